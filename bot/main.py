@@ -39,13 +39,19 @@ from models.analytics_table import init_analytics_tables
 from services.alert_service import start_alert_checker
 from services.refresh_tokens import refresh_top_tokens
 from services.refresh_whales import refresh_all_whales
-from whales.whale_monitor import start_monitor
+from whales.whale_monitor import WHALE_CHECK_INTERVAL, start_monitor
 from services.refresh_top200_coins import refresh_top200_coingecko_ids
 from services.refresh_top100_coins import refresh_top100_coingecko_ids
 from models.user_activity import update_last_active, cleanup_old_analytics
 from utils.private_guard_manager import apply_private_command_restrictions
 from handlers.fav.utils.db_favorites import init_favorites_table
 from services.screener_job import setup_screener_jobs, force_precompute_priority_timeframes
+from services.pattern_scanner import setup_pattern_scanner_jobs, shutdown_pattern_scanner
+from services.levels_board import setup_levels_board_jobs
+from services.regime_board import setup_regime_board_jobs
+from services.today_board import setup_today_board_jobs
+from services.llm_gateway import close_llm_gateway
+from services.http_client import close_http_client
 from services.signals_job import setup_indicator_jobs
 from services.movers_service import MoversService
 from services.performance_tracker import PerformanceTracker
@@ -58,6 +64,7 @@ from models.user import get_users_expiring_in, trial_expiry_warning_job, trial_e
 #
 # ADD these instead:
 from notifications.db import migrate as migrate_notifications
+from whales.whale_store import migrate as migrate_whales
 from notifications.handler import notifications_command, notifications_callback
 from notifications.scheduler import setup_notification_jobs
 
@@ -106,6 +113,12 @@ async def post_shutdown(application):
         # PTB's JobQueue handles its own cleanup on shutdown.
         await movers_service.close()
         logger.info("✅ Movers service closed")
+        shutdown_pattern_scanner()
+        logger.info("✅ Pattern scanner workers stopped")
+        await close_llm_gateway()
+        logger.info("✅ LLM gateway client closed")
+        await close_http_client()
+        logger.info("✅ Shared HTTP session closed")
     except Exception as e:
         logger.error(f"❌ Error during shutdown: {e}")
 
@@ -125,6 +138,7 @@ def main():
     # which creates all 3 new tables (notification_prefs, signal_alerts,
     # alert_history) instead of the old single-table setup.
     migrate_notifications()
+    migrate_whales()
     logger.info("✅ Database tables initialized")
 
     # ── Build application ─────────────────────────────────────────────
@@ -162,7 +176,7 @@ def main():
     jq.run_repeating(check_expired_pro_users,       interval=3600,   first=10)
     jq.run_repeating(refresh_top_tokens,            interval=604800, first=1800)
     jq.run_repeating(refresh_all_whales,            interval=604800, first=1500)
-    jq.run_repeating(start_monitor,                 interval=300,    first=1200)
+    jq.run_repeating(start_monitor,                 interval=WHALE_CHECK_INTERVAL, first=1200)
     jq.run_repeating(refresh_top200_coingecko_ids,  interval=259200, first=900)
     jq.run_repeating(refresh_top100_coingecko_ids,  interval=259200, first=600)
     jq.run_repeating(cleanup_old_analytics,         interval=86400,  first=15)
@@ -179,6 +193,22 @@ def main():
     setup_screener_jobs(app)
     logger.info("✅ Screener jobs scheduled")
 
+    # Market-wide chart-pattern board (read by /aiscan and signal alerts)
+    setup_pattern_scanner_jobs(app)
+    logger.info("✅ Pattern scanner job scheduled")
+
+    # Top-100 support/resistance board (read by /levels, /setup, channel posts)
+    setup_levels_board_jobs(app)
+    logger.info("✅ Levels board job scheduled")
+
+    # Hot-symbol /regime board (precomputed on candle close)
+    setup_regime_board_jobs(app)
+    logger.info("✅ Regime board job scheduled")
+
+    # Shared /today snapshot (all views pre-rendered)
+    setup_today_board_jobs(app)
+    logger.info("✅ Today snapshot job scheduled")
+
     # ADDED: notification jobs (daily briefs + signal alert checks)
     setup_notification_jobs(app)
     logger.info("✅ Notification jobs scheduled")
@@ -87,6 +87,7 @@ from .strategy_builder import (
     handle_strategy_input,
     confirm_strategy_callback,
     cancel_strategy_callback,
+    custom_screen_command,
     AWAITING_STRATEGY_INPUT
 )
 from .backtest import backtest_command, backtest_callback_handler
@@ -267,6 +268,7 @@ def register_all_handlers(app):
        app.add_handler(CallbackQueryHandler(backtest_callback_handler, pattern="^bt_"))
        app.add_handler(CommandHandler("aiscan", aiscan_command))
        app.add_handler(CommandHandler("screen", screener_command))
+       app.add_handler(CommandHandler("customscreen", custom_screen_command))
        app.add_handler(CallbackQueryHandler(screener_callback, pattern=r"^screener_"))               
        app.add_handler(MessageHandler(
         filters.TEXT & filters.Regex(r"^/[a-zA-Z]{1,10}$"), 
@@ -11,17 +11,19 @@ Output format:
   2. AI narrative (OpenRouter) grounded in the detected patterns
 """
 
-import os
 import datetime
 import logging
-import httpx
 
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
 from utils.ohlcv import fetch_candles
-from utils.patterns import detect_all_patterns          # returns List[Pattern]
+from utils.pattern_cache import detect_all_patterns_cached  # returns List[Pattern]
+from services.pattern_scanner import SCAN_LOOKBACK, get_board_entry, get_patterns_now
+from services.setup_analyzer import fetch_candles as fetch_scan_candles
+from utils.ai_cache import ai_cache, candle_bucket
+from services.llm_gateway import StreamAborted, StreamingReply, complete
 from models.user import get_user_plan
 from utils.auth import is_pro_plan
 from models.user_activity import update_last_active
@@ -45,15 +47,15 @@ def _fmt(price: float) -> str:
 # ============================================================================
 
 _TF_CONFIG = {
-    "1m":  {"max_patterns": 4,  "lookback": 60,  "horizon": "minutes",       "style": "SCALP"},
-    "5m":  {"max_patterns": 5,  "lookback": 100, "horizon": "1-4 hours",     "style": "SCALP"},
-    "15m": {"max_patterns": 6,  "lookback": 100, "horizon": "hours",         "style": "INTRADAY"},
-    "30m": {"max_patterns": 7,  "lookback": 150, "horizon": "hours/day",     "style": "INTRADAY"},
-    "1h":  {"max_patterns": 8,  "lookback": 200, "horizon": "1-3 days",      "style": "SWING"},
-    "2h":  {"max_patterns": 8,  "lookback": 200, "horizon": "2-5 days",      "style": "SWING"},
-    "4h":  {"max_patterns": 10, "lookback": 250, "horizon": "1-2 weeks",     "style": "SWING"},
-    "8h":  {"max_patterns": 10, "lookback": 250, "horizon": "2-4 weeks",     "style": "POSITION"},
-    "1d":  {"max_patterns": 12, "lookback": 300, "horizon": "weeks/months",  "style": "POSITION"},
+    "1m":  {"max_patterns": 4,  "lookback": 60,                    "horizon": "minutes",         "style": "SCALP"},
+    "5m":  {"max_patterns": 5,  "lookback": SCAN_LOOKBACK["5m"],   "horizon": "1-4 hours",       "style": "SCALP"},
+    "15m": {"max_patterns": 6,  "lookback": SCAN_LOOKBACK["15m"],  "horizon": "hours",           "style": "INTRADAY"},
+    "30m": {"max_patterns": 7,  "lookback": SCAN_LOOKBACK["30m"],  "horizon": "hours/day",       "style": "INTRADAY"},
+    "1h":  {"max_patterns": 8,  "lookback": SCAN_LOOKBACK["1h"],   "horizon": "1-3 days",        "style": "SWING"},
+    "2h":  {"max_patterns": 8,  "lookback": 200,                   "horizon": "2-5 days",        "style": "SWING"},
+    "4h":  {"max_patterns": 10, "lookback": SCAN_LOOKBACK["4h"],   "horizon": "1-2 weeks",       "style": "SWING"},
+    "8h":  {"max_patterns": 10, "lookback": 250,                   "horizon": "2-4 weeks",       "style": "POSITION"},
+    "1d":  {"max_patterns": 12, "lookback": SCAN_LOOKBACK["1d"],   "horizon": "weeks/months",    "style": "POSITION"},
 }
 
 _STYLE_LABELS = {
@@ -74,6 +76,9 @@ _MIN_CANDLES = {
 # ============================================================================
 
 _QUALITY_EMOJI = {"HIGH": "🔥", "MEDIUM": "⚡", "LOW": "💡"}
+
+_AI_MODEL          = "mistralai/mixtral-8x7b-instruct"
+_AI_PROMPT_VERSION = "aiscan-v1"   # bump when the prompt below changes
 _DIR_EMOJI     = {"BULLISH": "📈", "BEARISH": "📉", "NEUTRAL": "↔️"}
 _DIR_LABEL     = {"BULLISH": "Bullish", "BEARISH": "Bearish", "NEUTRAL": "Neutral"}
 
@@ -159,25 +164,35 @@ def _format_ai_message(ai_text: str, tf: str) -> str:
 
 
 # ============================================================================
-# AI NARRATIVE (async httpx — no blocking requests.post)
+# AI NARRATIVE (async LLM gateway — no blocking requests.post)
 # ============================================================================
 
+# Hallucination guard: replies containing any of these are discarded
+_FORBIDDEN_PHRASES = (
+    "will reach", "price target", "guaranteed", "definitely will",
+    "100% certain", "investment advice", "will go to",
+)
+
+
+def _has_forbidden_phrase(text: str) -> bool:
+    lowered = text.lower()
+    return any(phrase in lowered for phrase in _FORBIDDEN_PHRASES)
+
+
 async def _get_ai_narrative(
     symbol: str,
     tf: str,
     patterns: list,
     price: float,
     change_pct: float,
+    on_text=None,
 ) -> str | None:
     """
-    Call OpenRouter (async) with a structured prompt grounded in
-    the Pattern dicts. Returns the AI text or None on failure.
+    Call OpenRouter via the LLM gateway with a structured prompt grounded in
+    the Pattern dicts. `on_text` receives partial text while the reply
+    streams; the stream is aborted as soon as it contains a forbidden
+    phrase. Returns the AI text or None on failure.
     """
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    if not api_key:
-        logger.warning("OPENROUTER_API_KEY not set")
-        return None
-
     cfg   = _TF_CONFIG.get(tf, _TF_CONFIG["1h"])
     style = cfg["style"]
 
@@ -271,48 +286,105 @@ FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
 
 ⚠️ Pattern analysis only. Not financial advice."""
 
-    try:
-        async with httpx.AsyncClient(timeout=25.0) as client:
-            resp = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://t.me/your_bot",
-                },
-                json={
-                    "model": "mistralai/mixtral-8x7b-instruct",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.25,
-                    "max_tokens": max_tokens,
-                    "top_p": 0.9,
-                },
-            )
-
-        if resp.status_code != 200:
-            logger.error(f"OpenRouter {resp.status_code}: {resp.text[:200]}")
-            return None
+    # Same series, same candle, same pattern set → same narrative for everyone
+    cache_key = ai_cache.make_key(
+        "aiscan", _AI_PROMPT_VERSION, _AI_MODEL,
+        symbol=symbol, tf=tf, candle=candle_bucket(tf),
+        patterns=sorted((p["name"], p["direction"], p["quality"]) for p in patterns),
+    )
 
-        ai_text = resp.json()["choices"][0]["message"]["content"].strip()
+    async def _guarded(text: str) -> None:
+        # Checked before every partial edit, so a reply that trips the
+        # guard is never shown, not even in part
+        if _has_forbidden_phrase(text):
+            raise StreamAborted("forbidden phrase in partial reply")
+        await on_text(text)
+
+    async def _call() -> str | None:
+        ai_text = await complete(
+            "aiscan",
+            [{"role": "user", "content": prompt}],
+            model=_AI_MODEL,
+            temperature=0.25,
+            max_tokens=max_tokens,
+            top_p=0.9,
+            on_text=_guarded if on_text is not None else None,
+            extra_headers={"HTTP-Referer": "https://t.me/your_bot"},
+        )
+        if not ai_text:
+            return None
 
         # ── Hallucination guard ───────────────────────────────────────────
-        forbidden = [
-            "will reach", "price target", "guaranteed", "definitely will",
-            "100% certain", "investment advice", "will go to",
-        ]
-        if any(phrase in ai_text.lower() for phrase in forbidden):
+        if _has_forbidden_phrase(ai_text):
             logger.warning("AI response contained forbidden phrase — discarding")
             return None
 
         return ai_text
 
-    except httpx.TimeoutException:
-        logger.warning("OpenRouter timeout for /aiscan")
-        return None
+    return await ai_cache.get_or_create(cache_key, _call)
+
+
+# ============================================================================
+# ON-DEMAND SCAN & MARKET BOARD
+# ============================================================================
+
+def _price_change(candles: list, cfg: dict) -> tuple:
+    """(last close, % change over the last lookback/10 candles)"""
+    price      = float(candles[-1]["close"])
+    lookback_n = min(cfg["lookback"] // 10, len(candles) - 1)
+    ref_price  = float(candles[-lookback_n]["close"]) if lookback_n > 0 else price
+    return price, (price - ref_price) / (ref_price + 1e-9) * 100
+
+
+async def _fetch_and_detect(loading, symbol: str, tf: str, cfg: dict, min_candles: int, max_patterns: int):
+    """
+    Fallback when the pattern scan board has nothing current for this series.
+    Returns (patterns, price, change_pct, n_candles), or None after reporting
+    the failure on the loading message.
+    """
+    try:
+        candles = await fetch_candles(symbol, tf, limit=cfg["lookback"])
     except Exception as e:
-        logger.exception(f"OpenRouter error: {e}")
+        logger.exception(f"fetch_candles failed for {symbol}/{tf}")
+        await loading.edit_text("⚠️ Failed to fetch chart data. Please try again.")
         return None
 
+    if not candles or len(candles) < min_candles:
+        await loading.edit_text(
+            f"⚠️ Insufficient data for *{symbol}* on `{tf}`.\n\n"
+            f"Got {len(candles) if candles else 0} candles (need {min_candles}).\n"
+            f"Try a longer timeframe like `1h` or `4h`.",
+        )
+        return None
+
+    # ── Current price & change ────────────────────────────────────────────
+    price, change_pct = _price_change(candles, cfg)
+
+    # ── Detect patterns (cached per closed candle) ────────────────────────
+    try:
+        patterns = detect_all_patterns_cached(
+            symbol, tf, candles, max_results=max_patterns, min_quality="LOW"
+        )
+    except Exception as e:
+        logger.exception(f"Pattern detection failed for {symbol}/{tf}")
+        patterns = []
+
+    return patterns, price, change_pct, len(candles)
+
+
+def _format_patterns_now(limit: int = 5) -> str:
+    """Top rows of the market-wide 'patterns now' board, or '' before the first scan."""
+    rows = get_patterns_now(min_quality="HIGH", limit=limit)
+    if not rows:
+        return ""
+    lines = ["", "", "🔥 *Patterns now (top 100):*"]
+    for r in rows:
+        lines.append(
+            f"{_DIR_EMOJI.get(r['direction'], '•')} `{r['symbol']}` {r['timeframe']} — "
+            f"{r['emoji']} {r['name']}"
+        )
+    return "\n".join(lines)
+
 
 # ============================================================================
 # MAIN COMMAND HANDLER
@@ -355,7 +427,8 @@ async def aiscan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "`/aiscan BTC 4h`\n"
             "`/aiscan ETH 1h`\n"
             "`/aiscan SOL 15m`\n\n"
-            f"*Timeframes:* `{'  '.join(VALID_TIMEFRAMES)}`",
+            f"*Timeframes:* `{'  '.join(VALID_TIMEFRAMES)}`"
+            + _format_patterns_now(),
             parse_mode=ParseMode.MARKDOWN,
         )
         return
@@ -390,38 +463,31 @@ async def aiscan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         chat_id=update.effective_chat.id, action="typing"
     )
 
-    # ── Fetch candles ─────────────────────────────────────────────────────
-    try:
-        candles = await fetch_candles(symbol, tf, limit=cfg["lookback"])
-    except Exception as e:
-        logger.exception(f"fetch_candles failed for {symbol}/{tf}")
-        await loading.edit_text("⚠️ Failed to fetch chart data. Please try again.")
-        return
-
-    if not candles or len(candles) < min_candles:
-        await loading.edit_text(
-            f"⚠️ Insufficient data for *{symbol}* on `{tf}`.\n\n"
-            f"Got {len(candles) if candles else 0} candles (need {min_candles}).\n"
-            f"Try a longer timeframe like `1h` or `4h`.",
-        )
-        return
-
-    # ── Current price & change ────────────────────────────────────────────
-    price = float(candles[-1]["close"])
-    lookback_n = min(cfg["lookback"] // 10, len(candles) - 1)
-    ref_price  = float(candles[-lookback_n]["close"]) if lookback_n > 0 else price
-    change_pct = (price - ref_price) / (ref_price + 1e-9) * 100
-
-    # ── Detect patterns ───────────────────────────────────────────────────
-    try:
-        patterns = detect_all_patterns(candles, max_results=max_patterns, min_quality="LOW")
-    except Exception as e:
-        logger.exception(f"Pattern detection failed for {symbol}/{tf}")
-        patterns = []
+    # ── Market-wide scan board (already detected for this candle) ─────────
+    # The board only holds patterns for the last closed candle; price and
+    # change % come from the scanner's candle source (at most 30s old).
+    entry = get_board_entry(symbol, tf)
+    live  = None
+    if entry and entry["n"] >= min_candles:
+        try:
+            live = await fetch_scan_candles(symbol, tf, limit=cfg["lookback"])
+        except Exception:
+            logger.exception(f"Live candles failed for {symbol}/{tf}")
+
+    if live:
+        price, change_pct = _price_change(live, cfg)
+        patterns   = [dict(p) for p in entry["patterns"][:max_patterns]]
+        n_candles  = entry["n"]
+        logger.info(f"/aiscan {symbol}/{tf} — patterns served from pattern scan board")
+    else:
+        fetched = await _fetch_and_detect(loading, symbol, tf, cfg, min_candles, max_patterns)
+        if fetched is None:
+            return
+        patterns, price, change_pct, n_candles = fetched
 
     # ── Log ───────────────────────────────────────────────────────────────
     logger.info(
-        f"/aiscan {symbol}/{tf} — {len(candles)} candles, "
+        f"/aiscan {symbol}/{tf} — {n_candles} candles, "
         f"{len(patterns)} patterns, price={_fmt(price)}"
     )
 
@@ -430,7 +496,7 @@ async def aiscan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await loading.edit_text(
             f"✅ *{symbol} / {tf} — Clean Chart*\n\n"
             f"No significant patterns detected in the last "
-            f"{len(candles)} candles.\n\n"
+            f"{n_candles} candles.\n\n"
             f"💡 This often means price is in a tight consolidation with no "
             f"breakout signal yet. Try:\n"
             f"• A different timeframe\n"
@@ -448,10 +514,14 @@ async def aiscan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         chat_id=update.effective_chat.id, action="typing"
     )
 
-    ai_text = await _get_ai_narrative(symbol, tf, patterns, price, change_pct)
+    ai_msg = await update.message.reply_text("🤖 Generating AI analysis…")
+    ai_text = await _get_ai_narrative(
+        symbol, tf, patterns, price, change_pct,
+        on_text=StreamingReply(ai_msg, header="🤖 AI Analysis\n\n"),
+    )
 
     if ai_text:
-        await update.message.reply_text(
+        await ai_msg.edit_text(
             _format_ai_message(ai_text, tf),
             parse_mode=ParseMode.MARKDOWN,
             disable_web_page_preview=True,
@@ -459,7 +529,7 @@ async def aiscan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         # Fallback: rule-based summary built from pattern dicts
         fallback = _rule_based_summary(patterns, symbol, tf)
-        await update.message.reply_text(
+        await ai_msg.edit_text(
             _format_ai_message(fallback, tf),
             parse_mode=ParseMode.MARKDOWN,
         )
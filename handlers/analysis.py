@@ -1,4 +1,3 @@
-import requests
 import os
 from utils.indicators import get_crypto_indicators
 from models.user import get_user_plan
@@ -12,6 +11,8 @@ import httpx
 import logging
 from datetime import datetime
 from tasks.handlers import handle_streak
+from utils.ai_cache import ai_cache, candle_bucket
+from services.llm_gateway import StreamingReply, complete
 from typing import Optional, Dict, Any
 from functools import lru_cache
     
@@ -26,6 +27,10 @@ with open(COINGECKO_IDS_PATH, "r") as f:
 COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY")
 COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
 
+# AI configuration
+AI_MODEL = "mistralai/mixtral-8x7b-instruct"
+AI_PROMPT_VERSION = "analysis-v1"  # bump when build_analysis_prompt changes
+
 
 def safe(value: Any) -> str:
     """Safely format indicator values with improved type handling"""
@@ -294,7 +299,15 @@ async def analysis_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # GET AI ANALYSIS
         # ====================================================================
         
-        analysis_text = await get_ai_analysis(prompt)
+        # Shared by every request for this symbol/timeframe within the candle
+        cache_key = ai_cache.make_key(
+            "analysis", AI_PROMPT_VERSION, AI_MODEL,
+            symbol=symbol, timeframe=user_input_tf, candle=candle_bucket(user_input_tf),
+        )
+        stream = StreamingReply(loading_msg, header=f"🤖 {symbol} ({user_input_tf}) analysis\n\n")
+        analysis_text = await ai_cache.get_or_create(
+            cache_key, lambda: get_ai_analysis(prompt, on_text=stream)
+        )
         
         if analysis_text is None:
             await loading_msg.edit_text(
@@ -461,77 +474,48 @@ Remember: Interpret what IS, not what WILL BE. Help traders understand the curre
 # AI ANALYSIS
 # ============================================================================
 
-async def get_ai_analysis(prompt: str) -> Optional[str]:
+async def get_ai_analysis(prompt: str, on_text=None) -> Optional[str]:
     """
-    Get AI analysis from OpenRouter with improved error handling
+    Get AI analysis from OpenRouter via the LLM gateway. `on_text` receives
+    partial text while the reply streams.
     """
-    api_key = os.getenv('OPENROUTER_API_KEY')
-    
-    if not api_key:
-        logger.error("OPENROUTER_API_KEY not configured")
-        return None
-    
-    try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": os.getenv("APP_URL", "https://your-bot.com"),
-                "X-Title": "Crypto Analysis Bot"
-            },
-            json={
-                "model": "mistralai/mixtral-8x7b-instruct",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a professional cryptocurrency technical analyst. "
-                            "You interpret market data objectively and never make price predictions. "
-                            "You acknowledge uncertainty and provide balanced, multi-scenario analysis. "
-                            "Your goal is to help traders understand current market conditions, not to guess future prices."
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": 0.6,  # Slightly lower for more consistent analysis
-                "max_tokens": 600,
-                "top_p": 0.9
+    analysis = await complete(
+        "analysis",
+        [
+            {
+                "role": "system",
+                "content": (
+                    "You are a professional cryptocurrency technical analyst. "
+                    "You interpret market data objectively and never make price predictions. "
+                    "You acknowledge uncertainty and provide balanced, multi-scenario analysis. "
+                    "Your goal is to help traders understand current market conditions, not to guess future prices."
+                )
             },
-            timeout=25
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            analysis = data["choices"][0]["message"]["content"].strip()
-            
-            # Basic validation
-            if len(analysis) < 50:
-                logger.warning("AI returned suspiciously short analysis")
-                return None
-                
-            return analysis
-            
-        elif response.status_code == 429:
-            logger.error("OpenRouter rate limit exceeded")
-            return None
-        elif response.status_code == 401:
-            logger.error("OpenRouter API key invalid")
-            return None
-        else:
-            logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
-            return None
-
-    except requests.Timeout:
-        logger.error("OpenRouter request timeout")
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        model=AI_MODEL,
+        temperature=0.6,  # Slightly lower for more consistent analysis
+        max_tokens=600,
+        top_p=0.9,
+        on_text=on_text,
+        extra_headers={
+            "HTTP-Referer": os.getenv("APP_URL", "https://your-bot.com"),
+            "X-Title": "Crypto Analysis Bot"
+        },
+    )
+    if analysis is None:
         return None
-    except Exception as e:
-        logger.exception(f"AI analysis request failed: {e}")
+
+    # Basic validation
+    if len(analysis) < 50:
+        logger.warning("AI returned suspiciously short analysis")
         return None
 
+    return analysis
+
 
 # ============================================================================
 # RESPONSE FORMATTING
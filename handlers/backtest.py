@@ -8,6 +8,7 @@ from tasks.handlers import handle_streak
 from models.sma_strategy import simulate_sma_strategy
 from models.rsi_strategy import simulate_rsi_strategy
 from utils.backtest_formatter import format_strategy_output, format_comparison_output
+from utils.cache import get_cache
 import json
 from datetime import datetime
 
@@ -85,7 +86,6 @@ def get_remaining_backtests(user_id: int, plan: str) -> int:
     return max(0, limit - used)
 
 import os
-import time
 import httpx
 from datetime import datetime, timedelta
 from typing import List, Dict
@@ -94,8 +94,8 @@ from typing import List, Dict
 COINGECKO_DEMO_KEY = os.getenv("COINGECKO_API_KEY")  # Demo key from .env
 
 # --- Simple in-memory cache ---
-CACHE: Dict[str, Dict] = {}
 CACHE_DURATION = 300  # 5 minutes in seconds
+CACHE = get_cache("backtest", ttl=CACHE_DURATION, max_entries=200)
 
 async def fetch_coingecko_data(coingecko_id: str, days: int = 30) -> List[Dict]:
     """
@@ -111,14 +111,12 @@ async def fetch_coingecko_data(coingecko_id: str, days: int = 30) -> List[Dict]:
         Empty list if fetch fails
     """
     cache_key = f"{coingecko_id}_{days}"
-    now = time.time()
     
     # Check cache first
-    if cache_key in CACHE:
-        cached_data, timestamp = CACHE[cache_key]
-        if now - timestamp < CACHE_DURATION:
-            print(f"✅ Using cached data for {coingecko_id} ({days}d)")
-            return cached_data
+    cached_data = CACHE.get(cache_key)
+    if cached_data is not None:
+        print(f"✅ Using cached data for {coingecko_id} ({days}d)")
+        return cached_data
 
     # --- Fetch from CoinGecko Demo API ---
     try:
@@ -159,7 +157,7 @@ async def fetch_coingecko_data(coingecko_id: str, days: int = 30) -> List[Dict]:
             return []
 
         # Cache the result
-        CACHE[cache_key] = (candles, now)
+        CACHE.set(cache_key, candles)
         print(f"✅ Fetched {len(candles)} candles for {coingecko_id} ({days}d)")
         return candles
 
@@ -41,6 +41,10 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
+from services.levels_board import detect_level_break
+from utils.ai_cache import ai_cache
+from services.llm_gateway import complete
+
 logger = logging.getLogger(__name__)
 
 # ── Config ────────────────────────────────────────────────────────────────────
@@ -50,6 +54,9 @@ COINGECKO_API_KEY  = os.getenv("COINGECKO_API_KEY", "")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 BOT_USERNAME       = os.getenv("BOT_USERNAME", "your_bot")  # without @
 
+AI_MODEL           = "mistralai/mixtral-8x7b-instruct"
+AI_PROMPT_VERSION  = "channel-v1"
+
 _raw_admin_ids     = os.getenv("ADMIN_ID", "")
 ADMIN_IDS: set[int] = {
     int(x.strip()) for x in _raw_admin_ids.split(",") if x.strip().isdigit()
@@ -373,8 +380,12 @@ def enrich_data(raw: dict) -> dict:
     # EMA position string
     ema_pos = _ema_position(btc_price, ema20, ema50) if btc_price else "unavailable"
 
-    # Level break
-    level_break = _detect_level_break(prices_4h) if prices_4h else None
+    # Level break — precomputed BTC 4h S/R levels first, swing fallback
+    level_break = None
+    if len(prices_4h) >= 2:
+        level_break = detect_level_break("BTC", "4h", prices_4h[-2], prices_4h[-1])
+    if not level_break and prices_4h:
+        level_break = _detect_level_break(prices_4h)
 
     # Screener summary
     screener_counts = raw.get("screener_counts", {})
@@ -475,27 +486,21 @@ Max 75 words. No emojis. No bullet points."""
 async def get_ai_narrative(prompt: str) -> Optional[str]:
     if not OPENROUTER_API_KEY:
         return None
-    try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            r = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "mistralai/mixtral-8x7b-instruct",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 180,
-                    "temperature": 0.45,
-                },
-            )
-        if r.status_code == 200:
-            return r.json()["choices"][0]["message"]["content"].strip()
-        logger.warning(f"[channel AI] {r.status_code}")
-    except Exception as e:
-        logger.warning(f"[channel AI] {e}")
-    return None
+
+    # The prompt is built only from rounded market data, so it is its own
+    # content address — a preview and the post right after share one call
+    cache_key = ai_cache.make_key("channel_update", AI_PROMPT_VERSION, AI_MODEL, prompt=prompt)
+
+    async def _call() -> Optional[str]:
+        return await complete(
+            "channel_update",
+            [{"role": "user", "content": prompt}],
+            model=AI_MODEL,
+            max_tokens=180,
+            temperature=0.45,
+        )
+
+    return await ai_cache.get_or_create(cache_key, _call)
 
 
 def fallback_narrative(data: dict) -> str:
@@ -1,9 +1,10 @@
 # fav/utils/fav_prices_async.py
 import os
-import time
 import aiohttp
 from dotenv import load_dotenv
 
+from utils.cache import get_cache
+
 load_dotenv()
 
 CMC_API_KEY = os.getenv("CMC_API_KEY")
@@ -14,20 +15,16 @@ COINGECKO_MARKETS = "https://api.coingecko.com/api/v3/coins/markets"
 # -------------------------------------------------
 # SIMPLE IN-MEMORY CACHE (60 seconds lifespan)
 # -------------------------------------------------
-CACHE = {}
 CACHE_TTL = 60   # seconds
+CACHE = get_cache("fav_prices", ttl=CACHE_TTL, max_entries=1000)
 
 
 def cache_get(key):
-    if key in CACHE:
-        value, timestamp = CACHE[key]
-        if time.time() - timestamp < CACHE_TTL:
-            return value
-    return None
+    return CACHE.get(key)
 
 
 def cache_set(key, value):
-    CACHE[key] = (value, time.time())
+    CACHE.set(key, value)
 
 
 
@@ -5,14 +5,15 @@
 Handler for /levels command - Professional Support & Resistance Analysis
 - Multi-timeframe support (1m, 5m, 15m, 1h, 4h, 1d, 1w)
 - Single key level + range display
-- No caching (always fresh data)
+- Served from the precomputed levels board (refreshed every candle close)
 - Pro-only feature
 """
 
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
-from services.levels_engine import LevelsEngine, LevelsError, TIMEFRAME_CONFIG
+from services.levels_engine import LevelsError, TIMEFRAME_CONFIG
+from services.levels_board import get_levels
 from models.user import get_user_plan
 from utils.auth import is_pro_plan
 from models.user_activity import update_last_active
@@ -20,7 +21,7 @@ import asyncio
 from tasks.handlers import handle_streak
     
 async def levels_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /levels command - Pro only, always fresh calculations"""
+    """Handle /levels command - Pro only, levels as of the last candle close"""
     
     user_id = update.effective_user.id
     plan = get_user_plan(user_id)
@@ -82,9 +83,8 @@ async def levels_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await asyncio.sleep(0.3)
     
     try:
-        # Always calculate fresh (no cache)
-        engine = LevelsEngine()
-        result = await engine.calculate_levels(symbol, timeframe)
+        # Precomputed board (falls back to a live calculation on a miss)
+        result = await get_levels(symbol, timeframe)
         
         # Format and send response
         response = format_levels_response(result, symbol, timeframe)
@@ -142,7 +142,7 @@ def format_levels_response(result: dict, symbol: str, timeframe: str) -> str:
             response += (
                 f"{strength_emoji} **{level_display}** "
                 f"_(+{distance_pct:.1f}%)_\n"
-                f"   {level['touches']} touches · {level['strength']}\n"
+                f"   {describe_level_basis(level)} · {level['strength']}\n"
             )
         response += "\n"
     else:
@@ -168,12 +168,25 @@ def format_levels_response(result: dict, symbol: str, timeframe: str) -> str:
             response += (
                 f"{strength_emoji} **{level_display}** "
                 f"_(-{distance_pct:.1f}%)_\n"
-                f"   {level['touches']} touches · {level['strength']}\n"
+                f"   {describe_level_basis(level)} · {level['strength']}\n"
             )
         response += "\n"
     else:
         response += "🟢 **Support:** _No nearby levels_\n\n"
     
+    # ========================================================================
+    # VOLUME PROFILE
+    # ========================================================================
+    
+    profile = result.get('volume_profile')
+    if profile:
+        location = "inside" if profile['in_value_area'] else "outside"
+        response += (
+            f"📦 **Volume POC:** ${format_price(profile['poc'])} · "
+            f"Value area ${format_price(profile['value_area_low'])} - "
+            f"${format_price(profile['value_area_high'])} _(price {location})_\n\n"
+        )
+    
     # ========================================================================
     # TRADING INSIGHT
     # ========================================================================
@@ -210,6 +223,16 @@ def format_key_level_with_range(
     return f"${key_str} (${lower_str} - ${upper_str})"
 
 
+def describe_level_basis(level: dict) -> str:
+    """'4 touches' for swing clusters, 'Volume POC' / 'Volume node' for profile levels"""
+    source = level.get('source', 'swing')
+    if source == "poc":
+        return "Volume POC"
+    if source == "volume":
+        return "Volume node"
+    return f"{level['touches']} touches"
+
+
 def format_price(price: float) -> str:
     """
     Smart price formatting based on magnitude
@@ -5,7 +5,7 @@ from services.regime_engine import RegimeEngine
 from models.user import get_user_plan
 from utils.auth import is_pro_plan
 from models.user_activity import update_last_active
-from utils.regime_cache import RegimeCache
+from services.regime_board import regime_cache
 import asyncio
 import logging
 import json
@@ -18,10 +18,10 @@ from tasks.handlers import handle_streak
 logger = logging.getLogger(__name__)
 
 # ============================================================================
-# CACHE INITIALIZATION
+# CACHE
 # ============================================================================
-
-regime_cache = RegimeCache(ttl_minutes=5)
+# regime_cache is shared with the regime board, which keeps the most
+# requested symbol/style pairs precomputed until their next candle close.
 
 # ============================================================================
 # TOP 100 COIN VALIDATION
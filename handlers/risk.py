@@ -20,7 +20,6 @@ Leverage is used to:
 
 import os
 import logging
-import httpx
 
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -29,12 +28,17 @@ from models.user import get_user_plan
 from utils.auth import is_pro_plan
 from models.user_activity import update_last_active
 from tasks.handlers import handle_streak
+from utils.ai_cache import ai_cache
+from services.llm_gateway import complete
 from dotenv import load_dotenv
 
 load_dotenv()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 logger = logging.getLogger(__name__)
 
+AI_RISK_MODEL          = "anthropic/claude-3-haiku"
+AI_RISK_PROMPT_VERSION = "risk-v1"   # bump when the risk prompt changes
+
 
 # ── Number formatter ──────────────────────────────────────────────────────────
 
@@ -667,28 +671,23 @@ async def _get_ai_analysis(data: dict, liq_price: float, liq_is_safe: bool) -> s
         f"No preamble. Write like you're texting a trading partner."
     )
 
-    try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "anthropic/claude-3-haiku",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 200,
-                    "temperature": 0.5,
-                },
-            )
-        if resp.status_code == 200:
-            return resp.json()["choices"][0]["message"]["content"].strip()
-        logger.warning(f"[AI Risk] {resp.status_code}: {resp.text[:100]}")
-        return None
-    except Exception as e:
-        logger.warning(f"[AI Risk] {e}")
-        return None
+    # The trade parameters fully determine the prompt
+    cache_key = ai_cache.make_key(
+        "risk", AI_RISK_PROMPT_VERSION, AI_RISK_MODEL,
+        account=account_size, risk=risk_percent, entry=entry_price,
+        stop=stop_loss, leverage=leverage, liq=round(liq_price, 2), liq_safe=liq_is_safe,
+    )
+
+    async def _call() -> str | None:
+        return await complete(
+            "risk",
+            [{"role": "user", "content": prompt}],
+            model=AI_RISK_MODEL,
+            max_tokens=200,
+            temperature=0.5,
+        )
+
+    return await ai_cache.get_or_create(cache_key, _call)
 
 
 async def _get_ai_optimised(data: dict) -> dict | None:
@@ -716,24 +715,17 @@ async def _get_ai_optimised(data: dict) -> dict | None:
     )
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "anthropic/claude-3-haiku",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 100,
-                    "temperature": 0.3,
-                },
-            )
-        if resp.status_code != 200:
+        reply = await complete(
+            "risk",
+            [{"role": "user", "content": prompt}],
+            model=AI_RISK_MODEL,
+            max_tokens=100,
+            temperature=0.3,
+        )
+        if reply is None:
             return None
 
-        lines     = resp.json()["choices"][0]["message"]["content"].strip().split("\n")
+        lines     = reply.split("\n")
         optimised = {}
         for line in lines:
             if "STOP:"    in line: optimised["stop"] = float(line.split(":")[1].strip().replace(",", ""))
@@ -7,10 +7,11 @@ from models.user import get_user_plan
 from utils.auth import is_pro_plan
 from models.user_activity import update_last_active
 from tasks.handlers import handle_streak
+from utils.ai_cache import ai_cache, candle_bucket
+from services.llm_gateway import complete
 import json
 import os
 import logging
-import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,10 @@ performance_tracker = PerformanceTracker()
 
 VALID_TIMEFRAMES = ["5m", "15m", "30m", "1h", "2h", "4h", "8h", "1d"]
 
+AI_MODEL          = "anthropic/claude-3-haiku"
+AI_PROMPT_VERSION = "setup-v1"   # bump when the narrative prompt changes
+AI_HEDGE_AFTER    = 8            # seconds before a duplicate request is sent
+
 OUTCOME_WINDOWS = {
     "5m":  {"4h": 0.33, "24h": 2,   "72h": 6},
     "15m": {"4h": 1,    "24h": 6,   "72h": 18},
@@ -108,6 +113,14 @@ def fmt_price_plain(price: float) -> str:
     return fmt_price(price).lstrip("$")
 
 
+def level_basis(level: dict) -> str:
+    if level.get("source") == "poc":
+        return "volume POC"
+    if level.get("source") == "volume":
+        return "volume node"
+    return f"{level['touches']} touches"
+
+
 # ============================================================================
 # AI NARRATIVE
 # ============================================================================
@@ -193,28 +206,34 @@ Hard rules:
 - Output ONLY the paragraph + the three scenario lines. Nothing else.
 - Use plain text only. No asterisks, underscores, backticks, or any markdown symbols."""
 
-    try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://t.me/your_bot",
-                },
-                json={
-                    "model": "anthropic/claude-3-haiku",
-                    "max_tokens": 500,
-                    "messages": [{"role": "user", "content": prompt}],
-                },
-            )
-        resp.raise_for_status()
-        raw = resp.json()["choices"][0]["message"]["content"].strip()
-        return _parse_ai_response(raw, setup_data, symbol, timeframe)
+    # Key on the structured setup (the scenario lines echo these prices)
+    cache_key = ai_cache.make_key(
+        "setup", AI_PROMPT_VERSION, AI_MODEL,
+        symbol=symbol, timeframe=timeframe, candle=candle_bucket(timeframe),
+        direction=direction, score=score, confidence=confidence,
+        trend=trend_context, htf=(htf_tf, htf_trend),
+        signals=(bullish_signals[:4], bearish_signals[:4]),
+        prices=[fmt_price_plain(p) for p in (
+            entry_zone[0], entry_zone[1], sl_tight, tp1_safe, tp2_safe,
+            nearest_support, nearest_resistance,
+        )],
+    )
 
-    except Exception as e:
-        logger.warning(f"OpenRouter call failed ({e}) — using rule-based narrative")
+    async def _call() -> str | None:
+        # Hedged: a slow haiku reply gets a duplicate request, first one wins
+        return await complete(
+            "setup",
+            [{"role": "user", "content": prompt}],
+            model=AI_MODEL,
+            max_tokens=500,
+            hedge_after=AI_HEDGE_AFTER,
+            extra_headers={"HTTP-Referer": "https://t.me/your_bot"},
+        )
+
+    raw = await ai_cache.get_or_create(cache_key, _call)
+    if raw is None:
         return _rule_based_narrative(setup_data, symbol, timeframe)
+    return _parse_ai_response(raw, setup_data, symbol, timeframe)
 
 
 def _parse_ai_response(raw: str, setup_data: dict, symbol: str, timeframe: str) -> dict:
@@ -513,11 +532,11 @@ async def format_setup_message(setup_data: dict, symbol: str, timeframe: str) ->
         if resistance_levels:
             r    = resistance_levels[0]
             dist = ((r["price"] - current_price) / current_price) * 100
-            msg += f"↑ Resistance: {h(fmt_price(r['price']))} (+{dist:.1f}%, {r['touches']} touches)\n"
+            msg += f"↑ Resistance: {h(fmt_price(r['price']))} (+{dist:.1f}%, {level_basis(r)})\n"
         if support_levels:
             s    = support_levels[0]
             dist = ((current_price - s["price"]) / current_price) * 100
-            msg += f"↓ Support:    {h(fmt_price(s['price']))} (-{dist:.1f}%, {s['touches']} touches)\n"
+            msg += f"↓ Support:    {h(fmt_price(s['price']))} (-{dist:.1f}%, {level_basis(s)})\n"
         msg += "\n"
 
     # ── Signals summary ───────────────────────────────────────────────
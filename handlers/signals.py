@@ -282,7 +282,7 @@ async def signals_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Request more signals than needed, then trim by tier
         max_signals = tier_config["max_signals"]
         
-        final_signals = post_process_and_rank(
+        final_signals = await post_process_and_rank(
             pre_scored_coins=top_candidates,
             timeframe=timeframe,
             top_n=max_signals,  # Request only what user can see
@@ -3,16 +3,32 @@ import requests
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, ConversationHandler
+from telegram.helpers import escape_markdown
 from dotenv import load_dotenv
 from utils.auth import is_pro_plan
 from models.user import get_user_plan
 from models.ai_alerts import save_ai_strategy
 from models.user_activity import update_last_active
+from services.screener_dsl import FIELDS, StrategyDSLError, compile_strategy
+from services.screener_engine import run_custom_screen
 
 load_dotenv()
 
 AWAITING_STRATEGY_INPUT = 1
 
+SCREEN_TIMEFRAMES = ("5m", "15m", "30m", "1h", "4h", "1d")
+SCREEN_USAGE = (
+    "🧪 *Custom Screen* — scan 100 coins with your own rules.\n\n"
+    "Usage: `/customscreen [timeframe] rule; rule; ...`\n\n"
+    "• `rsi < 30` — required condition\n"
+    "• `macd > signal => 2` — adds 2 points when true\n"
+    "• `min_score: 2` — points needed to match\n\n"
+    "Example:\n"
+    "`/customscreen 4h rsi < 35 => 2; macd > signal => 1; volume > volume_ma`\n\n"
+    "Functions: `abs`, `min`, `max`, `pct(a, b)` (% difference)\n"
+    "Fields: " + ", ".join(f"`{f}`" for f in FIELDS)
+)
+
 async def strategy_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     await update_last_active(user_id, command_name="/aistrat")
@@ -141,4 +157,67 @@ async def cancel_strategy_callback(update: Update, context: ContextTypes.DEFAULT
     await query.answer()  
     context.user_data.pop("parsed_strategy", None)  
   
-    await query.edit_message_text("❌ Strategy cancelled. You can try again using /aistrat") 
\ No newline at end of file
+    await query.edit_message_text("❌ Strategy cancelled. You can try again using /aistrat") 
+
+
+async def custom_screen_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/customscreen [tf] <rules> — run a user-defined screen over the screener cache."""
+    user_id = update.effective_user.id
+    await update_last_active(user_id, command_name="/customscreen")
+    plan = get_user_plan(user_id)
+
+    if not is_pro_plan(plan):
+        return await update.message.reply_text(
+            "❌ This is a *Pro-only* feature. Upgrade to Pro to run custom screens.\n\n👉 /upgrade",
+            parse_mode=ParseMode.MARKDOWN
+        )
+
+    parts = update.message.text.split(maxsplit=1)
+    source = parts[1].strip() if len(parts) > 1 else ""
+
+    timeframe = "1h"
+    first, _, rest = source.partition(" ")
+    if first.lower() in SCREEN_TIMEFRAMES:
+        timeframe, source = first.lower(), rest.strip()
+
+    if not source:
+        return await update.message.reply_text(SCREEN_USAGE, parse_mode=ParseMode.MARKDOWN)
+
+    try:
+        strategy = compile_strategy(source)
+    except StrategyDSLError as e:
+        # The message can quote the user's input: escape it, and keep it out
+        # of a code span (legacy Markdown can't escape a backtick inside one)
+        return await update.message.reply_text(
+            f"⚠️ Could not read your rules: {escape_markdown(str(e))}\n\nSend /customscreen for the syntax.",
+            parse_mode=ParseMode.MARKDOWN
+        )
+
+    results = run_custom_screen(strategy, timeframe)
+    if results is None:
+        return await update.message.reply_text(
+            f"⏳ Screener data for *{timeframe}* is still warming up. Try again in a minute.",
+            parse_mode=ParseMode.MARKDOWN
+        )
+
+    rules = "\n".join(f"• `{line}`" for line in strategy.describe())
+    if not results:
+        return await update.message.reply_text(
+            f"❌ No coins matched your screen on *{timeframe}*.\n\n{rules}",
+            parse_mode=ParseMode.MARKDOWN
+        )
+
+    msg = f"✅ *Custom Screen* — {timeframe}\n{rules}\n\nFound {len(results)} coin(s)\n\n"
+    for i, coin in enumerate(results[:10], 1):
+        close = coin.get("close")
+        rsi = coin.get("rsi")
+        price_str = f"${close:.2f}" if close is not None else "N/A"
+        rsi_str = f"{rsi:.1f}" if rsi is not None else "N/A"
+        msg += (
+            f"{i}. *{coin['symbol']}* — Score: `{coin['score']}`\n"
+            f"   Price: `{price_str}` | RSI: `{rsi_str}`\n\n"
+        )
+    if len(results) > 10:
+        msg += f"_Showing top 10 of {len(results)} matches_\n"
+
+    await update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
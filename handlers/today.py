@@ -1,22 +1,12 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from services.today_data import MarketDataService
-from services.sentiment import SentimentService
-from services.sector_analysis import SectorAnalysisService
-from services.macro_data import MacroDataService
-from utils.today_builder import TodayAnalyzer
+from services.today_board import peek_today_message, get_today_message, TodaySnapshotError
 from models.user import get_user_plan
 from utils.auth import is_pro_plan
 from models.user_activity import update_last_active
 import time
 from typing import Dict, Optional
 from tasks.handlers import handle_streak
-# Initialize services (singleton pattern)
-market_service = MarketDataService()
-sentiment_service = SentimentService()
-sector_service = SectorAnalysisService()
-macro_service = MacroDataService()
-analyzer = TodayAnalyzer()
 
 # Rate limiting cache (user_id: last_request_time)
 _rate_limit_cache: Dict[int, float] = {}
@@ -107,102 +97,41 @@ async def today_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
     
-    # === LOADING MESSAGE ===
-    if view_mode == "risk":
-        loading_msg = await update.message.reply_text("⚡ Running quick analysis...")
-    elif view_mode in ["btc", "eth"]:
-        loading_msg = await update.message.reply_text(f"🔄 Analyzing {view_mode.upper()}...")
-    elif view_mode == "macro":
-        loading_msg = await update.message.reply_text("🌍 Analyzing macro conditions...")
-    elif view_mode == "sectors":
-        loading_msg = await update.message.reply_text("🎯 Analyzing 8 sectors...")
-    else:
-        loading_msg = await update.message.reply_text("🔄 Analyzing market conditions across all metrics...")
+    # === PRE-RENDERED SNAPSHOT (O(1) when the board is current) ===
+    loading_msg = None
+    message = peek_today_message(view_mode)
     
     try:
-        # === FETCH DATA (with individual error handling) ===
-        
-        # BTC data (critical)
-        btc_data = market_service.get_coin_data("BTC")
-        if not btc_data:
-            await loading_msg.edit_text(
-                "❌ Failed to fetch BTC data. This is required for analysis.\n"
-                "Please try again in a few moments."
-            )
-            return
-        
-        # ETH data (critical)
-        eth_data = market_service.get_coin_data("ETH")
-        if not eth_data:
-            await loading_msg.edit_text(
-                "❌ Failed to fetch ETH data. This is required for analysis.\n"
-                "Please try again in a few moments."
-            )
-            return
-        
-        # Sentiment data (fallback available)
-        sentiment_data = sentiment_service.get_fear_greed_index()
-        if not sentiment_data:
-            print("Warning: Sentiment data unavailable, using fallback")
-            sentiment_data = {
-                "value": 50,
-                "classification": "Neutral",
-                "emoji": "🔶",
-                "context": "Sentiment data temporarily unavailable"
-            }
-        
-        # Sector data (can continue without)
-        sector_data = sector_service.get_sector_analysis()
-        if not sector_data:
-            print("Warning: Sector data unavailable")
-            sector_data = {}
-        
-        # Macro data (important but can use fallback)
-        try:
-            # For quick views, skip altcoin season calculation (faster)
-            include_alt_season = view_mode not in ["risk", "btc", "eth"]
-            macro_data = macro_service.get_macro_indicators(include_alt_season=include_alt_season)
-        except Exception as e:
-            print(f"Error fetching macro data: {e}")
-            macro_data = macro_service._get_fallback_data(include_alt_season=False)
-        
-        if not macro_data:
-            print("Warning: Using fallback macro data")
-            macro_data = {
-                "btc_dominance": 50.0,
-                "eth_dominance": 15.0,
-                "total_stablecoin_dominance": 7.0,
-                "market_structure": "unknown",
-                "exchange_flow": "neutral",
-                "exchange_flow_signal": "neutral"
-            }
-        
-        # === RUN ANALYSIS ===
-        analysis = analyzer.analyze_market(
-            btc_data=btc_data,
-            eth_data=eth_data,
-            sentiment_data=sentiment_data,
-            sector_data=sector_data,
-            macro_data=macro_data
-        )
+        if message is None:
+            # === LOADING MESSAGE ===
+            if view_mode == "risk":
+                loading_msg = await update.message.reply_text("⚡ Running quick analysis...")
+            elif view_mode in ["btc", "eth"]:
+                loading_msg = await update.message.reply_text(f"🔄 Analyzing {view_mode.upper()}...")
+            elif view_mode == "macro":
+                loading_msg = await update.message.reply_text("🌍 Analyzing macro conditions...")
+            elif view_mode == "sectors":
+                loading_msg = await update.message.reply_text("🎯 Analyzing 8 sectors...")
+            else:
+                loading_msg = await update.message.reply_text("🔄 Analyzing market conditions across all metrics...")
+            
+            try:
+                message = await get_today_message(view_mode)
+            except TodaySnapshotError as e:
+                await loading_msg.edit_text(
+                    f"❌ Failed to fetch {e.symbol} data. This is required for analysis.\n"
+                    "Please try again in a few moments."
+                )
+                return
+            
+            if message is None:
+                raise RuntimeError(f"{view_mode} view unavailable")
         
-        # === FORMAT MESSAGE ===
-        if view_mode == "btc":
-            message = analyzer.format_btc_deep_dive(analysis)
-        elif view_mode == "eth":
-            message = analyzer.format_eth_deep_dive(analysis)  # You'll need to add this
-        elif view_mode == "sectors":
-            message = analyzer.format_sectors_only(analysis)
-        elif view_mode == "risk":
-            message = analyzer.format_risk_only(analysis)
-        elif view_mode == "macro":
-            message = analyzer.format_macro_only(analysis)
-        else:  # full
-            message = analyzer.format_full_analysis(analysis)
+        send = loading_msg.edit_text if loading_msg else update.message.reply_text
         
         # === SEND RESULT ===
         try:
-            await loading_msg.edit_text(
+            await send(
                 message, 
                 parse_mode="HTML", 
                 disable_web_page_preview=True
@@ -211,7 +140,7 @@ async def today_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # Handle message too long error
             if "message is too long" in str(e).lower():
                 # Split message or send as file
-                await loading_msg.edit_text(
+                await send(
                     "📊 Analysis complete! Message too long for Telegram.\n"
                     "Try a specific view:\n"
                     "• `/today risk` - Quick view\n"
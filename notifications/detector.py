@@ -10,6 +10,7 @@
 
 from typing import List, Dict, Any
 from services.screener_engine import get_precomputed_results
+from services.pattern_scanner import pattern_highlights
 from notifications.db import (
     get_all_active_alerts,
     was_recently_alerted,
@@ -39,8 +40,10 @@ def check_all_alerts() -> List[Dict[str, Any]]:
     Returns a flat list of dicts, one per notification to send:
     {
         user_id, alert_id, symbol, strategy_key, strategy_name,
-        timeframe, score, price, rsi, cooldown_minutes
+        timeframe, score, price, rsi, patterns, cooldown_minutes
     }
+    `patterns` holds bullish chart-pattern labels from the market-wide
+    pattern scan board (empty if the series has none right now).
     """
     alerts = get_all_active_alerts()
     if not alerts:
@@ -94,6 +97,7 @@ def check_all_alerts() -> List[Dict[str, Any]]:
                         "score":         coin.get("score"),
                         "price":         coin.get("close"),
                         "rsi":           coin.get("rsi"),
+                        "patterns":      pattern_highlights(coin_symbol, tf),
                         "cooldown_minutes": cooldown,
                     })
 
@@ -230,6 +230,8 @@ def _format_signal_alert(alert: Dict) -> str:
     Price : $142.30
     RSI   : 52.4 — room to run
 
+    Patterns : 🔨 Hammer (High)
+
     Near support, bounce signals
     ────────────────────
     """
@@ -240,9 +242,11 @@ def _format_signal_alert(alert: Dict) -> str:
     price    = alert.get("price")
     rsi      = alert.get("rsi")
     summary  = alert.get("signal_summary", "")
+    patterns = alert.get("patterns") or []
 
     price_str = _fmt_price(price)
     rsi_str, rsi_note = _fmt_rsi(rsi)
+    pattern_line = f"Patterns : {', '.join(patterns)}\n\n" if patterns else ""
 
     return (
         f"⚡ <b>Signal Detected — {symbol}/USDT</b>\n\n"
@@ -251,6 +255,7 @@ def _format_signal_alert(alert: Dict) -> str:
         f"Score     : {score}/10\n\n"
         f"Price : <code>{price_str}</code>\n"
         f"RSI   : <code>{rsi_str}</code>{rsi_note}\n\n"
+        f"{pattern_line}"
         f"<i>{summary}</i>\n"
         "─" * 22
     )
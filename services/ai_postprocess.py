@@ -1,4 +1,5 @@
 # services/ai_postprocess.py
+import asyncio
 from typing import List, Dict, Optional
 from services.ai_prompt import ai_refine_signal, build_fallback_signal, ALLOWED_SIGNALS, ALLOWED_RISK
 
@@ -106,7 +107,7 @@ def calculate_composite_score(signal: Dict) -> float:
     return composite
 
 
-def post_process_and_rank(
+async def post_process_and_rank(
     pre_scored_coins: List[Dict],
     timeframe: str,
     top_n: int = 10,
@@ -117,7 +118,8 @@ def post_process_and_rank(
     """
     Phase 4: Post-process AI signals and rank final results.
     
-    - Calls AI refinement for each coin
+    - Calls AI refinement for all coins concurrently (the LLM gateway caps
+      how many requests are in flight)
     - Validates AI output
     - Optionally uses fallback for failed AI calls
     - Filters weak signals
@@ -151,30 +153,29 @@ def post_process_and_rank(
     refined = []
     failed_count = 0
     
-    for coin in pre_scored_coins:
-        # Validate coin structure
-        if not isinstance(coin, dict):
-            continue
-        
-        if "symbol" not in coin:
-            continue
-        
-        symbol = coin["symbol"]
-        
-        # Attempt AI refinement
-        try:
-            ai_result = ai_refine_signal(
-                symbol=symbol,
+    # Validate coin structure
+    coins = [c for c in pre_scored_coins if isinstance(c, dict) and "symbol" in c]
+    
+    # Attempt AI refinement (one concurrent call per coin; validation
+    # errors and unexpected failures come back as exceptions)
+    ai_results = await asyncio.gather(
+        *(
+            ai_refine_signal(
+                symbol=coin["symbol"],
                 timeframe=timeframe,
                 pre_score_data=coin,
                 api_key=api_key
             )
-        except ValueError as e:
-            # Input validation error - skip this coin
-            failed_count += 1
-            ai_result = None
-        except Exception as e:
-            # Unexpected error - skip this coin
+            for coin in coins
+        ),
+        return_exceptions=True,
+    )
+    
+    for coin, ai_result in zip(coins, ai_results):
+        symbol = coin["symbol"]
+        
+        if isinstance(ai_result, Exception):
+            # Input validation error or unexpected error - skip this coin
             failed_count += 1
             ai_result = None
         
@@ -1,9 +1,11 @@
 # services/ai_prompt.py
 import os
 import json
-import requests
 from typing import Dict, Optional
 
+from utils.ai_cache import ai_cache, candle_bucket
+from services.llm_gateway import complete
+
 AI_PROMPT_TEMPLATE = """
 You are a trading signal classifier.
 
@@ -45,6 +47,11 @@ DEFAULT_TIMEOUT = 20
 DEFAULT_MODEL = "mistralai/mixtral-8x7b-instruct"
 DEFAULT_TEMPERATURE = 0.1
 MAX_RETRIES = 2
+PROMPT_VERSION = "refine-v2"  # bump when AI_PROMPT_TEMPLATE or scored_inputs() changes
+
+# Indicator readings are sent (and cached) in bands of this width, so the
+# tick-to-tick drift of a live quote doesn't change the prompt
+INDICATOR_BAND = 5
 
 
 def validate_pre_score_data(data: Dict, symbol: str) -> bool:
@@ -178,7 +185,30 @@ def extract_json_from_response(raw_response: str) -> Optional[Dict]:
         return None
 
 
-def ai_refine_signal(
+def scored_inputs(pre_score_data: Dict) -> Dict:
+    """
+    The part of a rank_top_setups() item the model is asked to judge: the
+    pre-engine's verdict (score, bias, confidence, reasons) plus banded
+    RSI/ADX and the MACD sign. This is both the prompt data and the cache
+    key, so one answer is shared by every identical verdict in a candle.
+    """
+    def band(value):
+        return None if value is None else int(round(value / INDICATOR_BAND) * INDICATOR_BAND)
+
+    macd = pre_score_data.get("macd")
+    return {
+        "symbol": pre_score_data["symbol"],
+        "score": pre_score_data["score"],
+        "bias": pre_score_data["bias"],
+        "confidence": pre_score_data["confidence"],
+        "reasons": pre_score_data["reasons"],
+        "rsi": band(pre_score_data.get("rsi")),
+        "adx": band(pre_score_data.get("adx")),
+        "macd": None if macd is None else ("positive" if macd > 0 else "negative" if macd < 0 else "flat"),
+    }
+
+
+async def ai_refine_signal(
     symbol: str,
     timeframe: str,
     pre_score_data: Dict,
@@ -199,7 +229,7 @@ def ai_refine_signal(
         api_key: OpenRouter API key (defaults to env var)
         model: AI model to use
         temperature: Model temperature (0.0-1.0)
-        timeout: Request timeout in seconds
+        timeout: Deadline in seconds (queueing + request)
 
     Returns:
         Dict with refined signal or None if failed
@@ -233,8 +263,9 @@ def ai_refine_signal(
         raise ValueError("OPENROUTER_API_KEY not found in environment or parameters")
     
     # Build prompt
+    inputs = scored_inputs(pre_score_data)
     try:
-        data_json = json.dumps(pre_score_data, indent=2)
+        data_json = json.dumps(inputs, indent=2)
     except (TypeError, ValueError) as e:
         raise ValueError(f"Failed to serialize pre_score_data: {e}")
     
@@ -244,78 +275,44 @@ def ai_refine_signal(
         data=data_json
     )
     
-    # Retry loop
-    last_error = None
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a strict JSON-only trading engine."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": temperature
-                },
-                timeout=timeout
+    # Identical scored input within the same candle → one call, shared by
+    # concurrent refinements too
+    cache_key = ai_cache.make_key(
+        "ai_refine", PROMPT_VERSION, model,
+        timeframe=timeframe, candle=candle_bucket(timeframe),
+        temperature=temperature, data=inputs,
+    )
+
+    async def _call() -> Optional[Dict]:
+        # Re-asks only when the reply is not valid signal JSON;
+        # a failed or timed-out call is final — the caller falls back
+        for attempt in range(MAX_RETRIES):
+            raw_content = await complete(
+                "ai_refine",
+                [
+                    {
+                        "role": "system",
+                        "content": "You are a strict JSON-only trading engine."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                model=model,
+                temperature=temperature,
+                deadline=timeout,
+                api_key=api_key,
             )
             
-            # Check response status
-            if response.status_code != 200:
-                last_error = f"API returned status {response.status_code}"
-                continue
-            
-            # Parse response
-            try:
-                response_json = response.json()
-            except json.JSONDecodeError:
-                last_error = "Failed to parse API response as JSON"
-                continue
-            
-            # Extract content
-            if "choices" not in response_json:
-                last_error = "Response missing 'choices' field"
-                continue
-            
-            if not response_json["choices"]:
-                last_error = "Response 'choices' array is empty"
-                continue
-            
-            if "message" not in response_json["choices"][0]:
-                last_error = "Response missing 'message' field"
-                continue
-            
-            if "content" not in response_json["choices"][0]["message"]:
-                last_error = "Response missing 'content' field"
-                continue
-            
-            raw_content = response_json["choices"][0]["message"]["content"]
-            
-            if not isinstance(raw_content, str):
-                last_error = "Response content is not a string"
-                continue
+            if raw_content is None:
+                return None
             
             # Extract and parse JSON
             result = extract_json_from_response(raw_content)
             
-            if result is None:
-                last_error = "Failed to extract valid JSON from response"
-                continue
-            
             # Validate response structure
-            if not validate_ai_response(result, symbol):
-                last_error = "AI response failed validation"
+            if result is None or not validate_ai_response(result, symbol):
                 continue
             
             # Ensure symbol matches (defensive)
@@ -323,27 +320,13 @@ def ai_refine_signal(
             
             # Clamp confidence (defensive)
             result["confidence"] = max(0, min(100, result["confidence"]))
-            
             return result
-            
-        except requests.exceptions.Timeout:
-            last_error = f"Request timeout after {timeout}s"
-            continue
-            
-        except requests.exceptions.ConnectionError:
-            last_error = "Connection error"
-            continue
-            
-        except requests.exceptions.RequestException as e:
-            last_error = f"Request error: {str(e)}"
-            continue
-            
-        except Exception as e:
-            last_error = f"Unexpected error: {str(e)}"
-            continue
-    
-    # All retries failed
-    return None
+        
+        # All retries failed
+        return None
+
+    result = await ai_cache.get_or_create(cache_key, _call)
+    return dict(result) if result is not None else None
 
 
 def build_fallback_signal(pre_score_data: Dict, symbol: str) -> Dict:
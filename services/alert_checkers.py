@@ -1,13 +1,13 @@
 from models.db import get_connection
+from utils.cache import get_cache
 from utils.prices import get_crypto_prices
 import traceback
 from collections import defaultdict
 from utils.indicators import get_cached_rsi, get_cached_macd, get_cached_ema
 import os
-import time
 import requests
 from collections import defaultdict
-import traceback, time, aiohttp, os
+import traceback, aiohttp, os
 from dotenv import load_dotenv
 from models.db import get_connection
 from models.alert import get_portfolio_value_limits  # <-- import your helper
@@ -20,8 +20,8 @@ COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY")
 # -----------------------
 # 60-SECOND CACHE
 # -----------------------
-fiat_cache = {}
 CACHE_DURATION = 60  # seconds
+fiat_cache = get_cache("fiat_prices", ttl=CACHE_DURATION, max_entries=50)
 
 # CoinGecko fiat IDs (lowercase required)
 FIAT_IDS = {
@@ -51,11 +51,11 @@ async def get_fiat_price(symbol: str):
     if symbol not in FIAT_IDS:
         return None
 
-    # Return cached value if valid
-    cached = fiat_cache.get(symbol)
-    if cached and time.time() - cached["time"] < CACHE_DURATION:
-        return cached["value"]
+    # Cached value if valid; concurrent checks share one request
+    return await fiat_cache.get_or_load(symbol, lambda: _fetch_fiat_price(symbol))
 
+
+async def _fetch_fiat_price(symbol: str):
     try:
         params = {
             "ids": "usd",
@@ -78,15 +78,7 @@ async def get_fiat_price(symbol: str):
                 if "usd" not in data or FIAT_IDS[symbol] not in data["usd"]:
                     return None
 
-                price = float(data["usd"][FIAT_IDS[symbol]])
-
-                # Cache result
-                fiat_cache[symbol] = {
-                    "value": price,
-                    "time": time.time()
-                }
-
-                return price
+                return float(data["usd"][FIAT_IDS[symbol]])
 
     except Exception as e:
         print(f"⚠️ CoinGecko fiat price error ({symbol}): {e}")
@@ -0,0 +1,58 @@
+# services/http_client.py
+"""
+Shared async HTTP session for the /today data services (market data,
+sectors, macro, sentiment).
+
+    data = await get_json(url, params=..., headers=...)
+
+One pooled aiohttp.ClientSession keeps connections alive across calls and
+services, so concurrent sub-fetches reuse sockets instead of each paying
+a TLS handshake. Non-2xx responses raise aiohttp.ClientResponseError,
+matching the requests `raise_for_status()` the services used before.
+"""
+
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+DEFAULT_TIMEOUT = 15       # seconds per request
+MAX_CONNECTIONS = 20       # total open sockets
+MAX_PER_HOST    = 10       # concurrent requests to one API
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS, limit_per_host=MAX_PER_HOST, ttl_dns_cache=300
+            )
+        )
+    return _session
+
+
+async def get_json(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Any:
+    """GET `url` and decode its JSON body (raises on HTTP error or timeout)."""
+    async with _get_session().get(
+        url,
+        params=params,
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    ) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+
+async def close_http_client() -> None:
+    """Close the shared session (call on bot shutdown)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -0,0 +1,239 @@
+# services/levels_board.py
+"""
+Precomputed support/resistance board for the most requested coins.
+
+Demand is counted per symbol by get_levels(). A background job takes
+ALWAYS_HOT plus the BOARD_SIZE most requested TOP_100_COINS symbols and,
+once per candle close of each BOARD_TIMEFRAMES timeframe, recalculates
+their LevelsEngine levels into a persistent LRU LevelsCache. Short
+timeframes (1m/5m/15m) are computed on demand only: boarding them would
+cost Twelve Data requests every few minutes. Readers:
+
+    get_levels(symbol, tf)             → /levels and /setup S/R inputs
+    detect_level_break(sym, tf, a, b)  → level-break lines in channel updates
+
+A reader that misses the board (unsupported symbol, first run, expired)
+computes on demand and stores the result for the next caller. Board
+entries can be a candle old, so get_levels overlays a live price (from
+setup_analyzer's 30s candle store) and re-splits the levels around it.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from telegram.ext import Application
+
+from services.levels_engine import LevelsEngine, TOP_100_COINS
+from utils.levels_cache import LevelsCache
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEVELS_DB_PATH = os.path.join(BASE_DIR, "data", "levels_cache.db")
+
+BOARD_TIMEFRAMES  = ("1h", "4h", "1d", "1w")
+BOARD_SIZE        = int(os.getenv("LEVELS_BOARD_SIZE", "10"))  # hot symbols precomputed
+ALWAYS_HOT        = ("BTC", "ETH")   # BTC 4h also feeds channel level breaks
+BOARD_MAX_LEVELS  = 5     # /setup uses 5, /levels shows the top 3
+FETCH_CONCURRENCY = 4     # simultaneous Twelve Data requests (TWELVE_LIMITER background lane)
+JOB_INTERVAL      = 60    # seconds
+CLOSE_GRACE       = 90    # seconds a result stays valid past the next close
+LIVE_PRICE_TF     = "1h"  # candle series for the live price when `tf` has no Bybit feed
+
+TIMEFRAME_SECONDS = {
+    "1m": 60, "5m": 300, "15m": 900, "1h": 3600,
+    "4h": 14400, "1d": 86400, "1w": 604800,
+}
+# Epoch day 0 is a Thursday; weekly candles open on Monday 00:00 UTC
+_TIMEFRAME_OFFSET = {"1w": 4 * 86400}
+
+levels_cache = LevelsCache(
+    max_entries=len(TOP_100_COINS) * len(LevelsEngine.TIMEFRAME_CONFIG) + 200,
+    persist_path=LEVELS_DB_PATH,
+)
+_engine = LevelsEngine()
+_demand: Counter = Counter()
+_last_board_close: Dict[str, float] = {}
+_is_running = False
+
+
+def _next_close(timeframe: str, now: float) -> float:
+    """Epoch seconds at which the currently forming `timeframe` candle closes."""
+    tf_secs = TIMEFRAME_SECONDS[timeframe]
+    offset  = _TIMEFRAME_OFFSET.get(timeframe, 0)
+    return ((now - offset) // tf_secs + 1) * tf_secs + offset
+
+
+async def _live_price(symbol: str, timeframe: str) -> Optional[float]:
+    """Latest close from the candle store (shared with /setup's own fetch), or None."""
+    # Imported here: setup_analyzer imports get_levels from this module
+    from services.setup_analyzer import BYBIT_INTERVAL, fetch_candles
+
+    tf = timeframe if timeframe in BYBIT_INTERVAL else LIVE_PRICE_TF
+    try:
+        candles = await fetch_candles(symbol, tf)
+    except Exception as e:
+        print(f"[levels_board] Live price failed for {symbol}: {e}")
+        return None
+    return float(candles[-1]["close"]) if candles else None
+
+
+def _at_price(result: Dict, price: float, max_levels: int) -> Dict:
+    """
+    Copy of `result` as seen from `price`: levels the price has crossed since
+    the calculation switch sides (broken resistance becomes support).
+    """
+    levels = result["support_levels"] + result["resistance_levels"]
+    resistance = sorted((l for l in levels if l["price"] > price), key=lambda l: l["price"])
+    support    = sorted((l for l in levels if l["price"] < price), key=lambda l: l["price"], reverse=True)
+
+    profile = result.get("volume_profile")
+    if profile:
+        profile = {
+            **profile,
+            "in_value_area": profile["value_area_low"] <= price <= profile["value_area_high"],
+        }
+
+    return {
+        **result,
+        "current_price":     price,
+        "support_levels":    support[:max_levels],
+        "resistance_levels": resistance[:max_levels],
+        "volume_profile":    profile,
+    }
+
+
+async def get_levels(symbol: str, timeframe: str, max_levels: int = 3) -> Dict:
+    """
+    Levels for (symbol, timeframe): served from the board when current,
+    otherwise calculated now and cached until the next candle close.
+    `current_price` is live; if no live price is available the
+    calculation-time price is kept.
+    Raises LevelsError exactly like LevelsEngine.calculate_levels.
+    """
+    _demand[symbol.upper()] += 1
+    result = levels_cache.get(symbol, timeframe)
+    if result is None:
+        result = await _engine.calculate_levels(symbol, timeframe, max_levels=BOARD_MAX_LEVELS)
+        levels_cache.set(
+            symbol, timeframe, result,
+            expires_at=_next_close(timeframe, time.time()) + CLOSE_GRACE,
+        )
+
+    # Always a trimmed copy — the cached entry keeps the full board depth
+    price = await _live_price(symbol, timeframe)
+    return _at_price(result, price or result["current_price"], max_levels)
+
+
+def detect_level_break(
+    symbol: str,
+    timeframe: str,
+    prev_price: float,
+    price: float,
+) -> Optional[str]:
+    """
+    "broke above $X resistance" / "broke below $X support" if the move from
+    prev_price to price crossed a board level, else None (also when the
+    board has nothing current for this series).
+    """
+    result = levels_cache.get(symbol, timeframe)
+    if not result or prev_price is None or price is None:
+        return None
+
+    crossed = [
+        level["price"]
+        for level in result["support_levels"] + result["resistance_levels"]
+        if min(prev_price, price) < level["price"] < max(prev_price, price)
+    ]
+    if not crossed:
+        return None
+    if price > prev_price:
+        return f"broke above ${max(crossed):,.0f} resistance"
+    return f"broke below ${min(crossed):,.0f} support"
+
+
+def hot_symbols() -> List[str]:
+    """Symbols to precompute: ALWAYS_HOT + the most requested top-100 coins."""
+    symbols = list(ALWAYS_HOT)
+    for symbol, _ in _demand.most_common():
+        if len(symbols) >= len(ALWAYS_HOT) + BOARD_SIZE:
+            break
+        if symbol in TOP_100_COINS and symbol not in symbols:
+            symbols.append(symbol)
+    return symbols
+
+
+async def refresh_levels_timeframe(timeframe: str, symbols: List[str]) -> int:
+    """Recalculate `symbols` on one timeframe. Returns #stored."""
+    semaphore  = asyncio.Semaphore(FETCH_CONCURRENCY)
+    expires_at = _next_close(timeframe, time.time()) + CLOSE_GRACE
+    start      = time.time()
+
+    async def _one(symbol: str) -> bool:
+        async with semaphore:
+            result = await _engine.calculate_levels(
+                symbol, timeframe, max_levels=BOARD_MAX_LEVELS, background=True
+            )
+        levels_cache.set(symbol, timeframe, result, expires_at=expires_at)
+        return True
+
+    results = await asyncio.gather(*(_one(s) for s in symbols), return_exceptions=True)
+    stored  = sum(1 for r in results if r is True)
+
+    print(
+        f"[levels_board] ✅ {timeframe}: {stored}/{len(symbols)} symbols "
+        f"in {time.time() - start:.1f}s"
+    )
+    return stored
+
+
+def _decay_demand(factor: float = 0.5) -> None:
+    global _demand
+    _demand = Counter({
+        symbol: int(count * factor)
+        for symbol, count in _demand.items()
+        if int(count * factor) > 0
+    })
+
+
+async def run_levels_board_job(context) -> None:
+    """
+    Scheduled job: refresh each timeframe whose candle has closed since its
+    last refresh. Skips if a previous run is still in progress.
+    """
+    global _is_running
+    if _is_running:
+        print("[levels_board] Previous refresh still running, skipping...")
+        return
+
+    _is_running = True
+    try:
+        now = time.time()
+        symbols = hot_symbols()
+        for tf in BOARD_TIMEFRAMES:
+            closed_at = _next_close(tf, now) - TIMEFRAME_SECONDS[tf]
+            if _last_board_close.get(tf) == closed_at:
+                continue
+            try:
+                await refresh_levels_timeframe(tf, symbols)
+                _last_board_close[tf] = closed_at
+                # Hourly halving keeps the board on what users asked for recently
+                if tf == "1h":
+                    _decay_demand()
+            except Exception as e:
+                print(f"[levels_board] ❌ Refresh failed for {tf}: {e}")
+
+        # Persist this run's board results and on-demand entries in one write
+        await levels_cache.aflush()
+    finally:
+        _is_running = False
+
+
+def setup_levels_board_jobs(application: Application) -> None:
+    application.job_queue.run_repeating(
+        run_levels_board_job,
+        interval=JOB_INTERVAL,
+        first=240,
+    )
+    print(f"[levels_board] Levels board refresh scheduled every {JOB_INTERVAL}s")
@@ -8,7 +8,9 @@ Professional-grade support/resistance level detection
 """
 
 from utils.regime_data import fetch_market_data, MarketDataError
+from services.volume_profile import build_volume_profile, node_for_price
 from typing import Dict, List, Tuple
+from bisect import bisect_left
 import statistics
 import json
 import logging
@@ -128,7 +130,8 @@ class LevelsEngine:
         self,
         symbol: str,
         timeframe: str,
-        max_levels: int = 3
+        max_levels: int = 3,
+        background: bool = False
     ) -> Dict:
 
         if symbol.upper() not in TOP_100_COINS:
@@ -144,7 +147,8 @@ class LevelsEngine:
             candles = await fetch_market_data(
                 symbol,
                 api_timeframe,
-                limit=config["candles"]
+                limit=config["candles"],
+                background=background
             )
 
             if len(candles) < 50:
@@ -170,6 +174,8 @@ class LevelsEngine:
             swing_highs = self._find_swing_highs(highs, config["swing_window"])
             swing_lows = self._find_swing_lows(lows, config["swing_window"])
 
+            profile = build_volume_profile(highs, lows, closes, volumes)
+
             resistance_levels = self._pro_cluster_and_score(
                 swing_highs,
                 volumes,
@@ -177,7 +183,8 @@ class LevelsEngine:
                 cluster_pct,
                 config["min_touches"],
                 config["recency_weight"],
-                "resistance"
+                "resistance",
+                profile=profile,
             )
 
             support_levels = self._pro_cluster_and_score(
@@ -187,7 +194,8 @@ class LevelsEngine:
                 cluster_pct,
                 config["min_touches"],
                 config["recency_weight"],
-                "support"
+                "support",
+                profile=profile,
             )
 
             resistance_levels = self._finalize_levels(
@@ -208,6 +216,7 @@ class LevelsEngine:
                 "atr_pct": round(volatility_factor, 2),
                 "support_levels": support_levels[:max_levels],
                 "resistance_levels": resistance_levels[:max_levels],
+                "volume_profile": self._summarize_profile(profile, current_price),
             }
 
         except MarketDataError as e:
@@ -253,66 +262,107 @@ class LevelsEngine:
         cluster_pct,
         min_touches,
         recency_weight,
-        level_type
+        level_type,
+        profile=None,
     ) -> List[Dict]:
+        """
+        Cluster swing points into scored levels. With a volume `profile`,
+        clusters sitting on a high-volume node (or the POC) score a bonus,
+        and POC/HVN prices no cluster covers are added as volume levels.
+        """
 
         if not swings:
             return []
 
         max_index = max(idx for idx, _ in swings) or 1
-        clusters = []
-        used = set()
+        n_volumes = len(volumes)
+        base_avg_vol = sum(volumes) / n_volumes if volumes else 0
+
+        # Greedy clustering in swing order: each unused swing anchors a
+        # cluster and absorbs every later unused swing within cluster_pct of
+        # the anchor price. Swing positions are sorted by price so an anchor's
+        # candidates are one bisected window; `skip` jumps over positions
+        # already used, so each swing is absorbed once — O(n log n) overall.
+        by_price = sorted(range(len(swings)), key=lambda k: swings[k][1])
+        sorted_prices = [swings[k][1] for k in by_price]
+        rank = [0] * len(swings)
+        for pos, k in enumerate(by_price):
+            rank[k] = pos
+        skip = list(range(len(swings) + 1))
+
+        def next_unused(pos):
+            root = pos
+            while skip[root] != root:
+                root = skip[root]
+            while skip[pos] != root:
+                skip[pos], pos = root, skip[pos]
+            return root
 
+        levels = []
         for i, (idx, price) in enumerate(swings):
-            if i in used:
+            pos = rank[i]
+            if next_unused(pos) != pos:
+                continue
+            skip[pos] = pos + 1
+
+            # Running sums; prices are accumulated relative to the anchor
+            # so the variance stays numerically stable.
+            touch_count = 1
+            idx_sum = idx
+            dev_sum = dev_sq_sum = 0.0
+            vol_sum, vol_n = (volumes[idx], 1) if idx < n_volumes else (0, 0)
+
+            if price > 0:
+                band = price * cluster_pct
+                pos = next_unused(bisect_left(sorted_prices, price - band * 1.000001))
+                while pos < len(swings) and sorted_prices[pos] < price + band * 1.000001:
+                    idx2, price2 = swings[by_price[pos]]
+                    if abs(price2 - price) / price < cluster_pct:
+                        skip[pos] = pos + 1
+                        touch_count += 1
+                        idx_sum += idx2
+                        dev = price2 - price
+                        dev_sum += dev
+                        dev_sq_sum += dev * dev
+                        if idx2 < n_volumes:
+                            vol_sum += volumes[idx2]
+                            vol_n += 1
+                    pos = next_unused(pos + 1)
+
+            if touch_count < min_touches:
                 continue
 
-            cluster = [(idx, price)]
-            used.add(i)
-
-            for j, (idx2, price2) in enumerate(swings[i + 1:], start=i + 1):
-                if j in used:
-                    continue
-                if price > 0 and abs(price2 - price) / price < cluster_pct:
-                    cluster.append((idx2, price2))
-                    used.add(j)
-
-            if len(cluster) >= min_touches:
-                clusters.append(cluster)
-
-        levels = []
-        for cluster in clusters:
-            prices = [p for _, p in cluster]
-            indices = [idx for idx, _ in cluster]
-
-            avg_price = statistics.mean(prices)
-            touch_count = len(cluster)
-
-            vols = [volumes[i] for i in indices if i < len(volumes)]
-            avg_volume = statistics.mean(vols) if vols else 0
+            mean_dev = dev_sum / touch_count
+            avg_price = price + mean_dev
+            avg_volume = vol_sum / vol_n if vol_n else 0
+            avg_idx = idx_sum / touch_count
 
-            avg_idx = statistics.mean(indices)
             recency_score = (avg_idx / max_index) ** recency_weight
             recency_score_weighted = recency_score * 10
 
-            std = statistics.stdev(prices) if len(prices) > 1 else 0
+            if touch_count > 1:
+                variance = (dev_sq_sum - touch_count * mean_dev * mean_dev) / (touch_count - 1)
+                std = math.sqrt(max(variance, 0.0))
+            else:
+                std = 0
             cluster_quality = 1 - min(std / avg_price, 0.5)
             quality_score = cluster_quality * 10
 
             base_score = touch_count * 10
             volume_score = 0
             if volumes and avg_volume:
-                base_avg_vol = sum(volumes) / len(volumes)
                 volume_score = (avg_volume / base_avg_vol) * 10 if base_avg_vol else 0
 
             round_bonus = self._check_round_number(avg_price)
+            node_bonus = 5 if node_for_price(profile, avg_price) else 0
 
             final_score = (
                 base_score * 0.4 +
                 volume_score * 0.3 +
                 recency_score_weighted * 0.2 +
                 quality_score * 0.1 +
-                round_bonus
+                round_bonus +
+                node_bonus
             )
 
             if final_score >= 30 or touch_count >= 5:
@@ -332,9 +382,60 @@ class LevelsEngine:
                 "recency": round(recency_score, 3),
             })
 
+        if profile:
+            levels.extend(self._volume_levels(profile, levels, cluster_pct))
+
         levels.sort(key=lambda x: x["score"], reverse=True)
         return levels
 
+    def _volume_levels(self, profile, swing_levels, cluster_pct) -> List[Dict]:
+        """POC + high-volume nodes not already covered by a swing cluster."""
+        nodes = list(profile["hvns"])
+        if not any(abs(n["price"] - profile["poc"]) < profile["bin_width"] / 2 for n in nodes):
+            nodes.append({"price": profile["poc"], "volume_ratio": None})
+
+        levels = []
+        for node in nodes:
+            price = node["price"]
+            if price <= 0:
+                continue
+            if any(abs(l["price"] - price) / price < cluster_pct for l in swing_levels):
+                continue
+
+            is_poc = abs(price - profile["poc"]) < profile["bin_width"] / 2
+            ratio = node["volume_ratio"] or 1.0
+            final_score = ratio * 10 * 0.3 + (5 if is_poc else 0) + self._check_round_number(price)
+
+            if is_poc or ratio >= 3:
+                strength = "Strong"
+            elif ratio >= 2:
+                strength = "Medium"
+            else:
+                strength = "Weak"
+
+            levels.append({
+                "price": price,
+                "touches": 0,
+                "strength": strength,
+                "score": round(final_score, 2),
+                "avg_volume": 0,
+                "cluster_quality": 1.0,
+                "recency": 0.0,
+                "source": "poc" if is_poc else "volume",
+            })
+        return levels
+
+    def _summarize_profile(self, profile, current_price):
+        if not profile:
+            return None
+        return {
+            "poc": profile["poc"],
+            "value_area_low": profile["value_area_low"],
+            "value_area_high": profile["value_area_high"],
+            "in_value_area": profile["value_area_low"] <= current_price <= profile["value_area_high"],
+            "hvns": [n["price"] for n in profile["hvns"]],
+        }
+
     def _check_round_number(self, price):
         round_numbers = [
             1, 5, 10, 25, 50, 100, 250, 500,
@@ -376,6 +477,7 @@ class LevelsEngine:
                 "touches": level["touches"],
                 "strength": level["strength"],
                 "score": level["score"],
+                "source": level.get("source", "swing"),
             })
 
         return finalized
\ No newline at end of file
@@ -0,0 +1,318 @@
+# services/llm_gateway.py
+"""
+Single async gateway for every OpenRouter (LLM) call in the bot.
+
+    text = await complete("aiscan", messages, model=..., max_tokens=...)
+
+- One pooled httpx.AsyncClient (keep-alive connections are reused)
+- A global concurrency cap; when it is saturated, waiting calls are
+  admitted by feature priority (interactive commands before channel posts
+  before batch signal refinement)
+- A per-feature deadline covering queueing + the request. On expiry, error
+  or bad status the call returns None and the caller uses its rule-based
+  fallback, so a user never waits on a slow model past the deadline.
+  Batch features (SLOT_DEADLINE_FEATURES) instead start their deadline when
+  they get a slot, with a separate cap on the queue wait, so time spent
+  behind interactive calls doesn't eat their request budget
+- Optional hedging: a second identical request after `hedge_after`
+  seconds, first answer wins
+- Optional streaming: `on_text(text_so_far)` is awaited as tokens arrive;
+  StreamingReply turns that into throttled Telegram message edits. The
+  callback may raise StreamAborted to cut the reply off (returns None)
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "6"))
+
+# Lower number = admitted first when the cap is saturated
+FEATURE_PRIORITY = {
+    "aiscan":         0,
+    "analysis":       0,
+    "setup":          0,
+    "risk":           0,
+    "channel_update": 1,
+    "ai_refine":      2,
+}
+
+# Seconds from call to answer (queue wait included, except for
+# SLOT_DEADLINE_FEATURES) before falling back
+FEATURE_DEADLINE = {
+    "aiscan":         25,
+    "analysis":       25,
+    "setup":          20,
+    "risk":           15,
+    "channel_update": 20,
+    "ai_refine":      20,
+}
+DEFAULT_DEADLINE = 20
+
+# Batch features: deadline counts from slot acquisition; value = max queue wait (s)
+SLOT_DEADLINE_FEATURES = {
+    "ai_refine":      120,
+}
+
+TextCallback = Callable[[str], Awaitable[None]]
+
+
+class StreamAborted(Exception):
+    """Raised by an `on_text` callback to stop the stream; `complete` returns None."""
+
+
+class _PriorityGate:
+    """Counting semaphore that wakes waiters lowest-priority-number first."""
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters: List = []
+        self._order = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()      # slot was handed over as we were cancelled
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._free += 1
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+
+_gate = _PriorityGate(MAX_CONCURRENT)
+_client: Optional[httpx.AsyncClient] = None
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count(feature: str, field: str) -> None:
+    stats = _stats.setdefault(
+        feature, {"calls": 0, "ok": 0, "failed": 0, "deadline": 0, "hedged": 0, "aborted": 0}
+    )
+    stats[field] += 1
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT * 2, max_keepalive_connections=MAX_CONCURRENT),
+        )
+    return _client
+
+
+async def close_llm_gateway() -> None:
+    """Close the pooled client (call on bot shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def _headers(api_key: str, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    if extra:
+        headers.update(extra)
+    return headers
+
+
+async def _post(payload: Dict[str, Any], headers: Dict[str, str]) -> Optional[str]:
+    resp = await _get_client().post(OPENROUTER_URL, headers=headers, json=payload)
+    if resp.status_code != 200:
+        logger.warning(f"[llm] {payload['model']} HTTP {resp.status_code}: {resp.text[:200]}")
+        return None
+    return resp.json()["choices"][0]["message"]["content"].strip()
+
+
+async def _stream(payload: Dict[str, Any], headers: Dict[str, str], on_text: TextCallback) -> Optional[str]:
+    text = ""
+    async with _get_client().stream(
+        "POST", OPENROUTER_URL, headers=headers, json={**payload, "stream": True}
+    ) as resp:
+        if resp.status_code != 200:
+            body = await resp.aread()
+            logger.warning(f"[llm] {payload['model']} HTTP {resp.status_code}: {body[:200]!r}")
+            return None
+        async for line in resp.aiter_lines():
+            # SSE: "data: {...}" chunks, ": keep-alive" comments, "data: [DONE]"
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            except (ValueError, KeyError, IndexError):
+                continue
+            if delta:
+                text += delta
+                await on_text(text)
+    return text.strip() or None
+
+
+async def _attempt(feature, payload, headers, on_text, slot_deadline=None) -> Optional[str]:
+    await _gate.acquire(FEATURE_PRIORITY.get(feature, 1))
+    try:
+        if on_text is not None:
+            request = _stream(payload, headers, on_text)
+        else:
+            request = _post(payload, headers)
+        return await asyncio.wait_for(request, timeout=slot_deadline)
+    finally:
+        _gate.release()
+
+
+async def _hedged(feature, payload, headers, hedge_after: float, slot_deadline=None) -> Optional[str]:
+    """Start a duplicate request if the first is still running after `hedge_after`s."""
+    tasks = [asyncio.ensure_future(_attempt(feature, payload, headers, None, slot_deadline))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            _count(feature, "hedged")
+            tasks.append(asyncio.ensure_future(_attempt(feature, payload, headers, None, slot_deadline)))
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.exception() and task.result():
+                    return task.result()
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def complete(
+    feature: str,
+    messages: List[Dict[str, str]],
+    *,
+    model: str,
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    deadline: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+    on_text: Optional[TextCallback] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    api_key: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Run one chat completion for `feature`. Returns the reply text, or None
+    on missing key, HTTP error or deadline expiry (callers fall back).
+    """
+    api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        logger.warning("OPENROUTER_API_KEY not set")
+        return None
+
+    payload: Dict[str, Any] = {"model": model, "messages": messages}
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+    if temperature is not None:
+        payload["temperature"] = temperature
+    if top_p is not None:
+        payload["top_p"] = top_p
+
+    headers  = _headers(api_key, extra_headers)
+    deadline = deadline or FEATURE_DEADLINE.get(feature, DEFAULT_DEADLINE)
+    start    = time.monotonic()
+    _count(feature, "calls")
+
+    # Interactive: one deadline over queue + request. Batch: the deadline
+    # covers the request only, the queue wait has its own cap.
+    if feature in SLOT_DEADLINE_FEATURES:
+        slot_deadline = deadline
+        total_timeout = SLOT_DEADLINE_FEATURES[feature] + deadline
+    else:
+        slot_deadline = None
+        total_timeout = deadline
+
+    try:
+        if hedge_after and on_text is None:
+            call = _hedged(feature, payload, headers, hedge_after, slot_deadline)
+        else:
+            call = _attempt(feature, payload, headers, on_text, slot_deadline)
+        text = await asyncio.wait_for(call, timeout=total_timeout)
+    except asyncio.TimeoutError:
+        _count(feature, "deadline")
+        logger.warning(f"[llm] {feature} missed its {deadline}s deadline — falling back")
+        return None
+    except StreamAborted as e:
+        _count(feature, "aborted")
+        logger.warning(f"[llm] {feature} stream aborted: {e}")
+        return None
+    except Exception as e:
+        _count(feature, "failed")
+        logger.warning(f"[llm] {feature} request failed: {e}")
+        return None
+
+    _count(feature, "ok" if text else "failed")
+    logger.info(f"[llm] {feature} answered in {time.monotonic() - start:.1f}s")
+    return text
+
+
+def get_stats() -> Dict:
+    """Gateway statistics"""
+    return {
+        "max_concurrent": MAX_CONCURRENT,
+        "queued": _gate.queued,
+        "features": {name: dict(s) for name, s in _stats.items()},
+    }
+
+
+class StreamingReply:
+    """
+    `on_text` callback that progressively edits a Telegram message with the
+    partial model output (plain text, throttled to stay within edit limits).
+    The caller makes the final formatted edit once `complete` returns.
+    """
+
+    def __init__(self, message, header: str = "", min_interval: float = 1.5, min_growth: int = 40):
+        self.message = message
+        self.header = header
+        self.min_interval = min_interval
+        self.min_growth = min_growth
+        self._last_edit = 0.0
+        self._last_len = 0
+
+    async def __call__(self, text: str) -> None:
+        now = time.monotonic()
+        if now - self._last_edit < self.min_interval or len(text) - self._last_len < self.min_growth:
+            return
+        self._last_edit = now
+        self._last_len = len(text)
+        try:
+            await self.message.edit_text(f"{self.header}{text} ▌")
+        except Exception as e:
+            # Never let a failed cosmetic edit break the completion
+            logger.debug(f"[llm] streaming edit skipped: {e}")
@@ -1,9 +1,11 @@
-import requests
+import asyncio
 from typing import Dict, Optional, List
-import time
 import os
 from dotenv import load_dotenv
 
+from services.http_client import get_json
+from utils.cache import get_cache
+
 # Load environment variables
 load_dotenv()
 
@@ -15,8 +17,8 @@ class MacroDataService:
         Initialize with CoinGecko API key from environment or parameter
         Looks for COINGECKO_API_KEY in .env file
         """
-        self.cache = {}
         self.cache_duration = 3600  # 1 hour for macro data
+        self.cache = get_cache("macro_data", ttl=self.cache_duration, max_entries=200)
         
         # Get API key from parameter, env, or use free tier
         self.api_key = api_key or os.getenv('COINGECKO_API_KEY')
@@ -43,9 +45,9 @@ class MacroDataService:
             'usdd': 'USDD'
         }
     
-    def get_macro_indicators(self, include_alt_season: bool = True) -> Optional[Dict]:
+    async def get_macro_indicators(self, include_alt_season: bool = True) -> Optional[Dict]:
         """
-        Get comprehensive macro market indicators
+        Get comprehensive macro market indicators (sub-fetches run concurrently)
         
         Args:
             include_alt_season: Whether to include altcoin season calculation (slower)
@@ -53,23 +55,25 @@ class MacroDataService:
         cache_key = f"macro_data_alt{include_alt_season}"
         
         # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
         try:
-            # Get dominance data
-            dominance_data = self._get_dominance_data()
-            
-            # Get volume and flow indicators
-            volume_data = self._get_volume_indicators()
-            
-            # Get funding rate estimate
-            funding_rate = self._get_funding_rate_estimate()
+            # Dominance, volume/flow, funding estimate, market fear/greed from
+            # price action and (if requested) altcoin season, all at once
+            fetches = [
+                self._get_dominance_data(),
+                self._get_volume_indicators(),
+                self._get_funding_rate_estimate(),
+                self._calculate_market_sentiment(),
+            ]
+            if include_alt_season:
+                fetches.append(self.get_altcoin_season_index())
             
-            # Get market fear/greed from price action
-            market_sentiment = self._calculate_market_sentiment()
+            dominance_data, volume_data, funding_rate, market_sentiment, *alt_season = (
+                await asyncio.gather(*fetches)
+            )
             
             # Build result
             result = {
@@ -81,11 +85,10 @@ class MacroDataService:
             
             # Add altcoin season if requested
             if include_alt_season:
-                alt_season = self.get_altcoin_season_index()
-                result["altcoin_season"] = alt_season
+                result["altcoin_season"] = alt_season[0]
             
             # Cache result
-            self.cache[cache_key] = (result, time.time())
+            self.cache.set(cache_key, result)
             return result
             
         except Exception as e:
@@ -96,7 +99,7 @@ class MacroDataService:
             # Return fallback data
             return self._get_fallback_data(include_alt_season)
     
-    def _get_dominance_data(self) -> Dict:
+    async def _get_dominance_data(self) -> Dict:
         """
         Get BTC dominance, ETH dominance, and stablecoin dominance
         Returns comprehensive dominance metrics
@@ -104,9 +107,7 @@ class MacroDataService:
         try:
             # Get global market data
             url = f"{self.base_url}/global"
-            response = requests.get(url, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            global_data = response.json()['data']
+            global_data = (await get_json(url, headers=self.headers))['data']
             
             # BTC and ETH dominance (from global data)
             btc_dominance = round(global_data['market_cap_percentage'].get('btc', 50.0), 2)
@@ -116,7 +117,7 @@ class MacroDataService:
             total_market_cap = global_data['total_market_cap']['usd']
             
             # Calculate stablecoin dominance (batch request)
-            stablecoin_data = self._get_stablecoin_dominance(total_market_cap)
+            stablecoin_data = await self._get_stablecoin_dominance(total_market_cap)
             
             # Calculate "others" dominance (everything except BTC, ETH, stables)
             others_dominance = round(
@@ -153,7 +154,7 @@ class MacroDataService:
                 "stablecoin_breakdown": {}
             }
     
-    def _get_stablecoin_dominance(self, total_market_cap: float) -> Dict:
+    async def _get_stablecoin_dominance(self, total_market_cap: float) -> Dict:
         """
         Calculate stablecoin dominance with breakdown
         Uses batch API call for efficiency
@@ -171,9 +172,7 @@ class MacroDataService:
                 "page": 1
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            stablecoin_markets = response.json()
+            stablecoin_markets = await get_json(url, params=params, headers=self.headers)
             
             # Calculate dominances
             total_stablecoin_mcap = 0
@@ -226,7 +225,7 @@ class MacroDataService:
         else:
             return "balanced"      # Healthy distribution
     
-    def _get_volume_indicators(self) -> Dict:
+    async def _get_volume_indicators(self) -> Dict:
         """
         Get volume-based indicators including exchange flow estimates
         """
@@ -239,9 +238,7 @@ class MacroDataService:
                 "interval": "daily"
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = await get_json(url, params=params, headers=self.headers)
             
             volumes = [v[1] for v in data['total_volumes']]
             
@@ -311,7 +308,7 @@ class MacroDataService:
                 "signal": "bullish"
             }
     
-    def _get_funding_rate_estimate(self) -> Dict:
+    async def _get_funding_rate_estimate(self) -> Dict:
         """
         Enhanced funding rate estimate with confidence level
         """
@@ -326,9 +323,7 @@ class MacroDataService:
                 "developer_data": "false"
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            market_data = response.json()['market_data']
+            market_data = (await get_json(url, params=params, headers=self.headers))['market_data']
             
             # Multiple momentum indicators for better estimate
             price_change_24h = market_data.get('price_change_percentage_24h', 0)
@@ -376,7 +371,7 @@ class MacroDataService:
                 "based_on": "fallback"
             }
     
-    def _calculate_market_sentiment(self) -> Dict:
+    async def _calculate_market_sentiment(self) -> Dict:
         """
         Calculate overall market sentiment from price action
         """
@@ -391,9 +386,7 @@ class MacroDataService:
                 "price_change_percentage": "24h"
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            coins = response.json()
+            coins = await get_json(url, params=params, headers=self.headers)
             
             # Count positive vs negative
             positive_count = sum(1 for c in coins if c.get('price_change_percentage_24h', 0) > 0)
@@ -436,17 +429,16 @@ class MacroDataService:
                 "coins_total": 0
             }
     
-    def get_altcoin_season_index(self) -> Dict:
+    async def get_altcoin_season_index(self) -> Dict:
         """
         Enhanced Altcoin Season Index with more granular analysis
         Returns score 0-100 where >75 = alt season, <25 = BTC season
         """
         cache_key = "altseason_index_v2"
         
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
         try:
             # Get top 100 coins for better representation
@@ -459,9 +451,7 @@ class MacroDataService:
                 "price_change_percentage": "30d"
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            coins = response.json()
+            coins = await get_json(url, params=params, headers=self.headers)
             
             # Get BTC 30d performance
             btc_performance = next((c['price_change_percentage_30d_in_currency'] 
@@ -560,7 +550,7 @@ class MacroDataService:
                 }
             }
             
-            self.cache[cache_key] = (result, time.time())
+            self.cache.set(cache_key, result)
             return result
             
         except Exception as e:
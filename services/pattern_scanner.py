@@ -0,0 +1,296 @@
+# services/pattern_scanner.py
+"""
+Market-wide chart-pattern scanner.
+
+A background job fetches candles for the top-100 coins on every scanned
+timeframe and runs `detect_all_patterns` in a ProcessPoolExecutor, so the
+CPU-bound detection never blocks the bot's event loop. Each series is sent
+to the workers as one compact float64 array (see `utils.pattern_cache.
+pack_candles`); the worker entry point lives in utils so unpickling it
+needs only the pattern library. Spawned workers still re-import the main
+module, which is why bot/main.py starts the bot under `__main__` only.
+
+Results are published as a ranked "patterns now" board that /aiscan and
+signal notifications read instantly:
+
+    get_patterns_now(...)       → ranked rows across the whole market
+    get_board_entry(sym, tf)    → one series' patterns, if still current
+    pattern_highlights(sym, tf) → short labels for notification messages
+
+A timeframe is only rescanned once a new candle has closed on it.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from telegram.ext import Application
+
+from services.setup_analyzer import fetch_candles
+from utils.pattern_cache import (
+    TIMEFRAME_SECONDS,
+    candle_epoch_seconds,
+    closed_candles,
+    detect_packed_patterns,
+    pack_candles,
+)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COINGECKO_IDS_PATH = os.path.join(BASE_DIR, "services", "top100_coingecko_ids.json")
+
+try:
+    with open(COINGECKO_IDS_PATH, "r") as f:
+        SCAN_SYMBOLS = [symbol.upper() for symbol in json.load(f)]
+except (FileNotFoundError, json.JSONDecodeError) as e:
+    print(f"[pattern_scanner] Error loading coin list: {e}")
+    SCAN_SYMBOLS = []
+
+# Same timeframes the screener and signal alerts use
+SCAN_TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
+
+JOB_INTERVAL      = 300   # seconds — fine enough to catch every 5m close
+FETCH_CONCURRENCY = 8     # simultaneous Bybit/OKX requests
+MAX_WORKERS       = max(1, min(4, (os.cpu_count() or 2) - 1))
+MAX_PATTERNS      = 12    # per series — the largest /aiscan cap
+
+# Candles per series — /aiscan's on-demand windows, so both paths agree
+SCAN_LOOKBACK = {"5m": 100, "15m": 100, "30m": 150, "1h": 200, "4h": 250, "1d": 300}
+
+_QUALITY_POINTS = {"HIGH": 3.0, "MEDIUM": 2.0, "LOW": 1.0}
+_QUALITY_ORDER  = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+_TF_WEIGHT      = {"5m": 0.6, "15m": 0.7, "30m": 0.8, "1h": 1.0, "4h": 1.2, "1d": 1.4}
+
+# Published board: (SYMBOL, timeframe) -> entry, plus the ranked row table
+_board: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_ranked: List[Dict[str, Any]] = []
+_last_scanned_close: Dict[str, float] = {}
+_is_scanning = False
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+# ============================================================================
+# PROCESS POOL
+# ============================================================================
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: never fork the running bot (event loop, HTTP clients, threads)
+        _pool = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pattern_scanner() -> None:
+    """Stop the worker processes (called on bot shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# ============================================================================
+# RANKING
+# ============================================================================
+
+def _pattern_score(pattern: Dict[str, Any], n_closed: int, timeframe: str) -> float:
+    """Quality × recency × timeframe weight — higher is more actionable now."""
+    age     = max(0, n_closed - 1 - int(pattern.get("index", 0)))
+    recency = 1.0 / (1.0 + age / 3.0)
+    quality = _QUALITY_POINTS.get(pattern.get("quality"), 1.0)
+    return round(quality * recency * _TF_WEIGHT.get(timeframe, 1.0), 3)
+
+
+def _rebuild_ranking() -> None:
+    global _ranked
+    rows = []
+    for (symbol, tf), entry in _board.items():
+        for p in entry["patterns"]:
+            rows.append({
+                "symbol":    symbol,
+                "timeframe": tf,
+                "name":      p["name"],
+                "emoji":     p["emoji"],
+                "direction": p["direction"],
+                "quality":   p["quality"],
+                "description": p["description"],
+                "score":     _pattern_score(p, entry["n_closed"], tf),
+                "price":     entry["price"],
+            })
+    rows.sort(key=lambda r: (-r["score"], _QUALITY_ORDER.get(r["quality"], 2)))
+    _ranked = rows
+
+
+# ============================================================================
+# SCAN
+# ============================================================================
+
+def _last_closed_open(timeframe: str, now: float) -> float:
+    """Open time (epoch s) of the most recently closed candle on `timeframe`."""
+    tf_secs = TIMEFRAME_SECONDS[timeframe]
+    return (now // tf_secs) * tf_secs - tf_secs
+
+
+async def _scan_one(
+    symbol: str,
+    timeframe: str,
+    semaphore: asyncio.Semaphore,
+) -> Optional[Dict[str, Any]]:
+    async with semaphore:
+        candles = await fetch_candles(symbol, timeframe, limit=SCAN_LOOKBACK[timeframe])
+    if not candles:
+        return None
+
+    closed, _ = closed_candles(candles, timeframe)
+    if len(closed) < 5:
+        return None
+
+    loop     = asyncio.get_running_loop()
+    patterns = await loop.run_in_executor(
+        _get_pool(), detect_packed_patterns, pack_candles(closed), MAX_PATTERNS
+    )
+
+    last_open = candle_epoch_seconds(closed[-1].get("datetime")) or 0.0
+    return {
+        "symbol":        symbol,
+        "timeframe":     timeframe,
+        "patterns":      patterns,
+        "n":             len(candles),
+        "n_closed":      len(closed),
+        "price":         float(candles[-1]["close"]),
+        "candle_open":   last_open,
+        # Current until the candle after the last closed one has closed too
+        "valid_until":   last_open + 2 * TIMEFRAME_SECONDS[timeframe],
+        "scanned_at":    time.time(),
+    }
+
+
+async def scan_timeframe(timeframe: str, symbols: Optional[List[str]] = None) -> int:
+    """
+    Fetch + detect every symbol on one timeframe and publish to the board.
+    Fetches run concurrently (bounded); each series goes to the process
+    pool as soon as it arrives. Returns the number of series published.
+    """
+    symbols   = symbols or SCAN_SYMBOLS
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    start     = time.time()
+
+    results = await asyncio.gather(
+        *(_scan_one(symbol, timeframe, semaphore) for symbol in symbols),
+        return_exceptions=True,
+    )
+
+    published = 0
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            print(f"[pattern_scanner] {symbol} ({timeframe}) failed: {result}")
+            continue
+        if result:
+            _board[(symbol, timeframe)] = result
+            published += 1
+
+    _rebuild_ranking()
+    print(
+        f"[pattern_scanner] ✅ {timeframe}: {published}/{len(symbols)} series "
+        f"in {time.time() - start:.1f}s"
+    )
+    return published
+
+
+async def run_pattern_scan_job(context) -> None:
+    """
+    Scheduled job: rescan every timeframe whose candle has closed since its
+    last scan. Skips if a previous run is still in progress.
+    """
+    global _is_scanning
+    if _is_scanning:
+        print("[pattern_scanner] Previous scan still running, skipping...")
+        return
+
+    _is_scanning = True
+    try:
+        now = time.time()
+        for tf in SCAN_TIMEFRAMES:
+            closed_open = _last_closed_open(tf, now)
+            if _last_scanned_close.get(tf) == closed_open:
+                continue
+            try:
+                await scan_timeframe(tf)
+                _last_scanned_close[tf] = closed_open
+            except Exception as e:
+                print(f"[pattern_scanner] ❌ Scan failed for {tf}: {e}")
+    finally:
+        _is_scanning = False
+
+
+def setup_pattern_scanner_jobs(application: Application) -> None:
+    application.job_queue.run_repeating(
+        run_pattern_scan_job,
+        interval=JOB_INTERVAL,
+        first=180,
+    )
+    print(f"[pattern_scanner] Market-wide pattern scan scheduled every {JOB_INTERVAL}s")
+
+
+# ============================================================================
+# READ API
+# ============================================================================
+
+def get_board_entry(symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+    """
+    Board entry for one series, or None if it was never scanned or a newer
+    candle has closed since (the caller should then analyse on demand).
+    """
+    entry = _board.get((symbol.upper(), timeframe))
+    if not entry or time.time() >= entry["valid_until"]:
+        return None
+    return entry
+
+
+def get_patterns_now(
+    timeframe: Optional[str] = None,
+    direction: Optional[str] = None,
+    min_quality: str = "MEDIUM",
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Top-ranked current patterns across the market, optionally filtered."""
+    now       = time.time()
+    min_order = _QUALITY_ORDER.get(min_quality, 2)
+    rows = []
+    for row in _ranked:
+        if timeframe and row["timeframe"] != timeframe:
+            continue
+        if direction and row["direction"] != direction:
+            continue
+        if _QUALITY_ORDER.get(row["quality"], 2) > min_order:
+            continue
+        entry = _board.get((row["symbol"], row["timeframe"]))
+        if not entry or now >= entry["valid_until"]:
+            continue
+        rows.append(row)
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def pattern_highlights(
+    symbol: str,
+    timeframe: str,
+    direction: str = "BULLISH",
+    limit: int = 2,
+) -> List[str]:
+    """Short 'emoji name (quality)' labels for one series — for alert messages."""
+    entry = get_board_entry(symbol, timeframe)
+    if not entry:
+        return []
+    return [
+        f"{p['emoji']} {p['name']} ({p['quality'].title()})"
+        for p in entry["patterns"]
+        if p["direction"] == direction and p["quality"] in ("HIGH", "MEDIUM")
+    ][:limit]
@@ -1,11 +1,74 @@
 import asyncio
 import logging
+from bisect import bisect_left
 from datetime import datetime, timedelta
 from database.setup_db import get_connection
 from services.setup_analyzer import fetch_candles
 
 logger = logging.getLogger(__name__)
 
+PENDING_BATCH       = 1000   # unresolved setups examined per run
+RESOLVE_CONCURRENCY = 4      # (symbol, timeframe) candle fetches in flight
+MIN_FETCH_CANDLES   = 200
+MAX_FETCH_CANDLES   = 1000   # Bybit's per-request cap
+
+_CANDLE_MS = {
+    "5m":  300_000,   "15m": 900_000,   "30m": 1_800_000,
+    "1h":  3_600_000, "2h":  7_200_000,  "4h":  14_400_000,
+    "8h":  28_800_000,"1d":  86_400_000,
+}
+
+SCORE_BUCKET     = 5    # score points per aggregate bucket
+SIMILAR_SCORE    = 7    # /setup compares against scores within ±7
+SIMILAR_DAYS     = 90
+SIMILAR_MIN      = 10   # resolved setups needed before showing stats
+WINDOW_MIN       = 5    # resolved outcomes needed for a per-window win rate
+
+# Rolls fully resolved setups into setup_perf_agg, one row per
+# (symbol, timeframe, score bucket, direction, day). {where} selects the setups.
+_AGG_UPSERT = f"""
+    INSERT INTO setup_perf_agg (
+        symbol, timeframe, score_bucket, direction, day,
+        total, wins, losses, win_profit, loss_profit, rr_sum,
+        resolved_4h, wins_4h, resolved_24h, wins_24h, resolved_72h, wins_72h
+    )
+    SELECT symbol, timeframe, score / {SCORE_BUCKET}, direction, substr(created_at, 1, 10),
+           COUNT(*),
+           SUM(outcome = 'win'),
+           SUM(outcome = 'loss'),
+           SUM(CASE WHEN outcome = 'win'  THEN COALESCE(profit_pct, 0) ELSE 0 END),
+           SUM(CASE WHEN outcome = 'loss' THEN COALESCE(profit_pct, 0) ELSE 0 END),
+           SUM(COALESCE(risk_reward, 0)),
+           -- CASE, not SUM(col = ...): a group where a window is all NULL must sum to 0
+           SUM(CASE WHEN outcome_4h  IN ('win', 'loss') THEN 1 ELSE 0 END),
+           SUM(CASE WHEN outcome_4h  = 'win'            THEN 1 ELSE 0 END),
+           SUM(CASE WHEN outcome_24h IN ('win', 'loss') THEN 1 ELSE 0 END),
+           SUM(CASE WHEN outcome_24h = 'win'            THEN 1 ELSE 0 END),
+           SUM(CASE WHEN outcome_72h IN ('win', 'loss') THEN 1 ELSE 0 END),
+           SUM(CASE WHEN outcome_72h = 'win'            THEN 1 ELSE 0 END)
+    FROM trade_setups
+    WHERE outcome IS NOT NULL AND {{where}}
+    GROUP BY symbol, timeframe, score / {SCORE_BUCKET}, direction, substr(created_at, 1, 10)
+    ON CONFLICT (symbol, timeframe, score_bucket, direction, day) DO UPDATE SET
+        total        = total        + excluded.total,
+        wins         = wins         + excluded.wins,
+        losses       = losses       + excluded.losses,
+        win_profit   = win_profit   + excluded.win_profit,
+        loss_profit  = loss_profit  + excluded.loss_profit,
+        rr_sum       = rr_sum       + excluded.rr_sum,
+        resolved_4h  = resolved_4h  + excluded.resolved_4h,
+        wins_4h      = wins_4h      + excluded.wins_4h,
+        resolved_24h = resolved_24h + excluded.resolved_24h,
+        wins_24h     = wins_24h     + excluded.wins_24h,
+        resolved_72h = resolved_72h + excluded.resolved_72h,
+        wins_72h     = wins_72h     + excluded.wins_72h
+"""
+
+_UPDATE_COLUMNS = (
+    "price_4h", "outcome_4h", "price_24h", "outcome_24h",
+    "price_72h", "outcome_72h", "outcome", "profit_pct", "resolved_at",
+)
+
 
 class PerformanceTracker:
     """
@@ -17,6 +80,10 @@ class PerformanceTracker:
     timeframe — and marks each setup as win / loss / open accordingly.
 
     get_similar_setups then returns real win rates, not illustrative numbers.
+
+    Resolved setups are also rolled into setup_perf_agg as they resolve, so
+    the /setup performance block and /perf stats read a handful of aggregate
+    rows instead of scanning trade_setups.
     """
 
     def __init__(self):
@@ -91,6 +158,44 @@ class PerformanceTracker:
             except Exception:
                 pass
 
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS setup_perf_agg (
+                    symbol        TEXT    NOT NULL,
+                    timeframe     TEXT    NOT NULL,
+                    score_bucket  INTEGER NOT NULL,
+                    direction     TEXT    NOT NULL,
+                    day           TEXT    NOT NULL,
+                    total         INTEGER NOT NULL DEFAULT 0,
+                    wins          INTEGER NOT NULL DEFAULT 0,
+                    losses        INTEGER NOT NULL DEFAULT 0,
+                    win_profit    REAL    NOT NULL DEFAULT 0,
+                    loss_profit   REAL    NOT NULL DEFAULT 0,
+                    rr_sum        REAL    NOT NULL DEFAULT 0,
+                    resolved_4h   INTEGER NOT NULL DEFAULT 0,
+                    wins_4h       INTEGER NOT NULL DEFAULT 0,
+                    resolved_24h  INTEGER NOT NULL DEFAULT 0,
+                    wins_24h      INTEGER NOT NULL DEFAULT 0,
+                    resolved_72h  INTEGER NOT NULL DEFAULT 0,
+                    wins_72h      INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (symbol, timeframe, score_bucket, direction, day)
+                ) WITHOUT ROWID;
+            """)
+
+            # First run with the aggregate table: backfill from history
+            if conn.execute("SELECT 1 FROM setup_perf_agg LIMIT 1").fetchone() is None:
+                conn.execute(_AGG_UPSERT.format(where="1"))
+                logger.info("setup_perf_agg: backfilled from trade_setups")
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    def rebuild_aggregates(self) -> None:
+        """Recompute setup_perf_agg from trade_setups (admin / repair)."""
+        conn = get_connection()
+        try:
+            conn.execute("DELETE FROM setup_perf_agg")
+            conn.execute(_AGG_UPSERT.format(where="1"))
             conn.commit()
         finally:
             conn.close()
@@ -147,10 +252,13 @@ class PerformanceTracker:
         """
         For every unresolved setup whose check windows have elapsed,
         fetch real price from the exchange and mark win/loss.
+
+        Setups are grouped by (symbol, timeframe): each group needs one
+        candle fetch, every due window is resolved from that series, and
+        all updates are written with a single executemany.
         Returns the number of setups resolved in this run.
         """
-        resolved = 0
-        conn     = get_connection()
+        conn = get_connection()
         try:
             cur = conn.cursor()
             cur.execute(
@@ -163,26 +271,132 @@ class PerformanceTracker:
                 FROM trade_setups
                 WHERE resolved_at IS NULL
                 ORDER BY created_at ASC
-                LIMIT 100
-                """
+                LIMIT ?
+                """,
+                (PENDING_BATCH,),
             )
             rows = cur.fetchall()
         finally:
             conn.close()
 
+        now    = datetime.utcnow()
+        groups: dict = {}
         for row in rows:
-            try:
-                resolved += await self._resolve_one(row)
-                await asyncio.sleep(0.5)
-            except Exception as e:
-                logger.warning(f"resolve_one error for setup #{row[0]}: {e}")
+            due = self._due_windows(row, now)
+            if due:
+                groups.setdefault((row[1], row[2]), []).append((row, due))
+
+        if not groups:
+            return 0
+
+        sem = asyncio.Semaphore(RESOLVE_CONCURRENCY)
 
+        async def _resolve_group(symbol: str, timeframe: str, pending: list) -> list:
+            async with sem:
+                candles = await self._fetch_group_candles(symbol, timeframe, pending, now)
+            if not candles:
+                return []
+            times   = [c["datetime"] for c in candles]
+            results = []
+            for row, due in pending:
+                update = self._resolve_from_candles(row, due, candles, times, now)
+                if update:
+                    results.append(update)
+            return results
+
+        keys    = list(groups)
+        results = await asyncio.gather(
+            *(_resolve_group(symbol, tf, groups[(symbol, tf)]) for symbol, tf in keys),
+            return_exceptions=True,
+        )
+
+        updates = []
+        for (symbol, tf), result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.warning(f"resolve group error for {symbol}/{tf}: {result}")
+                continue
+            updates.extend(result)
+
+        if not updates:
+            return 0
+
+        # COALESCE keeps columns a row did not resolve this run untouched,
+        # so every update shares one statement
+        conn = get_connection()
+        try:
+            conn.executemany(
+                """
+                UPDATE trade_setups SET
+                    price_4h    = COALESCE(?, price_4h),
+                    outcome_4h  = COALESCE(?, outcome_4h),
+                    price_24h   = COALESCE(?, price_24h),
+                    outcome_24h = COALESCE(?, outcome_24h),
+                    price_72h   = COALESCE(?, price_72h),
+                    outcome_72h = COALESCE(?, outcome_72h),
+                    outcome     = COALESCE(?, outcome),
+                    profit_pct  = COALESCE(?, profit_pct),
+                    resolved_at = COALESCE(?, resolved_at)
+                WHERE id = ?
+                """,
+                [tuple(u.get(col) for col in _UPDATE_COLUMNS) + (u["id"],) for u in updates],
+            )
+            # Roll newly resolved setups into the aggregates in the same transaction
+            resolved_ids = [u["id"] for u in updates if u.get("resolved_at")]
+            if resolved_ids:
+                placeholders = ", ".join("?" * len(resolved_ids))
+                conn.execute(
+                    _AGG_UPSERT.format(where=f"id IN ({placeholders})"), resolved_ids
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+        resolved = len(resolved_ids)
         if resolved:
-            logger.info(f"resolve_pending_outcomes: resolved {resolved} setup(s)")
+            logger.info(
+                f"resolve_pending_outcomes: resolved {resolved} setup(s) "
+                f"from {len(groups)} candle fetch(es)"
+            )
         return resolved
 
-    async def _resolve_one(self, row: tuple) -> int:
-        """Check and update a single pending setup. Returns 1 if fully resolved."""
+    @staticmethod
+    def _due_windows(row: tuple, now: datetime) -> list:
+        """(window, hours) pairs whose check time has passed and have no outcome yet."""
+        timeframe  = row[2]
+        created_at = datetime.fromisoformat(row[7])
+        outcomes   = {"4h": row[11], "24h": row[12], "72h": row[13]}
+
+        from handlers.setup import OUTCOME_WINDOWS
+        windows = OUTCOME_WINDOWS.get(timeframe, {"4h": 4, "24h": 24, "72h": 72})
+
+        return [
+            (name, windows[name])
+            for name in ("4h", "24h", "72h")
+            if outcomes[name] is None and now >= created_at + timedelta(hours=windows[name])
+        ]
+
+    @staticmethod
+    async def _fetch_group_candles(
+        symbol: str, timeframe: str, pending: list, now: datetime
+    ) -> list | None:
+        """One candle series long enough to reach the oldest due window in the group."""
+        candle_ms = _CANDLE_MS.get(timeframe, 3_600_000)
+        oldest_ms = min(
+            (datetime.fromisoformat(row[7]) + timedelta(hours=due[0][1])).timestamp() * 1000
+            for row, due in pending
+        )
+        needed = int((now.timestamp() * 1000 - oldest_ms) // candle_ms) + 3
+        limit  = max(MIN_FETCH_CANDLES, min(MAX_FETCH_CANDLES, needed))
+        try:
+            return await fetch_candles(symbol, timeframe, limit=limit)
+        except Exception as e:
+            logger.warning(f"candle fetch error for {symbol}/{timeframe}: {e}")
+            return None
+
+    def _resolve_from_candles(
+        self, row: tuple, due: list, candles: list, times: list, now: datetime
+    ) -> dict | None:
+        """Price every due window of one setup from its group's candles."""
         (
             setup_id, symbol, timeframe, direction,
             entry_price, stop_loss, tp1,
@@ -192,62 +406,31 @@ class PerformanceTracker:
         ) = row
 
         created_at = datetime.fromisoformat(created_at_str)
-        now        = datetime.utcnow()
-
-        from handlers.setup import OUTCOME_WINDOWS
-        windows  = OUTCOME_WINDOWS.get(timeframe, {"4h": 4, "24h": 24, "72h": 72})
-        w4h_hrs  = windows["4h"]
-        w24h_hrs = windows["24h"]
-        w72h_hrs = windows["72h"]
+        tolerance  = _CANDLE_MS.get(timeframe, 3_600_000) * 3
 
         updates: dict = {}
-
-        if outcome_4h is None and now >= created_at + timedelta(hours=w4h_hrs):
-            price = await self._fetch_price_at(symbol, timeframe, created_at, w4h_hrs)
-            if price:
-                updates["price_4h"]   = price
-                updates["outcome_4h"] = self._classify(
-                    direction, entry_price, stop_loss, tp1, price
-                )
-
-        if outcome_24h is None and now >= created_at + timedelta(hours=w24h_hrs):
-            price = await self._fetch_price_at(symbol, timeframe, created_at, w24h_hrs)
-            if price:
-                updates["price_24h"]   = price
-                updates["outcome_24h"] = self._classify(
-                    direction, entry_price, stop_loss, tp1, price
-                )
-
-        if outcome_72h is None and now >= created_at + timedelta(hours=w72h_hrs):
-            price = await self._fetch_price_at(symbol, timeframe, created_at, w72h_hrs)
-            if price:
-                pct     = ((price - entry_price) / entry_price) * 100
+        for name, hours in due:
+            target_ms = int((created_at + timedelta(hours=hours)).timestamp() * 1000)
+            price     = self._price_at(candles, times, target_ms, tolerance)
+            if not price:
+                continue
+
+            outcome = self._classify(direction, entry_price, stop_loss, tp1, price)
+            updates[f"price_{name}"]   = price
+            updates[f"outcome_{name}"] = outcome
+
+            if name == "72h":
+                pct = ((price - entry_price) / entry_price) * 100
                 if direction == "BEARISH":
                     pct = -pct
-                outcome                = self._classify(
-                    direction, entry_price, stop_loss, tp1, price
-                )
-                updates["price_72h"]   = price
-                updates["outcome_72h"] = outcome
                 updates["outcome"]     = outcome
                 updates["profit_pct"]  = round(pct, 2)
                 updates["resolved_at"] = now.isoformat()
 
         if not updates:
-            return 0
-
-        set_clause = ", ".join(f"{k} = ?" for k in updates)
-        values     = list(updates.values()) + [setup_id]
-        conn       = get_connection()
-        try:
-            conn.execute(
-                f"UPDATE trade_setups SET {set_clause} WHERE id = ?", values
-            )
-            conn.commit()
-        finally:
-            conn.close()
-
-        return 1 if "resolved_at" in updates else 0
+            return None
+        updates["id"] = setup_id
+        return updates
 
     @staticmethod
     def _classify(
@@ -266,85 +449,72 @@ class PerformanceTracker:
         return "open"
 
     @staticmethod
-    async def _fetch_price_at(
-        symbol: str, timeframe: str, created_at: datetime, hours_later: float
+    def _price_at(
+        candles: list, times: list, target_ms: int, tolerance: int
     ) -> float | None:
-        try:
-            candles = await fetch_candles(symbol, timeframe, limit=200)
-            if not candles:
-                return None
-
-            target_ms = int(
-                (created_at + timedelta(hours=hours_later)).timestamp() * 1000
-            )
-            closest = min(candles, key=lambda c: abs(c["datetime"] - target_ms))
-
-            _CANDLE_MS = {
-                "5m":  300_000,   "15m": 900_000,   "30m": 1_800_000,
-                "1h":  3_600_000, "2h":  7_200_000,  "4h":  14_400_000,
-                "8h":  28_800_000,"1d":  86_400_000,
-            }
-            tolerance = _CANDLE_MS.get(timeframe, 3_600_000) * 3
-            if abs(closest["datetime"] - target_ms) > tolerance:
-                return None
-
-            return closest["close"]
-
-        except Exception as e:
-            logger.warning(f"_fetch_price_at error for {symbol}: {e}")
+        """Close of the candle nearest `target_ms` (binary search), if within tolerance."""
+        i = bisect_left(times, target_ms)
+        nearest = [j for j in (i - 1, i) if 0 <= j < len(times)]
+        if not nearest:
+            return None
+        j = min(nearest, key=lambda k: abs(times[k] - target_ms))
+        if abs(times[j] - target_ms) > tolerance:
             return None
+        return candles[j]["close"]
 
     # ── Read ──────────────────────────────────────────────────────────────────
 
     async def get_similar_setups(
-        self, symbol: str, timeframe: str, score: int
+        self, symbol: str, timeframe: str, score: int, direction: str | None = None
     ) -> dict | None:
         """
-        Return real historical performance for setups similar to the current one.
+        Return real historical performance for setups similar to the current one
+        (score buckets covering ±7, last 90 days, optionally same direction).
         Requires at least 10 resolved setups to return data.
         """
         try:
+            query = f"""
+                SELECT SUM(total), SUM(wins), SUM(losses),
+                       SUM(win_profit), SUM(loss_profit), SUM(rr_sum),
+                       SUM(resolved_4h),  SUM(wins_4h),
+                       SUM(resolved_24h), SUM(wins_24h),
+                       SUM(resolved_72h), SUM(wins_72h)
+                FROM setup_perf_agg
+                WHERE symbol       = ?
+                AND   timeframe    = ?
+                AND   score_bucket BETWEEN ? AND ?
+                AND   day          > date('now', '-{SIMILAR_DAYS} days')
+            """
+            params = [
+                symbol, timeframe,
+                max(score - SIMILAR_SCORE, 0) // SCORE_BUCKET,
+                (score + SIMILAR_SCORE) // SCORE_BUCKET,
+            ]
+            if direction:
+                query += " AND direction = ?"
+                params.append(direction)
+
             conn = get_connection()
-            cur  = conn.cursor()
-            cur.execute(
-                """
-                SELECT outcome, profit_pct, risk_reward,
-                       outcome_4h, outcome_24h, outcome_72h
-                FROM trade_setups
-                WHERE symbol    = ?
-                AND   timeframe = ?
-                AND   score     BETWEEN ? AND ?
-                AND   outcome   IS NOT NULL
-                AND   created_at > datetime('now', '-90 days')
-                ORDER BY created_at DESC
-                LIMIT 200
-                """,
-                (symbol, timeframe, score - 7, score + 7),
-            )
-            rows = cur.fetchall()
+            r    = conn.execute(query, params).fetchone()
             conn.close()
 
-            if not rows or len(rows) < 10:
+            total = (r[0] or 0) if r else 0
+            if total < SIMILAR_MIN:
                 return None
 
-            total  = len(rows)
-            wins   = [r for r in rows if r[0] == "win"]
-            losses = [r for r in rows if r[0] == "loss"]
-            w_n    = len(wins)
-            l_n    = len(losses)
+            w_n = r[1] or 0
+            l_n = r[2] or 0
 
             win_rate   = (w_n / total) * 100
-            avg_win    = (sum(r[1] for r in wins)   / w_n)  if w_n else 0.0
-            avg_loss   = (sum(r[1] for r in losses) / l_n)  if l_n else 0.0
+            avg_win    = (r[3] / w_n) if w_n else 0.0
+            avg_loss   = (r[4] / l_n) if l_n else 0.0
             expectancy = (win_rate / 100 * avg_win) + ((1 - win_rate / 100) * avg_loss)
-            avg_rr     = sum(r[2] for r in rows if r[2]) / total
+            avg_rr     = (r[5] or 0) / total
 
-            def _wr(col_idx: int) -> float | None:
-                resolved = [r for r in rows if r[col_idx] in ("win", "loss")]
-                if len(resolved) < 5:
+            def _wr(resolved: int | None, wins: int | None) -> float | None:
+                if not resolved or resolved < WINDOW_MIN:
                     return None
-                w = sum(1 for r in resolved if r[col_idx] == "win")
-                return round(w / len(resolved) * 100, 1)
+                return round((wins or 0) / resolved * 100, 1)
 
             return {
                 "total_setups":    total,
@@ -355,9 +525,9 @@ class PerformanceTracker:
                 "avg_loss":        round(avg_loss, 2),
                 "expectancy":      round(expectancy, 2),
                 "avg_risk_reward": round(avg_rr, 2),
-                "win_rate_4h":     _wr(3),
-                "win_rate_24h":    _wr(4),
-                "win_rate_72h":    _wr(5),
+                "win_rate_4h":     _wr(r[6], r[7]),
+                "win_rate_24h":    _wr(r[8], r[9]),
+                "win_rate_72h":    _wr(r[10], r[11]),
             }
 
         except Exception as e:
@@ -374,14 +544,13 @@ class PerformanceTracker:
             cur.execute(
                 """
                 SELECT
-                    COUNT(*)                                         AS total,
-                    SUM(CASE WHEN outcome='win'  THEN 1 ELSE 0 END) AS wins,
-                    SUM(CASE WHEN outcome='loss' THEN 1 ELSE 0 END) AS losses,
-                    AVG(CASE WHEN outcome='win'  THEN profit_pct END) AS avg_win,
-                    AVG(CASE WHEN outcome='loss' THEN profit_pct END) AS avg_loss,
+                    SUM(total)                                       AS total,
+                    SUM(wins)                                        AS wins,
+                    SUM(losses)                                      AS losses,
+                    SUM(win_profit)  / NULLIF(SUM(wins), 0)          AS avg_win,
+                    SUM(loss_profit) / NULLIF(SUM(losses), 0)        AS avg_loss,
                     COUNT(DISTINCT symbol)                           AS symbols
-                FROM trade_setups
-                WHERE outcome IS NOT NULL
+                FROM setup_perf_agg
                 """
             )
             r = cur.fetchone()
@@ -5,6 +5,8 @@ import asyncio
 from datetime import datetime
 from dotenv import load_dotenv
 
+from whales import whale_store
+
 # ✅ Load API keys
 load_dotenv()
 
@@ -12,8 +14,6 @@ ETHPLORER_API_KEY = os.getenv("ETHPLORER_API_KEY", "freekey")
 ETHPLORER_BASE = "https://api.ethplorer.io"
 
 TOP_TOKENS_FILE = "services/top100_coingecko_ids.json"
-WHALE_DATA_DIR = "whales/data"
-os.makedirs(WHALE_DATA_DIR, exist_ok=True)
 
 COINGECKO_BASE = "https://api.coingecko.com/api/v3"
 
@@ -137,15 +137,7 @@ async def fetch_top_holders_ethplorer(contract_address: str, symbol: str, limit:
 
 # ✅ Helper: Save fallback data
 def save_fallback(symbol: str, reason: str):
-    data = {
-        "symbol": symbol.upper(),
-        "unsupported": True,
-        "reason": reason,
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-    }
-    save_path = os.path.join(WHALE_DATA_DIR, f"{symbol.upper()}.json")
-    with open(save_path, "w") as wf:
-        json.dump(data, wf, indent=2)
+    whale_store.save_unsupported_token(symbol, reason)
     print(f"⚠️ Skipped {symbol}: {reason}")
 
 
@@ -192,19 +184,9 @@ async def refresh_all_whales(context=None):
         print(f"🔹 Fetching whales for {symbol} ({contract_address})...")
         whales = await fetch_top_holders_ethplorer(contract_address, symbol)
 
-        save_path = os.path.join(WHALE_DATA_DIR, f"{symbol}.json")
         if whales:
-            # ✅ Add version tracking + timestamp
-            whale_data = {
-                "token": symbol,
-                "contract": contract_address,
-                "updated_at": datetime.utcnow().isoformat(),
-                "version": "1.0.0",
-                "whale_count": len(whales),
-                "whales": whales
-            }
-            with open(save_path, "w") as wf:
-                json.dump(whale_data, wf, indent=2)
+            # ✅ Replaces the token's holder rows in one transaction
+            whale_store.save_token_whales(symbol, contract_address, whales)
             print(f"✅ Saved {len(whales)} whales for {symbol}")
         else:
             save_fallback(symbol, "No whale data available from Ethplorer")
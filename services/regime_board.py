@@ -0,0 +1,166 @@
+# services/regime_board.py
+"""
+Precomputed /regime results for the most requested symbols.
+
+Demand is counted by RegimeCache (every lookup of "BTC_day", hit or miss).
+A background job takes the hottest keys plus ALWAYS_HOT and, once per
+candle close of each style's lower timeframe, recomputes their regime and
+stores it in `regime_cache` until the next close. Each (symbol, timeframe)
+series is fetched and run through calculate_indicators once per refresh,
+so a symbol hot for both styles shares its 4h data between them.
+
+/regime reads `regime_cache` first; the long tail still falls back to
+on-demand RegimeEngine.analyze with the regular 5-minute TTL.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, List, Set
+
+from telegram.ext import Application
+
+from services.regime_engine import RegimeEngine
+from utils.regime_cache import RegimeCache
+from utils.regime_data import fetch_market_data
+from utils.regime_indicators import calculate_indicators
+
+# style → (lower_tf, upper_tf), as offered by the /regime buttons
+REGIME_STYLES = {
+    "day":   ("1h", "4h"),
+    "swing": ("4h", "1day"),
+}
+
+TIMEFRAME_SECONDS = {"1h": 3600, "4h": 14400, "1day": 86400}
+
+BOARD_SIZE        = int(os.getenv("REGIME_BOARD_SIZE", "10"))  # hot keys precomputed
+ALWAYS_HOT        = ("BTC", "ETH")
+FETCH_CONCURRENCY = 2     # simultaneous Twelve Data requests (background lane)
+JOB_INTERVAL      = 60    # seconds
+CLOSE_DELAY       = 30    # seconds after a close before the new candle is fetched
+CLOSE_GRACE       = 300   # seconds a board result stays valid past the next close
+
+regime_cache = RegimeCache(ttl_minutes=5)
+_engine = RegimeEngine()
+_last_board_close: Dict[str, float] = {}
+_is_running = False
+
+
+def _last_close(timeframe: str, now: float) -> float:
+    """Epoch seconds at which the most recent `timeframe` candle closed."""
+    tf_secs = TIMEFRAME_SECONDS[timeframe]
+    return now // tf_secs * tf_secs
+
+
+def hot_symbols(style: str) -> List[str]:
+    """Symbols to precompute for `style`: ALWAYS_HOT + the most requested."""
+    symbols = list(ALWAYS_HOT)
+    for key in regime_cache.get_hot_keys(BOARD_SIZE):
+        # RegimeCache upper-cases keys: "BTC_DAY"
+        symbol, _, key_style = key.rpartition("_")
+        if key_style.lower() == style and symbol not in symbols:
+            symbols.append(symbol)
+    return symbols
+
+
+async def refresh_regime_styles(styles: List[str]) -> int:
+    """Recompute the hot symbols of `styles`. Returns #results stored."""
+    start = time.time()
+    wanted: Dict[str, Set[str]] = {}
+    for style in styles:
+        for symbol in hot_symbols(style):
+            wanted.setdefault(symbol, set()).add(style)
+
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def _fetch(symbol: str, timeframe: str):
+        async with semaphore:
+            candles = await fetch_market_data(symbol, timeframe, background=True)
+        return candles, calculate_indicators(candles, timeframe)
+
+    async def _one(symbol: str, symbol_styles: Set[str]) -> int:
+        timeframes = sorted({tf for s in symbol_styles for tf in REGIME_STYLES[s]})
+        fetched = await asyncio.gather(
+            *(_fetch(symbol, tf) for tf in timeframes), return_exceptions=True
+        )
+        series = {
+            tf: result for tf, result in zip(timeframes, fetched)
+            if not isinstance(result, Exception)
+        }
+
+        stored = 0
+        now = time.time()
+        for style in symbol_styles:
+            lower_tf, upper_tf = REGIME_STYLES[style]
+            if lower_tf not in series or upper_tf not in series:
+                continue
+            (data_lower, ind_lower), (data_upper, ind_upper) = series[lower_tf], series[upper_tf]
+            try:
+                result = _engine.analyze_market_data(
+                    {"symbol": symbol, "data_lower": data_lower, "data_upper": data_upper},
+                    lower_tf, upper_tf,
+                    indicators_lower=ind_lower, indicators_upper=ind_upper,
+                )
+            except Exception as e:
+                print(f"[regime_board] ⚠️ {symbol} {style}: {e}")
+                continue
+            expires_at = _last_close(lower_tf, now) + TIMEFRAME_SECONDS[lower_tf] + CLOSE_GRACE
+            regime_cache.set(f"{symbol}_{style}", "board", result, expires_at=expires_at)
+            stored += 1
+        return stored
+
+    results = await asyncio.gather(
+        *(_one(symbol, s) for symbol, s in wanted.items()), return_exceptions=True
+    )
+    stored = sum(r for r in results if isinstance(r, int))
+
+    print(
+        f"[regime_board] ✅ {'+'.join(styles)}: {stored} result(s) for "
+        f"{len(wanted)} symbol(s) in {time.time() - start:.1f}s"
+    )
+    return stored
+
+
+async def run_regime_board_job(context) -> None:
+    """
+    Scheduled job: refresh each style whose lower-timeframe candle has closed
+    since its last refresh. Skips if a previous run is still in progress.
+    """
+    global _is_running
+    if _is_running:
+        print("[regime_board] Previous refresh still running, skipping...")
+        return
+
+    _is_running = True
+    try:
+        now = time.time()
+        due = []
+        for style, (lower_tf, _) in REGIME_STYLES.items():
+            closed_at = _last_close(lower_tf, now)
+            if now - closed_at < CLOSE_DELAY or _last_board_close.get(style) == closed_at:
+                continue
+            due.append((style, closed_at))
+
+        if not due:
+            return
+
+        try:
+            await refresh_regime_styles([style for style, _ in due])
+            for style, closed_at in due:
+                _last_board_close[style] = closed_at
+            # Hourly halving keeps the board on what users asked for recently
+            if "day" in dict(due):
+                regime_cache.decay_demand()
+        except Exception as e:
+            print(f"[regime_board] ❌ Refresh failed: {e}")
+    finally:
+        _is_running = False
+
+
+def setup_regime_board_jobs(application: Application) -> None:
+    application.job_queue.run_repeating(
+        run_regime_board_job,
+        interval=JOB_INTERVAL,
+        first=300,
+    )
+    print(f"[regime_board] Regime board refresh scheduled every {JOB_INTERVAL}s")
@@ -96,83 +96,7 @@ class RegimeEngine:
             # ================================================================
             market_data = await fetch_regime_data(symbol, lower_tf, upper_tf)
             
-            # Validate data was received
-            if not market_data.get("data_lower") or not market_data.get("data_upper"):
-                raise Exception("No market data received")
-            
-            # Check minimum candle requirements
-            min_lower = self.min_candles.get(lower_tf, 100)
-            min_upper = self.min_candles.get(upper_tf, 50)
-            
-            if len(market_data["data_lower"]) < min_lower:
-                logger.warning(f"Insufficient {lower_tf} data: {len(market_data['data_lower'])} < {min_lower}")
-                raise Exception(f"Insufficient historical data for {lower_tf} timeframe")
-            
-            if len(market_data["data_upper"]) < min_upper:
-                logger.warning(f"Insufficient {upper_tf} data: {len(market_data['data_upper'])} < {min_upper}")
-                raise Exception(f"Insufficient historical data for {upper_tf} timeframe")
-            
-            # ================================================================
-            # STEP 2: CALCULATE INDICATORS
-            # ================================================================
-            indicators_lower = calculate_indicators(market_data["data_lower"], lower_tf)
-            indicators_upper = calculate_indicators(market_data["data_upper"], upper_tf)
-            
-            logger.info(f"Indicators calculated: lower_trend={indicators_lower.get('trend_bias')}, upper_trend={indicators_upper.get('trend_bias')}")
-            
-            # ================================================================
-            # STEP 3: DETERMINE REGIME
-            # ================================================================
-            regime = self._determine_regime(indicators_lower, indicators_upper)
-            
-            # ================================================================
-            # STEP 4: CALCULATE RISK LEVEL
-            # ================================================================
-            risk_level = self._calculate_risk_level(regime, indicators_lower, indicators_upper)
-            
-            # ================================================================
-            # STEP 5: SUGGEST TRADING POSTURE (More specific)
-            # ================================================================
-            posture = self._suggest_posture(regime, risk_level, indicators_lower, indicators_upper)
-            
-            # ================================================================
-            # STEP 6: CALCULATE CONFIDENCE
-            # ================================================================
-            confidence = self._calculate_confidence(indicators_lower, indicators_upper)
-            
-            # ================================================================
-            # STEP 7: BUILD RESULT (BASE)
-            # ================================================================
-            result = {
-                "symbol": market_data["symbol"],
-                "regime": regime,
-                "risk_level": risk_level,
-                "posture": posture,
-                "confidence": confidence
-            }
-            
-            # Add fallback warning if symbol was changed
-            if market_data.get("fallback_used"):
-                result["warning"] = (
-                    f"Could not fetch {market_data['original_symbol']} data. "
-                    f"Showing BTC instead."
-                )
-            
-            # ================================================================
-            # STEP 8: ADD PRO FEATURES
-            # ================================================================
-            result.update({
-                "strategy_rules": self._check_strategy_rules(
-                    indicators_lower, indicators_upper
-                ),
-                "volume_behavior": self._analyze_volume(
-                    market_data["data_lower"], market_data["data_upper"]
-                )
-            })
-            
-            logger.info(f"Analysis complete: symbol={symbol}, regime={regime}, confidence={confidence}%")
-            
-            return result
+            return self.analyze_market_data(market_data, lower_tf, upper_tf)
             
         except MarketDataError as e:
             logger.error(f"Market data error for {symbol}: {str(e)}")
@@ -186,6 +110,109 @@ class RegimeEngine:
                 raise Exception(f"Data error: {str(e)}")
             raise Exception(f"Analysis error: {str(e)}")
     
+    def analyze_market_data(
+        self,
+        market_data: Dict,
+        lower_tf: str,
+        upper_tf: str,
+        indicators_lower: Dict = None,
+        indicators_upper: Dict = None
+    ) -> Dict:
+        """
+        Regime analysis on already-fetched market data (see fetch_regime_data)
+        
+        Args:
+            market_data: Dict with symbol, data_lower, data_upper (+ fallback info)
+            lower_tf: Lower timeframe of data_lower
+            upper_tf: Upper timeframe of data_upper
+            indicators_lower: Precomputed calculate_indicators(data_lower) - optional
+            indicators_upper: Precomputed calculate_indicators(data_upper) - optional
+        
+        Returns:
+            Dictionary with regime analysis results
+        """
+        symbol = market_data.get("symbol")
+        
+        # Validate data was received
+        if not market_data.get("data_lower") or not market_data.get("data_upper"):
+            raise Exception("No market data received")
+        
+        # Check minimum candle requirements
+        min_lower = self.min_candles.get(lower_tf, 100)
+        min_upper = self.min_candles.get(upper_tf, 50)
+        
+        if len(market_data["data_lower"]) < min_lower:
+            logger.warning(f"Insufficient {lower_tf} data: {len(market_data['data_lower'])} < {min_lower}")
+            raise Exception(f"Insufficient historical data for {lower_tf} timeframe")
+        
+        if len(market_data["data_upper"]) < min_upper:
+            logger.warning(f"Insufficient {upper_tf} data: {len(market_data['data_upper'])} < {min_upper}")
+            raise Exception(f"Insufficient historical data for {upper_tf} timeframe")
+        
+        # ================================================================
+        # STEP 2: CALCULATE INDICATORS
+        # ================================================================
+        if indicators_lower is None:
+            indicators_lower = calculate_indicators(market_data["data_lower"], lower_tf)
+        if indicators_upper is None:
+            indicators_upper = calculate_indicators(market_data["data_upper"], upper_tf)
+        
+        logger.info(f"Indicators calculated: lower_trend={indicators_lower.get('trend_bias')}, upper_trend={indicators_upper.get('trend_bias')}")
+        
+        # ================================================================
+        # STEP 3: DETERMINE REGIME
+        # ================================================================
+        regime = self._determine_regime(indicators_lower, indicators_upper)
+        
+        # ================================================================
+        # STEP 4: CALCULATE RISK LEVEL
+        # ================================================================
+        risk_level = self._calculate_risk_level(regime, indicators_lower, indicators_upper)
+        
+        # ================================================================
+        # STEP 5: SUGGEST TRADING POSTURE (More specific)
+        # ================================================================
+        posture = self._suggest_posture(regime, risk_level, indicators_lower, indicators_upper)
+        
+        # ================================================================
+        # STEP 6: CALCULATE CONFIDENCE
+        # ================================================================
+        confidence = self._calculate_confidence(indicators_lower, indicators_upper)
+        
+        # ================================================================
+        # STEP 7: BUILD RESULT (BASE)
+        # ================================================================
+        result = {
+            "symbol": market_data["symbol"],
+            "regime": regime,
+            "risk_level": risk_level,
+            "posture": posture,
+            "confidence": confidence
+        }
+        
+        # Add fallback warning if symbol was changed
+        if market_data.get("fallback_used"):
+            result["warning"] = (
+                f"Could not fetch {market_data['original_symbol']} data. "
+                f"Showing BTC instead."
+            )
+        
+        # ================================================================
+        # STEP 8: ADD PRO FEATURES
+        # ================================================================
+        result.update({
+            "strategy_rules": self._check_strategy_rules(
+                indicators_lower, indicators_upper
+            ),
+            "volume_behavior": self._analyze_volume(
+                market_data["data_lower"], market_data["data_upper"]
+            )
+        })
+        
+        logger.info(f"Analysis complete: symbol={symbol}, regime={regime}, confidence={confidence}%")
+        
+        return result
+
     # ========================================================================
     # REGIME DETERMINATION
     # ========================================================================
@@ -6,7 +6,9 @@ import time
 from datetime import datetime
 from dotenv import load_dotenv
 from typing import Optional, Dict, Any, List
-from collections import deque
+
+from utils.cache import get_cache
+from utils.rate_limiter import BYBIT_LIMITER, OKX_LIMITER
 
 load_dotenv()
 
@@ -29,12 +31,17 @@ REQUEST_TIMEOUT = 10
 MAX_RETRIES = 2
 CACHE_TTL = 3600 # 1 hour
 
-# Rate limiting
-RATE_LIMIT_WINDOW = 60
-MAX_REQUESTS_PER_WINDOW = 400  # More conservative for multiple exchanges
-_request_times: deque = deque(maxlen=MAX_REQUESTS_PER_WINDOW)
-_rate_limit_lock = asyncio.Lock()
-_cache: Dict[str, tuple[Any, float]] = {}
+INTERVAL_SECONDS = {
+    "1m": 60, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "1d": 86400,
+}
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # candle lists dominate; ~64 MB bound
+
+# 200 closed candles (EMA200) plus the forming one, which is dropped
+SCREEN_CANDLES = 201
+
+_cache = get_cache("screener", ttl=CACHE_TTL, max_entries=5000, max_bytes=CACHE_MAX_BYTES)
 _working_bybit = None
 _working_okx = None
 
@@ -43,25 +50,6 @@ _working_okx = None
 # RATE LIMITING & CACHING
 # ============================================================================
 
-async def _wait_for_rate_limit():
-    """Enforce rate limit."""
-    async with _rate_limit_lock:
-        now = time.time()
-        
-        while _request_times and now - _request_times[0] > RATE_LIMIT_WINDOW:
-            _request_times.popleft()
-        
-        if len(_request_times) >= MAX_REQUESTS_PER_WINDOW:
-            wait_time = RATE_LIMIT_WINDOW - (now - _request_times[0]) + 0.1
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-                now = time.time()
-                while _request_times and now - _request_times[0] > RATE_LIMIT_WINDOW:
-                    _request_times.popleft()
-        
-        _request_times.append(time.time())
-
-
 def _get_cache_key(symbol: str, interval: str, exchange: str, params: str = "") -> str:
     """Generate unique cache key."""
     return f"{exchange}:{symbol}:{interval}:{params}"
@@ -69,17 +57,46 @@ def _get_cache_key(symbol: str, interval: str, exchange: str, params: str = "")
 
 def _get_from_cache(key: str) -> Optional[Any]:
     """Retrieve from cache if not expired."""
-    if key in _cache:
-        data, timestamp = _cache[key]
-        if time.time() - timestamp < CACHE_TTL:
-            return data
-        del _cache[key]
-    return None
+    return _cache.get(key)
+
+
+def _set_cache(key: str, data: Any, ttl: float = CACHE_TTL) -> None:
+    """Store in cache for `ttl` seconds."""
+    _cache.set(key, data, ttl)
+
+
+def seconds_until_close(interval: str, now: Optional[float] = None) -> float:
+    """Seconds until the forming `interval` candle closes (UTC-aligned)."""
+    secs = INTERVAL_SECONDS.get(interval)
+    if not secs:
+        return CACHE_TTL
+    now = time.time() if now is None else now
+    return secs - (now % secs)
 
 
-def _set_cache(key: str, data: Any) -> None:
-    """Store in cache."""
-    _cache[key] = (data, time.time())
+def _ttl_until_close(interval: str) -> float:
+    """Cache candle-derived data only until the next candle closes."""
+    return min(CACHE_TTL, seconds_until_close(interval))
+
+
+def closed_candles_newest_first(
+    candles: List[Dict[str, Any]],
+    interval: str,
+    now: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Drop the still-forming candle from a newest-first list. Candle
+    'datetime' is the naive local-time open written by the kline fetchers.
+    """
+    secs = INTERVAL_SECONDS.get(interval)
+    if not candles or not secs:
+        return candles
+    try:
+        opened = datetime.fromisoformat(candles[0]["datetime"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return candles
+    now = time.time() if now is None else now
+    return candles[1:] if opened + secs > now else candles
 
 
 def clear_cache() -> None:
@@ -214,6 +231,7 @@ async def fetch_bybit_klines(symbol: str, interval: str = "60", limit: int = 200
         url = f"{base_url}/v5/market/kline"
         
         try:
+            await BYBIT_LIMITER.acquire()
             connector = aiohttp.TCPConnector(force_close=True, ttl_dns_cache=300)
             
             async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
@@ -279,6 +297,7 @@ async def fetch_okx_klines(symbol: str, interval: str = "1H", limit: int = 200)
         url = f"{base_url}/api/v5/market/candles"
         
         try:
+            await OKX_LIMITER.acquire()
             connector = aiohttp.TCPConnector(force_close=True, ttl_dns_cache=300)
             
             async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
@@ -317,12 +336,18 @@ async def fetch_okx_klines(symbol: str, interval: str = "1H", limit: int = 200)
 # UNIFIED KLINE FETCHER
 # ============================================================================
 
-async def get_ohlcv(symbol: str, interval: str = "1h", limit: int = 200) -> Optional[List[Dict[str, Any]]]:
+async def get_ohlcv(
+    symbol: str,
+    interval: str = "1h",
+    limit: int = 200,
+    min_candles: int = 50,
+) -> Optional[List[Dict[str, Any]]]:
     """
     Fetch OHLCV data with automatic fallback between Bybit and OKX
     
     Returns:
-        List of candles (newest → oldest) or None
+        List of candles (newest → oldest) or None if neither exchange
+        returned at least `min_candles`
     """
     cache_key = _get_cache_key(symbol, interval, "multi_exchange", f"limit={limit}")
     
@@ -331,27 +356,22 @@ async def get_ohlcv(symbol: str, interval: str = "1h", limit: int = 200) -> Opti
     if cached:
         return cached
     
-    await _wait_for_rate_limit()
-    
-    # Try Bybit first (generally more reliable for spot)
-    print(f"[screener] Fetching {symbol} {interval} from Bybit...")
-    candles = await fetch_bybit_klines(symbol, interval, limit)
-    
-    if candles and len(candles) >= 50:
-        print(f"[screener] ✅ Got {len(candles)} candles from Bybit")
-        candles.reverse()  # Convert to newest first
-        _set_cache(cache_key, candles)
-        return candles
-    
-    # Fallback to OKX
-    print(f"[screener] Bybit failed, trying OKX...")
-    candles = await fetch_okx_klines(symbol, interval, limit)
-    
-    if candles and len(candles) >= 50:
-        print(f"[screener] ✅ Got {len(candles)} candles from OKX")
-        candles.reverse()  # Convert to newest first
-        _set_cache(cache_key, candles)
-        return candles
+    # Bybit first (generally more reliable for spot). When its bucket is
+    # drained and OKX has headroom, start on OKX so both venues are used.
+    venues = [("Bybit", fetch_bybit_klines), ("OKX", fetch_okx_klines)]
+    if BYBIT_LIMITER.available() < 1 <= OKX_LIMITER.available():
+        venues.reverse()
+
+    for name, fetch in venues:
+        candles = await fetch(symbol, interval, limit)
+        
+        if candles and len(candles) >= min(min_candles, limit):
+            print(f"[screener] ✅ Got {len(candles)} {symbol} {interval} candles from {name}")
+            candles.reverse()  # Convert to newest first
+            _set_cache(cache_key, candles, _ttl_until_close(interval))
+            return candles
+        
+        print(f"[screener] {name} failed for {symbol} {interval}, trying next exchange...")
     
     print(f"[screener] ❌ Both exchanges failed for {symbol}")
     return None
@@ -476,6 +496,74 @@ def is_bullish_engulfing(c1: Dict[str, float], c2: Dict[str, float]) -> bool:
         return False
 
 
+# ============================================================================
+# SHARED DAILY CONTEXT
+# ============================================================================
+
+DAILY_CONTEXT_CANDLES = 10
+DAILY_CONTEXT_RETRY = 300  # seconds before retrying a symbol whose daily fetch failed
+
+_daily_inflight: Dict[str, "asyncio.Future"] = {}
+
+
+def _daily_context_from_candles(daily_candles: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """avg_7d / support / resistance from newest-first daily candles."""
+    context = {"avg_7d": None, "support": None, "resistance": None}
+    if not daily_candles or len(daily_candles) < 7:
+        return context
+
+    closes_7d = [safe_float(c.get("close")) for c in daily_candles[:7]]
+    closes_7d = [c for c in closes_7d if c is not None]
+    if len(closes_7d) >= 5:
+        context["avg_7d"] = sum(closes_7d) / len(closes_7d)
+
+    highs = [safe_float(c.get("high")) for c in daily_candles[:5]]
+    lows = [safe_float(c.get("low")) for c in daily_candles[:5]]
+    highs = [h for h in highs if h is not None]
+    lows = [l for l in lows if l is not None]
+    if highs:
+        context["resistance"] = max(highs)
+    if lows:
+        context["support"] = min(lows)
+    return context
+
+
+async def _load_daily_context(symbol: str, cache_key: str) -> Dict[str, Any]:
+    daily_candles = await get_ohlcv(symbol, "1d", DAILY_CONTEXT_CANDLES, min_candles=7)
+    context = _daily_context_from_candles(daily_candles)
+    ttl = _ttl_until_close("1d") if daily_candles else min(DAILY_CONTEXT_RETRY, _ttl_until_close("1d"))
+    _set_cache(cache_key, context, ttl)
+    return context
+
+
+async def get_daily_context(
+    symbol: str,
+    daily_candles: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Daily context (avg_7d, support, resistance) shared by every screener
+    timeframe of a symbol. Fetched once per daily candle; concurrent callers
+    for the same symbol share a single in-flight request. Callers that
+    already hold daily candles (the 1d screen) pass them in instead.
+    """
+    cache_key = f"daily_context:{symbol}"
+    cached = _get_from_cache(cache_key)
+    if cached is not None:
+        return cached
+
+    if daily_candles is not None:
+        context = _daily_context_from_candles(daily_candles[:DAILY_CONTEXT_CANDLES])
+        _set_cache(cache_key, context, _ttl_until_close("1d"))
+        return context
+
+    pending = _daily_inflight.get(cache_key)
+    if pending is None:
+        pending = asyncio.ensure_future(_load_daily_context(symbol, cache_key))
+        _daily_inflight[cache_key] = pending
+        pending.add_done_callback(lambda _: _daily_inflight.pop(cache_key, None))
+    return await asyncio.shield(pending)
+
+
 # ============================================================================
 # MAIN SCREENER DATA LOADER
 # ============================================================================
@@ -510,18 +598,31 @@ async def load_screener_data(symbol: str, interval: str = "1h") -> Dict[str, Any
         "support": None,
         "resistance": None,
         "bullish_engulfing": False,
+        "candle_time": None,
     }
 
-    # Fetch OHLCV data
-    candles = await get_ohlcv(symbol, interval, 200)
-    daily_candles = await get_ohlcv(symbol, "1d", 10)
+    # Fetch OHLCV data; the daily context is shared across timeframes.
+    # Scores use closed candles only: the forming one is dropped, so a
+    # snapshot taken just after a close (and cached until the next one)
+    # is not built from a few seconds of volume and price action.
+    if interval in ("1d", "1day", "daily"):
+        candles = await get_ohlcv(symbol, interval, SCREEN_CANDLES)
+        candles = closed_candles_newest_first(candles, interval)
+        daily_context = await get_daily_context(symbol, candles)
+    else:
+        candles, daily_context = await asyncio.gather(
+            get_ohlcv(symbol, interval, SCREEN_CANDLES),
+            get_daily_context(symbol),
+        )
+        candles = closed_candles_newest_first(candles, interval)
     
     if not candles or len(candles) < 50:
-        _set_cache(complete_cache_key, data)
+        _set_cache(complete_cache_key, data, _ttl_until_close(interval))
         return data
     
     # Extract basic data
     try:
+        data["candle_time"] = candles[0].get("datetime")
         data["close"] = safe_float(candles[0].get("close"))
         data["prev_close"] = safe_float(candles[1].get("close")) if len(candles) > 1 else None
         data["volume"] = safe_float(candles[0].get("volume"))
@@ -571,31 +672,10 @@ async def load_screener_data(symbol: str, interval: str = "1h") -> Dict[str, Any
             data["signal"] = macd_result["signal"]
             data["hist"] = macd_result["hist"]
     
-    # Process daily data
-    if daily_candles and len(daily_candles) >= 7:
-        try:
-            closes_7d = [safe_float(c.get("close")) for c in daily_candles[:7]]
-            closes_7d = [c for c in closes_7d if c is not None]
-            
-            if len(closes_7d) >= 5:
-                data["avg_7d"] = sum(closes_7d) / len(closes_7d)
-            
-            if len(daily_candles) >= 5:
-                highs = [safe_float(c.get("high")) for c in daily_candles[:5]]
-                lows = [safe_float(c.get("low")) for c in daily_candles[:5]]
-                
-                highs = [h for h in highs if h is not None]
-                lows = [l for l in lows if l is not None]
-                
-                if highs:
-                    data["resistance"] = max(highs)
-                if lows:
-                    data["support"] = min(lows)
-        
-        except Exception as e:
-            print(f"[screener] Error processing daily data for {symbol}: {e}")
+    # Daily context (avg_7d, support, resistance)
+    data.update(daily_context)
     
     # Cache result
-    _set_cache(complete_cache_key, data)
+    _set_cache(complete_cache_key, data, _ttl_until_close(interval))
     
     return data
@@ -0,0 +1,388 @@
+# services/screener_dsl.py
+"""
+Rule DSL for screener strategies.
+
+A strategy is a few lines of plain conditions over the screener indicators,
+compiled once into numpy predicates that score every coin in one pass over
+the cross-coin indicator matrix (one column per field, one row per coin):
+
+    # Oversold bounce
+    min_score: 2
+    rsi < 35                      => 2     scored rule: adds 2 when true
+    macd > signal                 => 2
+    -2 <= pct(close, support) <= 5 => 1
+    volume > volume_ma                     bare condition: required filter
+
+A coin matches when every filter holds and its score reaches min_score
+(default 1 when the strategy has scored rules, else 0). Lines may also be
+separated with ";" so a strategy fits in one chat message.
+
+Conditions use numbers, the FIELDS below, + - * /, comparisons (chains
+allowed), and / or / not, and the functions abs, min, max and
+pct(a, b) = (a - b) / b * 100. A missing indicator never satisfies a
+comparison, exactly like the old per-coin `_validate_number` guards.
+"""
+
+import ast
+import re
+from functools import reduce
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.screener_data import is_bullish_engulfing
+from services.pattern_scanner import get_board_entry
+
+# Numeric columns of the indicator matrix (load_screener_data keys, plus
+# pattern counts from the pattern-scanner board)
+FIELDS = (
+    "close", "prev_close", "rsi", "macd", "signal", "hist",
+    "ema20", "ema50", "ema200", "volume", "volume_ma", "avg_7d",
+    "support", "resistance", "bullish_engulfing",
+    "bullish_patterns", "bearish_patterns",
+)
+
+MAX_RULES = 20
+MAX_RULE_LENGTH = 200
+
+_RULE_RE = re.compile(r"^(?P<cond>.+?)\s*=>\s*(?P<points>[+-]?\d+)$")
+_MIN_SCORE_RE = re.compile(r"^min_score\s*:\s*(?P<value>-?\d+)$", re.IGNORECASE)
+
+
+class StrategyDSLError(Exception):
+    """Raised when a strategy definition cannot be parsed or compiled"""
+    pass
+
+
+def _pct(a, b):
+    return (a - b) / b * 100
+
+
+_FUNCTIONS: Dict[str, Tuple[Callable, int]] = {
+    "abs": (np.abs, 1),
+    "min": (np.minimum, 2),
+    "max": (np.maximum, 2),
+    "pct": (_pct, 2),
+}
+
+_BIN_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+}
+
+_CMP_OPS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+Columns = Dict[str, np.ndarray]
+Expr = Callable[[Columns], Any]
+
+
+# ============================================================================
+# INDICATOR MATRIX
+# ============================================================================
+
+class IndicatorMatrix:
+    """Screener data for many coins as one float64 column per field."""
+
+    def __init__(self, symbols: List[str], columns: Columns, rows: List[Dict[str, Any]]):
+        self.symbols = symbols
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+def _number(value: Any) -> float:
+    if value is None:
+        return float("nan")
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return float("nan")
+
+
+def _engulfing(data: Dict[str, Any]) -> float:
+    if data.get("bullish_engulfing"):
+        return 1.0
+    c1, c2 = data.get("candle_1"), data.get("candle_2")
+    if isinstance(c1, dict) and isinstance(c2, dict):
+        try:
+            return 1.0 if is_bullish_engulfing(c1, c2) else 0.0
+        except Exception:
+            pass
+    return 0.0
+
+
+def _pattern_counts(symbol: str, timeframe: Optional[str]) -> Tuple[float, float]:
+    """(bullish, bearish) HIGH/MEDIUM patterns currently on the scanner board."""
+    entry = get_board_entry(symbol, timeframe) if timeframe else None
+    if not entry:
+        return 0.0, 0.0
+    strong = [p for p in entry["patterns"] if p["quality"] in ("HIGH", "MEDIUM")]
+    bullish = sum(1 for p in strong if p["direction"] == "BULLISH")
+    bearish = sum(1 for p in strong if p["direction"] == "BEARISH")
+    return float(bullish), float(bearish)
+
+
+def build_indicator_matrix(
+    coin_data: Dict[str, Dict[str, Any]],
+    timeframe: Optional[str] = None,
+) -> IndicatorMatrix:
+    """
+    Stack per-coin screener dicts (symbol → load_screener_data result) into
+    an IndicatorMatrix. Missing values become NaN.
+    """
+    symbols = list(coin_data)
+    rows = [coin_data[s] for s in symbols]
+    n = len(symbols)
+
+    columns: Columns = {}
+    for field in FIELDS:
+        if field in ("bullish_engulfing", "bullish_patterns", "bearish_patterns"):
+            continue
+        columns[field] = np.fromiter((_number(r.get(field)) for r in rows), dtype=np.float64, count=n)
+
+    columns["bullish_engulfing"] = np.fromiter((_engulfing(r) for r in rows), dtype=np.float64, count=n)
+
+    counts = [_pattern_counts(s, timeframe) for s in symbols]
+    columns["bullish_patterns"] = np.fromiter((c[0] for c in counts), dtype=np.float64, count=n)
+    columns["bearish_patterns"] = np.fromiter((c[1] for c in counts), dtype=np.float64, count=n)
+
+    return IndicatorMatrix(symbols, columns, rows)
+
+
+# ============================================================================
+# COMPILER
+# ============================================================================
+
+def _as_bool(value: Any) -> np.ndarray:
+    """Truth value of a column: NaN and 0 are false."""
+    value = np.asarray(value)
+    if value.dtype == np.bool_:
+        return value
+    return (value == value) & (value != 0)
+
+
+def _compile_expr(node: ast.AST) -> Expr:
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise StrategyDSLError(f"unsupported value: {node.value!r}")
+        value = float(node.value)
+        return lambda cols: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in FIELDS:
+            raise StrategyDSLError(f"unknown field '{node.id}'")
+        name = node.id
+        return lambda cols: cols[name]
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_expr(node.operand)
+        if isinstance(node.op, ast.USub):
+            return lambda cols: np.negative(operand(cols))
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(node.op, ast.Not):
+            return lambda cols: np.logical_not(_as_bool(operand(cols)))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        op = _BIN_OPS[type(node.op)]
+        left, right = _compile_expr(node.left), _compile_expr(node.right)
+        return lambda cols: op(left(cols), right(cols))
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_expr(v) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return lambda cols: reduce(combine, (_as_bool(p(cols)) for p in parts))
+
+    if isinstance(node, ast.Compare):
+        if not all(type(op) in _CMP_OPS for op in node.ops):
+            raise StrategyDSLError("unsupported comparison")
+        operands = [_compile_expr(node.left)] + [_compile_expr(c) for c in node.comparators]
+        ops = [_CMP_OPS[type(op)] for op in node.ops]
+
+        def _compare(cols):
+            values = [o(cols) for o in operands]
+            result = ops[0](values[0], values[1])
+            for i in range(1, len(ops)):
+                result = np.logical_and(result, ops[i](values[i], values[i + 1]))
+            return result
+        return _compare
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+            raise StrategyDSLError("unsupported function call")
+        func, arity = _FUNCTIONS[node.func.id]
+        if len(node.args) != arity:
+            raise StrategyDSLError(f"{node.func.id}() takes {arity} argument(s)")
+        args = [_compile_expr(a) for a in node.args]
+        return lambda cols: func(*(a(cols) for a in args))
+
+    raise StrategyDSLError(f"unsupported syntax: {ast.dump(node)[:40]}")
+
+
+def compile_condition(text: str) -> Expr:
+    """Compile one condition into a column-wise predicate."""
+    text = text.strip()
+    if not text:
+        raise StrategyDSLError("empty condition")
+    if len(text) > MAX_RULE_LENGTH:
+        raise StrategyDSLError("condition too long")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError:
+        raise StrategyDSLError(f"cannot parse '{text}'")
+    return _compile_expr(tree.body)
+
+
+class CompiledStrategy:
+    """A parsed strategy: required filters, scored rules and a minimum score."""
+
+    def __init__(
+        self,
+        name: str,
+        source: str,
+        filters: List[Tuple[str, Expr]],
+        rules: List[Tuple[str, Expr, int]],
+        min_score: int,
+    ):
+        self.name = name
+        self.source = source
+        self.filters = filters
+        self.rules = rules
+        self.min_score = min_score
+
+    def evaluate(self, matrix: IndicatorMatrix) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (matched, score) arrays aligned with matrix.symbols."""
+        n = len(matrix)
+        score = np.zeros(n, dtype=np.int64)
+        matched = np.ones(n, dtype=bool)
+        if n == 0:
+            return matched, score
+
+        with np.errstate(all="ignore"):
+            for _, predicate in self.filters:
+                matched &= np.broadcast_to(_as_bool(predicate(matrix.columns)), (n,))
+            for _, predicate, points in self.rules:
+                hit = np.broadcast_to(_as_bool(predicate(matrix.columns)), (n,))
+                score += hit * points
+
+        matched &= score >= self.min_score
+        return matched, score
+
+    def describe(self) -> List[str]:
+        """Human-readable rule lines, in definition order."""
+        lines = [f"require {text}" for text, _ in self.filters]
+        lines += [f"{text} → {points:+d}" for text, _, points in self.rules]
+        lines.append(f"min score {self.min_score}")
+        return lines
+
+
+def compile_strategy(source: str, name: str = "Custom screen") -> CompiledStrategy:
+    """
+    Parse and compile a strategy definition (see module docstring).
+    Raises StrategyDSLError with a user-presentable message.
+    """
+    filters: List[Tuple[str, Expr]] = []
+    rules: List[Tuple[str, Expr, int]] = []
+    min_score: Optional[int] = None
+
+    for raw in re.split(r"[;\n]", source):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        m = _MIN_SCORE_RE.match(line)
+        if m:
+            min_score = int(m.group("value"))
+            continue
+
+        m = _RULE_RE.match(line)
+        if m:
+            cond = m.group("cond")
+            rules.append((cond, compile_condition(cond), int(m.group("points"))))
+        else:
+            filters.append((line, compile_condition(line)))
+
+        if len(filters) + len(rules) > MAX_RULES:
+            raise StrategyDSLError(f"at most {MAX_RULES} conditions per strategy")
+
+    if not filters and not rules:
+        raise StrategyDSLError("strategy has no conditions")
+
+    if min_score is None:
+        min_score = 1 if rules else 0
+    return CompiledStrategy(name, source, filters, rules, min_score)
+
+
+# ============================================================================
+# BUILT-IN STRATEGIES
+# ============================================================================
+
+BUILTIN_STRATEGY_SOURCES = {
+    # Strong Bounce Setup
+    "strat_1": """
+        min_score: 2
+        rsi < 35                                     => 2
+        rsi < 25                                     => 1
+        35 <= rsi <= 45                              => 1
+        macd > signal                                => 2
+        macd > signal and signal != 0 and abs(macd - signal) / abs(signal) > 0.05 => 1
+        -2 <= pct(close, support) <= 5               => 1
+    """,
+    # Breakout with Momentum
+    "strat_2": """
+        min_score: 3
+        pct(close, ema20) > 0                        => 2
+        pct(close, ema20) > 2                        => 1
+        -2 <= pct(close, ema20) <= 0                 => 1
+        close > prev_close and pct(close, prev_close) >= 1 => 1
+        close > prev_close and pct(close, prev_close) >= 3 => 1
+        volume_ma > 0 and volume / volume_ma >= 1.2  => 1
+        volume_ma > 0 and volume / volume_ma >= 1.8  => 1
+    """,
+    # Reversal After Sell-Off
+    "strat_3": """
+        min_score: 3
+        rsi < 35                                     => 2
+        rsi < 25                                     => 1
+        35 <= rsi <= 40                              => 1
+        bullish_engulfing                            => 2
+        close > prev_close                           => 1
+        abs(pct(close, support)) <= 3                => 1
+    """,
+    # Trend Turning Bullish
+    "strat_4": """
+        min_score: 2
+        macd > signal * 0.95                         => 1
+        macd > signal * 0.95 and macd > signal       => 1
+        macd > signal * 0.95 and macd > signal and macd > signal * 1.05 => 1
+        ema50 > ema200 * 0.98                        => 1
+        ema50 > ema200 * 0.98 and ema50 > ema200     => 1
+        close > ema20                                => 1
+    """,
+    # Deep Pullback Opportunity
+    "strat_5": """
+        min_score: 2
+        -8 <= pct(close, avg_7d) <= -2               => 2
+        -6 <= pct(close, avg_7d) <= -3               => 1
+        0 <= pct(close, support) <= 5                => 2
+        0 <= pct(close, support) <= 2                => 1
+        close > ema50 * 0.95                         => 1
+        40 <= rsi <= 55                              => 1
+    """,
+}
+
+BUILTIN_STRATEGIES: Dict[str, CompiledStrategy] = {
+    key: compile_strategy(source, name=key)
+    for key, source in BUILTIN_STRATEGY_SOURCES.items()
+}
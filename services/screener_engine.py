@@ -3,9 +3,16 @@ import asyncio
 import json
 import os
 import time
+from bisect import bisect_left, insort
 from typing import Dict, Any, List, Tuple, Optional
 
-from services.screener_data import load_screener_data, is_bullish_engulfing
+from services.screener_data import load_screener_data, INTERVAL_SECONDS
+from services.screener_dsl import (
+    BUILTIN_STRATEGIES,
+    CompiledStrategy,
+    IndicatorMatrix,
+    build_indicator_matrix,
+)
 
 # Load top 100 coin IDs (symbol -> id)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -19,10 +26,11 @@ except (FileNotFoundError, json.JSONDecodeError) as e:
     print(f"[screener] Error loading coin list: {e}")
     COINS_LIST = []
 
-# Rate limiting: 20 coins per minute = 1 coin every 3 seconds
-_COINS_PER_MINUTE = 20
-_SECONDS_PER_COIN = 60 / _COINS_PER_MINUTE  # 3 seconds
-_FETCH_TIMEOUT = 15  # seconds per coin
+# Request pacing is done by the per-exchange token buckets in
+# utils/rate_limiter.py; this only caps how many coins are in flight.
+_MAX_IN_FLIGHT = 16
+_FETCH_TIMEOUT = 30  # seconds per coin, including limiter queueing
+_STRATEGY_KEYS = list(BUILTIN_STRATEGIES)
 
 # Pre-computed results cache
 # Format: _precomputed_results["strat_1_1h"] = [results...]
@@ -30,6 +38,20 @@ _precomputed_results: Dict[str, List[Dict[str, Any]]] = {}
 _last_precompute_time: Dict[str, float] = {}
 _is_precomputing: Dict[str, bool] = {}  # Track per-timeframe status
 
+# Incremental state: the candle each coin was last scored on, per timeframe,
+# and each strategy's current row per symbol (so it can be replaced in place).
+# The result lists above stay sorted; rows are moved with bisect, never re-sorted.
+_scored_candle: Dict[str, Dict[str, Any]] = {}
+_result_rows: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+# Latest screener data per timeframe and symbol, and its indicator matrix
+# (rebuilt lazily after each pass) for user-defined screens
+_coin_data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_matrix_cache: Dict[str, IndicatorMatrix] = {}
+
+# Seconds after a candle close before rescoring (lets exchanges roll over)
+CLOSE_DELAY = 10
+
 # FIX: Lock only protects the _is_precomputing flag check, NOT the full operation.
 # This allows multiple timeframes to precompute concurrently without blocking each other.
 _precompute_flag_lock = asyncio.Lock()
@@ -76,11 +98,94 @@ async def _fetch_for_coin(symbol: str, timeframe: str) -> Tuple[str, Optional[Di
         return symbol, None
 
 
+def _score_matrix(strategy: CompiledStrategy, matrix: IndicatorMatrix) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Evaluate a strategy over every coin at once. Returns symbol → row (None if no match)."""
+    try:
+        matched, scores = strategy.evaluate(matrix)
+    except Exception as e:
+        print(f"[screener] Error evaluating {strategy.name}: {e}")
+        return {symbol: None for symbol in matrix.symbols}
+
+    rows: Dict[str, Optional[Dict[str, Any]]] = {}
+    for i, symbol in enumerate(matrix.symbols):
+        if not matched[i]:
+            rows[symbol] = None
+            continue
+        d = matrix.rows[i]
+        rows[symbol] = {
+            "symbol": symbol,
+            "rsi": safe_get(d, "rsi"),
+            "macd": safe_get(d, "macd"),
+            "macd_signal": safe_get(d, "signal"),
+            "close": safe_get(d, "close"),
+            "score": int(scores[i]),
+        }
+    return rows
+
+
+def _sort_key(row: Dict[str, Any]) -> Tuple[float, float]:
+    return (-row["score"], safe_float_compare(row["rsi"]))
+
+
+def _sort_matches(matches: List[Dict[str, Any]]) -> None:
+    matches.sort(key=_sort_key)
+
+
+def _replace_row(cache_key: str, symbol: str, row: Optional[Dict[str, Any]]) -> None:
+    """Swap a symbol's row in a sorted result list (None removes it)."""
+    results = _precomputed_results.setdefault(cache_key, [])
+    rows = _result_rows.setdefault(cache_key, {})
+
+    old = rows.pop(symbol, None)
+    if old is not None:
+        i = bisect_left(results, _sort_key(old), key=_sort_key)
+        while results[i] is not old:
+            i += 1
+        del results[i]
+
+    if row is not None:
+        insort(results, row, key=_sort_key)
+        rows[symbol] = row
+
+
+def last_candle_close(timeframe: str, now: Optional[float] = None) -> float:
+    """Epoch seconds of the most recent `timeframe` candle close."""
+    now = time.time() if now is None else now
+    secs = INTERVAL_SECONDS.get(timeframe, 3600)
+    return now - (now % secs)
+
+
+def needs_rescore(timeframe: str, now: Optional[float] = None) -> bool:
+    """True once a candle has closed (plus CLOSE_DELAY) since the last pass."""
+    now = time.time() if now is None else now
+    due = last_candle_close(timeframe, now - CLOSE_DELAY) + CLOSE_DELAY
+    return _last_precompute_time.get(timeframe, 0) < due
+
+
+async def _iter_coin_data(symbols: List[str], timeframe: str):
+    """
+    Fetch screener data for all symbols concurrently and yield
+    (symbol, screener_data) in completion order — the exchange token
+    buckets set the actual request rate.
+    """
+    semaphore = asyncio.Semaphore(_MAX_IN_FLIGHT)
+
+    async def _bounded(symbol: str):
+        async with semaphore:
+            return await _fetch_for_coin(symbol, timeframe)
+
+    for next_done in asyncio.as_completed([_bounded(s) for s in symbols]):
+        yield await next_done
+
+
 async def precompute_all_coins(timeframe: str = "1h") -> None:
     """
     Pre-fetch and cache data for all 100 coins for a specific timeframe.
-    Respects rate limit of 20 coins/minute = 1 coin every 3 seconds.
-    Takes ~5 minutes per timeframe.
+    Coins are fetched concurrently under the shared Bybit/OKX token
+    buckets and scored against every strategy as their data arrives.
+
+    Only coins whose candle changed since their last scoring are
+    rescored; their rows are moved within the sorted strategy lists.
 
     FIX: The lock now only guards the is_precomputing flag check.
     The actual fetch+compute runs outside the lock so other timeframes
@@ -98,52 +203,56 @@ async def precompute_all_coins(timeframe: str = "1h") -> None:
     start_time = time.time()
 
     try:
-        all_data = {}
-
-        for i, coin in enumerate(COINS_LIST, 1):
-            symbol = coin["symbol"]
-
-            _, screener_data = await _fetch_for_coin(symbol, timeframe)
-
-            if screener_data:
-                all_data[symbol] = screener_data
-                print(f"[screener] Fetched {i}/{len(COINS_LIST)}: {symbol} ({timeframe})")
-            else:
-                print(f"[screener] Failed {i}/{len(COINS_LIST)}: {symbol} ({timeframe})")
-
-            if i < len(COINS_LIST):
-                await asyncio.sleep(_SECONDS_PER_COIN)
-
-        # Compute and store results for all strategies
-        for strategy_key in ["strat_1", "strat_2", "strat_3", "strat_4", "strat_5"]:
-            matches = []
-
-            for symbol, screener_data in all_data.items():
-                payload = screener_data.copy()
-                payload["symbol"] = symbol
-
-                try:
-                    matched, score = match_strategy(strategy_key, payload)
-                    if matched and score > 0:
-                        matches.append({
-                            "symbol": symbol,
-                            "rsi": safe_get(payload, "rsi"),
-                            "macd": safe_get(payload, "macd"),
-                            "macd_signal": safe_get(payload, "signal"),
-                            "close": safe_get(payload, "close"),
-                            "score": score,
-                        })
-                except Exception as e:
-                    print(f"[screener] Error matching {symbol} for {strategy_key}: {e}")
-
-            matches.sort(key=lambda x: (
-                -x["score"],
-                safe_float_compare(x["rsi"])
-            ))
-
-            cache_key = _get_cache_key(strategy_key, timeframe)
-            _precomputed_results[cache_key] = matches
-
+        scored = _scored_candle.setdefault(timeframe, {})
+        latest = _coin_data.setdefault(timeframe, {})
+        changed: Dict[str, Dict[str, Any]] = {}
+        unchanged = failed = 0
+
+        symbols = [coin["symbol"] for coin in COINS_LIST]
+        async for symbol, screener_data in _iter_coin_data(symbols, timeframe):
+            if not screener_data:
+                print(f"[screener] Failed: {symbol} ({timeframe})")
+                failed += 1
+                scored.pop(symbol, None)
+                latest.pop(symbol, None)
+                for strategy_key in _STRATEGY_KEYS:
+                    _replace_row(_get_cache_key(strategy_key, timeframe), symbol, None)
+                continue
+
+            latest[symbol] = screener_data
+
+            # Same candle as last time → inputs unchanged, keep current rows
+            candle_time = screener_data.get("candle_time")
+            if candle_time is not None and scored.get(symbol) == candle_time:
+                unchanged += 1
+                continue
+            changed[symbol] = screener_data
+
+        # Score every changed coin against every strategy in one vectorized pass
+        if changed:
+            matrix = build_indicator_matrix(changed, timeframe)
+            for strategy_key in _STRATEGY_KEYS:
+                cache_key = _get_cache_key(strategy_key, timeframe)
+                for symbol, row in _score_matrix(BUILTIN_STRATEGIES[strategy_key], matrix).items():
+                    _replace_row(cache_key, symbol, row)
+            for symbol, data in changed.items():
+                scored[symbol] = data.get("candle_time")
+        rescored = len(changed)
+
+        # Coins that left the universe drop out of every list
+        current = set(symbols)
+        for symbol in [s for s in latest if s not in current]:
+            latest.pop(symbol)
+        for symbol in [s for s in scored if s not in current]:
+            scored.pop(symbol)
+            for strategy_key in _STRATEGY_KEYS:
+                _replace_row(_get_cache_key(strategy_key, timeframe), symbol, None)
+
+        print(
+            f"[screener] {timeframe}: rescored {rescored}, unchanged {unchanged}, "
+            f"failed {failed} of {len(symbols)} coins"
+        )
+        _matrix_cache.pop(timeframe, None)
         _last_precompute_time[timeframe] = time.time()
         elapsed = time.time() - start_time
         print(f"[screener] ✅ Pre-computation done for {timeframe} in {elapsed:.1f}s")
@@ -161,6 +270,9 @@ def get_precomputed_results(strategy_key: str, timeframe: str = "1h") -> Optiona
     Get pre-computed results for a strategy and timeframe.
     Returns None if no pre-computed data available.
     """
+    # Lists fill in place during the first pass; hide them until it completes
+    if timeframe not in _last_precompute_time:
+        return None
     cache_key = _get_cache_key(strategy_key, timeframe)
     return _precomputed_results.get(cache_key)
 
@@ -177,6 +289,9 @@ def is_cache_fresh(timeframe: str = "1h", max_age_seconds: int = 3600) -> bool:
     last_time = _last_precompute_time.get(timeframe, 0)
     if last_time == 0:
         return False
+    # Passes run on candle close, so a pass since the last close is current
+    if last_time >= last_candle_close(timeframe):
+        return True
     return (time.time() - last_time) < max_age_seconds
 
 
@@ -198,11 +313,29 @@ async def run_screener(strategy_key: str, timeframe: str = "1h", use_precomputed
     return await _run_live_screener(strategy_key, timeframe)
 
 
+def run_custom_screen(strategy: CompiledStrategy, timeframe: str = "1h") -> Optional[List[Dict[str, Any]]]:
+    """
+    Evaluate a user-defined strategy over the latest data for all coins.
+    Returns sorted matches, or None until the timeframe's first pass is done.
+    """
+    if timeframe not in _last_precompute_time:
+        return None
+
+    matrix = _matrix_cache.get(timeframe)
+    if matrix is None:
+        matrix = build_indicator_matrix(_coin_data.get(timeframe, {}), timeframe)
+        _matrix_cache[timeframe] = matrix
+
+    matches = [row for row in _score_matrix(strategy, matrix).values() if row]
+    _sort_matches(matches)
+    return matches
+
+
 async def _run_live_screener(strategy_key: str, timeframe: str = "1h", limit: int = 100) -> List[Dict[str, Any]]:
     """
     Live scan fallback — used only when cache is completely empty.
-    Slow by design (rate-limited). Triggers background cache warmup
-    so the next call will be instant.
+    Rate-limited by the exchange token buckets. Triggers background cache
+    warmup so the next call will be instant.
     """
     if not COINS_LIST:
         print("[screener] No coins available to scan")
@@ -216,205 +349,33 @@ async def _run_live_screener(strategy_key: str, timeframe: str = "1h", limit: in
         print(f"[screener] Triggering background precompute for {timeframe}...")
         asyncio.create_task(precompute_all_coins(timeframe=timeframe))
 
-    matches = []
-    limit = min(limit, len(COINS_LIST))
-
-    for i, coin in enumerate(COINS_LIST[:limit], 1):
-        symbol = coin["symbol"]
+    strategy = BUILTIN_STRATEGIES.get(strategy_key)
+    if strategy is None:
+        return []
 
-        _, screener_data = await _fetch_for_coin(symbol, timeframe)
+    coin_data: Dict[str, Dict[str, Any]] = {}
+    symbols = [coin["symbol"] for coin in COINS_LIST[:limit]]
 
-        if not screener_data:
-            continue
+    async for symbol, screener_data in _iter_coin_data(symbols, timeframe):
+        if screener_data:
+            coin_data[symbol] = screener_data
 
-        payload = screener_data.copy()
-        payload["symbol"] = symbol
-
-        try:
-            matched, score = match_strategy(strategy_key, payload)
-            if matched and score > 0:
-                matches.append({
-                    "symbol": symbol,
-                    "rsi": safe_get(payload, "rsi"),
-                    "macd": safe_get(payload, "macd"),
-                    "macd_signal": safe_get(payload, "signal"),
-                    "close": safe_get(payload, "close"),
-                    "score": score,
-                })
-        except Exception as e:
-            print(f"[screener] match_strategy error for {symbol}: {e}")
-
-        if i < limit:
-            await asyncio.sleep(_SECONDS_PER_COIN)
-
-    matches.sort(key=lambda x: (
-        -x["score"],
-        safe_float_compare(x["rsi"])
-    ))
+    matrix = build_indicator_matrix(coin_data, timeframe)
+    matches = [row for row in _score_matrix(strategy, matrix).values() if row]
+    _sort_matches(matches)
 
     print(f"[screener] Live scan done for {timeframe}: {len(matches)} matches")
     return matches
 
 
-def _validate_number(val: Any) -> bool:
-    """Check if value is a valid number (not None, not NaN, not inf)."""
-    if val is None:
-        return False
-    try:
-        num = float(val)
-        return not (num != num or num == float('inf') or num == float('-inf'))
-    except (ValueError, TypeError):
-        return False
-
-
 def match_strategy(key: str, d: Dict[str, Any]) -> Tuple[bool, int]:
     """
-    Match a coin against a strategy with REALISTIC thresholds.
-    Returns (match_bool, score_int).
+    Match a single coin against a built-in strategy.
+    Returns (match_bool, score_int). Bulk callers should build an
+    IndicatorMatrix and use _score_matrix instead.
     """
-    score = 0
-
-    rsi = safe_get(d, "rsi")
-    macd = safe_get(d, "macd")
-    signal = safe_get(d, "signal")
-    ema20 = safe_get(d, "ema20")
-    ema50 = safe_get(d, "ema50")
-    ema200 = safe_get(d, "ema200")
-    close = safe_get(d, "close")
-    prev_close = safe_get(d, "prev_close")
-    volume = safe_get(d, "volume")
-    volume_ma = safe_get(d, "volume_ma")
-    avg_7d = safe_get(d, "avg_7d")
-    resistance = safe_get(d, "resistance")
-    support = safe_get(d, "support")
-    bullish_engulfing = safe_get(d, "bullish_engulfing", False)
-
-    if key == "strat_1":
-        if _validate_number(rsi):
-            if rsi < 35:
-                score += 2
-                if rsi < 25:
-                    score += 1
-            elif 35 <= rsi <= 45:
-                score += 1
-
-        if _validate_number(macd) and _validate_number(signal):
-            if macd > signal:
-                score += 2
-                hist_strength = abs(macd - signal) / abs(signal) if signal != 0 else 0
-                if hist_strength > 0.05:
-                    score += 1
-
-        if _validate_number(close) and _validate_number(support):
-            dist = ((close - support) / support) * 100
-            if -2 <= dist <= 5:
-                score += 1
-
-        return score >= 2, score
-
-    elif key == "strat_2":
-        if all(_validate_number(x) for x in [close, ema20]):
-            dist_from_ema = ((close - ema20) / ema20) * 100
-            if dist_from_ema > 0:
-                score += 2
-                if dist_from_ema > 2:
-                    score += 1
-            elif -2 <= dist_from_ema <= 0:
-                score += 1
-
-        if _validate_number(close) and _validate_number(prev_close):
-            if close > prev_close:
-                pct_gain = ((close - prev_close) / prev_close) * 100
-                if pct_gain >= 1:
-                    score += 1
-                if pct_gain >= 3:
-                    score += 1
-
-        if _validate_number(volume) and _validate_number(volume_ma) and volume_ma > 0:
-            volume_ratio = volume / volume_ma
-            if volume_ratio >= 1.2:
-                score += 1
-                if volume_ratio >= 1.8:
-                    score += 1
-
-        return score >= 3, score
-
-    elif key == "strat_3":
-        if _validate_number(rsi):
-            if rsi < 35:
-                score += 2
-                if rsi < 25:
-                    score += 1
-            elif 35 <= rsi <= 40:
-                score += 1
-
-        if bullish_engulfing:
-            score += 2
-        else:
-            c1 = safe_get(d, "candle_1")
-            c2 = safe_get(d, "candle_2")
-            if c1 and c2 and isinstance(c1, dict) and isinstance(c2, dict):
-                try:
-                    if is_bullish_engulfing(c1, c2):
-                        score += 2
-                except Exception:
-                    pass
-
-        if _validate_number(close) and _validate_number(prev_close):
-            if close > prev_close:
-                score += 1
-
-        if _validate_number(close) and _validate_number(support):
-            dist = abs(close - support) / support * 100
-            if dist <= 3:
-                score += 1
-
-        return score >= 3, score
-
-    elif key == "strat_4":
-        if _validate_number(macd) and _validate_number(signal):
-            if macd > signal * 0.95:
-                score += 1
-                if macd > signal:
-                    score += 1
-                    if macd > signal * 1.05:
-                        score += 1
-
-        if _validate_number(ema50) and _validate_number(ema200):
-            if ema50 > ema200 * 0.98:
-                score += 1
-                if ema50 > ema200:
-                    score += 1
-
-        if _validate_number(close) and _validate_number(ema20):
-            if close > ema20:
-                score += 1
-
-        return score >= 2, score
-
-    elif key == "strat_5":
-        if _validate_number(avg_7d) and _validate_number(close):
-            pct_below = ((avg_7d - close) / avg_7d) * 100
-            if 2 <= pct_below <= 8:
-                score += 2
-                if 3 <= pct_below <= 6:
-                    score += 1
-
-        if _validate_number(support) and _validate_number(close):
-            dist_from_support = ((close - support) / support) * 100
-            if 0 <= dist_from_support <= 5:
-                score += 2
-                if dist_from_support <= 2:
-                    score += 1
-
-        if _validate_number(close) and _validate_number(ema50):
-            if close > ema50 * 0.95:
-                score += 1
-
-        if _validate_number(rsi):
-            if 40 <= rsi <= 55:
-                score += 1
-
-        return score >= 2, score
-
-    return False, 0
+    strategy = BUILTIN_STRATEGIES.get(key)
+    if strategy is None:
+        return False, 0
+    matched, scores = strategy.evaluate(build_indicator_matrix({"_": d}))
+    return bool(matched[0]), int(scores[0])
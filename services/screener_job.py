@@ -2,11 +2,11 @@
 import asyncio
 from telegram import Bot
 from telegram.ext import Application
-from services.screener_engine import precompute_all_coins, is_cache_fresh
+from services.screener_engine import precompute_all_coins, needs_rescore
 from notifications.scheduler import run_signal_check
 
-# Job runs every 1 hour
-JOB_INTERVAL = 3600  # 1 hour in seconds
+# Job ticks every minute; a timeframe is rescored only after its candle closes
+JOB_INTERVAL = 60  # seconds
 
 # Priority timeframes warm up first (most commonly used)
 PRIORITY_TIMEFRAMES = ["1h", "4h", "1d"]
@@ -15,15 +15,12 @@ ALL_TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
 
 async def run_screener_precompute_job(context):
     """
-    Scheduled job: refreshes all timeframe caches every hour.
-    Skips timeframes that are still fresh.
+    Scheduled job: rescores each timeframe whose candle has closed since
+    its last pass. Timeframes mid-candle are skipped silently.
     """
-    print("[screener_job] Starting scheduled pre-computation for all timeframes...")
-
     for timeframe in ALL_TIMEFRAMES:
         try:
-            if is_cache_fresh(timeframe, max_age_seconds=JOB_INTERVAL):
-                print(f"[screener_job] Cache still fresh for {timeframe}, skipping...")
+            if not needs_rescore(timeframe):
                 continue
 
             print(f"[screener_job] Pre-computing {timeframe}...")
@@ -37,8 +34,6 @@ async def run_screener_precompute_job(context):
             print(f"[screener_job] Error during pre-computation for {timeframe}: {e}")
             continue
 
-    print("[screener_job] All timeframe pre-computations completed")
-
 
 async def _startup_warmup(bot: Bot):
     """
@@ -48,7 +43,7 @@ async def _startup_warmup(bot: Bot):
     context.bot — _startup_warmup is not a PTB job callback so it
     has no context. The bot is passed in from _trigger_startup below.
 
-    Phase 1: Warm up priority timeframes (1h, 4h, 1d) first — ~15 minutes.
+    Phase 1: Warm up priority timeframes (1h, 4h, 1d) first.
     Phase 2: Warm up remaining timeframes (5m, 15m, 30m) in the background.
     """
     print("[screener_job] 🚀 Startup warmup started...")
@@ -103,7 +98,7 @@ def setup_screener_jobs(application: Application):
         interval=JOB_INTERVAL,
         first=JOB_INTERVAL
     )
-    print(f"[screener_job] Hourly refresh scheduled every {JOB_INTERVAL}s")
+    print(f"[screener_job] Candle-close refresh checked every {JOB_INTERVAL}s")
     print(f"[screener_job] Priority timeframes: {PRIORITY_TIMEFRAMES}")
     print(f"[screener_job] All timeframes: {ALL_TIMEFRAMES}")
 
@@ -1,11 +1,15 @@
-import requests
+import asyncio
 from typing import Dict, Optional, List
-import time
 import os
 from dotenv import load_dotenv
 
+from services.http_client import get_json
+from utils.cache import get_cache
+
 load_dotenv()
 
+MARKETS_PAGE_SIZE = 250  # /coins/markets maximum per request
+
 class SectorAnalysisService:
     """Analyzes performance of different crypto sectors using CoinGecko API"""
     
@@ -14,8 +18,8 @@ class SectorAnalysisService:
         Initialize with CoinGecko API key from environment or parameter
         Looks for COINGECKO_API_KEY in .env file
         """
-        self.cache = {}
         self.cache_duration = 1800  # 30 minutes
+        self.cache = get_cache("sector_analysis", ttl=self.cache_duration, max_entries=200)
         
         # Get API key from parameter, env, or use free tier
         self.api_key = api_key or os.getenv('COINGECKO_API_KEY')
@@ -211,38 +215,50 @@ class SectorAnalysisService:
         # Minimum coins required per sector for valid analysis
         self.min_coins_for_analysis = 3
     
-    def get_sector_analysis(self, sectors_to_analyze: Optional[List[str]] = None) -> Optional[Dict]:
+    async def get_sector_analysis(self, sectors_to_analyze: Optional[List[str]] = None) -> Optional[Dict]:
         """
         Get performance analysis for all sectors or specific sectors
         
+        Every coin of every requested sector is fetched in one bulk
+        /coins/markets snapshot (one request per MARKETS_PAGE_SIZE coins),
+        then each sector is aggregated from that shared table.
+        
         Args:
             sectors_to_analyze: List of sector names to analyze, or None for all
         """
         cache_key = f"sector_analysis_{'_'.join(sectors_to_analyze) if sectors_to_analyze else 'all'}"
         
         # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
         try:
-            result = {}
-            
             # Determine which sectors to analyze
             sectors = sectors_to_analyze if sectors_to_analyze else self.sectors.keys()
             
+            known_sectors = []
             for sector_name in sectors:
                 if sector_name not in self.sectors:
                     print(f"Unknown sector: {sector_name}")
                     continue
-                
-                coins = self.sectors[sector_name]
-                sector_performance = self._analyze_sector_performance(coins, sector_name)
-                result[sector_name] = sector_performance
+                known_sectors.append(sector_name)
+            
+            coin_ids = {
+                self.coin_id_map[symbol]
+                for name in known_sectors
+                for symbol in self.sectors[name]
+                if symbol in self.coin_id_map
+            }
+            markets = await self._fetch_markets(sorted(coin_ids))
+            
+            result = {
+                name: self._analyze_sector_performance(self.sectors[name], name, markets)
+                for name in known_sectors
+            }
             
             # Cache result
-            self.cache[cache_key] = (result, time.time())
+            self.cache.set(cache_key, result)
             return result
             
         except Exception as e:
@@ -251,10 +267,39 @@ class SectorAnalysisService:
             traceback.print_exc()
             return None
     
-    def _analyze_sector_performance(self, coins: List[str], sector_name: str) -> Dict:
+    async def _fetch_markets(self, coin_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Bulk /coins/markets snapshot for `coin_ids`, pages fetched concurrently
+        Returns dict: {coin_id: market row}
+        """
+        url = f"{self.base_url}/coins/markets"
+        pages = [coin_ids[i:i + MARKETS_PAGE_SIZE] for i in range(0, len(coin_ids), MARKETS_PAGE_SIZE)]
+        
+        responses = await asyncio.gather(*(
+            get_json(
+                url,
+                params={
+                    "vs_currency": "usd",
+                    "ids": ",".join(page),
+                    "order": "market_cap_desc",
+                    "per_page": len(page),
+                    "page": 1,
+                    "sparkline": "false",
+                    "price_change_percentage": "24h"
+                },
+                headers=self.headers,
+            )
+            for page in pages
+        ))
+        return {coin["id"]: coin for rows in responses for coin in rows}
+    
+    def _analyze_sector_performance(self, coins: List[str], sector_name: str, markets: Dict[str, Dict]) -> Dict:
         """
         Analyze average performance of a sector with improved accuracy
         Uses market-cap weighted average and filters out low-quality data
+        
+        Args:
+            markets: Bulk market rows by CoinGecko id (from _fetch_markets)
         """
         try:
             # Convert symbols to CoinGecko IDs
@@ -271,33 +316,8 @@ class SectorAnalysisService:
                     "data_quality": "low"
                 }
             
-            # Fetch market data for all coins in batches (API limit is 250 per request)
-            all_coins_data = []
-            batch_size = 50  # Process 50 coins at a time to avoid overwhelming API
-            
-            for i in range(0, len(coin_ids), batch_size):
-                batch = coin_ids[i:i + batch_size]
-                
-                url = f"{self.base_url}/coins/markets"
-                params = {
-                    "vs_currency": "usd",
-                    "ids": ",".join(batch),
-                    "order": "market_cap_desc",
-                    "per_page": len(batch),
-                    "page": 1,
-                    "sparkline": "false",
-                    "price_change_percentage": "24h"
-                }
-                
-                response = requests.get(url, params=params, headers=self.headers, timeout=15)
-                response.raise_for_status()
-                batch_data = response.json()
-                
-                all_coins_data.extend(batch_data)
-                
-                # Small delay to respect rate limits
-                if i + batch_size < len(coin_ids):
-                    time.sleep(0.3)
+            # This sector's rows from the shared snapshot
+            all_coins_data = [markets[coin_id] for coin_id in coin_ids if coin_id in markets]
             
             if not all_coins_data:
                 return {
@@ -459,19 +479,18 @@ class SectorAnalysisService:
             print(f"Error identifying top performers: {e}")
             return {"best": [], "worst": []}
     
-    def get_sector_comparison(self) -> Optional[Dict]:
+    async def get_sector_comparison(self) -> Optional[Dict]:
         """
         Get a comparative analysis of all sectors with improved metrics
         """
         cache_key = "sector_comparison_v2"
         
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
         try:
-            sector_analysis = self.get_sector_analysis()
+            sector_analysis = await self.get_sector_analysis()
             
             if not sector_analysis:
                 return None
@@ -537,7 +556,7 @@ class SectorAnalysisService:
                 "rotation_signal": rotation
             }
             
-            self.cache[cache_key] = (result, time.time())
+            self.cache.set(cache_key, result)
             return result
             
         except Exception as e:
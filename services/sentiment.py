@@ -1,13 +1,14 @@
-import requests
 from typing import Optional, Dict
-import time
+
+from services.http_client import get_json
+from utils.cache import get_cache
 
 class SentimentService:
     """Fetches crypto sentiment data (Fear & Greed Index)"""
     
     def __init__(self):
-        self.cache = {}
         self.cache_duration = 3600  # 1 hour
+        self.cache = get_cache("sentiment", ttl=self.cache_duration, max_entries=200)
     
     # Sentiment zones with contextual insights
     SENTIMENT_ZONES = {
@@ -38,7 +39,7 @@ class SentimentService:
         }
     }
     
-    def get_fear_greed_index(self) -> Optional[Dict]:
+    async def get_fear_greed_index(self) -> Optional[Dict]:
         """
         Get Fear & Greed Index from alternative.me with enhanced classification
         Returns: {
@@ -51,16 +52,13 @@ class SentimentService:
         cache_key = "fear_greed"
         
         # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
         try:
             url = "https://api.alternative.me/fng/"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = await get_json(url, timeout=10)
             
             value = int(data['data'][0]['value'])
             
@@ -75,7 +73,7 @@ class SentimentService:
             }
             
             # Cache result
-            self.cache[cache_key] = (result, time.time())
+            self.cache.set(cache_key, result)
             return result
             
         except Exception as e:
@@ -3,8 +3,11 @@ import httpx
 import os
 import json
 from dotenv import load_dotenv
-from services.levels_engine import LevelsEngine
-from utils.patterns import detect_all_patterns, patterns_to_strings
+from services.levels_board import get_levels
+from utils.patterns import patterns_to_strings
+from utils.cache import get_cache
+from utils.pattern_cache import detect_all_patterns_cached
+from utils.rate_limiter import BYBIT_LIMITER, OKX_LIMITER
 
 load_dotenv()
 
@@ -55,6 +58,13 @@ HTF_MAP = {
 
 MIN_CANDLES = 50   # minimum candles required for reliable indicator math
 
+# Candle store: fetched series (indicators already attached) are reused for
+# this many seconds, so /setup, its refresh button and the HTF of nearby
+# timeframes share one exchange call. Concurrent requests share one fetch.
+CANDLE_STORE_TTL = 30
+
+_candle_store = get_cache("setup_candles", ttl=CANDLE_STORE_TTL, max_entries=200)
+
 
 # ============================================================================
 # SMART PRICE FORMATTER
@@ -111,6 +121,7 @@ async def _fetch_bybit(symbol: str, timeframe: str, limit: int = 200) -> list |
     }
 
     try:
+        await BYBIT_LIMITER.acquire()
         async with httpx.AsyncClient(timeout=15.0) as client:
             resp = await client.get(f"{BYBIT_BASE_URL}/v5/market/kline", params=params)
 
@@ -180,6 +191,7 @@ async def _fetch_okx(symbol: str, timeframe: str, limit: int = 200) -> list | No
     }
 
     try:
+        await OKX_LIMITER.acquire()
         async with httpx.AsyncClient(timeout=15.0) as client:
             resp = await client.get(f"{OKX_BASE_URL}/api/v5/market/candles", params=params)
 
@@ -230,6 +242,18 @@ async def _fetch_okx(symbol: str, timeframe: str, limit: int = 200) -> list | No
 
 
 async def fetch_candles(symbol: str, timeframe: str, limit: int = 200) -> list | None:
+    """
+    OHLCV candles with technical indicators attached — from the candle store
+    when fetched within the last CANDLE_STORE_TTL seconds, else fetched now.
+    Callers must treat the returned list as read-only (it is shared).
+    """
+    return await _candle_store.get_or_load(
+        (symbol.upper(), timeframe, limit),
+        lambda: _fetch_candles_uncached(symbol, timeframe, limit),
+    )
+
+
+async def _fetch_candles_uncached(symbol: str, timeframe: str, limit: int = 200) -> list | None:
     """
     Fetch OHLCV candles — Bybit first, OKX as fallback.
     Attaches technical indicators before returning.
@@ -442,7 +466,7 @@ async def _build_indicators_dict(candles: list) -> dict | None:
 
 
 # ============================================================================
-# LEVEL NORMALISATION  (unchanged)
+# LEVEL NORMALISATION
 # ============================================================================
 
 def _normalise_level(raw: dict, fallback_price: float) -> dict:
@@ -459,6 +483,7 @@ def _normalise_level(raw: dict, fallback_price: float) -> dict:
         "price_upper": price_upper,
         "strength":    strength,
         "touches":     touches,
+        "source":      raw.get("source", "swing"),
     }
 
 
@@ -468,88 +493,91 @@ def _normalise_level(raw: dict, fallback_price: float) -> dict:
 
 class SetupAnalyzer:
 
-    def __init__(self):
-        self.levels_engine = LevelsEngine()
-
     # ------------------------------------------------------------------ public
 
     async def analyze_setup(self, symbol: str, timeframe: str) -> dict | None:
         try:
             print(f"🔄 Analyzing {symbol}/{timeframe}…")
 
-            # ── 1. Fetch LTF + HTF candles concurrently ───────────────
+            # Dependency graph — the three branches run concurrently:
+            #   LTF candles ─┬─ indicators ─┐
+            #                └─ patterns ───┤
+            #   HTF candles ── HTF trend ───┼─ score → direction → MTF → trade levels
+            #   S/R levels ─────────────────┘
             htf = HTF_MAP.get(timeframe, "1d")
-            same_tf = (htf == timeframe)
 
-            if same_tf:
-                # No higher TF available — only one fetch needed
-                ltf_candles = await fetch_candles(symbol, timeframe)
-                htf_candles = ltf_candles
-            else:
-                ltf_candles, htf_candles = await asyncio.gather(
-                    fetch_candles(symbol, timeframe),
-                    fetch_candles(symbol, htf),
-                )
+            async def _ltf_branch():
+                candles = await fetch_candles(symbol, timeframe)
+                if not candles or len(candles) < MIN_CANDLES:
+                    return candles, None, []
+                indicators = await _build_indicators_dict(candles)
+                try:
+                    patterns = detect_all_patterns_cached(symbol, timeframe, candles, max_results=8)
+                except Exception as e:
+                    print(f"⚠️  Pattern detection failed: {e}")
+                    patterns = []
+                return candles, indicators, patterns
+
+            async def _htf_branch():
+                # 1d has no higher TF — the LTF fetch is shared via the candle store
+                candles = await fetch_candles(symbol, htf)
+                return _htf_trend(candles) if candles else "UNKNOWN"
+
+            async def _levels_branch():
+                try:
+                    return await get_levels(symbol, timeframe, max_levels=5)
+                except Exception as e:
+                    print(f"⚠️  S/R levels failed for {symbol}: {e}")
+                    return None
+
+            (ltf_candles, indicators, pattern_dicts), htf_trend_label, sr_data = await asyncio.gather(
+                _ltf_branch(), _htf_branch(), _levels_branch()
+            )
 
             if not ltf_candles or len(ltf_candles) < MIN_CANDLES:
                 print(f"❌ Insufficient LTF candles for {symbol}/{timeframe}")
                 return None
-
-            # ── 2. HTF trend ──────────────────────────────────────────
-            htf_trend_label = _htf_trend(htf_candles) if htf_candles else "UNKNOWN"
-            print(f"   HTF ({htf}) trend: {htf_trend_label}")
-
-            # ── 3. Indicators from LTF ────────────────────────────────
-            indicators = await _build_indicators_dict(ltf_candles)
             if not indicators:
                 print(f"❌ Indicator build failed for {symbol}")
                 return None
 
+            print(f"   HTF ({htf}) trend: {htf_trend_label}")
             current_price = indicators["price"]
 
-            # ── 4. Support / Resistance ───────────────────────────────
+            # ── Support / Resistance ──────────────────────────────────
             support_levels: list    = []
             resistance_levels: list = []
-            try:
-                sr_data = await self.levels_engine.calculate_levels(
-                    symbol=symbol, timeframe=timeframe, max_levels=5
-                )
-                if sr_data.get("current_price"):
-                    current_price = float(sr_data["current_price"])
-                support_levels    = [_normalise_level(l, current_price) for l in sr_data.get("support_levels", [])]
-                resistance_levels = [_normalise_level(l, current_price) for l in sr_data.get("resistance_levels", [])]
-            except Exception as e:
-                print(f"⚠️  S/R levels failed for {symbol}: {e}")
-
-            # ── 5. Patterns ───────────────────────────────────────────
-            try:
-                pattern_dicts = detect_all_patterns(ltf_candles, max_results=8)
-            except Exception as e:
-                print(f"⚠️  Pattern detection failed: {e}")
-                pattern_dicts = []
-
-            # ── 6. Score ──────────────────────────────────────────────
+            if sr_data:
+                try:
+                    # get_levels already split the levels around a live
+                    # price; current_price stays the LTF close fetched above
+                    support_levels    = [_normalise_level(l, current_price) for l in sr_data.get("support_levels", [])]
+                    resistance_levels = [_normalise_level(l, current_price) for l in sr_data.get("resistance_levels", [])]
+                except Exception as e:
+                    print(f"⚠️  S/R levels failed for {symbol}: {e}")
+
+            # ── Score ─────────────────────────────────────────────────
             score_data = self._score(
                 ltf_candles, indicators, support_levels, resistance_levels, pattern_dicts
             )
 
-            # ── 7. Direction ──────────────────────────────────────────
+            # ── Direction ─────────────────────────────────────────────
             direction = self._direction(score_data)
 
-            # ── 8. MTF penalty / bonus ────────────────────────────────
+            # ── MTF penalty / bonus ───────────────────────────────────
             penalty, mtf_warning = _mtf_quality_penalty(direction, htf_trend_label)
             adjusted_score = max(0, min(100, score_data["score"] - penalty))
             score_data["score"] = adjusted_score
             if mtf_warning:
                 score_data["risk_factors"].insert(0, mtf_warning)
 
-            # ── 9. Trade levels ───────────────────────────────────────
+            # ── Trade levels ──────────────────────────────────────────
             trade = self._trade_levels(indicators, support_levels, resistance_levels, direction)
 
-            # ── 10. Confidence ────────────────────────────────────────
+            # ── Confidence ────────────────────────────────────────────
             confidence = self._confidence(score_data, indicators)
 
-            # ── 11. Entry conditions ──────────────────────────────────
+            # ── Entry conditions ──────────────────────────────────────
             conditions = self._entry_conditions(indicators, direction, timeframe, score_data)
 
             print(
@@ -14,6 +14,10 @@ from decimal import Decimal, InvalidOperation
 import httpx
 from dotenv import load_dotenv
 
+from services.screener_data import SCREEN_CANDLES, get_ohlcv
+from utils.cache import get_cache
+from utils.rate_limiter import BYBIT_LIMITER, COINGECKO_LIMITER, OKX_LIMITER, TWELVE_LIMITER
+
 # Load environment variables from .env - try multiple locations
 dotenv_path = Path(BASE_DIR) / ".env"
 if not dotenv_path.exists():
@@ -48,14 +52,13 @@ COINGECKO_MARKET_URL = f"{COINGECKO_BASE_URL}/coins/markets"
 TWELVE_BASE_URL = "https://api.twelvedata.com/time_series"
 EXCHANGE = "binance"
 
-# Rate limiting configuration (20 requests per minute)
-RATE_LIMIT_REQUESTS = 8
-RATE_LIMIT_PERIOD = 60  # seconds
-_rate_limit_queue = []
+# Rate limiting: shared token buckets (utils/rate_limiter.py) sized to the
+# API plans; this only caps how many OHLCV requests are in flight at once
+OHLCV_CONCURRENCY = 16
 
 # Cache configuration (10 minutes)
 CACHE_DURATION = 600  # 10 minutes in seconds
-_cache_store = {}
+_cache_store = get_cache("signal_data", ttl=CACHE_DURATION, max_entries=2000)
 
 # Top 100 coins only
 MAX_COINS = 100
@@ -64,31 +67,6 @@ MAX_COINS = 100
 IDS_PATH = os.path.join(BASE_DIR, "top100_coingecko_ids.json")
 
 
-# -----------------------------
-# Rate Limiting
-# -----------------------------
-
-async def rate_limit():
-    """Enforce rate limit of 20 requests per minute."""
-    global _rate_limit_queue
-    
-    current_time = time.time()
-    
-    # Remove requests older than 60 seconds
-    _rate_limit_queue = [t for t in _rate_limit_queue if current_time - t < RATE_LIMIT_PERIOD]
-    
-    # If we've hit the limit, wait
-    if len(_rate_limit_queue) >= RATE_LIMIT_REQUESTS:
-        oldest_request = _rate_limit_queue[0]
-        wait_time = RATE_LIMIT_PERIOD - (current_time - oldest_request)
-        if wait_time > 0:
-            await asyncio.sleep(wait_time)
-            return await rate_limit()  # Recursive call after waiting
-    
-    # Add current request to queue
-    _rate_limit_queue.append(current_time)
-
-
 # -----------------------------
 # Cache Management
 # -----------------------------
@@ -100,18 +78,12 @@ def get_cache_key(symbol: str, timeframe: str, source: str = "combined") -> str:
 
 def get_cached_data(cache_key: str) -> Optional[Dict]:
     """Retrieve cached data if still valid (within 10 minutes)."""
-    if cache_key in _cache_store:
-        data, timestamp = _cache_store[cache_key]
-        if time.time() - timestamp < CACHE_DURATION:
-            return data
-        else:
-            del _cache_store[cache_key]
-    return None
+    return _cache_store.get(cache_key)
 
 
 def set_cached_data(cache_key: str, data: Dict) -> None:
-    """Store data in cache with current timestamp."""
-    _cache_store[cache_key] = (data, time.time())
+    """Store data in cache for CACHE_DURATION."""
+    _cache_store.set(cache_key, data)
 
 
 # -----------------------------
@@ -171,6 +143,22 @@ def calculate_ema(prices: List[float], period: int) -> Optional[float]:
     return ema
 
 
+def _ema_series(prices: List[float], period: int) -> List[Optional[float]]:
+    """EMA after each price (None until `period` prices are available)."""
+    series: List[Optional[float]] = [None] * len(prices)
+    if len(prices) < period:
+        return series
+    
+    multiplier = 2 / (period + 1)
+    ema = sum(prices[:period]) / period
+    series[period - 1] = ema
+    for i in range(period, len(prices)):
+        ema = (prices[i] - ema) * multiplier + ema
+        series[i] = ema
+    
+    return series
+
+
 def calculate_rsi(prices: List[float], period: int = 14) -> Optional[float]:
     """Calculate Relative Strength Index."""
     if len(prices) < period + 1:
@@ -209,10 +197,13 @@ def calculate_macd(prices: List[float]) -> tuple:
     
     macd = ema12 - ema26
     
+    # EMA series computed once; entry i equals calculate_ema(prices[:i+1], n)
+    ema12_series = _ema_series(prices, 12)
+    ema26_series = _ema_series(prices, 26)
     macd_values = []
     for i in range(26, len(prices)):
-        e12 = calculate_ema(prices[:i+1], 12)
-        e26 = calculate_ema(prices[:i+1], 26)
+        e12 = ema12_series[i]
+        e26 = ema26_series[i]
         if e12 and e26:
             macd_values.append(e12 - e26)
     
@@ -309,7 +300,7 @@ async def fetch_coingecko_data(coin_id: str, symbol: str, timeframe: str = "1h",
             print(f"⚠️ No CoinGecko API key found in environment")
         return None
     
-    await rate_limit()
+    await COINGECKO_LIMITER.acquire()
     
     # Using the simple/price endpoint for current prices
     params = {
@@ -362,6 +353,82 @@ async def fetch_coingecko_data(coin_id: str, symbol: str, timeframe: str = "1h",
         return None
 
 
+async def fetch_coingecko_markets(coins: List[Dict[str, str]], debug: bool = False) -> Dict[str, Dict]:
+    """
+    Current quotes for many coins with one /coins/markets request.
+    Returns symbol → quote (same shape as fetch_coingecko_data).
+    """
+    if not coins or not COINGECKO_API_KEY:
+        return {}
+
+    by_id = {coin["id"]: coin["symbol"] for coin in coins}
+    params = {
+        "vs_currency": "usd",
+        "ids": ",".join(by_id),
+        "per_page": 250,
+        "page": 1,
+        "x_cg_demo_api_key": COINGECKO_API_KEY
+    }
+
+    await COINGECKO_LIMITER.acquire()
+
+    try:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            resp = await client.get(COINGECKO_MARKET_URL, params=params)
+            resp.raise_for_status()
+            rows = resp.json()
+    except Exception as e:
+        print(f"⚠️ CoinGecko markets error: {type(e).__name__}: {e}")
+        return {}
+
+    quotes = {}
+    for row in rows:
+        symbol = by_id.get(row.get("id"))
+        if not symbol or row.get("current_price") is None:
+            continue
+        quote = {
+            "coin_id": row["id"],
+            "symbol": symbol,
+            "price": row["current_price"],
+            "market_cap": row.get("market_cap"),
+            "volume_24h": row.get("total_volume"),
+            "change_24h": row.get("price_change_percentage_24h"),
+            "source": "coingecko"
+        }
+        quotes[symbol] = quote
+
+    if debug:
+        print(f"✓ CoinGecko markets: {len(quotes)}/{len(coins)} quotes in one call")
+    return quotes
+
+
+# -----------------------------
+# Exchange OHLCV (Bybit → OKX, primary)
+# -----------------------------
+
+async def fetch_exchange_ohlcv(
+    symbol: str,
+    timeframe: str = "1h",
+    debug: bool = False
+) -> Optional[Dict]:
+    """
+    OHLCV from Bybit/OKX via the screener's fetcher: paced by the per-exchange
+    token buckets and cached until the candle closes. Same symbol and window
+    as the screener's precompute, so a warm screener serves these for free.
+    """
+    try:
+        candles = await get_ohlcv(f"{symbol}/USDT", timeframe, SCREEN_CANDLES)
+    except Exception as e:
+        if debug:
+            print(f"❌ Exchange OHLCV error for {symbol}: {type(e).__name__}: {e}")
+        return None
+
+    if not candles:
+        return None
+    # Newest first, like Twelve Data "values"
+    return {"values": candles, "source": "exchange"}
+
+
 # -----------------------------
 # Twelve Data API Functions (Fallback for Historical OHLCV)
 # -----------------------------
@@ -390,7 +457,7 @@ async def fetch_twelve_ohlcv(
             print("⚠️ No Twelve Data API key found in environment")
         return None
 
-    await rate_limit()
+    await TWELVE_LIMITER.acquire()
 
     normalized = normalize_symbol_twelve(symbol)
 
@@ -442,8 +509,9 @@ def process_ohlcv_to_indicators(symbol: str, ohlcv_data: Dict, coingecko_data: O
         if not values:
             return None
         
-        # Twelve Data format: reverse to get chronological order
+        # Exchange and Twelve Data values are newest first: reverse to chronological
         candles = list(reversed(values))
+        ohlcv_source = ohlcv_data.get("source", "twelve")
         
         closes = [float(c["close"]) for c in candles]
         highs = [float(c["high"]) for c in candles]
@@ -452,10 +520,10 @@ def process_ohlcv_to_indicators(symbol: str, ohlcv_data: Dict, coingecko_data: O
         # Use CoinGecko current price if available, otherwise use latest close
         if coingecko_data and "price" in coingecko_data:
             last_price = float(coingecko_data["price"])
-            source = "coingecko+twelve"
+            source = f"coingecko+{ohlcv_source}"
         else:
             last_price = closes[-1]
-            source = "twelve"
+            source = ohlcv_source
         
         return calculate_indicators_from_prices(symbol, timeframe, closes, highs, lows, last_price, source)
     
@@ -527,10 +595,11 @@ async def fetch_top_100_indicator_data(
 ) -> List[Dict]:
     """
     Fetch indicator data for top 100 coins using CoinGecko API with Twelve Data fallback.
-    - Rate limited to 20 requests/minute
+    - One bulk CoinGecko /coins/markets call for all current quotes
+    - OHLCV from Bybit/OKX (per-exchange token buckets, shared with the
+      screener's candle cache); Twelve Data only for coins neither lists
+    - Indicators computed as each coin's candles arrive
     - Results cached for 10 minutes
-    - Uses CoinGecko for current prices
-    - Falls back to Twelve Data for historical OHLCV when needed
     """
     
     # Check API keys before proceeding
@@ -548,61 +617,81 @@ async def fetch_top_100_indicator_data(
             print("⚠️ No coins loaded from top100_coingecko_ids.json")
             return []
         
+        start_time = time.time()
         print(f"📊 Fetching indicators for {len(coins)} coins...")
-        print(f"   Primary: CoinGecko API (current quotes)")
-        print(f"   Fallback: Twelve Data API (historical OHLCV)")
-        print(f"   Rate Limit: {RATE_LIMIT_REQUESTS} requests/min")
+        print(f"   Primary: CoinGecko API (bulk current quotes)")
+        print(f"   OHLCV: Bybit/OKX, Twelve Data fallback ({OHLCV_CONCURRENCY} in flight)")
         print(f"   Cache Duration: {CACHE_DURATION//60} minutes")
         
         all_results = []
-        coingecko_count = 0
+        exchange_count = 0
         twelve_count = 0
         cache_count = 0
         combined_count = 0
         
+        # Serve what is still cached; only the rest goes to the APIs
+        pending = []
         for coin in coins:
-            symbol = coin["symbol"]
-            coin_id = coin["id"]
-            
-            # Check cache first
-            cache_key_combined = get_cache_key(symbol, timeframe, "combined")
-            cached_result = get_cached_data(cache_key_combined)
+            cached_result = get_cached_data(get_cache_key(coin["symbol"], timeframe, "combined"))
             if cached_result:
                 cache_count += 1
                 all_results.append(cached_result)
+            else:
+                pending.append(coin)
+        
+        # One request for every pending coin's current quote
+        quotes = await fetch_coingecko_markets(pending, debug=debug)
+        
+        semaphore = asyncio.Semaphore(OHLCV_CONCURRENCY)
+        
+        async def _fetch_ohlcv(coin: Dict[str, str]) -> Tuple[Dict[str, str], Optional[Dict]]:
+            async with semaphore:
+                data = await fetch_exchange_ohlcv(coin["symbol"], timeframe, debug=debug)
+                if not data:
+                    data = await fetch_twelve_ohlcv(coin["symbol"], timeframe, debug=debug)
+                return coin, data
+        
+        # Indicators are computed as soon as each coin's candles land,
+        # while the remaining requests are still in flight
+        for next_done in asyncio.as_completed([_fetch_ohlcv(coin) for coin in pending]):
+            coin, ohlcv_data = await next_done
+            symbol = coin["symbol"]
+            
+            if not ohlcv_data:
+                if debug:
+                    print(f"⚠️ No data available for {symbol}")
                 continue
             
-            # Try to get CoinGecko current price (for real-time data)
-            coingecko_data = await fetch_coingecko_data(coin_id, symbol, timeframe, debug=debug)
+            result = process_ohlcv_to_indicators(symbol, ohlcv_data, quotes.get(symbol), timeframe)
+            if not result:
+                continue
             
-            # Get historical OHLCV from Twelve Data (needed for indicators)
-            twelve_data = await fetch_twelve_ohlcv(symbol, timeframe, debug=debug)
+            all_results.append(result)
             
-            if twelve_data:
-                # Process indicators using Twelve Data OHLCV
-                result = process_ohlcv_to_indicators(symbol, twelve_data, coingecko_data, timeframe)
-                
-                if result:
-                    all_results.append(result)
-                    
-                    # Track source
-                    if result["source"] == "coingecko+twelve":
-                        combined_count += 1
-                    elif result["source"] == "coingecko":
-                        coingecko_count += 1
-                    else:
-                        twelve_count += 1
-                    
-                    # Cache the result
-                    set_cached_data(cache_key_combined, result)
+            # Track source
+            if result["source"].startswith("coingecko+"):
+                combined_count += 1
+            if result["source"].endswith("exchange"):
+                exchange_count += 1
+            else:
+                twelve_count += 1
             
-            elif debug:
-                print(f"⚠️ No data available for {symbol}")
+            # Cache the result
+            set_cached_data(get_cache_key(symbol, timeframe, "combined"), result)
+        
+        # Keep the top-100 order regardless of completion order
+        rank = {coin["symbol"]: i for i, coin in enumerate(coins)}
+        all_results.sort(key=lambda r: rank.get(r["symbol"], len(rank)))
         
         success_rate = (len(all_results) / len(coins) * 100) if coins else 0
-        print(f"\n✅ Successfully fetched {len(all_results)}/{len(coins)} coins ({success_rate:.1f}%)")
-        print(f"   CoinGecko+Twelve: {combined_count} | Twelve only: {twelve_count} | Cached: {cache_count}")
-        print(f"   Total API calls: ~{len(_rate_limit_queue)}")
+        print(f"\n✅ Successfully fetched {len(all_results)}/{len(coins)} coins ({success_rate:.1f}%) "
+              f"in {time.time() - start_time:.1f}s")
+        print(f"   Exchange OHLCV: {exchange_count} | Twelve fallback: {twelve_count} | "
+              f"With CoinGecko price: {combined_count} | Cached: {cache_count}")
+        print(f"   Limiter waits: Bybit {BYBIT_LIMITER.get_stats()['waited_seconds']}s | "
+              f"OKX {OKX_LIMITER.get_stats()['waited_seconds']}s | "
+              f"Twelve {TWELVE_LIMITER.get_stats()['waited_seconds']}s | "
+              f"CoinGecko {COINGECKO_LIMITER.get_stats()['waited_seconds']}s")
         
         return all_results
     
@@ -620,10 +709,8 @@ async def fetch_top_100_indicator_data(
 
 def clear_cache():
     """Manually clear all cached data."""
-    global _cache_store, _rate_limit_queue
     _cache_store.clear()
-    _rate_limit_queue.clear()
-    print("✓ Cache and rate limit queue cleared")
+    print("✓ Cache cleared")
 
 
 # -----------------------------
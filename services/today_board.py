@@ -0,0 +1,180 @@
+# services/today_board.py
+"""
+Precomputed /today market snapshot shared by every user.
+
+The /today analysis depends only on market data, never on the user, so a
+background job builds it once per JOB_INTERVAL: BTC/ETH data, sentiment,
+sectors and macro are fetched concurrently, run through
+TodayAnalyzer.analyze_market, and every view is rendered up front.
+
+    peek_today_message("risk")          → pre-rendered text or None (O(1))
+    await get_today_message("risk")     → same, building the snapshot if needed
+
+A reader that finds no snapshot (first start, failed refreshes) builds
+one on demand; concurrent readers share that single build. A snapshot
+older than SNAPSHOT_TTL is still served for up to SNAPSHOT_STALE more
+seconds while a background rebuild runs.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from telegram.ext import Application
+
+from services.macro_data import MacroDataService
+from services.sector_analysis import SectorAnalysisService
+from services.sentiment import SentimentService
+from services.today_data import MarketDataService
+from utils.cache import get_cache
+from utils.today_builder import TodayAnalyzer
+
+JOB_INTERVAL   = 300   # seconds between snapshot rebuilds
+SNAPSHOT_TTL   = 2 * JOB_INTERVAL
+SNAPSHOT_STALE = 1800  # seconds a snapshot may be served while rebuilding
+
+# /today view mode → TodayAnalyzer formatter
+VIEW_FORMATTERS = {
+    "full":    "format_full_analysis",
+    "btc":     "format_btc_deep_dive",
+    "eth":     "format_eth_deep_dive",
+    "sectors": "format_sectors_only",
+    "risk":    "format_risk_only",
+    "macro":   "format_macro_only",
+}
+
+FALLBACK_SENTIMENT = {
+    "value": 50,
+    "classification": "Neutral",
+    "emoji": "🔶",
+    "context": "Sentiment data temporarily unavailable"
+}
+
+FALLBACK_MACRO = {
+    "btc_dominance": 50.0,
+    "eth_dominance": 15.0,
+    "total_stablecoin_dominance": 7.0,
+    "market_structure": "unknown",
+    "exchange_flow": "neutral",
+    "exchange_flow_signal": "neutral"
+}
+
+_SNAPSHOT_KEY = "snapshot"
+
+market_service = MarketDataService()
+sentiment_service = SentimentService()
+sector_service = SectorAnalysisService()
+macro_service = MacroDataService()
+analyzer = TodayAnalyzer()
+
+snapshot_cache = get_cache(
+    "today_snapshot", ttl=SNAPSHOT_TTL, stale_ttl=SNAPSHOT_STALE, max_entries=1
+)
+_is_running = False
+
+
+class TodaySnapshotError(Exception):
+    """Data required for the analysis (BTC or ETH) could not be fetched."""
+
+    def __init__(self, symbol: str):
+        super().__init__(f"Failed to fetch {symbol} data")
+        self.symbol = symbol
+
+
+async def build_today_snapshot() -> Dict:
+    """
+    Fetch every input, run the analysis and render all views.
+    Raises TodaySnapshotError when BTC or ETH data is unavailable.
+    """
+    start = time.time()
+    btc_data, eth_data, sentiment_data, sector_data, macro_data = await asyncio.gather(
+        market_service.get_coin_data("BTC"),
+        market_service.get_coin_data("ETH"),
+        sentiment_service.get_fear_greed_index(),
+        sector_service.get_sector_analysis(),
+        macro_service.get_macro_indicators(include_alt_season=True),
+        return_exceptions=True,
+    )
+
+    # BTC and ETH are critical; everything else has a fallback
+    if isinstance(btc_data, Exception) or not btc_data:
+        raise TodaySnapshotError("BTC")
+    if isinstance(eth_data, Exception) or not eth_data:
+        raise TodaySnapshotError("ETH")
+
+    if isinstance(sentiment_data, Exception) or not sentiment_data:
+        print("[today_board] ⚠️ Sentiment data unavailable, using fallback")
+        sentiment_data = FALLBACK_SENTIMENT
+    if isinstance(sector_data, Exception) or not sector_data:
+        print("[today_board] ⚠️ Sector data unavailable")
+        sector_data = {}
+    if isinstance(macro_data, Exception):
+        print(f"[today_board] ⚠️ Macro data failed: {macro_data}")
+        macro_data = macro_service._get_fallback_data(include_alt_season=False)
+    if not macro_data:
+        macro_data = FALLBACK_MACRO
+
+    analysis = analyzer.analyze_market(
+        btc_data=btc_data,
+        eth_data=eth_data,
+        sentiment_data=sentiment_data,
+        sector_data=sector_data,
+        macro_data=macro_data
+    )
+
+    messages = {}
+    for view_mode, formatter in VIEW_FORMATTERS.items():
+        try:
+            messages[view_mode] = getattr(analyzer, formatter)(analysis)
+        except Exception as e:
+            print(f"[today_board] ⚠️ {view_mode} view failed to render: {e}")
+
+    print(f"[today_board] ✅ Snapshot built in {time.time() - start:.1f}s")
+    return {
+        "built_at": time.time(),
+        "analysis": analysis,
+        "messages": messages,
+    }
+
+
+def peek_today_message(view_mode: str) -> Optional[str]:
+    """Pre-rendered text for `view_mode` from a fresh snapshot, else None"""
+    snapshot = snapshot_cache.get(_SNAPSHOT_KEY)
+    if snapshot is None:
+        return None
+    return snapshot["messages"].get(view_mode)
+
+
+async def get_today_message(view_mode: str) -> Optional[str]:
+    """
+    Pre-rendered text for `view_mode`, building the snapshot if there is
+    none. Raises TodaySnapshotError like build_today_snapshot.
+    """
+    snapshot = await snapshot_cache.get_or_load(_SNAPSHOT_KEY, build_today_snapshot)
+    return snapshot["messages"].get(view_mode)
+
+
+async def run_today_board_job(context) -> None:
+    """Scheduled job: rebuild the snapshot. Skips if a build is still running."""
+    global _is_running
+    if _is_running:
+        print("[today_board] Previous build still running, skipping...")
+        return
+
+    _is_running = True
+    try:
+        snapshot_cache.set(_SNAPSHOT_KEY, await build_today_snapshot())
+    except Exception as e:
+        # Keep serving the previous snapshot until it goes stale
+        print(f"[today_board] ❌ Snapshot build failed: {e}")
+    finally:
+        _is_running = False
+
+
+def setup_today_board_jobs(application: Application) -> None:
+    application.job_queue.run_repeating(
+        run_today_board_job,
+        interval=JOB_INTERVAL,
+        first=60,
+    )
+    print(f"[today_board] /today snapshot refresh scheduled every {JOB_INTERVAL}s")
@@ -1,10 +1,12 @@
-import requests
+import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
-import time
 import os
 from dotenv import load_dotenv
 
+from services.http_client import get_json
+from utils.cache import get_cache
+
 # Load environment variables
 load_dotenv()
 
@@ -16,8 +18,8 @@ class MarketDataService:
         Initialize with CoinGecko API key from environment or parameter
         Looks for COINGECKO_API_KEY in .env file
         """
-        self.cache = {}
         self.cache_duration = 1800  # 30 minutes
+        self.cache = get_cache("today_data", ttl=self.cache_duration, max_entries=500)
         
         # Get API key from parameter, env, or use free tier
         self.api_key = api_key or os.getenv('COINGECKO_API_KEY')
@@ -198,30 +200,27 @@ class MarketDataService:
         else:
             self.headers = {}
     
-    def get_coin_data(self, symbol: str) -> Optional[Dict]:
+    async def get_coin_data(self, symbol: str) -> Optional[Dict]:
         """
         Get comprehensive data for a specific coin
         symbol: "BTC", "ETH", etc.
+        Concurrent callers for the same coin share one fetch.
         """
-        cache_key = f"{symbol}_data"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
-        
+        return await self.cache.get_or_load(f"{symbol}_data", lambda: self._load_coin_data(symbol))
+    
+    async def _load_coin_data(self, symbol: str) -> Optional[Dict]:
         try:
             coin_id = self.coin_ids.get(symbol)
             if not coin_id:
                 print(f"Unknown symbol: {symbol}")
                 return None
             
-            # Fetch current price and 24h data
-            market_data = self._fetch_coin_market_data(coin_id)
-            
-            # Fetch historical data for technical indicators (90 days)
-            ohlc_data = self._fetch_ohlc_data(coin_id, days=90)
+            # Current price / 24h data and 90 days of history for the
+            # technical indicators, fetched concurrently
+            market_data, ohlc_data = await asyncio.gather(
+                self._fetch_coin_market_data(coin_id),
+                self._fetch_ohlc_data(coin_id, days=90),
+            )
             
             if not market_data or not ohlc_data:
                 return None
@@ -278,8 +277,6 @@ class MarketDataService:
                 "key_level_status": self._check_key_levels(current_price, ma_50, ma_200)
             }
             
-            # Cache result
-            self.cache[cache_key] = (data, time.time())
             return data
             
         except Exception as e:
@@ -288,58 +285,36 @@ class MarketDataService:
             traceback.print_exc()
             return None
     
-    def get_multiple_coins_data(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+    async def get_multiple_coins_data(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
         """
-        Get data for multiple coins efficiently
+        Get data for multiple coins efficiently (cached coins are served
+        from cache, the rest are fetched concurrently)
         Returns dict: {symbol: coin_data}
         """
-        result = {}
-        
         # Filter symbols that we support
         valid_symbols = [s for s in symbols if s in self.coin_ids]
         
         if not valid_symbols:
-            return result
-        
-        # Check cache first
-        uncached_symbols = []
-        for symbol in valid_symbols:
-            cache_key = f"{symbol}_data"
-            if cache_key in self.cache:
-                cached_data, timestamp = self.cache[cache_key]
-                if time.time() - timestamp < self.cache_duration:
-                    result[symbol] = cached_data
-                else:
-                    uncached_symbols.append(symbol)
-            else:
-                uncached_symbols.append(symbol)
+            return {}
         
-        # Fetch uncached symbols
-        for symbol in uncached_symbols:
-            coin_data = self.get_coin_data(symbol)
-            if coin_data:
-                result[symbol] = coin_data
-            
-            # Small delay to respect rate limits
-            if len(uncached_symbols) > 5:
-                time.sleep(0.2)
-        
-        return result
+        coins_data = await asyncio.gather(*(self.get_coin_data(s) for s in valid_symbols))
+        return {
+            symbol: coin_data
+            for symbol, coin_data in zip(valid_symbols, coins_data)
+            if coin_data
+        }
     
-    def get_market_cap_data(self) -> Optional[Dict]:
+    async def get_market_cap_data(self) -> Optional[Dict]:
         """Get total crypto market cap and dominance data"""
         cache_key = "market_cap_data"
         
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
         try:
             url = f"{self.base_url}/global"
-            response = requests.get(url, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()['data']
+            data = (await get_json(url, headers=self.headers))['data']
             
             result = {
                 "total_market_cap": data['total_market_cap']['usd'],
@@ -349,7 +324,7 @@ class MarketDataService:
                 "total_volume_24h": data['total_volume']['usd']
             }
             
-            self.cache[cache_key] = (result, time.time())
+            self.cache.set(cache_key, result)
             return result
             
         except Exception as e:
@@ -371,7 +346,7 @@ class MarketDataService:
         """Check if a coin symbol is supported"""
         return symbol.upper() in self.coin_ids
     
-    def _fetch_coin_market_data(self, coin_id: str) -> Optional[Dict]:
+    async def _fetch_coin_market_data(self, coin_id: str) -> Optional[Dict]:
         """Fetch current market data for a coin"""
         try:
             url = f"{self.base_url}/coins/{coin_id}"
@@ -384,9 +359,7 @@ class MarketDataService:
                 "sparkline": "false"
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = await get_json(url, params=params, headers=self.headers)
             
             return data['market_data']
             
@@ -394,7 +367,7 @@ class MarketDataService:
             print(f"Error fetching market data for {coin_id}: {e}")
             return None
     
-    def _fetch_ohlc_data(self, coin_id: str, days: int = 90) -> Optional[List]:
+    async def _fetch_ohlc_data(self, coin_id: str, days: int = 90) -> Optional[List]:
         """
         Fetch OHLC (candlestick) data
         Returns: List of [timestamp, open, high, low, close, volume]
@@ -406,20 +379,17 @@ class MarketDataService:
                 "days": days
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            ohlc_data = response.json()
-            
-            # Get volume data
+            # Volume data comes from market_chart; both requested together
             market_chart_url = f"{self.base_url}/coins/{coin_id}/market_chart"
             market_params = {
                 "vs_currency": "usd",
                 "days": days
             }
             
-            market_response = requests.get(market_chart_url, params=market_params, headers=self.headers, timeout=15)
-            market_response.raise_for_status()
-            market_data = market_response.json()
+            ohlc_data, market_data = await asyncio.gather(
+                get_json(url, params=params, headers=self.headers),
+                get_json(market_chart_url, params=market_params, headers=self.headers),
+            )
             
             volumes = market_data.get('total_volumes', [])
             
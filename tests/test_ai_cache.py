@@ -0,0 +1,56 @@
+import asyncio
+
+from utils.ai_cache import FEATURE_TTLS, AICache
+from utils.cache import get_all_stats
+
+
+def test_concurrent_identical_requests_make_one_call():
+    cache = AICache()
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "narrative"
+
+    async def run():
+        key = cache.make_key("aiscan", "v1", "model", symbol="BTC", tf="1h")
+        return await asyncio.gather(*(cache.get_or_create(key, produce) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["narrative"] * 5
+    assert len(calls) == 1
+    stats = cache.get_stats()
+    assert stats["features"]["aiscan"] == {"requests": 5, "llm_calls": 1}
+    assert stats["coalesced"] == 4
+
+
+def test_failed_call_is_not_cached():
+    cache = AICache()
+    replies = iter([None, "second try"])
+
+    async def produce():
+        return next(replies)
+
+    async def run():
+        key = cache.make_key("risk", "v1", "model", symbol="ETH")
+        return await cache.get_or_create(key, produce), await cache.get_or_create(key, produce)
+
+    assert asyncio.run(run()) == (None, "second try")
+
+
+def test_feature_ttl_and_registration():
+    cache = AICache()
+    key = cache.make_key("setup", "v1", "model", symbol="SOL")
+    cache.set(key, {"text": "x"})
+
+    entry = cache.cache.get_entry(key)
+    assert round(entry["expires_at"] - entry["cached_at"]) == FEATURE_TTLS["setup"]
+    assert "ai" in get_all_stats()
+
+
+def test_key_depends_on_inputs_not_order():
+    a = AICache.make_key("aiscan", "v1", "m", symbol="BTC", tf="1h")
+    b = AICache.make_key("aiscan", "v1", "m", tf="1h", symbol="BTC")
+    c = AICache.make_key("aiscan", "v2", "m", symbol="BTC", tf="1h")
+    assert a == b != c
+    assert a.startswith("aiscan:")
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from utils import cache as cache_mod
+from utils.cache import Cache, get_all_stats, get_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for utils.cache"""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    c = Cache("test-ttl", ttl=10)
+    c.set("a", 1)
+    c.set("b", 2, ttl=30)
+    clock[0] += 11
+    assert c.get("a") is None
+    assert c.get("b") == 2
+    clock[0] += 20
+    assert c.get("b", "gone") == "gone"
+
+
+def test_least_recently_used_is_evicted_first():
+    c = Cache("test-lru", max_entries=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")                      # b is now least recently used
+    c.set("c", 3)
+    assert c.keys() == ["a", "c"]
+    assert c.get_stats()["evictions"] == 1
+
+
+def test_byte_bound_evicts_and_rejects_oversized_values():
+    c = Cache("test-bytes", max_bytes=100, sizeof=len)
+    c.set("a", "x" * 40)
+    c.set("b", "x" * 40)
+    c.set("c", "x" * 40)            # 120 bytes → "a" goes
+    assert c.keys() == ["b", "c"]
+    c.set("huge", "x" * 101)
+    assert c.get("huge") is None
+    assert c.get_stats()["bytes"] == 80
+
+
+def test_get_or_load_is_single_flight():
+    c = Cache("test-flight", ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(c.get_or_load("k", loader) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert asyncio.run(c.get_or_load("k", loader)) == "value"
+    assert len(calls) == 1
+    stats = c.get_stats()
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_none_is_not_cached_unless_asked():
+    c = Cache("test-none")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return None
+
+    asyncio.run(c.get_or_load("k", loader))
+    asyncio.run(c.get_or_load("k", loader))
+    assert len(calls) == 2
+    asyncio.run(c.get_or_load("n", loader, cache_none=True))
+    asyncio.run(c.get_or_load("n", loader, cache_none=True))
+    assert len(calls) == 3
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    c = Cache("test-stale", ttl=10, stale_ttl=60)
+    c.set("k", "old")
+    clock[0] += 20
+    assert c.get("k") is None       # get() never returns stale values
+
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "new"
+
+    async def run():
+        first = await c.get_or_load("k", loader)
+        second = await c.get_or_load("k", loader)
+        await asyncio.sleep(0.05)
+        return first, second, await c.get_or_load("k", loader)
+
+    assert asyncio.run(run()) == ("old", "old", "new")
+    assert len(calls) == 1
+
+
+def test_failed_load_is_not_cached():
+    c = Cache("test-error")
+
+    async def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(c.get_or_load("k", boom))
+    assert "k" not in c.keys()
+    assert c.get_stats()["load_errors"] == 1
+
+
+def test_registry_returns_the_same_cache():
+    a = get_cache("test-registry", ttl=5)
+    b = get_cache("test-registry", ttl=99)
+    assert a is b and a.ttl == 5
+    a.set("x", 1)
+    a.get("x")
+    assert get_all_stats()["test-registry"]["hits"] == 1
@@ -0,0 +1,81 @@
+import random
+import statistics
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from services.levels_engine import LevelsEngine
+
+
+def _pairwise_clusters(swings, cluster_pct, min_touches):
+    """The greedy O(n^2) scan the sorted sweep replaced."""
+    clusters, used = [], set()
+    for i, (idx, price) in enumerate(swings):
+        if i in used:
+            continue
+        cluster = [(idx, price)]
+        used.add(i)
+        for j in range(i + 1, len(swings)):
+            if j not in used and price > 0 and abs(swings[j][1] - price) / price < cluster_pct:
+                cluster.append(swings[j])
+                used.add(j)
+        if len(cluster) >= min_touches:
+            clusters.append(cluster)
+    return clusters
+
+
+def _random_swings(rng, n):
+    centres = [rng.uniform(50, 150) for _ in range(rng.randint(1, 6))]
+    swings = []
+    for _ in range(n):
+        price = rng.choice(centres) * (1 + rng.gauss(0, 0.01))
+        if rng.random() < 0.3:
+            price = round(price)        # exact ties and band-edge distances
+        swings.append((rng.randrange(300), price))
+    return swings
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_sweep_matches_pairwise_greedy_clustering(seed):
+    rng = random.Random(seed)
+    swings = _random_swings(rng, rng.randint(1, 120))
+    volumes = [rng.uniform(100, 1000) for _ in range(250)]    # some swings past the end
+    cluster_pct = rng.choice([0.005, 0.01, 0.02])
+    min_touches = rng.choice([1, 2, 3])
+
+    levels = LevelsEngine()._pro_cluster_and_score(
+        swings, volumes, 100.0, cluster_pct, min_touches, 1.5, "support",
+    )
+    expected = _pairwise_clusters(swings, cluster_pct, min_touches)
+
+    def summary(touches, price, volume, quality):
+        return touches, round(price, 6), round(volume, 6), round(quality, 3)
+
+    got = sorted(summary(l["touches"], l["price"], l["avg_volume"], l["cluster_quality"]) for l in levels)
+    want = []
+    for cluster in expected:
+        prices = [p for _, p in cluster]
+        vols = [volumes[i] for i, _ in cluster if i < len(volumes)]
+        std = statistics.stdev(prices) if len(prices) > 1 else 0
+        avg_price = statistics.mean(prices)
+        want.append(summary(
+            len(cluster), avg_price, statistics.mean(vols) if vols else 0,
+            1 - min(std / avg_price, 0.5),
+        ))
+    assert got == sorted(want)
+
+
+def test_every_swing_is_clustered_once():
+    rng = random.Random(1)
+    swings = _random_swings(rng, 500)
+    levels = LevelsEngine()._pro_cluster_and_score(swings, [], 100.0, 0.01, 1, 1.5, "resistance")
+    assert sum(l["touches"] for l in levels) == len(swings)
+    assert levels == sorted(levels, key=lambda l: l["score"], reverse=True)
+
+
+def test_band_edge_is_exclusive():
+    swings = [(0, 100.0), (1, 101.0), (2, 99.0), (3, 100.5), (4, 99.5), (5, 101.0)]
+    levels = LevelsEngine()._pro_cluster_and_score(swings, [], 100.0, 0.01, 1, 1.5, "support")
+    # 100 takes 100.5 and 99.5 only; 101 then anchors both 101s, 99 stays alone
+    assert sorted((l["touches"], round(l["price"], 6)) for l in levels) == [(1, 99.0), (2, 101.0), (3, 100.0)]
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from utils.pattern_cache import PatternCache
+from utils.patterns import detect_all_patterns
+
+HOUR = 3600
+
+
+def _series(n: int, seed: int = 7):
+    """Chronological 1h candles (Bybit-style ms datetimes) from a seeded random walk."""
+    rng = random.Random(seed)
+    candles, price = [], 100.0
+    for i in range(n):
+        o = price
+        c = o * (1 + rng.gauss(0, 0.012))
+        h = max(o, c) * (1 + abs(rng.gauss(0, 0.006)))
+        l = min(o, c) * (1 - abs(rng.gauss(0, 0.006)))
+        candles.append({
+            "datetime": (1_700_000_000 // HOUR + i) * HOUR * 1000,
+            "open": o, "high": h, "low": l, "close": c,
+            "volume": rng.uniform(50, 150),
+        })
+        price = c
+    return candles
+
+
+def _now_after(window):
+    """A time at which every candle in `window` has closed."""
+    return window[-1]["datetime"] / 1000 + HOUR + 1
+
+
+@pytest.mark.parametrize("lengths", [(200, 250), (250, 300), (200, 300)])
+def test_carried_results_match_full_scan_for_each_window_length(lengths):
+    series = _series(max(lengths) + 40)
+    cache = PatternCache()
+
+    # Two callers with different window lengths alternate on every close
+    for end in range(max(lengths), len(series) + 1):
+        for n in lengths:
+            window = series[end - n:end]
+            got = cache.detect("BTC", "1h", window, max_results=20, now=_now_after(window))
+            assert got == detect_all_patterns(window, max_results=20), (n, end)
+
+    stats = cache.get_stats()
+    assert stats["series_cached"] == 2
+    assert stats["incremental_runs"] > 0
+
+
+def test_same_candle_and_length_is_a_hit():
+    series = _series(260)
+    cache = PatternCache()
+    window = series[-200:]
+    now = _now_after(window)
+
+    first = cache.detect("BTC", "1h", window, now=now)
+    assert cache.detect("BTC", "1h", window, now=now) == first
+    cache.detect("BTC", "1h", series[-250:], now=now)
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_forming_candle_is_ignored():
+    series = _series(201)
+    cache = PatternCache()
+    closed = series[:-1]
+    # The newest candle opened 10 minutes ago and is still forming
+    now = series[-1]["datetime"] / 1000 + 600
+    assert cache.detect("BTC", "1h", series, now=now) == detect_all_patterns(closed)
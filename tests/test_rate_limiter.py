@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from utils.rate_limiter import TokenBucket
+
+
+def test_burst_then_paced():
+    async def run():
+        bucket = TokenBucket("test", rate=50, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        burst = time.monotonic() - start
+        for _ in range(5):
+            await bucket.acquire()
+        return burst, time.monotonic() - start, bucket.get_stats()
+
+    burst, total, stats = asyncio.run(run())
+    assert burst < 0.05
+    assert 0.08 <= total < 0.5        # 5 more tokens at 50/s ≈ 0.1s
+    assert stats["acquired"] == 10
+
+
+def test_interactive_waiter_goes_before_queued_background():
+    async def run():
+        bucket = TokenBucket("test", rate=20, capacity=1)
+        await bucket.acquire()          # drain
+        order = []
+
+        async def take(name, background):
+            await bucket.acquire(background=background)
+            order.append(name)
+
+        tasks = [asyncio.create_task(take(f"bg{i}", True)) for i in range(4)]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(take("user", False)))
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(run())
+    assert order.index("user") <= 1
+    assert [name for name in order if name != "user"] == ["bg0", "bg1", "bg2", "bg3"]
+
+
+def test_background_leaves_the_reserve():
+    async def run():
+        bucket = TokenBucket("test", rate=0.5, capacity=4, reserve=2)
+        for _ in range(2):
+            await bucket.acquire(background=True)
+        blocked = asyncio.create_task(bucket.acquire(background=True))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+        # The reserved tokens are still there for interactive callers
+        await asyncio.wait_for(bucket.acquire(), timeout=0.1)
+        await asyncio.wait_for(bucket.acquire(), timeout=0.1)
+        blocked.cancel()
+        await asyncio.gather(blocked, return_exceptions=True)
+        return bucket.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["acquired"] == 4
+    assert stats["acquired_background"] == 2
+    assert stats["queued"] == 0
+
+
+def test_cancelled_waiter_does_not_block_the_queue():
+    async def run():
+        bucket = TokenBucket("test", rate=20, capacity=1)
+        await bucket.acquire()
+        first = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.005)
+        second = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.005)
+        first.cancel()
+        await asyncio.wait_for(second, timeout=0.5)
+        return bucket.get_stats()
+
+    assert asyncio.run(run())["queued"] == 0
+
+
+def test_waiters_of_the_same_priority_are_served_in_arrival_order():
+    async def run():
+        bucket = TokenBucket("test", rate=50, capacity=1)
+        await bucket.acquire()
+        order = []
+
+        async def take(i):
+            await bucket.acquire()
+            order.append(i)
+
+        tasks = []
+        for i in range(5):
+            tasks.append(asyncio.create_task(take(i)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
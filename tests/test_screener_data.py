@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from services.screener_data import closed_candles_newest_first
+
+
+def _candles(newest_open: float, step: int, n: int = 5):
+    return [
+        {"datetime": datetime.fromtimestamp(newest_open - i * step).isoformat(), "close": float(i)}
+        for i in range(n)
+    ]
+
+
+def test_forming_candle_is_dropped():
+    now = 1_700_000_000 - (1_700_000_000 % 3600) + 10  # 10s into a 1h candle
+    candles = _candles(now - 10, 3600)
+    closed = closed_candles_newest_first(candles, "1h", now=now)
+    assert closed == candles[1:]
+
+
+def test_closed_newest_candle_is_kept():
+    now = 1_700_000_000 - (1_700_000_000 % 3600) + 10
+    # Exchange has not rolled over yet: newest candle opened an hour ago
+    candles = _candles(now - 10 - 3600, 3600)
+    assert closed_candles_newest_first(candles, "1h", now=now) == candles
+
+
+def test_unknown_interval_or_datetime_is_left_alone():
+    candles = [{"datetime": "not a date"}, {"datetime": "also not"}]
+    assert closed_candles_newest_first(candles, "1h") == candles
+    assert closed_candles_newest_first(candles, "3w") == candles
+    assert closed_candles_newest_first([], "1h") == []
@@ -0,0 +1,232 @@
+import random
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("telegram")
+
+from services.screener_data import is_bullish_engulfing
+from services.screener_dsl import (
+    BUILTIN_STRATEGIES,
+    MAX_RULE_LENGTH,
+    MAX_RULES,
+    StrategyDSLError,
+    build_indicator_matrix,
+    compile_condition,
+    compile_strategy,
+)
+
+
+@pytest.mark.parametrize("source, message", [
+    ("rsi <", "cannot parse"),
+    ("rsi < 30 =>", "cannot parse"),
+    (" ; # only a comment", "no conditions"),
+    ("rsi < 30 and " * 20 + "rsi < 30", "too long"),
+    ("\n".join(["rsi < 30"] * (MAX_RULES + 1)), f"at most {MAX_RULES}"),
+])
+def test_parse_errors(source, message):
+    with pytest.raises(StrategyDSLError, match=message):
+        compile_strategy(source)
+
+
+@pytest.mark.parametrize("condition, message", [
+    ("close.__class__", "unsupported syntax"),
+    ("__import__('os')", "unsupported function call"),
+    ("np.sum(close)", "unsupported function call"),
+    ("pct(close=1, support=2)", "unsupported function call"),
+    ("abs(close, support)", "takes 1 argument"),
+    ("price > 10", "unknown field 'price'"),
+    ("rsi < 'low'", "unsupported value"),
+    ("rsi < True", "unsupported value"),
+    ("rsi in [1, 2]", "unsupported comparison"),
+    ("[rsi for rsi in close]", "unsupported syntax"),
+    ("lambda: rsi", "unsupported syntax"),
+])
+def test_rejected_constructs(condition, message):
+    with pytest.raises(StrategyDSLError, match=message):
+        compile_condition(condition)
+
+
+def test_empty_and_oversized_conditions():
+    with pytest.raises(StrategyDSLError, match="empty condition"):
+        compile_condition("   ")
+    with pytest.raises(StrategyDSLError, match="condition too long"):
+        compile_condition("1" * (MAX_RULE_LENGTH + 1))
+
+
+def test_filters_rules_and_min_score():
+    strategy = compile_strategy("volume > volume_ma; rsi < 30 => 2; macd > signal => 1 # cross", name="t")
+    assert strategy.min_score == 1
+    assert [text for text, _ in strategy.filters] == ["volume > volume_ma"]
+    assert [(text, points) for text, _, points in strategy.rules] == [("rsi < 30", 2), ("macd > signal", 1)]
+
+    coins = {
+        "A": {"volume": 2, "volume_ma": 1, "rsi": 20, "macd": 1, "signal": 0},    # 3
+        "B": {"volume": 2, "volume_ma": 1, "rsi": 50, "macd": 1, "signal": 0},    # 1
+        "C": {"volume": 2, "volume_ma": 1, "rsi": 50, "macd": 0, "signal": 1},    # 0
+        "D": {"volume": 1, "volume_ma": 2, "rsi": 20, "macd": 1, "signal": 0},    # filtered
+        "E": {"volume": None, "volume_ma": 2, "rsi": 20},                         # missing
+    }
+    matched, score = strategy.evaluate(build_indicator_matrix(coins))
+    assert matched.tolist() == [True, True, False, False, False]
+    assert score.tolist() == [3, 1, 0, 3, 2]
+
+
+def test_missing_values_never_satisfy_a_comparison():
+    strategy = compile_strategy("rsi < 30 => 1; not (rsi >= 30) => 1; min_score: 0")
+    matched, score = strategy.evaluate(build_indicator_matrix({"A": {"rsi": None}}))
+    assert score.tolist() == [1]        # only the negation holds, as NaN >= 30 is false
+
+
+# ----------------------------------------------------------------------------
+# Built-ins against the hand-written match_strategy they replaced
+# ----------------------------------------------------------------------------
+
+def _valid(val):
+    if val is None:
+        return False
+    try:
+        num = float(val)
+        return not (num != num or num in (float("inf"), float("-inf")))
+    except (ValueError, TypeError):
+        return False
+
+
+def _reference_match(key, d):
+    score = 0
+    rsi, macd, signal = d.get("rsi"), d.get("macd"), d.get("signal")
+    ema20, ema50, ema200 = d.get("ema20"), d.get("ema50"), d.get("ema200")
+    close, prev_close = d.get("close"), d.get("prev_close")
+    volume, volume_ma = d.get("volume"), d.get("volume_ma")
+    avg_7d, support = d.get("avg_7d"), d.get("support")
+
+    if key == "strat_1":
+        if _valid(rsi):
+            if rsi < 35:
+                score += 2
+                if rsi < 25:
+                    score += 1
+            elif 35 <= rsi <= 45:
+                score += 1
+        if _valid(macd) and _valid(signal) and macd > signal:
+            score += 2
+            if (abs(macd - signal) / abs(signal) if signal != 0 else 0) > 0.05:
+                score += 1
+        if _valid(close) and _valid(support) and -2 <= (close - support) / support * 100 <= 5:
+            score += 1
+        return score >= 2, score
+
+    if key == "strat_2":
+        if _valid(close) and _valid(ema20):
+            dist = (close - ema20) / ema20 * 100
+            if dist > 0:
+                score += 2
+                if dist > 2:
+                    score += 1
+            elif -2 <= dist <= 0:
+                score += 1
+        if _valid(close) and _valid(prev_close) and close > prev_close:
+            gain = (close - prev_close) / prev_close * 100
+            score += (gain >= 1) + (gain >= 3)
+        if _valid(volume) and _valid(volume_ma) and volume_ma > 0:
+            ratio = volume / volume_ma
+            if ratio >= 1.2:
+                score += 1
+                if ratio >= 1.8:
+                    score += 1
+        return score >= 3, score
+
+    if key == "strat_3":
+        if _valid(rsi):
+            if rsi < 35:
+                score += 2
+                if rsi < 25:
+                    score += 1
+            elif 35 <= rsi <= 40:
+                score += 1
+        if d.get("bullish_engulfing") or (
+            isinstance(d.get("candle_1"), dict) and isinstance(d.get("candle_2"), dict)
+            and is_bullish_engulfing(d["candle_1"], d["candle_2"])
+        ):
+            score += 2
+        if _valid(close) and _valid(prev_close) and close > prev_close:
+            score += 1
+        if _valid(close) and _valid(support) and abs(close - support) / support * 100 <= 3:
+            score += 1
+        return score >= 3, score
+
+    if key == "strat_4":
+        if _valid(macd) and _valid(signal) and macd > signal * 0.95:
+            score += 1
+            if macd > signal:
+                score += 1
+                if macd > signal * 1.05:
+                    score += 1
+        if _valid(ema50) and _valid(ema200) and ema50 > ema200 * 0.98:
+            score += 1
+            if ema50 > ema200:
+                score += 1
+        if _valid(close) and _valid(ema20) and close > ema20:
+            score += 1
+        return score >= 2, score
+
+    if key == "strat_5":
+        if _valid(avg_7d) and _valid(close):
+            below = (avg_7d - close) / avg_7d * 100
+            if 2 <= below <= 8:
+                score += 2
+                if 3 <= below <= 6:
+                    score += 1
+        if _valid(support) and _valid(close):
+            dist = (close - support) / support * 100
+            if 0 <= dist <= 5:
+                score += 2
+                if dist <= 2:
+                    score += 1
+        if _valid(close) and _valid(ema50) and close > ema50 * 0.95:
+            score += 1
+        if _valid(rsi) and 40 <= rsi <= 55:
+            score += 1
+        return score >= 2, score
+
+
+def _random_coin(rng):
+    close = rng.uniform(50, 150)
+
+    def near(pct):
+        return None if rng.random() < 0.08 else close * (1 + rng.uniform(-pct, pct) / 100)
+
+    def candle():
+        o = close * (1 + rng.uniform(-3, 3) / 100)
+        return {"open": o, "close": o * (1 + rng.uniform(-3, 3) / 100)}
+
+    signal = rng.choice([0.0, rng.uniform(-2, 2)])
+    return {
+        "close": close,
+        "prev_close": near(5),
+        "rsi": None if rng.random() < 0.08 else rng.uniform(10, 80),
+        "macd": signal + rng.uniform(-0.3, 0.3),
+        "signal": signal,
+        "ema20": near(5),
+        "ema50": near(8),
+        "ema200": near(12),
+        "volume": rng.uniform(0, 3000),
+        "volume_ma": rng.choice([0.0, rng.uniform(500, 2000)]),
+        "avg_7d": near(10),
+        "support": near(8),
+        "bullish_engulfing": rng.random() < 0.2,
+        "candle_1": candle(),
+        "candle_2": candle(),
+    }
+
+
+@pytest.mark.parametrize("key", sorted(BUILTIN_STRATEGIES))
+def test_builtin_strategies_match_the_hand_written_rules(key):
+    rng = random.Random(key)
+    coins = {f"C{i}": _random_coin(rng) for i in range(3000)}
+    matched, score = BUILTIN_STRATEGIES[key].evaluate(build_indicator_matrix(coins))
+
+    expected = [_reference_match(key, d) for d in coins.values()]
+    assert score.tolist() == [s for _, s in expected]
+    assert matched.tolist() == [m for m, _ in expected]
+    assert 0 < matched.sum() < len(coins)
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from whales import whale_monitor
+from whales.whale_monitor import (
+    ACTIVE_WINDOW,
+    DEFAULT_POLL_INTERVAL,
+    HOT_WINDOW,
+    MAX_POLL_INTERVAL,
+    WHALE_CHECK_INTERVAL,
+    get_cursor_key,
+    is_poll_due,
+    next_poll_interval,
+    update_cursor,
+)
+
+NOW = 1_700_000_000.0
+CONTRACT = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+WHALE = "0xF977814e90dA44bFA03b6295A0616a897441aceC"
+
+
+def test_cursor_key_ignores_address_case():
+    assert get_cursor_key(CONTRACT, WHALE) == get_cursor_key(CONTRACT.lower(), WHALE.upper().replace("0X", "0x"))
+
+
+def test_unknown_whale_is_due_and_polled_at_the_default_interval():
+    assert is_poll_due(None, NOW)
+    assert next_poll_interval(None, NOW) == DEFAULT_POLL_INTERVAL
+
+
+def test_poll_is_due_half_a_cycle_early():
+    cursor = {"next_check": NOW + WHALE_CHECK_INTERVAL / 2}
+    assert is_poll_due(cursor, NOW)
+    assert not is_poll_due(cursor, NOW - 1)
+
+
+@pytest.mark.parametrize("idle, interval, expected", [
+    (60, 3600, WHALE_CHECK_INTERVAL),
+    (HOT_WINDOW, 3600, DEFAULT_POLL_INTERVAL),
+    (ACTIVE_WINDOW - 1, 3600, DEFAULT_POLL_INTERVAL),
+    (ACTIVE_WINDOW, WHALE_CHECK_INTERVAL, DEFAULT_POLL_INTERVAL),
+    (ACTIVE_WINDOW, DEFAULT_POLL_INTERVAL, 2 * DEFAULT_POLL_INTERVAL),
+    (ACTIVE_WINDOW, MAX_POLL_INTERVAL, MAX_POLL_INTERVAL),
+])
+def test_interval_follows_the_age_of_the_last_transfer(idle, interval, expected):
+    cursor = {"last_activity": NOW - idle, "interval": interval}
+    assert next_poll_interval(cursor, NOW) == expected
+
+
+def test_dormant_whale_backs_off_to_the_cap():
+    cursors, key, now = {}, "k", NOW
+    intervals = []
+    for _ in range(6):
+        update_cursor(cursors, key, now=now)
+        intervals.append(cursors[key]["interval"])
+        now = cursors[key]["next_check"]
+    assert intervals == [300, 600, 1200, 2400, 3600, 3600]
+
+
+def test_update_cursor_only_moves_forward():
+    cursors = {}
+    update_cursor(cursors, "k", {"blockNumber": "200", "timeStamp": str(int(NOW - 30))}, NOW)
+    update_cursor(cursors, "k", {"blockNumber": "150", "timeStamp": str(int(NOW - 9000))}, NOW + 10)
+    update_cursor(cursors, "k", {"blockNumber": "bad"}, NOW + 20)
+    cursor = cursors["k"]
+    assert cursor["block"] == 200
+    assert cursor["last_activity"] == int(NOW - 30)
+    assert cursor["interval"] == WHALE_CHECK_INTERVAL
+    assert cursor["next_check"] == NOW + 20 + WHALE_CHECK_INTERVAL
+
+
+def test_process_whale_fetches_after_the_cursor_and_skips_when_not_due(monkeypatch):
+    requests = []
+
+    async def fake_fetch(address, contract, symbol, limit=5, start_block=None):
+        requests.append(start_block)
+        return []
+
+    monkeypatch.setattr(whale_monitor, "fetch_whale_transactions", fake_fetch)
+    monkeypatch.setattr(whale_monitor.time, "time", lambda: NOW)
+    key = get_cursor_key(CONTRACT, WHALE)
+    cursors = {key: {"block": 1000, "last_activity": NOW - 60, "next_check": NOW - 1}}
+    whale = {"address": WHALE}
+
+    async def run():
+        await whale_monitor.process_whale(whale, "USDC", CONTRACT, {}, cursors, 1, 0)
+        await whale_monitor.process_whale(whale, "USDC", CONTRACT, {}, cursors, 1, 0)
+
+    asyncio.run(run())
+    assert requests == [1001]          # the second call is not due yet
+    assert cursors[key]["block"] == 1000
+    assert cursors[key]["next_check"] == NOW + WHALE_CHECK_INTERVAL
@@ -0,0 +1,135 @@
+# ----------------------------------------------------------------------------
+# utils/ai_cache.py
+# ----------------------------------------------------------------------------
+"""
+Content-addressed cache for AI (OpenRouter) responses.
+
+Keys are a hash of the normalized structured inputs behind a prompt —
+symbol, timeframe, candle boundary, pattern set, model and prompt
+version — not of the prompt text, so every user asking about the same
+series within one candle shares one LLM call:
+
+    key = ai_cache.make_key("aiscan", "v1", model, symbol="BTC", tf="1h",
+                            candle=candle_bucket("1h"), patterns=[...])
+    text = await ai_cache.get_or_create(key, _call)   # async def _call() -> str | None
+
+The feature (first make_key argument) is the key prefix; it selects the
+TTL from FEATURE_TTLS unless get_or_create is given an explicit `ttl`.
+
+Entries live in a utils.cache.Cache (namespace "ai", reported by
+get_all_stats()); its get_or_load coalesces concurrent identical requests
+onto one in-flight call (single-flight). Failed calls (None) are never
+cached.
+"""
+
+import hashlib
+import json
+import time
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.cache import Cache
+from utils.pattern_cache import TIMEFRAME_SECONDS
+
+# Seconds each feature's responses stay valid (keys already roll over on
+# candle close where the inputs include a candle boundary)
+FEATURE_TTLS = {
+    "aiscan":         1800,
+    "analysis":        900,
+    "setup":           900,
+    "risk":           3600,
+    "channel_update":  600,
+    "ai_refine":      1800,
+}
+DEFAULT_TTL = 600
+
+
+def candle_bucket(timeframe: str, now: Optional[float] = None) -> int:
+    """Open time (epoch seconds) of the candle currently forming on `timeframe`."""
+    secs = TIMEFRAME_SECONDS.get(timeframe, 3600)
+    now = time.time() if now is None else now
+    return int(now // secs * secs)
+
+
+class AICache:
+    """AI responses in a shared Cache (namespace "ai") with per-feature TTLs"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.cache = Cache("ai", ttl=DEFAULT_TTL, max_entries=max_entries)
+        self.lock = threading.Lock()  # guards the per-feature counters
+        self._features: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(feature: str, version: str, model: str, **inputs: Any) -> str:
+        """Stable hash of the structured inputs behind a prompt."""
+        payload = json.dumps(
+            {"feature": feature, "version": version, "model": model, "inputs": inputs},
+            sort_keys=True,
+            default=str,
+            separators=(",", ":"),
+        )
+        return f"{feature}:{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    @staticmethod
+    def _ttl(key: str, ttl: Optional[float]) -> float:
+        if ttl is not None:
+            return ttl
+        return FEATURE_TTLS.get(key.split(":", 1)[0], DEFAULT_TTL)
+
+    def _count(self, key: str, field: str) -> None:
+        with self.lock:
+            stats = self._features.setdefault(key.split(":", 1)[0], {"requests": 0, "llm_calls": 0})
+            stats[field] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached response"""
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache a response for `ttl` seconds (default: the feature's TTL)"""
+        self.cache.set(key, value, ttl=self._ttl(key, ttl))
+
+    async def get_or_create(
+        self,
+        key: str,
+        producer: Callable[[], Awaitable[Optional[Any]]],
+        ttl: Optional[float] = None,
+    ) -> Optional[Any]:
+        """
+        Cached value for `key`, else await `producer()` once — concurrent
+        callers with the same key wait on the same call. None is not cached.
+        """
+        self._count(key, "requests")
+
+        async def _produce() -> Optional[Any]:
+            self._count(key, "llm_calls")
+            return await producer()
+
+        return await self.cache.get_or_load(key, _produce, ttl=self._ttl(key, ttl))
+
+    def clear(self) -> None:
+        """Clear cache"""
+        self.cache.clear()
+        with self.lock:
+            self._features.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        stats = self.cache.get_stats()
+        with self.lock:
+            features = {name: dict(s) for name, s in self._features.items()}
+        return {
+            "entries_cached": stats["entries"],
+            "max_entries": self.max_entries,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "coalesced": stats["coalesced"],
+            "in_flight": stats["in_flight"],
+            "hit_rate_pct": stats["hit_rate_pct"],
+            "features": features,
+        }
+
+
+# Shared instance for every AI feature
+ai_cache = AICache()
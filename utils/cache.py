@@ -0,0 +1,315 @@
+# ----------------------------------------------------------------------------
+# utils/cache.py
+# ----------------------------------------------------------------------------
+"""
+Shared in-memory cache behind every TTL cache in the bot.
+
+    prices = get_cache("prices", ttl=90, max_entries=2000)
+    prices.set("BTC", 64000.0)
+    prices.get("BTC")                               # None once expired
+    value = await prices.get_or_load(key, loader)   # single-flight
+
+Bounds:
+- max_entries: least recently used entries are evicted first
+- max_bytes:   optional, approximate deep size of the stored values
+- ttl:         per cache, overridable per entry (`ttl=` or `expires_at=`)
+
+With `stale_ttl`, an expired entry is kept that much longer and
+get_or_load() keeps serving it while a single background load refreshes
+it (stale-while-revalidate). get() only ever returns fresh values.
+
+The lock guards dictionary operations only and is never held across an
+await, so a cache can be used both from the event loop and from worker
+threads (asyncio.to_thread).
+
+Every cache registers under its namespace; get_all_stats() reports
+hits / misses / evictions for all of them.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+PURGE_INTERVAL = 60  # seconds between sweeps of dead entries on set()
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+def approx_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep size in bytes of plain data (dicts, lists, tuples, scalars)."""
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approx_size(k, _depth + 1) + approx_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            size += approx_size(v, _depth + 1)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "cached_at", "expires_at", "stale_until", "size")
+
+    def __init__(self, value, cached_at, expires_at, stale_until, size):
+        self.value = value
+        self.cached_at = cached_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+
+
+class Cache:
+    """LRU + TTL cache with optional byte bound and async single-flight loads"""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float = 60,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        stale_ttl: float = 0,
+        sizeof: Callable[[Any], int] = approx_size,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, "asyncio.Future"] = {}
+        self._bytes = 0
+        self._last_purge = time.time()
+        self._stats = _new_stats()
+        _register(self)
+
+    # ------------------------------------------------------------------
+    # Sync API
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Fresh value for `key`, else `default`"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now > entry.expires_at:
+                if entry is not None and now > entry.stale_until:
+                    self._drop(key)
+                    self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Store `value` for `ttl` seconds (or until `expires_at`)"""
+        now = time.time()
+        if expires_at is None:
+            expires_at = now + (self.ttl if ttl is None else ttl)
+        size = self._sizeof(value) if self.max_bytes else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes and size > self.max_bytes:
+                self._stats["evictions"] += 1
+                return
+            self._entries[key] = _Entry(value, now, expires_at, expires_at + self.stale_ttl, size)
+            self._bytes += size
+            self._stats["sets"] += 1
+
+            if now - self._last_purge > PURGE_INTERVAL:
+                self._purge(now)
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def get_entry(self, key: Hashable) -> Optional[Dict]:
+        """Value and timestamps for `key` (even if expired), without counting a lookup"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return {
+                "value": entry.value,
+                "cached_at": entry.cached_at,
+                "expires_at": entry.expires_at,
+            }
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove `key`. Returns True if it was cached."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._drop(key)
+            return True
+
+    def clear(self) -> None:
+        """Remove every entry and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._stats = _new_stats()
+
+    def purge_expired(self) -> int:
+        """Drop entries past their stale window. Returns #entries removed."""
+        with self._lock:
+            return self._purge(time.time())
+
+    def keys(self) -> List[Hashable]:
+        """Keys currently held (fresh or stale)"""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Loader,
+        ttl: Optional[float] = None,
+        cache_none: bool = False,
+    ) -> Any:
+        """
+        Cached value for `key`, else `await loader()` once — concurrent
+        callers share the same load. A stale entry is returned immediately
+        while the load runs in the background. None results are not cached
+        unless `cache_none`.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now <= entry.expires_at:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.value
+            stale = entry is not None and now <= entry.stale_until
+            self._stats["stale_hits" if stale else "misses"] += 1
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load(key, loader, ttl, cache_none))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda fut: self._load_done(key, fut))
+        else:
+            self._stats["coalesced"] += 1
+
+        if stale:
+            return entry.value
+        return await asyncio.shield(pending)
+
+    async def _load(self, key, loader, ttl, cache_none) -> Any:
+        self._stats["loads"] += 1
+        value = await loader()
+        if value is not None or cache_none:
+            self.set(key, value, ttl)
+        return value
+
+    def _load_done(self, key, fut: "asyncio.Future") -> None:
+        self._inflight.pop(key, None)
+        if not fut.cancelled() and fut.exception() is not None:
+            # Retrieved here so background refreshes never log "never retrieved"
+            self._stats["load_errors"] += 1
+            print(f"[cache:{self.namespace}] Load failed for {key!r}: {fut.exception()}")
+
+    # ------------------------------------------------------------------
+    # Internals (lock held)
+    # ------------------------------------------------------------------
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _purge(self, now: float) -> int:
+        dead = [k for k, e in self._entries.items() if now > e.stale_until]
+        for key in dead:
+            self._drop(key)
+        self._stats["expired"] += len(dead)
+        self._last_purge = now
+        return len(dead)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+            stats.update({
+                "namespace": self.namespace,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes if self.max_bytes else None,
+                "max_bytes": self.max_bytes,
+                "in_flight": len(self._inflight),
+                "total_requests": lookups,
+                "hit_rate_pct": round(
+                    (stats["hits"] + stats["stale_hits"]) / lookups * 100, 1
+                ) if lookups else 0,
+            })
+            return stats
+
+    def reset_stats(self) -> None:
+        """Reset counters (entries are kept)"""
+        with self._lock:
+            self._stats = _new_stats()
+
+
+def _new_stats() -> Dict[str, int]:
+    return {
+        "hits": 0, "stale_hits": 0, "misses": 0, "sets": 0,
+        "evictions": 0, "expired": 0,
+        "loads": 0, "coalesced": 0, "load_errors": 0,
+    }
+
+
+# ----------------------------------------------------------------------------
+# Namespace registry
+# ----------------------------------------------------------------------------
+
+_registry: Dict[str, Cache] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(cache: Cache) -> None:
+    with _registry_lock:
+        _registry[cache.namespace] = cache
+
+
+def get_cache(namespace: str, **options: Any) -> Cache:
+    """The cache registered as `namespace`, created with `options` if new"""
+    with _registry_lock:
+        cache = _registry.get(namespace)
+    if cache is None:
+        cache = Cache(namespace, **options)
+    return cache
+
+
+def get_all_stats() -> Dict[str, Dict]:
+    """Statistics of every registered cache, by namespace"""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.namespace: cache.get_stats() for cache in caches}
@@ -7,6 +7,8 @@ from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
 
+from utils.cache import get_cache
+
 # 🔑 Load API keys
 load_dotenv()
 TWELVE_API_KEY = os.getenv("TWELVE_DATA_API_KEY")
@@ -16,24 +18,17 @@ TWELVE_BASE_URL = "https://api.twelvedata.com"
 COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
 
 # ----------------------------- In-Memory Cache -----------------------------
-_cache = {}
 CACHE_TTL = 60
+_cache = get_cache("indicators.series", ttl=CACHE_TTL, max_entries=1000)
 
 def get_cache_key(symbol, interval):
     return f"{symbol.upper()}_{interval}"
 
 def get_cached_data(symbol, interval):
-    key = get_cache_key(symbol, interval)
-    entry = _cache.get(key)
-    if entry and (time.time() - entry["timestamp"] < CACHE_TTL):
-        return entry["data"]
-    return None
+    return _cache.get(get_cache_key(symbol, interval))
 
 def set_cache(symbol, interval, data):
-    _cache[get_cache_key(symbol, interval)] = {
-        "data": data,
-        "timestamp": time.time()
-    }
+    _cache.set(get_cache_key(symbol, interval), data)
 
 # ----------------------------- Symbol Mapping -----------------------------
 
@@ -479,9 +474,9 @@ CRYPTOCOMPARE_BASE_URL = "https://min-api.cryptocompare.com"
 if not CRYPTOCOMPARE_API_KEY:
     logger.warning("⚠️ CRYPTOCOMPARE_API_KEY not found in environment variables")
 
-# 🧠 Cache memory (symbol_timeframe → {timestamp, data})
-_volume_cache = {}
+# 🧠 Cache memory (symbol_timeframe → (current, average))
 CACHE_TTL = 120  # seconds (2 minutes cache lifespan)
+_volume_cache = get_cache("indicators.volume", ttl=CACHE_TTL, max_entries=1000)
 
 # Request configuration
 REQUEST_TIMEOUT = 30  # seconds
@@ -525,14 +520,13 @@ async def get_volume_comparison(
         raise ValueError("❌ Symbol cannot be empty after stripping whitespace")
 
     key = f"{symbol.lower()}_{timeframe}"
-    now = time.time()
 
     # ✅ Return cached data if still fresh and caching is enabled
-    if use_cache and key in _volume_cache:
-        cache_entry = _volume_cache[key]
-        if now - cache_entry["timestamp"] < CACHE_TTL:
+    if use_cache:
+        cached = _volume_cache.get(key)
+        if cached is not None:
             logger.debug(f"📦 Returning cached data for {key}")
-            return cache_entry["data"]
+            return cached
 
     # ✅ Supported timeframes (mapped to CryptoCompare intervals)
     tf_map = {
@@ -687,7 +681,7 @@ async def get_volume_comparison(
     result = (round(current_volume, 2), round(average_volume, 2))
 
     # 🧠 Store result in cache
-    _volume_cache[key] = {"timestamp": now, "data": result}
+    _volume_cache.set(key, result)
     logger.info(f"✅ Volume comparison for {symbol} ({timeframe}): current={current_volume:,.2f}, avg={average_volume:,.2f}")
 
     return result
@@ -701,12 +695,9 @@ def clear_cache(symbol: Optional[str] = None, timeframe: Optional[str] = None):
         symbol: Optional symbol to clear
         timeframe: Optional timeframe to clear
     """
-    global _volume_cache
-    
     if symbol and timeframe:
         key = f"{symbol.lower()}_{timeframe.lower()}"
-        if key in _volume_cache:
-            del _volume_cache[key]
+        if _volume_cache.delete(key):
             logger.info(f"🧹 Cleared cache for {key}")
     else:
         _volume_cache.clear()
@@ -720,17 +711,23 @@ def get_cache_stats() -> dict:
     Returns:
         Dictionary with cache statistics
     """
-    now = time.time()  # ✅ Call time() function correctly
-    active_entries = sum(
-        1 for entry in _volume_cache.values()
-        if now - entry["timestamp"] < CACHE_TTL
-    )
+    now = time.time()
+    stats = _volume_cache.get_stats()
+    active_entries = 0
+    for key in _volume_cache.keys():
+        entry = _volume_cache.get_entry(key)
+        if entry and now <= entry["expires_at"]:
+            active_entries += 1
     
     return {
-        "total_entries": len(_volume_cache),
+        "total_entries": stats["entries"],
         "active_entries": active_entries,
-        "stale_entries": len(_volume_cache) - active_entries,
-        "cache_ttl": CACHE_TTL
+        "stale_entries": stats["entries"] - active_entries,
+        "cache_ttl": _volume_cache.ttl,
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "evictions": stats["evictions"],
+        "hit_rate_pct": stats["hit_rate_pct"],
     }
 
 import aiohttp
@@ -742,22 +739,19 @@ load_dotenv()
 
 TWELVE_DATA_API_KEY = os.getenv("TWELVE_DATA_API_KEY")
 
-# Cache dictionary: _cache[symbol][indicator_name] = {"value": ..., "timestamp": ...}
-_indicator_cache = {}
+# Cache: (symbol, indicator_name) → value; concurrent alert checks for
+# the same symbol share one request
 CACHE_TTL = 120  # seconds
-
-
-def is_fresh(entry):
-    return time.time() - entry["timestamp"] < CACHE_TTL
+_indicator_cache = get_cache("indicators.alerts", ttl=CACHE_TTL, max_entries=2000)
 
 
 # === GET RSI ===
 async def get_cached_rsi(symbol):
     symbol = symbol.upper()
-    if symbol in _indicator_cache and "rsi" in _indicator_cache[symbol]:
-        if is_fresh(_indicator_cache[symbol]["rsi"]):
-            return _indicator_cache[symbol]["rsi"]["value"]
+    return await _indicator_cache.get_or_load((symbol, "rsi"), lambda: _fetch_rsi(symbol))
+
 
+async def _fetch_rsi(symbol):
     url = (
         f"https://api.twelvedata.com/rsi?symbol={symbol}/USDT&interval=1h"
         f"&apikey={TWELVE_DATA_API_KEY}&time_period=14"
@@ -766,21 +760,16 @@ async def get_cached_rsi(symbol):
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as resp:
             data = await resp.json()
-            value = float(data.get("values", [{}])[0].get("rsi", 0))
-
-            if symbol not in _indicator_cache:
-                _indicator_cache[symbol] = {}
-            _indicator_cache[symbol]["rsi"] = {"value": value, "timestamp": time.time()}
-            return value
+            return float(data.get("values", [{}])[0].get("rsi", 0))
 
 
 # === GET MACD ===
 async def get_cached_macd(symbol):
     symbol = symbol.upper()
-    if symbol in _indicator_cache and "macd" in _indicator_cache[symbol]:
-        if is_fresh(_indicator_cache[symbol]["macd"]):
-            return _indicator_cache[symbol]["macd"]["value"]
+    return await _indicator_cache.get_or_load((symbol, "macd"), lambda: _fetch_macd(symbol))
 
+
+async def _fetch_macd(symbol):
     url = (
         f"https://api.twelvedata.com/macd?symbol={symbol}/USDT&interval=1h"
         f"&apikey={TWELVE_DATA_API_KEY}&short_period=12&long_period=26&signal_period=9"
@@ -793,25 +782,18 @@ async def get_cached_macd(symbol):
             macd = float(val.get("macd", 0))
             signal = float(val.get("macd_signal", 0))
             hist = float(val.get("macd_histogram", 0))
-
-            if symbol not in _indicator_cache:
-                _indicator_cache[symbol] = {}
-            _indicator_cache[symbol]["macd"] = {
-                "value": (macd, signal, hist),
-                "timestamp": time.time()
-            }
             return macd, signal, hist
 
 
 # === GET EMA ===
 async def get_cached_ema(symbol, period=20):
     symbol = symbol.upper()
-    key = f"ema{period}"
+    return await _indicator_cache.get_or_load(
+        (symbol, f"ema{period}"), lambda: _fetch_ema(symbol, period)
+    )
 
-    if symbol in _indicator_cache and key in _indicator_cache[symbol]:
-        if is_fresh(_indicator_cache[symbol][key]):
-            return _indicator_cache[symbol][key]["value"]
 
+async def _fetch_ema(symbol, period):
     url = (
         f"https://api.twelvedata.com/ema?symbol={symbol}/USDT&interval=1h"
         f"&time_period={period}&apikey={TWELVE_DATA_API_KEY}"
@@ -820,12 +802,4 @@ async def get_cached_ema(symbol, period=20):
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as resp:
             data = await resp.json()
-            ema = float(data.get("values", [{}])[0].get("ema", 0))
-
-            if symbol not in _indicator_cache:
-                _indicator_cache[symbol] = {}
-            _indicator_cache[symbol][key] = {
-                "value": ema,
-                "timestamp": time.time()
-            }
-            return ema
\ No newline at end of file
+            return float(data.get("values", [{}])[0].get("ema", 0))
\ No newline at end of file
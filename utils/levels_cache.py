@@ -3,45 +3,192 @@
 # ----------------------------------------------------------------------------
 """
 Cache for levels analysis (longer TTL than regime)
+
+Entries live in an LRU-bounded utils.cache.Cache (namespace "levels").
+With a `persist_path`, unexpired rows are loaded from SQLite once at
+startup so precomputed levels survive a restart, and new entries are
+queued and written in one transaction by flush() / `await aflush()`
+(once per board refresh, off the event loop). Reads never touch disk.
+Expired rows and rows beyond `max_entries` are pruned every
+PRUNE_INTERVAL seconds during a flush.
 """
 
+import asyncio
+import json
+import os
+import sqlite3
 import time
 import threading
 from typing import Optional, Dict
 
+from utils.cache import Cache
+
+PRUNE_INTERVAL = 600  # seconds between on-disk prunes
+
 
 class LevelsCache:
-    """Simple cache for levels (10 min TTL)"""
-    
-    def __init__(self, ttl_minutes: int = 10):
+    """LRU cache for levels (10 min default TTL, optional SQLite persistence)"""
+
+    def __init__(
+        self,
+        ttl_minutes: int = 10,
+        max_entries: int = 1000,
+        persist_path: Optional[str] = None,
+    ):
         self.ttl_minutes = ttl_minutes
-        self.cache: Dict[str, Dict] = {}
-        self.lock = threading.Lock()
-    
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.cache = Cache("levels", ttl=ttl_minutes * 60, max_entries=max_entries)
+        self.lock = threading.Lock()  # guards _pending and serialises SQLite access
+        self._pending: Dict[str, Dict] = {}
+        self._last_prune = 0.0
+        self._restored = 0
+        self._flushed = 0
+
+        if persist_path:
+            os.makedirs(os.path.dirname(persist_path), exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS levels_cache (
+                        key        TEXT PRIMARY KEY,
+                        result     TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        cached_at  REAL NOT NULL
+                    )
+                    """
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self._restore()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.persist_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        return conn
+
+    def _restore(self) -> None:
+        """Load unexpired rows into memory (startup, before the event loop serves)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT key, result, expires_at FROM levels_cache "
+                "WHERE expires_at > ? ORDER BY cached_at DESC LIMIT ?",
+                (time.time(), self.max_entries),
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"[LevelsCache] Restore failed: {e}")
+            return
+        finally:
+            conn.close()
+
+        # Oldest first, so the most recent rows end up most recently used
+        for key, result, expires_at in reversed(rows):
+            self.cache.set(key, json.loads(result), expires_at=expires_at)
+        self._restored = len(rows)
+
     def get(self, symbol: str, timeframe: str) -> Optional[Dict]:
         """Get cached levels"""
+        key = f"{symbol.upper()}:{timeframe}"
+        result = self.cache.get(key)
+        return result.copy() if result is not None else None
+
+    def set(
+        self,
+        symbol: str,
+        timeframe: str,
+        result: Dict,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Cache levels (until `expires_at`, or for the default TTL); persisted on the next flush"""
+        key = f"{symbol.upper()}:{timeframe}"
+        item = {
+            "result": result.copy(),
+            "expires_at": expires_at or time.time() + (self.ttl_minutes * 60),
+            "cached_at": time.time(),
+        }
+        self.cache.set(key, item["result"], expires_at=item["expires_at"])
+        if self.persist_path:
+            with self.lock:
+                self._pending[key] = item
+
+    def flush(self) -> int:
+        """Write queued entries in one transaction (blocking). Returns #rows written."""
+        if not self.persist_path:
+            return 0
+
         with self.lock:
-            key = f"{symbol}:{timeframe}"
-            if key not in self.cache:
-                return None
-            
-            item = self.cache[key]
-            if time.time() > item["expires_at"]:
-                del self.cache[key]
-                return None
-            
-            return item["result"].copy()
-    
-    def set(self, symbol: str, timeframe: str, result: Dict) -> None:
-        """Cache levels"""
-        with self.lock:
-            key = f"{symbol}:{timeframe}"
-            self.cache[key] = {
-                "result": result.copy(),
-                "expires_at": time.time() + (self.ttl_minutes * 60)
-            }
-    
+            pending, self._pending = self._pending, {}
+            now = time.time()
+            prune = now - self._last_prune > PRUNE_INTERVAL
+            if not pending and not prune:
+                return 0
+
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO levels_cache (key, result, expires_at, cached_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (key, json.dumps(item["result"]), item["expires_at"], item["cached_at"])
+                        for key, item in pending.items()
+                    ],
+                )
+                if prune:
+                    conn.execute("DELETE FROM levels_cache WHERE expires_at < ?", (now,))
+                    # Same size bound on disk: keep the most recently written rows
+                    conn.execute(
+                        "DELETE FROM levels_cache WHERE key NOT IN ("
+                        "SELECT key FROM levels_cache ORDER BY cached_at DESC LIMIT ?)",
+                        (self.max_entries,),
+                    )
+                    self._last_prune = now
+                conn.commit()
+                self._flushed += len(pending)
+            except sqlite3.Error as e:
+                print(f"[LevelsCache] Flush of {len(pending)} entries failed: {e}")
+                # Requeue unless newer values arrived meanwhile
+                for key, item in pending.items():
+                    self._pending.setdefault(key, item)
+                return 0
+            finally:
+                conn.close()
+        return len(pending)
+
+    async def aflush(self) -> int:
+        """flush() in a worker thread"""
+        return await asyncio.to_thread(self.flush)
+
     def clear(self) -> None:
         """Clear cache"""
+        self.cache.clear()
+        with self.lock:
+            self._pending.clear()
+            if self.persist_path:
+                conn = self._connect()
+                try:
+                    conn.execute("DELETE FROM levels_cache")
+                    conn.commit()
+                finally:
+                    conn.close()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        stats = self.cache.get_stats()
         with self.lock:
-            self.cache.clear()
\ No newline at end of file
+            pending = len(self._pending)
+        return {
+            "entries_cached": stats["entries"],
+            "max_entries": self.max_entries,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "evictions": stats["evictions"],
+            "restored_from_disk": self._restored,
+            "pending_writes": pending,
+            "rows_flushed": self._flushed,
+            "total_requests": stats["total_requests"],
+            "hit_rate_pct": stats["hit_rate_pct"],
+        }
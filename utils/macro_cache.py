@@ -6,10 +6,12 @@ Simple cache for macro data (5 minute TTL)
 Macro data doesn't need symbol-specific caching
 """
 
-import time
-import threading
 from typing import Optional, Dict
 
+from utils.cache import Cache
+
+_KEY = "snapshot"
+
 
 class MacroCache:
     """
@@ -20,9 +22,7 @@ class MacroCache:
     def __init__(self, ttl_minutes: int = 5):
         """Initialize cache"""
         self.ttl_minutes = ttl_minutes
-        self.cache: Optional[Dict] = None
-        self.expires_at: float = 0
-        self.lock = threading.Lock()
+        self.cache = Cache("macro", ttl=ttl_minutes * 60, max_entries=1)
     
     def get(self) -> Optional[Dict]:
         """
@@ -31,15 +31,8 @@ class MacroCache:
         Returns:
             Cached snapshot or None if expired/empty
         """
-        with self.lock:
-            if not self.cache:
-                return None
-            
-            if time.time() > self.expires_at:
-                self.cache = None
-                return None
-            
-            return self.cache.copy()
+        snapshot = self.cache.get(_KEY)
+        return snapshot.copy() if snapshot else None
     
     def set(self, snapshot: Dict) -> None:
         """
@@ -48,12 +41,12 @@ class MacroCache:
         Args:
             snapshot: Macro data dictionary
         """
-        with self.lock:
-            self.cache = snapshot.copy()
-            self.expires_at = time.time() + (self.ttl_minutes * 60)
+        self.cache.set(_KEY, snapshot.copy())
     
     def clear(self) -> None:
         """Clear cache"""
-        with self.lock:
-            self.cache = None
-            self.expires_at = 0
+        self.cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        return self.cache.get_stats()
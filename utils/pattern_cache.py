@@ -0,0 +1,277 @@
+# ----------------------------------------------------------------------------
+# utils/pattern_cache.py
+# ----------------------------------------------------------------------------
+"""
+Per-series cache for chart-pattern detection.
+
+The candle window behind /aiscan and /setup only changes when a candle
+closes, so detection results are keyed by (symbol, timeframe, window
+length) and tagged with the last closed candle. Repeat requests inside the
+same candle are cache hits. Callers fetching different window lengths
+(/setup 200 candles, the scanner SCAN_LOOKBACK) get separate entries:
+hits graded on one window are never carried onto another.
+
+When a new candle closes, detectors that declare a `lookback` (the
+per-candle candlestick scanners, see `utils.patterns._incremental`) only
+scan the new candles; their earlier hits are carried forward and re-indexed
+onto the new window. Every other detector judges the latest close against
+the whole structure and is re-run. A carry-forward is only used when it is
+provably identical to a full scan, otherwise the detector runs in full.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.patterns import (
+    Candle,
+    Pattern,
+    PatternContext,
+    _DETECTORS,
+    detect_all_patterns,
+    rank_patterns,
+    run_detector,
+)
+
+TIMEFRAME_SECONDS = {
+    "1m": 60, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "8h": 28800, "1d": 86400,
+}
+
+
+def candle_epoch_seconds(value: Any) -> Optional[float]:
+    """Candle 'datetime' → epoch seconds (Bybit/OKX ms ints, Twelve Data strings)."""
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            try:
+                dt = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.timestamp()
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    return None
+
+
+def closed_candles(
+    candles: List[Candle],
+    timeframe: str,
+    now: Optional[float] = None,
+) -> Tuple[List[Candle], bool]:
+    """
+    Drop the still-forming candle, if the newest one has not closed yet.
+
+    Returns (closed_candles, chronological). Twelve Data returns
+    newest-first, Bybit/OKX (after reversal) oldest-first; both are handled.
+    """
+    if not candles:
+        return [], True
+
+    first = candle_epoch_seconds(candles[0].get("datetime"))
+    last  = candle_epoch_seconds(candles[-1].get("datetime"))
+    chronological = first is None or last is None or last >= first
+
+    newest_ts = last if chronological else first
+    tf_secs   = TIMEFRAME_SECONDS.get(timeframe)
+    now       = time.time() if now is None else now
+
+    if tf_secs and newest_ts is not None and newest_ts + tf_secs > now:
+        return (candles[:-1] if chronological else candles[1:]), chronological
+    return candles, chronological
+
+
+# Columns of the compact array used to ship a series to worker processes
+PACKED_COLUMNS = (
+    "datetime", "open", "high", "low", "close", "volume",
+    "ema20", "ema50", "ema200", "rsi", "macd", "macdSignal", "macdHist",
+)
+
+
+def pack_candles(candles: List[Candle]) -> np.ndarray:
+    """Candle dicts → (n, len(PACKED_COLUMNS)) float64 array; missing values are NaN."""
+    return np.array(
+        [[np.nan if c.get(col) is None else float(c[col]) for col in PACKED_COLUMNS] for c in candles],
+        dtype=np.float64,
+    )
+
+
+def unpack_candles(rows: np.ndarray) -> List[Candle]:
+    """Inverse of pack_candles — NaN goes back to None so indicator warm-up is kept."""
+    candles = []
+    for row in rows.tolist():
+        c = {col: (None if v != v else v) for col, v in zip(PACKED_COLUMNS, row)}
+        c["datetime"] = int(c["datetime"]) if c["datetime"] is not None else None
+        candles.append(c)
+    return candles
+
+
+def detect_packed_patterns(rows: np.ndarray, max_results: int = 8) -> List[Pattern]:
+    """Process-pool entry point: detect_all_patterns() on a packed series."""
+    return detect_all_patterns(unpack_candles(rows), max_results=max_results)
+
+
+class PatternCache:
+    """
+    Detection results per (symbol, timeframe, window length), valid until
+    the next candle close.
+
+    Each entry keeps the per-detector results (before dedupe/ranking), so
+    callers asking for different `max_results` / `min_quality` share it.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.cache: Dict[Tuple[str, str, int], Dict] = {}
+        self._hits = 0
+        self._misses = 0
+        self._incremental = 0
+
+    def detect(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: List[Candle],
+        max_results: int = 8,
+        min_quality: str = "LOW",
+        now: Optional[float] = None,
+    ) -> List[Pattern]:
+        """Cached equivalent of detect_all_patterns() on the closed candles."""
+        closed, chronological = closed_candles(candles, timeframe, now)
+        if len(closed) < 5:
+            return []
+
+        key        = (symbol.upper().strip(), timeframe, len(closed))
+        newest     = closed[-1] if chronological else closed[0]
+        candle_key = newest.get("datetime")
+        entry      = self.cache.get(key)
+
+        if entry and entry["candle_key"] == candle_key:
+            self._hits += 1
+        else:
+            self._misses += 1
+            entry = self._evaluate(closed, chronological, candle_key, entry)
+            self.cache[key] = entry
+            if len(self.cache) > self.max_entries:
+                self._evict_oldest()
+
+        ranked = rank_patterns(entry["found"], max_results=max_results, min_quality=min_quality)
+        return [dict(p) for p in ranked]
+
+    def _evaluate(
+        self,
+        closed: List[Candle],
+        chronological: bool,
+        candle_key: Any,
+        previous: Optional[Dict],
+    ) -> Dict:
+        ctx   = PatternContext(closed)
+        trend = ctx.trend()
+
+        # Where did the previous window end inside this one?
+        first_new = None
+        if previous and chronological and previous["chronological"] and previous["trend"] == trend:
+            for i in range(ctx.n - 1, -1, -1):
+                if closed[i].get("datetime") == previous["candle_key"]:
+                    first_new = i + 1
+                    break
+
+        found: List[List[Pattern]] = []
+        carried_any = False
+        for d, detector in enumerate(_DETECTORS):
+            lookback = getattr(detector, "lookback", None)
+            carried  = None
+            if lookback and first_new is not None:
+                carried = self._carry_forward(
+                    detector, ctx, previous["found"][d],
+                    first_new, previous["n"], lookback,
+                )
+            if carried is None:
+                carried = run_detector(detector, ctx)
+            else:
+                carried_any = True
+            found.append(carried)
+
+        if carried_any:
+            self._incremental += 1
+
+        return {
+            "candle_key":    candle_key,
+            "n":             ctx.n,
+            "chronological": chronological,
+            "trend":         trend,
+            "found":         found,
+            "cached_at":     time.time(),
+        }
+
+    @staticmethod
+    def _carry_forward(
+        detector,
+        ctx: PatternContext,
+        old_hits: List[Pattern],
+        first_new: int,
+        old_n: int,
+        lookback: int,
+    ) -> Optional[List[Pattern]]:
+        """
+        Scan only candles ≥ first_new and merge with the re-indexed old hits.
+
+        Returns None when the merge could differ from a full scan: too few
+        hits to fill the detector's cap, or a needed old hit whose lookback
+        window no longer lies entirely inside the new series.
+        """
+        shift    = old_n - first_new          # candles dropped off the front
+        carried  = [dict(h, index=h["index"] - shift) for h in old_hits]
+        new_hits = run_detector(detector, ctx, since=first_new)
+        merged   = (carried + new_hits)[-detector.keep:]
+
+        if len(merged) < detector.keep:
+            return None
+        if any(h["index"] < lookback - 1 for h in merged):
+            return None
+        return merged
+
+    def _evict_oldest(self) -> None:
+        oldest = min(self.cache, key=lambda k: self.cache[k]["cached_at"])
+        del self.cache[oldest]
+
+    def clear(self) -> None:
+        """Clear cache"""
+        self.cache.clear()
+        self._hits = 0
+        self._misses = 0
+        self._incremental = 0
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        total = self._hits + self._misses
+        return {
+            "series_cached":    len(self.cache),
+            "hits":             self._hits,
+            "misses":           self._misses,
+            "incremental_runs": self._incremental,
+            "total_requests":   total,
+            "hit_rate_pct":     round(self._hits / total * 100, 1) if total else 0,
+        }
+
+
+# Shared instance used by /aiscan and the setup analyzer
+pattern_cache = PatternCache()
+
+
+def detect_all_patterns_cached(
+    symbol: str,
+    timeframe: str,
+    candles: List[Candle],
+    max_results: int = 8,
+    min_quality: str = "LOW",
+) -> List[Pattern]:
+    """detect_all_patterns() on the closed candles, served from `pattern_cache`."""
+    return pattern_cache.detect(
+        symbol, timeframe, candles, max_results=max_results, min_quality=min_quality
+    )
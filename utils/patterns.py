@@ -28,11 +28,16 @@ Return format for every function:
 
 The public helper `detect_all_patterns(candles)` runs every detector and
 returns a deduplicated, quality-sorted list ready for the AI narrative.
+Detectors take either a candle list or a `PatternContext`; the latter carries
+the memoised series/swing/EMA/trend features shared across one scan.
 """
 
-from typing import List, Dict, Any, Tuple, Optional
+from bisect import bisect_left
+from typing import List, Dict, Any, Tuple, Optional, Union
 import math
 
+import numpy as np
+
 # ── Typing alias ──────────────────────────────────────────────────────────────
 Candle  = Dict[str, Any]
 Pattern = Dict[str, Any]
@@ -132,30 +137,19 @@ def _ema(values: List[float], period: int) -> List[float]:
 # ── Volume context ────────────────────────────────────────────────────────────
 
 def _avg_volume(candles: List[Candle], lookback: int = 20) -> float:
-    vols = _volumes(candles)
-    relevant = [v for v in vols[-lookback:] if v > 0]
-    return sum(relevant) / len(relevant) if relevant else 0.0
+    return PatternContext.of(candles).avg_volume(lookback)
 
 
 def _volume_available(candles: List[Candle]) -> bool:
     """CoinGecko OHLC has no volume; Binance/Twelve Data does."""
-    return any(float(c.get("volume", 0)) > 0 for c in candles[-10:])
+    return PatternContext.of(candles).volume_available()
 
 
 # ── Trend context ─────────────────────────────────────────────────────────────
 
 def _trend(candles: List[Candle], lookback: int = 20) -> str:
     """STRONG_UP | UP | RANGING | DOWN | STRONG_DOWN using EMA slope."""
-    closes = _closes(candles)
-    if len(closes) < lookback + 5:
-        return "RANGING"
-    ema20 = _ema(closes, 20)
-    slope = (ema20[-1] - ema20[-lookback]) / (ema20[-lookback] + 1e-9) * 100
-    if slope > 3:   return "STRONG_UP"
-    if slope > 0.5: return "UP"
-    if slope < -3:  return "STRONG_DOWN"
-    if slope < -0.5: return "DOWN"
-    return "RANGING"
+    return PatternContext.of(candles).trend(lookback)
 
 
 # ── Near S/R level ────────────────────────────────────────────────────────────
@@ -179,11 +173,164 @@ def _quality(high_conds: List[bool], med_conds: List[bool]) -> str:
     return "LOW"
 
 
+# ── Shared per-series context ─────────────────────────────────────────────────
+
+_NEAR_LEVEL_WINDOW = 60   # candles scanned for S/R swings by the location filter
+
+
+class PatternContext:
+    """
+    Lazily memoised features of one candle series.
+
+    `detect_all_patterns` builds one context per scan and hands it to every
+    detector, so price series, swing points, EMAs, average volume and the
+    trend label are each derived once instead of once per detector.
+    Detectors still accept a plain candle list and wrap it via `of()`.
+    """
+
+    def __init__(self, candles: List[Candle]):
+        self.candles = candles
+        self.n       = len(candles)
+        self._memo: Dict[Any, Any] = {}
+
+    @classmethod
+    def of(cls, candles: "List[Candle] | PatternContext") -> "PatternContext":
+        return candles if isinstance(candles, cls) else cls(candles)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _memoized(self, key: Any, compute) -> Any:
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    # ── Raw series ────────────────────────────────────────────────────
+
+    def series(self, key: str, default: float = 0.0) -> List[float]:
+        """float(candle[key]) for every candle (missing → default)."""
+        return self._memoized(
+            ("series", key, default),
+            lambda: [float(c.get(key, default)) for c in self.candles],
+        )
+
+    def safe_series(self, key: str, default: float = 0.0) -> List[float]:
+        """Like `series` but None / unparsable values fall back to default (see `_safe`)."""
+        return self._memoized(
+            ("safe_series", key, default),
+            lambda: [_safe(self.candles, key, i, default) for i in range(self.n)],
+        )
+
+    @property
+    def opens(self) -> List[float]:
+        return self.series("open")
+
+    @property
+    def highs(self) -> List[float]:
+        return self.series("high")
+
+    @property
+    def lows(self) -> List[float]:
+        return self.series("low")
+
+    @property
+    def closes(self) -> List[float]:
+        return self.series("close")
+
+    @property
+    def volumes(self) -> List[float]:
+        return self.series("volume")
+
+    def array(self, key: str) -> np.ndarray:
+        """`series(key)` as a float64 NumPy array, for the vectorised detectors."""
+        return self._memoized(("array", key), lambda: np.asarray(self.series(key), dtype=float))
+
+    def tail(self, count: int) -> "PatternContext":
+        """Context over the last `count` candles (memoised)."""
+        if count >= self.n:
+            return self
+        return self._memoized(("tail", count), lambda: PatternContext(self.candles[-count:]))
+
+    # ── Derived features ──────────────────────────────────────────────
+
+    def swing_highs(self, key: str = "high", left: int = 2, right: int = 2) -> List[Tuple[int, float]]:
+        return self._memoized(
+            ("swing_highs", key, left, right),
+            lambda: _swing_highs(self.series(key), left, right),
+        )
+
+    def swing_lows(self, key: str = "low", left: int = 2, right: int = 2) -> List[Tuple[int, float]]:
+        return self._memoized(
+            ("swing_lows", key, left, right),
+            lambda: _swing_lows(self.series(key), left, right),
+        )
+
+    def ema(self, period: int, key: str = "close") -> List[float]:
+        return self._memoized(("ema", key, period), lambda: _ema(self.series(key), period))
+
+    def avg_volume(self, lookback: int = 20) -> float:
+        def compute() -> float:
+            relevant = [v for v in self.volumes[-lookback:] if v > 0]
+            return sum(relevant) / len(relevant) if relevant else 0.0
+        return self._memoized(("avg_volume", lookback), compute)
+
+    def volume_available(self) -> bool:
+        return self._memoized(
+            "volume_available",
+            lambda: any(v > 0 for v in self.volumes[-10:]),
+        )
+
+    def trend(self, lookback: int = 20) -> str:
+        """STRONG_UP | UP | RANGING | DOWN | STRONG_DOWN using EMA slope."""
+        def compute() -> str:
+            if self.n < lookback + 5:
+                return "RANGING"
+            ema20 = self.ema(20)
+            slope = (ema20[-1] - ema20[-lookback]) / (ema20[-lookback] + 1e-9) * 100
+            if slope > 3:    return "STRONG_UP"
+            if slope > 0.5:  return "UP"
+            if slope < -3:   return "STRONG_DOWN"
+            if slope < -0.5: return "DOWN"
+            return "RANGING"
+        return self._memoized(("trend", lookback), compute)
+
+    def near_level(self, price: float, end: int, pct: float = 0.015) -> bool:
+        """
+        Same answer as `_near_level(price, candles[:end], pct)`.
+
+        A 2/2 swing inside the trailing window candles[end-60:end] is exactly
+        a full-series swing whose index lies in [start+2, end-2), so the
+        full-series swing lists are computed once and range-sliced per call.
+        """
+        start = max(0, end - _NEAR_LEVEL_WINDOW)
+        lo, hi = start + 2, end - 2
+        if hi <= lo:
+            return False
+        for swings, idx in (
+            (self.swing_highs("high"), self._swing_index("high")),
+            (self.swing_lows("low"),   self._swing_index("low")),
+        ):
+            for k in range(bisect_left(idx, lo), bisect_left(idx, hi)):
+                lvl = swings[k][1]
+                if abs(price - lvl) / (lvl + 1e-9) < pct:
+                    return True
+        return False
+
+    def _swing_index(self, key: str) -> List[int]:
+        def compute() -> List[int]:
+            swings = self.swing_highs("high") if key == "high" else self.swing_lows("low")
+            return [i for i, _ in swings]
+        return self._memoized(("swing_index", key), compute)
+
+
+Candles = Union[List[Candle], PatternContext]
+
+
 # ============================================================================
 # CATEGORY A — CONTINUATION PATTERNS
 # ============================================================================
 
-def detect_flags_pennants(candles: List[Candle]) -> List[Pattern]:
+def detect_flags_pennants(candles: Candles) -> List[Pattern]:
     """
     Bull/Bear Flags and Pennants.
     Requires:
@@ -192,14 +339,15 @@ def detect_flags_pennants(candles: List[Candle]) -> List[Pattern]:
       - Breakout in pole direction
     """
     results = []
-    if len(candles) < 20:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 20:
         return results
 
-    closes = _closes(candles)
-    highs  = _highs(candles)
-    lows   = _lows(candles)
+    closes = ctx.closes
+    highs  = ctx.highs
+    lows   = ctx.lows
 
-    for pole_end in range(10, len(candles) - 3):
+    for pole_end in range(10, ctx.n - 3):
         # ── Find pole ────────────────────────────────────────────────
         for pole_len in range(4, 10):
             pole_start = pole_end - pole_len
@@ -215,7 +363,7 @@ def detect_flags_pennants(candles: List[Candle]) -> List[Pattern]:
 
             # ── Find consolidation channel after pole ────────────────
             consol_start = pole_end
-            consol_end   = min(pole_end + 12, len(candles) - 1)
+            consol_end   = min(pole_end + 12, ctx.n - 1)
 
             if consol_end <= consol_start + 3:
                 continue
@@ -250,7 +398,7 @@ def detect_flags_pennants(candles: List[Candle]) -> List[Pattern]:
                         f"{ptype} breakout above {_fmt(channel_top)} "
                         f"after {abs(pole_move):.1f}% pole"
                     ),
-                    index=len(candles) - 1,
+                    index=ctx.n - 1,
                 ))
 
             elif is_bear_pole and last_c < channel_bot * 0.998:
@@ -265,27 +413,26 @@ def detect_flags_pennants(candles: List[Candle]) -> List[Pattern]:
                         f"{ptype} breakdown below {_fmt(channel_bot)} "
                         f"after {abs(pole_move):.1f}% pole"
                     ),
-                    index=len(candles) - 1,
+                    index=ctx.n - 1,
                 ))
 
     return results[:2]   # cap at 2 to avoid duplicates from overlapping windows
 
 
-def detect_triangles(candles: List[Candle]) -> List[Pattern]:
+def detect_triangles(candles: Candles) -> List[Pattern]:
     """
     Ascending, Descending, and Symmetrical Triangles.
     Requires ≥ 3 swing points on each trendline, convergence confirmed.
     """
     results = []
-    if len(candles) < 30:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 30:
         return results
 
-    highs  = _highs(candles)
-    lows   = _lows(candles)
-    closes = _closes(candles)
+    closes = ctx.closes
 
-    sh = _swing_highs(highs, left=3, right=3)
-    sl = _swing_lows(lows,   left=3, right=3)
+    sh = ctx.swing_highs("high", left=3, right=3)
+    sl = ctx.swing_lows("low",   left=3, right=3)
 
     if len(sh) < 2 or len(sl) < 2:
         return results
@@ -300,7 +447,7 @@ def detect_triangles(candles: List[Candle]) -> List[Pattern]:
     lo_slope = (sl[-1][1] - sl[0][1]) / (sl[-1][0] - sl[0][0] + 1e-9)
 
     last     = closes[-1]
-    last_idx = len(candles) - 1
+    last_idx = ctx.n - 1
 
     # Project trendlines to current candle
     upper_now = sh[-1][1] + hi_slope * (last_idx - sh[-1][0])
@@ -351,22 +498,21 @@ def detect_triangles(candles: List[Candle]) -> List[Pattern]:
     return results
 
 
-def detect_rectangles(candles: List[Candle]) -> List[Pattern]:
+def detect_rectangles(candles: Candles) -> List[Pattern]:
     """
     Rectangle / range consolidation with breakout.
     Requires ≥ 2 touches on both top and bottom within 1.5% band.
     """
     results = []
-    if len(candles) < 20:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 20:
         return results
 
-    recent = candles[-40:]
-    highs  = _highs(recent)
-    lows   = _lows(recent)
-    closes = _closes(recent)
+    recent = ctx.tail(40)
+    closes = recent.closes
 
-    sh = _swing_highs(highs, left=2, right=2)
-    sl = _swing_lows(lows,   left=2, right=2)
+    sh = recent.swing_highs("high", left=2, right=2)
+    sl = recent.swing_lows("low",   left=2, right=2)
 
     if len(sh) < 2 or len(sl) < 2:
         return results
@@ -389,7 +535,7 @@ def detect_rectangles(candles: List[Candle]) -> List[Pattern]:
                 f"Range breakout above {_fmt(resistance)} "
                 f"(range {band_pct*100:.1f}%)"
             ),
-            index=len(candles) - 1,
+            index=ctx.n - 1,
         ))
     elif last < support * 0.998:
         q = _quality([len(sl) >= 3, band_pct < 0.04], [len(sl) >= 2, band_pct < 0.07])
@@ -399,23 +545,24 @@ def detect_rectangles(candles: List[Candle]) -> List[Pattern]:
                 f"Range breakdown below {_fmt(support)} "
                 f"(range {band_pct*100:.1f}%)"
             ),
-            index=len(candles) - 1,
+            index=ctx.n - 1,
         ))
 
     return results
 
 
-def detect_cup_and_handle(candles: List[Candle]) -> List[Pattern]:
+def detect_cup_and_handle(candles: Candles) -> List[Pattern]:
     """
     Cup and Handle (bullish continuation).
     Looks for U-shaped base followed by small pullback, then breakout.
     Minimum 20 candles for the cup.
     """
     results = []
-    if len(candles) < 35:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 35:
         return results
 
-    closes = _closes(candles)
+    closes = ctx.closes
     n      = len(closes)
 
     for cup_len in range(20, min(60, n - 10)):
@@ -467,22 +614,21 @@ def detect_cup_and_handle(candles: List[Candle]) -> List[Pattern]:
 # CATEGORY B — REVERSAL PATTERNS
 # ============================================================================
 
-def detect_head_and_shoulders(candles: List[Candle]) -> List[Pattern]:
+def detect_head_and_shoulders(candles: Candles) -> List[Pattern]:
     """
     Head & Shoulders (bearish reversal) and
     Inverse H&S (bullish reversal).
     Requires clear left shoulder, head, right shoulder with neckline break.
     """
     results = []
-    if len(candles) < 30:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 30:
         return results
 
-    highs  = _highs(candles)
-    lows   = _lows(candles)
-    closes = _closes(candles)
+    closes = ctx.closes
 
-    sh = _swing_highs(highs, left=3, right=3)
-    sl = _swing_lows(lows,   left=3, right=3)
+    sh = ctx.swing_highs("high", left=3, right=3)
+    sl = ctx.swing_lows("low",   left=3, right=3)
 
     # ── H&S (bearish) ────────────────────────────────────────────────
     if len(sh) >= 3:
@@ -502,7 +648,7 @@ def detect_head_and_shoulders(candles: List[Candle]) -> List[Pattern]:
                 continue
 
             # Neckline: connect troughs between ls-hd and hd-rs
-            mid_troughs = [sl for sl in _swing_lows(lows, 2, 2)
+            mid_troughs = [sl for sl in ctx.swing_lows("low", 2, 2)
                            if ls_i < sl[0] < rs_i]
             if len(mid_troughs) < 1:
                 continue
@@ -519,7 +665,7 @@ def detect_head_and_shoulders(candles: List[Candle]) -> List[Pattern]:
                         f"H&S neckline break below {_fmt(neckline)} "
                         f"(head {_fmt(hd_v)})"
                     ),
-                    index=len(candles) - 1,
+                    index=ctx.n - 1,
                 ))
 
     # ── Inverse H&S (bullish) ─────────────────────────────────────────
@@ -536,7 +682,7 @@ def detect_head_and_shoulders(candles: List[Candle]) -> List[Pattern]:
             if rs_i <= hd_i:
                 continue
 
-            mid_peaks = [sp for sp in _swing_highs(highs, 2, 2)
+            mid_peaks = [sp for sp in ctx.swing_highs("high", 2, 2)
                          if ls_i < sp[0] < rs_i]
             if not mid_peaks:
                 continue
@@ -553,29 +699,28 @@ def detect_head_and_shoulders(candles: List[Candle]) -> List[Pattern]:
                         f"Inverse H&S neckline break above {_fmt(neckline)} "
                         f"(head {_fmt(hd_v)})"
                     ),
-                    index=len(candles) - 1,
+                    index=ctx.n - 1,
                 ))
 
     return results[:2]
 
 
-def detect_double_top_bottom(candles: List[Candle]) -> List[Pattern]:
+def detect_double_top_bottom(candles: Candles) -> List[Pattern]:
     """
     Double Top (bearish) and Double Bottom (bullish).
     Peaks/troughs must be within 2%, ≥ 5 candles apart, with neckline break.
     Also detects Triple Top/Bottom when 3 touches are found.
     """
     results = []
-    if len(candles) < 20:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 20:
         return results
 
-    highs  = _highs(candles)
-    lows   = _lows(candles)
-    closes = _closes(candles)
-    n      = len(candles)
+    closes = ctx.closes
+    n      = ctx.n
 
-    sh = _swing_highs(highs, left=3, right=3)
-    sl = _swing_lows(lows,   left=3, right=3)
+    sh = ctx.swing_highs("high", left=3, right=3)
+    sl = ctx.swing_lows("low",   left=3, right=3)
 
     # ── Double / Triple TOP ────────────────────────────────────────────
     for i in range(len(sh) - 1):
@@ -657,21 +802,20 @@ def detect_double_top_bottom(candles: List[Candle]) -> List[Pattern]:
     return results[:3]
 
 
-def detect_wedges(candles: List[Candle]) -> List[Pattern]:
+def detect_wedges(candles: Candles) -> List[Pattern]:
     """
     Rising Wedge (bearish) and Falling Wedge (bullish).
     Both trendlines slope the same direction but converge.
     """
     results = []
-    if len(candles) < 20:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 20:
         return results
 
-    highs  = _highs(candles)
-    lows   = _lows(candles)
-    closes = _closes(candles)
+    closes = ctx.closes
 
-    sh = _swing_highs(highs, left=2, right=2)[-4:]
-    sl = _swing_lows(lows,   left=2, right=2)[-4:]
+    sh = ctx.swing_highs("high", left=2, right=2)[-4:]
+    sl = ctx.swing_lows("low",   left=2, right=2)[-4:]
 
     if len(sh) < 2 or len(sl) < 2:
         return results
@@ -692,7 +836,7 @@ def detect_wedges(candles: List[Candle]) -> List[Pattern]:
     if not converging:
         return results
 
-    n         = len(candles)
+    n         = ctx.n
     upper_now = sh[-1][1] + hi_slope * (n - 1 - sh[-1][0])
     lower_now = sl[-1][1] + lo_slope * (n - 1 - sl[-1][0])
     last      = closes[-1]
@@ -717,16 +861,17 @@ def detect_wedges(candles: List[Candle]) -> List[Pattern]:
     return results
 
 
-def detect_rounding_bottom(candles: List[Candle]) -> List[Pattern]:
+def detect_rounding_bottom(candles: Candles) -> List[Pattern]:
     """
     Rounding Bottom (Saucer) — gradual U-shaped base.
     Splits recent candles into three thirds and checks for the characteristic shape.
     """
     results = []
-    if len(candles) < 30:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 30:
         return results
 
-    closes = _closes(candles[-60:])
+    closes = ctx.tail(60).closes
     n      = len(closes)
     third  = n // 3
 
@@ -752,7 +897,7 @@ def detect_rounding_bottom(candles: List[Candle]) -> List[Pattern]:
                 f"Rounding Bottom saucer ({bowl_depth*100:.0f}% depth), "
                 f"price reclaiming {_fmt(left_avg)}"
             ),
-            index=len(candles) - 1,
+            index=ctx.n - 1,
         ))
 
     return results
@@ -761,56 +906,108 @@ def detect_rounding_bottom(candles: List[Candle]) -> List[Pattern]:
 # ============================================================================
 # CATEGORY C — CANDLESTICK PATTERNS (context-filtered)
 # ============================================================================
+#
+# Candle-shape conditions are evaluated as NumPy boolean masks over the whole
+# series; only the handful of matches that survive the per-detector cap are
+# turned into Pattern dicts (and only those pay for the S/R location test).
+# Position k in the shifted arrays below corresponds to candle index k + 2,
+# matching the `range(2, n)` scan of the original per-candle loops.
+#
+# These detectors are also incremental (see `_incremental`): `since` limits
+# the scan to candles from that index on, so a cache can carry earlier hits
+# forward and only evaluate the newly closed candles.
+
+def _incremental(lookback: int, keep: int):
+    """
+    Declare a per-candle detector as incrementally evaluable.
 
-def detect_engulfing_patterns(candles: List[Candle]) -> List[Pattern]:
+    lookback — candles ending at a hit's index that its detection and
+               quality grading read (besides the series-wide trend label)
+    keep     — how many of the most recent hits the detector returns
+    """
+    def mark(detector):
+        detector.lookback = lookback
+        detector.keep     = keep
+        return detector
+    return mark
+
+
+def _last_hits(mask: np.ndarray, limit: int, since: int = 2) -> List[int]:
+    """Candle indices of the last `limit` True positions (index ≥ since) of a k → k+2 mask."""
+    start = max(since, 2)
+    hits  = np.flatnonzero(mask[start - 2:])[-limit:] + start
+    return [int(i) for i in hits]
+
+
+@_incremental(lookback=_NEAR_LEVEL_WINDOW + 1, keep=3)
+def detect_engulfing_patterns(candles: Candles, since: int = 2) -> List[Pattern]:
     """
     Bullish and Bearish Engulfing.
     Only fired when pattern occurs near a swing S/R level.
     """
     results = []
-    if len(candles) < 5:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 5:
         return results
 
-    closes = _closes(candles)
-    trend  = _trend(candles)
+    o, c  = ctx.array("open"), ctx.array("close")
+    po, pc = o[1:-1], c[1:-1]
+    co, cc = o[2:],   c[2:]
+    trend  = ctx.trend()
 
-    for i in range(2, len(candles)):
-        prev = candles[i - 1]
-        curr = candles[i]
-        po, pc = float(prev["open"]), float(prev["close"])
-        co, cc = float(curr["open"]), float(curr["close"])
+    body_prev = np.abs(pc - po)
+    body_curr = np.abs(cc - co)
+    sized     = (body_prev >= 0.001) & (body_curr >= body_prev)
 
-        body_prev = abs(pc - po)
-        body_curr = abs(cc - co)
-        if body_prev < 0.001 or body_curr < body_prev:
-            continue
+    # Bullish: prev bearish, curr bullish, fully engulfs — bearish is the mirror
+    bull = sized & (pc < po) & (cc > co) & (cc > po) & (co < pc)
+    bear = sized & ~bull & (pc > po) & (cc < co) & (co > pc) & (cc < po)
 
-        at_level = _near_level(cc, candles[:i], pct=0.02)
+    for i in _last_hits(bull | bear, 3, since):   # Last 3 occurrences
+        close    = float(c[i])
+        at_level = ctx.near_level(close, i, pct=0.02)
 
-        # Bullish Engulfing: prev bearish, curr bullish, fully engulfs
-        if pc < po and cc > co and cc > po and co < pc:
+        if bull[i - 2]:
             in_downtrend = trend in ("DOWN", "STRONG_DOWN", "RANGING")
             q = _quality([in_downtrend, at_level], [in_downtrend or at_level])
             results.append(_pattern(
                 name="Bullish Engulfing", emoji="🟢", direction="BULLISH", quality=q,
-                description=f"Bullish Engulfing at {_fmt(cc)}",
+                description=f"Bullish Engulfing at {_fmt(close)}",
                 index=i,
             ))
-
-        # Bearish Engulfing: prev bullish, curr bearish, fully engulfs
-        elif pc > po and cc < co and co > pc and cc < po:
+        else:
             in_uptrend = trend in ("UP", "STRONG_UP", "RANGING")
             q = _quality([in_uptrend, at_level], [in_uptrend or at_level])
             results.append(_pattern(
                 name="Bearish Engulfing", emoji="🔴", direction="BEARISH", quality=q,
-                description=f"Bearish Engulfing at {_fmt(cc)}",
+                description=f"Bearish Engulfing at {_fmt(close)}",
                 index=i,
             ))
 
-    return results[-3:]   # Last 3 occurrences
+    return results
 
 
-def detect_hammer_patterns(candles: List[Candle]) -> List[Pattern]:
+def _shape_arrays(ctx: "PatternContext") -> Dict[str, np.ndarray]:
+    """Body / range / shadow arrays for candles 2..n-1, shared by single-candle detectors."""
+    def compute() -> Dict[str, np.ndarray]:
+        o, h = ctx.array("open")[2:], ctx.array("high")[2:]
+        l, c = ctx.array("low")[2:],  ctx.array("close")[2:]
+        body  = np.abs(c - o)
+        total = h - l
+        ranged = total >= 1e-9
+        ratio  = np.divide(body, total, out=np.full(body.shape, np.inf), where=ranged)
+        return {
+            "body":  body,
+            "total": total,
+            "ratio": ratio,   # body / total, +inf where the candle has no range
+            "lower": np.minimum(o, c) - l,
+            "upper": h - np.maximum(o, c),
+        }
+    return ctx._memoized("candle_shape", compute)
+
+
+@_incremental(lookback=_NEAR_LEVEL_WINDOW + 1, keep=3)
+def detect_hammer_patterns(candles: Candles, since: int = 2) -> List[Pattern]:
     """
     Hammer, Inverted Hammer, Shooting Star, Hanging Man.
     All require:
@@ -819,25 +1016,26 @@ def detect_hammer_patterns(candles: List[Candle]) -> List[Pattern]:
       - Occurrence near S/R level
     """
     results = []
-    if len(candles) < 5:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 5:
         return results
 
-    trend = _trend(candles)
+    shape = _shape_arrays(ctx)
+    body, lower, upper = shape["body"], shape["lower"], shape["upper"]
+    closes = ctx.closes
+    trend  = ctx.trend()
 
-    for i in range(2, len(candles)):
-        c    = candles[i]
-        o, h, l, cl = float(c["open"]), float(c["high"]), float(c["low"]), float(c["close"])
-        body  = abs(cl - o)
-        total = h - l
-        if total < 1e-9 or body / total > 0.4:
-            continue
+    small_body = shape["ratio"] <= 0.4
+    # Hammer: long lower shadow, small upper shadow — star is the mirror
+    hammer = small_body & (lower >= 2 * body) & (upper < body)
+    star   = small_body & ~hammer & (upper >= 2 * body) & (lower < body)
 
-        lower_shadow = min(o, cl) - l
-        upper_shadow = h - max(o, cl)
-        at_level     = _near_level(cl, candles[:i], pct=0.02)
+    for i in _last_hits(hammer | star, 3, since):
+        k  = i - 2
+        cl = closes[i]
+        at_level = ctx.near_level(cl, i, pct=0.02)
 
-        # Hammer: long lower shadow, small upper shadow (bullish at support)
-        if lower_shadow >= 2 * body and upper_shadow < body:
+        if hammer[k]:
             in_down = trend in ("DOWN", "STRONG_DOWN")
             q = _quality([in_down, at_level], [in_down or at_level])
             name = "Hammer" if in_down else "Hanging Man"
@@ -845,12 +1043,10 @@ def detect_hammer_patterns(candles: List[Candle]) -> List[Pattern]:
             emoji     = "🔨" if in_down else "🪝"
             results.append(_pattern(
                 name=name, emoji=emoji, direction=direction, quality=q,
-                description=f"{name} at {_fmt(cl)} (lower shadow {lower_shadow/body:.1f}× body)",
+                description=f"{name} at {_fmt(cl)} (lower shadow {float(lower[k] / body[k]):.1f}× body)",
                 index=i,
             ))
-
-        # Shooting Star / Inverted Hammer: long upper shadow, small lower shadow
-        elif upper_shadow >= 2 * body and lower_shadow < body:
+        else:
             in_up = trend in ("UP", "STRONG_UP")
             q = _quality([in_up, at_level], [in_up or at_level])
             name = "Shooting Star" if in_up else "Inverted Hammer"
@@ -858,45 +1054,44 @@ def detect_hammer_patterns(candles: List[Candle]) -> List[Pattern]:
             emoji     = "💫" if in_up else "⬆️"
             results.append(_pattern(
                 name=name, emoji=emoji, direction=direction, quality=q,
-                description=f"{name} at {_fmt(cl)} (upper shadow {upper_shadow/body:.1f}× body)",
+                description=f"{name} at {_fmt(cl)} (upper shadow {float(upper[k] / body[k]):.1f}× body)",
                 index=i,
             ))
 
-    return results[-3:]
+    return results
 
 
-def detect_doji_patterns(candles: List[Candle]) -> List[Pattern]:
+@_incremental(lookback=_NEAR_LEVEL_WINDOW + 1, keep=2)
+def detect_doji_patterns(candles: Candles, since: int = 2) -> List[Pattern]:
     """
     Standard Doji, Gravestone Doji, Dragonfly Doji.
     Body must be ≤ 5% of total range.
     Only meaningful at extremes (near S/R or after strong move).
     """
     results = []
-    if len(candles) < 5:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 5:
         return results
 
-    trend = _trend(candles)
+    shape = _shape_arrays(ctx)
+    total, lower, upper = shape["total"], shape["lower"], shape["upper"]
+    closes = ctx.closes
+    trend  = ctx.trend()
 
-    for i in range(2, len(candles)):
-        c    = candles[i]
-        o, h, l, cl = float(c["open"]), float(c["high"]), float(c["low"]), float(c["close"])
-        body  = abs(cl - o)
-        total = h - l
-        if total < 1e-9:
-            continue
-        if body / total > 0.05:    # Must be very small body
-            continue
-
-        lower_shadow = min(o, cl) - l
-        upper_shadow = h - max(o, cl)
-        at_level     = _near_level(cl, candles[:i], pct=0.02)
+    doji = shape["ratio"] <= 0.05    # Must be very small body
 
-        if not at_level:
+    # Walk matches newest-first: only the last 2 located dojis are kept, so
+    # the location test stops as soon as those are found.
+    start = max(since, 2)
+    for k in (np.flatnonzero(doji[start - 2:]) + (start - 2))[::-1]:
+        i  = int(k) + 2
+        cl = closes[i]
+        if not ctx.near_level(cl, i, pct=0.02):
             continue   # Doji without location context is noise
 
         # Gravestone: almost no lower shadow (bearish)
-        if upper_shadow > total * 0.6 and lower_shadow < total * 0.1:
-            q = _quality([trend in ("UP", "STRONG_UP"), at_level], [at_level])
+        if upper[k] > total[k] * 0.6 and lower[k] < total[k] * 0.1:
+            q = _quality([trend in ("UP", "STRONG_UP"), True], [True])
             results.append(_pattern(
                 name="Gravestone Doji", emoji="🪦", direction="BEARISH", quality=q,
                 description=f"Gravestone Doji at {_fmt(cl)} — exhaustion signal",
@@ -904,8 +1099,8 @@ def detect_doji_patterns(candles: List[Candle]) -> List[Pattern]:
             ))
 
         # Dragonfly: almost no upper shadow (bullish)
-        elif lower_shadow > total * 0.6 and upper_shadow < total * 0.1:
-            q = _quality([trend in ("DOWN", "STRONG_DOWN"), at_level], [at_level])
+        elif lower[k] > total[k] * 0.6 and upper[k] < total[k] * 0.1:
+            q = _quality([trend in ("DOWN", "STRONG_DOWN"), True], [True])
             results.append(_pattern(
                 name="Dragonfly Doji", emoji="🪁", direction="BULLISH", quality=q,
                 description=f"Dragonfly Doji at {_fmt(cl)} — rejection of lows",
@@ -920,144 +1115,142 @@ def detect_doji_patterns(candles: List[Candle]) -> List[Pattern]:
                 index=i,
             ))
 
-    return results[-2:]
+        if len(results) == 2:
+            break
+
+    return results[::-1]
 
 
-def detect_star_patterns(candles: List[Candle]) -> List[Pattern]:
+@_incremental(lookback=_NEAR_LEVEL_WINDOW + 1, keep=2)
+def detect_star_patterns(candles: Candles, since: int = 2) -> List[Pattern]:
     """
     Morning Star (bullish 3-candle reversal) and
     Evening Star (bearish 3-candle reversal).
     """
     results = []
-    if len(candles) < 5:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 5:
         return results
 
-    trend = _trend(candles)
+    o, c = ctx.array("open"), ctx.array("close")
+    o1, c1 = o[:-2],  c[:-2]
+    o2, c2 = o[1:-1], c[1:-1]   # Star candle (small body)
+    o3, c3 = o[2:],   c[2:]
+    trend  = ctx.trend()
 
-    for i in range(2, len(candles)):
-        c1 = candles[i - 2]
-        c2 = candles[i - 1]   # Star candle (small body)
-        c3 = candles[i]
+    body1 = np.abs(c1 - o1)
+    body2 = np.abs(c2 - o2)
+    body3 = np.abs(c3 - o3)
 
-        o1, c1v = float(c1["open"]), float(c1["close"])
-        o2, c2v = float(c2["open"]), float(c2["close"])
-        o3, c3v = float(c3["open"]), float(c3["close"])
+    # Star body must be small relative to candle 1
+    base = (body1 >= 1e-9) & (body3 >= 1e-9) & (body2 <= body1 * 0.3)
+    mid1 = (o1 + c1) / 2
 
-        body1 = abs(c1v - o1)
-        body2 = abs(c2v - o2)
-        body3 = abs(c3v - o3)
+    # Morning Star: c1 bearish, c2 small, c3 bullish closing above c1 midpoint
+    morning = base & (c1 < o1) & (c3 > o3) & (c3 > mid1)
+    # Evening Star: c1 bullish, c2 small, c3 bearish closing below c1 midpoint
+    evening = base & (c1 > o1) & (c3 < o3) & (c3 < mid1)
 
-        if body1 < 1e-9 or body3 < 1e-9:
-            continue
-
-        # Star body must be small relative to candle 1
-        if body2 > body1 * 0.3:
-            continue
-
-        at_level = _near_level(c3v, candles[:i], pct=0.025)
-
-        # Morning Star: c1 bearish, c2 small (gap down), c3 bullish
-        if c1v < o1 and c3v > o3:
-            # c3 must close above midpoint of c1
-            if c3v > (o1 + c1v) / 2:
-                in_down = trend in ("DOWN", "STRONG_DOWN")
-                q = _quality([in_down, at_level], [in_down or at_level])
-                results.append(_pattern(
-                    name="Morning Star", emoji="🌅", direction="BULLISH", quality=q,
-                    description=f"Morning Star reversal at {_fmt(c3v)}",
-                    index=i,
-                ))
+    for i in _last_hits(morning | evening, 2, since):
+        close    = float(c[i])
+        at_level = ctx.near_level(close, i, pct=0.025)
 
-        # Evening Star: c1 bullish, c2 small (gap up), c3 bearish
-        elif c1v > o1 and c3v < o3:
-            if c3v < (o1 + c1v) / 2:
-                in_up = trend in ("UP", "STRONG_UP")
-                q = _quality([in_up, at_level], [in_up or at_level])
-                results.append(_pattern(
-                    name="Evening Star", emoji="🌆", direction="BEARISH", quality=q,
-                    description=f"Evening Star reversal at {_fmt(c3v)}",
-                    index=i,
-                ))
+        if morning[i - 2]:
+            in_down = trend in ("DOWN", "STRONG_DOWN")
+            q = _quality([in_down, at_level], [in_down or at_level])
+            results.append(_pattern(
+                name="Morning Star", emoji="🌅", direction="BULLISH", quality=q,
+                description=f"Morning Star reversal at {_fmt(close)}",
+                index=i,
+            ))
+        else:
+            in_up = trend in ("UP", "STRONG_UP")
+            q = _quality([in_up, at_level], [in_up or at_level])
+            results.append(_pattern(
+                name="Evening Star", emoji="🌆", direction="BEARISH", quality=q,
+                description=f"Evening Star reversal at {_fmt(close)}",
+                index=i,
+            ))
 
-    return results[-2:]
+    return results
 
 
-def detect_three_candle_patterns(candles: List[Candle]) -> List[Pattern]:
+@_incremental(lookback=3, keep=2)
+def detect_three_candle_patterns(candles: Candles, since: int = 2) -> List[Pattern]:
     """
     Three White Soldiers (bullish) and Three Black Crows (bearish).
     Requires 3 consecutive strong same-direction candles, each closing near high/low.
     """
     results = []
-    if len(candles) < 5:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 5:
         return results
 
-    trend = _trend(candles)
+    o, h = ctx.array("open"), ctx.array("high")
+    l, c = ctx.array("low"),  ctx.array("close")
+    trend = ctx.trend()
 
-    for i in range(2, len(candles)):
-        c1, c2, c3 = candles[i-2], candles[i-1], candles[i]
-        opens  = [float(c["open"])  for c in [c1, c2, c3]]
-        closes = [float(c["close"]) for c in [c1, c2, c3]]
-        highs  = [float(c["high"])  for c in [c1, c2, c3]]
-        lows   = [float(c["low"])   for c in [c1, c2, c3]]
+    def window(a: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return a[:-2], a[1:-1], a[2:]
 
-        bodies = [abs(closes[j] - opens[j]) for j in range(3)]
-        if any(b < 1e-9 for b in bodies):
-            continue
+    opens, closes = window(o), window(c)
+    highs, lows   = window(h), window(l)
+    bodies = [np.abs(closes[j] - opens[j]) for j in range(3)]
+    sized  = (bodies[0] >= 1e-9) & (bodies[1] >= 1e-9) & (bodies[2] >= 1e-9)
 
-        # Three White Soldiers: 3 bullish candles, each closing near high
-        if all(closes[j] > opens[j] for j in range(3)):
-            if closes[1] > closes[0] and closes[2] > closes[1]:
-                upper_wicks = [highs[j] - closes[j] for j in range(3)]
-                small_wicks = all(upper_wicks[j] < bodies[j] * 0.3 for j in range(3))
-                if small_wicks:
-                    q = _quality([small_wicks, trend in ("UP", "RANGING")], [True])
-                    results.append(_pattern(
-                        name="Three White Soldiers", emoji="💂", direction="BULLISH", quality=q,
-                        description=f"Three White Soldiers — strong bullish momentum at {_fmt(closes[2])}",
-                        index=i,
-                    ))
+    # Three White Soldiers: 3 rising bullish candles, each closing near high
+    soldiers = sized & (closes[1] > closes[0]) & (closes[2] > closes[1])
+    for j in range(3):
+        soldiers &= (closes[j] > opens[j]) & (highs[j] - closes[j] < bodies[j] * 0.3)
 
-        # Three Black Crows: 3 bearish candles, each closing near low
-        elif all(closes[j] < opens[j] for j in range(3)):
-            if closes[1] < closes[0] and closes[2] < closes[1]:
-                lower_wicks = [closes[j] - lows[j] for j in range(3)]
-                small_wicks = all(lower_wicks[j] < bodies[j] * 0.3 for j in range(3))
-                if small_wicks:
-                    q = _quality([small_wicks, trend in ("DOWN", "RANGING")], [True])
-                    results.append(_pattern(
-                        name="Three Black Crows", emoji="🦅", direction="BEARISH", quality=q,
-                        description=f"Three Black Crows — strong bearish momentum at {_fmt(closes[2])}",
-                        index=i,
-                    ))
+    # Three Black Crows: 3 falling bearish candles, each closing near low
+    crows = sized & (closes[1] < closes[0]) & (closes[2] < closes[1])
+    for j in range(3):
+        crows &= (closes[j] < opens[j]) & (closes[j] - lows[j] < bodies[j] * 0.3)
+
+    for i in _last_hits(soldiers | crows, 2, since):
+        close = float(c[i])
+        if soldiers[i - 2]:
+            q = _quality([True, trend in ("UP", "RANGING")], [True])
+            results.append(_pattern(
+                name="Three White Soldiers", emoji="💂", direction="BULLISH", quality=q,
+                description=f"Three White Soldiers — strong bullish momentum at {_fmt(close)}",
+                index=i,
+            ))
+        else:
+            q = _quality([True, trend in ("DOWN", "RANGING")], [True])
+            results.append(_pattern(
+                name="Three Black Crows", emoji="🦅", direction="BEARISH", quality=q,
+                description=f"Three Black Crows — strong bearish momentum at {_fmt(close)}",
+                index=i,
+            ))
 
-    return results[-2:]
+    return results
 
 
 # ============================================================================
 # CATEGORY D — MOMENTUM PATTERNS
 # ============================================================================
 
-def detect_divergences(candles: List[Candle]) -> List[Pattern]:
+def detect_divergences(candles: Candles) -> List[Pattern]:
     """
     RSI Divergence — Regular (reversal) and Hidden (continuation).
     Regular:  price makes new extreme but RSI does not → exhaustion
     Hidden:   price makes higher low / lower high but RSI does not → continuation
     """
     results = []
-    if len(candles) < 20:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 20:
         return results
 
-    recent = candles[-60:]
-    closes = [float(c["close"]) for c in recent]
-    rsis   = [float(c.get("rsi", 50)) for c in recent]
-    n      = len(closes)
+    recent = ctx.tail(60)
 
-    sh_c = _swing_highs(closes, left=3, right=3)
-    sl_c = _swing_lows(closes,  left=3, right=3)
+    sh_c = recent.swing_highs("close", left=3, right=3)
+    sl_c = recent.swing_lows("close",  left=3, right=3)
 
     # Parallel RSI swing highs/lows
-    sh_r = _swing_highs(rsis, left=3, right=3)
-    sl_r = _swing_lows(rsis,  left=3, right=3)
+    sh_r = _swing_highs(recent.series("rsi", 50), left=3, right=3)
+    sl_r = _swing_lows(recent.series("rsi", 50),  left=3, right=3)
 
     def nearest_rsi_swing(idx: int, swings: list) -> Optional[Tuple[int, float]]:
         close_enough = [s for s in swings if abs(s[0] - idx) <= 5]
@@ -1130,23 +1323,22 @@ def detect_divergences(candles: List[Candle]) -> List[Pattern]:
     return results
 
 
-def detect_macd_divergence(candles: List[Candle]) -> List[Pattern]:
+def detect_macd_divergence(candles: Candles) -> List[Pattern]:
     """
     MACD Histogram Divergence.
     More reliable than RSI divergence because MACD is momentum of momentum.
     """
     results = []
-    if len(candles) < 20:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 20:
         return results
 
-    recent = candles[-60:]
-    closes = [float(c["close"]) for c in recent]
-    histos = [float(c.get("macdHist", 0)) for c in recent]
+    recent = ctx.tail(60)
 
-    sh_c = _swing_highs(closes, left=3, right=3)
-    sl_c = _swing_lows(closes,  left=3, right=3)
-    sh_h = _swing_highs(histos, left=3, right=3)
-    sl_h = _swing_lows(histos,  left=3, right=3)
+    sh_c = recent.swing_highs("close",    left=3, right=3)
+    sl_c = recent.swing_lows("close",     left=3, right=3)
+    sh_h = recent.swing_highs("macdHist", left=3, right=3)
+    sl_h = recent.swing_lows("macdHist",  left=3, right=3)
 
     def nearest(idx, swings):
         close = [s for s in swings if abs(s[0] - idx) <= 5]
@@ -1187,18 +1379,19 @@ def detect_macd_divergence(candles: List[Candle]) -> List[Pattern]:
     return results
 
 
-def detect_volume_divergence(candles: List[Candle]) -> List[Pattern]:
+def detect_volume_divergence(candles: Candles) -> List[Pattern]:
     """
     Volume Divergence — only fired when volume data is present (Binance/Twelve Data).
     Price moving up on declining volume = distribution (bearish).
     Price moving down on declining volume = accumulation (bullish).
     """
     results = []
-    if not _volume_available(candles) or len(candles) < 15:
+    ctx = PatternContext.of(candles)
+    if not ctx.volume_available() or ctx.n < 15:
         return results
 
-    closes  = _closes(candles[-20:])
-    volumes = _volumes(candles[-20:])
+    closes  = ctx.tail(20).closes
+    volumes = ctx.tail(20).volumes
 
     price_trend = (closes[-1] - closes[0]) / (closes[0] + 1e-9)
     early_vol   = sum(volumes[:5]) / 5
@@ -1216,7 +1409,7 @@ def detect_volume_divergence(candles: List[Candle]) -> List[Pattern]:
                 f"Price up {price_trend*100:.1f}% on {abs(vol_trend)*100:.0f}% "
                 f"declining volume — distribution signal"
             ),
-            index=len(candles) - 1,
+            index=ctx.n - 1,
         ))
     elif price_trend < -0.03 and vol_trend < -0.25:
         results.append(_pattern(
@@ -1225,7 +1418,7 @@ def detect_volume_divergence(candles: List[Candle]) -> List[Pattern]:
                 f"Price down {abs(price_trend)*100:.1f}% on {abs(vol_trend)*100:.0f}% "
                 f"declining volume — accumulation signal"
             ),
-            index=len(candles) - 1,
+            index=ctx.n - 1,
         ))
 
     return results
@@ -1235,23 +1428,25 @@ def detect_volume_divergence(candles: List[Candle]) -> List[Pattern]:
 # CATEGORY E — CROSS / EVENT PATTERNS
 # ============================================================================
 
-def detect_golden_death_crosses(candles: List[Candle]) -> List[Pattern]:
+def detect_golden_death_crosses(candles: Candles) -> List[Pattern]:
     """
     Golden Cross (EMA50 > EMA200, bullish) and
     Death Cross  (EMA50 < EMA200, bearish).
     Also detects EMA20/EMA50 fast crosses for shorter timeframes.
     """
     results = []
-    if len(candles) < 3:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 3:
         return results
 
-    for i in range(1, len(candles)):
-        e50_prev  = _safe(candles, "ema50",  i - 1)
-        e200_prev = _safe(candles, "ema200", i - 1)
-        e50_curr  = _safe(candles, "ema50",  i)
-        e200_curr = _safe(candles, "ema200", i)
-        e20_prev  = _safe(candles, "ema20",  i - 1)
-        e20_curr  = _safe(candles, "ema20",  i)
+    ema20  = ctx.safe_series("ema20")
+    ema50  = ctx.safe_series("ema50")
+    ema200 = ctx.safe_series("ema200")
+
+    for i in range(1, ctx.n):
+        e50_prev,  e50_curr  = ema50[i - 1],  ema50[i]
+        e200_prev, e200_curr = ema200[i - 1], ema200[i]
+        e20_prev,  e20_curr  = ema20[i - 1],  ema20[i]
 
         if 0 in (e50_prev, e200_prev, e50_curr, e200_curr):
             continue
@@ -1290,25 +1485,27 @@ def detect_golden_death_crosses(candles: List[Candle]) -> List[Pattern]:
     return results[-2:]   # Only most recent
 
 
-def detect_ema_reclaims(candles: List[Candle]) -> List[Pattern]:
+def detect_ema_reclaims(candles: Candles) -> List[Pattern]:
     """
     Price reclaiming a key EMA after trading below/above it.
     EMA200 reclaim is HIGH quality; EMA50 is MEDIUM; EMA20 is LOW.
     """
     results = []
-    if len(candles) < 5:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 5:
         return results
 
+    closes = ctx.safe_series("close")
+
     for ema_key, period, base_quality in [
         ("ema200", 200, "HIGH"),
         ("ema50",  50,  "MEDIUM"),
         ("ema20",  20,  "LOW"),
     ]:
-        for i in range(2, len(candles)):
-            prev_close = _safe(candles, "close", i - 1)
-            curr_close = _safe(candles, "close", i)
-            prev_ema   = _safe(candles, ema_key, i - 1)
-            curr_ema   = _safe(candles, ema_key, i)
+        emas = ctx.safe_series(ema_key)
+        for i in range(2, ctx.n):
+            prev_close, curr_close = closes[i - 1], closes[i]
+            prev_ema,   curr_ema   = emas[i - 1],   emas[i]
 
             if 0 in (prev_close, curr_close, prev_ema, curr_ema):
                 continue
@@ -1334,23 +1531,22 @@ def detect_ema_reclaims(candles: List[Candle]) -> List[Pattern]:
     return results[-3:]
 
 
-def detect_trendline_breaks(candles: List[Candle]) -> List[Pattern]:
+def detect_trendline_breaks(candles: Candles) -> List[Pattern]:
     """
     Trendline break (aggressive entry signal) and
     Trendline retest after break (conservative, higher-probability entry).
     Requires ≥ 3 swing-point touches to validate the trendline.
     """
     results = []
-    if len(candles) < 20:
+    ctx = PatternContext.of(candles)
+    if ctx.n < 20:
         return results
 
-    highs  = _highs(candles)
-    lows   = _lows(candles)
-    closes = _closes(candles)
-    n      = len(candles)
+    closes = ctx.closes
+    n      = ctx.n
 
-    sh = _swing_highs(highs, left=2, right=2)
-    sl = _swing_lows(lows,   left=2, right=2)
+    sh = ctx.swing_highs("high", left=2, right=2)
+    sl = ctx.swing_lows("low",   left=2, right=2)
 
     def fit_line(points):
         """Least-squares line through (index, value) points."""
@@ -1444,7 +1640,11 @@ def detect_trendline_breaks(candles: List[Candle]) -> List[Pattern]:
 # Quality sort order
 _QUALITY_ORDER = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
 
-# All detectors in priority order (higher-confidence first)
+# All detectors in priority order (higher-confidence first).
+# Detectors without a `lookback` attribute (see `_incremental`) judge the
+# latest close against structure spanning the whole series, or read
+# indicator series that are re-seeded with every window, so they are always
+# re-run in full when a new candle closes.
 _DETECTORS = [
     detect_flags_pennants,
     detect_triangles,
@@ -1469,15 +1669,19 @@ _DETECTORS = [
 
 
 def detect_all_patterns(
-    candles: List[Candle],
+    candles: Candles,
     max_results: int = 8,
     min_quality: str = "LOW",
 ) -> List[Pattern]:
     """
     Run every detector, deduplicate by name, sort by quality, return top results.
 
+    All detectors share one PatternContext, so each series / swing / EMA /
+    trend derivation happens once per call rather than once per detector.
+
     Args:
-        candles:     List of OHLCV candle dicts with indicator fields attached.
+        candles:     List of OHLCV candle dicts with indicator fields attached
+                     (or a PatternContext already built over them).
         max_results: Maximum patterns to return (default 8).
         min_quality: Filter floor — "HIGH", "MEDIUM", or "LOW".
 
@@ -1487,20 +1691,37 @@ def detect_all_patterns(
     if not candles or len(candles) < 5:
         return []
 
+    ctx = PatternContext.of(candles)
+    found = [run_detector(detector, ctx) for detector in _DETECTORS]
+    return rank_patterns(found, max_results=max_results, min_quality=min_quality)
+
+
+def run_detector(detector, ctx: PatternContext, **kwargs) -> List[Pattern]:
+    """Run one detector; never let a single detector crash the whole analysis."""
+    try:
+        return detector(ctx, **kwargs)
+    except Exception:
+        return []
+
+
+def rank_patterns(
+    found: List[List[Pattern]],
+    max_results: int = 8,
+    min_quality: str = "LOW",
+) -> List[Pattern]:
+    """
+    Merge per-detector results (in `_DETECTORS` order): deduplicate by name,
+    filter by quality, sort HIGH → LOW then most recent first, cap.
+    """
     all_patterns: List[Pattern] = []
     seen_names: set = set()
 
-    for detector in _DETECTORS:
-        try:
-            found = detector(candles)
-            for p in found:
-                name = p.get("name", "")
-                if name not in seen_names:
-                    seen_names.add(name)
-                    all_patterns.append(p)
-        except Exception as e:
-            # Never let a single detector crash the whole analysis
-            pass
+    for patterns in found:
+        for p in patterns:
+            name = p.get("name", "")
+            if name not in seen_names:
+                seen_names.add(name)
+                all_patterns.append(p)
 
     # Filter by minimum quality
     min_order = _QUALITY_ORDER.get(min_quality, 2)
@@ -1,18 +1,19 @@
 import aiohttp
 import asyncio
-import time
 from typing import List, Dict, Any
 import os
 from dotenv import load_dotenv
 
+from utils.cache import get_cache
+
 load_dotenv()
 COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY")
 
 
 COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3/simple/price"
 COINGECKO_IDS = {}  # UPPER_SYMBOL -> coin_id mapping
-CACHE = {}          # symbol -> {price, change_pct, time}
 CACHE_TTL = 120     # seconds
+CACHE = get_cache("portfolio_prices", ttl=CACHE_TTL, max_entries=2000)  # symbol -> {price, change_pct}
 
 
 async def get_portfolio_crypto_prices(symbols) -> Dict[str, Dict[str, Any]]:
@@ -23,18 +24,14 @@ async def get_portfolio_crypto_prices(symbols) -> Dict[str, Dict[str, Any]]:
     symbols = [s.upper().strip() for s in symbols if isinstance(s, str) and s.strip()]
     symbols = list(dict.fromkeys(symbols))  # remove duplicates
 
-    now = time.time()
     output: Dict[str, Dict[str, Any]] = {}
 
     # Check cache
     missing = []
     for sym in symbols:
         c = CACHE.get(sym)
-        if c and (now - c.get("time", 0) < CACHE_TTL):
-            output[sym] = {
-                "price": c.get("price"),
-                "change_pct": c.get("change_pct")
-            }
+        if c is not None:
+            output[sym] = dict(c)
         else:
             missing.append(sym)
 
@@ -71,7 +68,7 @@ async def get_portfolio_crypto_prices(symbols) -> Dict[str, Dict[str, Any]]:
 
             if not coin_id:
                 output[sym] = {"price": None, "change_pct": None}
-                CACHE[sym] = {"price": None, "change_pct": None, "time": time.time()}
+                CACHE.set(sym, {"price": None, "change_pct": None})
                 continue
 
             # Fetch full coin data
@@ -130,11 +127,11 @@ async def get_portfolio_crypto_prices(symbols) -> Dict[str, Dict[str, Any]]:
                     change_pct_val = 0.0
 
                 output[sym] = {"price": price_val, "change_pct": change_pct_val}
-                CACHE[sym] = {"price": price_val, "change_pct": change_pct_val, "time": time.time()}
+                CACHE.set(sym, {"price": price_val, "change_pct": change_pct_val})
 
             except Exception as e:
                 print(f"❌ Error fetching coin data for {sym}: {e}")
                 output[sym] = {"price": None, "change_pct": None}
-                CACHE[sym] = {"price": None, "change_pct": None, "time": time.time()}
+                CACHE.set(sym, {"price": None, "change_pct": None})
 
     return output
\ No newline at end of file
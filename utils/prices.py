@@ -2,9 +2,10 @@ import aiohttp
 import json
 import os
 import asyncio
-import time
 from dotenv import load_dotenv
 
+from utils.cache import get_cache
+
 # === Load environment variables ===
 load_dotenv()
 COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY")
@@ -18,8 +19,8 @@ with open(file_path, "r") as f:
     COINGECKO_IDS = json.load(f)
 
 # === Caching setup ===
-CACHE = {}
 CACHE_TTL = 90  # seconds
+CACHE = get_cache("prices", ttl=CACHE_TTL, max_entries=5000)
 
 # === Request deduplication ===
 PENDING_REQUESTS = {}  # Track in-flight requests to avoid duplicates
@@ -38,14 +39,13 @@ async def get_crypto_prices(symbols):
     symbols = [s.upper() for s in symbols]
 
     # Check cache first
-    now = time.time()
     cached_prices = {}
     missing_symbols = []
 
     for sym in symbols:
-        cached_entry = CACHE.get(sym)
-        if cached_entry and now - cached_entry["time"] < CACHE_TTL:
-            cached_prices[sym] = cached_entry["price"]
+        cached_price = CACHE.get(sym)
+        if cached_price is not None:
+            cached_prices[sym] = cached_price
         else:
             missing_symbols.append(sym)
 
@@ -80,12 +80,11 @@ async def get_crypto_prices(symbols):
         # After waiting, check cache again (the other request may have populated it)
         fresh_prices = {}
         still_missing = []
-        now = time.time()
         
         for sym in missing_symbols:
-            cached_entry = CACHE.get(sym)
-            if cached_entry and now - cached_entry["time"] < CACHE_TTL:
-                fresh_prices[sym] = cached_entry["price"]
+            cached_price = CACHE.get(sym)
+            if cached_price is not None:
+                fresh_prices[sym] = cached_price
             else:
                 still_missing.append(sym)
         
@@ -134,7 +133,7 @@ async def get_crypto_prices(symbols):
                         usd_price = content.get("usd")
                         if usd_price is not None:
                             sym = symbol_to_id[coin_id]
-                            CACHE[sym] = {"price": float(usd_price), "time": time.time()}
+                            CACHE.set(sym, float(usd_price))
                             cached_prices[sym] = float(usd_price)
 
                     # Mark request as successful
@@ -0,0 +1,127 @@
+# ----------------------------------------------------------------------------
+# utils/rate_limiter.py
+# ----------------------------------------------------------------------------
+"""
+Async token-bucket rate limiter.
+
+One bucket per upstream venue, shared by every caller in the process, so
+concurrent requests run as fast as the venue allows and no faster:
+
+    await BYBIT_LIMITER.acquire()      # waits only when the bucket is empty
+
+Background jobs (the precompute boards) pass `background=True`: they queue
+behind every interactive waiter and may not dip into the bucket's last
+`reserve` tokens, so a burst of board refreshes never makes a user command
+wait for the whole backlog.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Dict, List
+
+
+class TokenBucket:
+    """
+    Refills `rate` tokens per second up to `capacity` (the allowed burst).
+    The last `reserve` tokens are kept for interactive (non-background) callers.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: int, reserve: int = 0):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = min(reserve, capacity - 1)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._waiters: List[list] = []   # heap of [priority, arrival, wake-up future]
+        self._order = itertools.count()
+        self._acquired = 0
+        self._background = 0
+        self._waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> float:
+        """Tokens available right now (without taking any)."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, tokens: int = 1, background: bool = False) -> None:
+        """
+        Take `tokens`, sleeping until the bucket has refilled enough.
+        Waiters are served interactive first, then first-come-first-served.
+        """
+        loop   = asyncio.get_running_loop()
+        entry  = [1 if background else 0, next(self._order), loop.create_future()]
+        needed = tokens + (self.reserve if background else 0)
+        start  = time.monotonic()
+
+        heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                self._refill()
+                at_head = self._waiters[0] is entry
+                if at_head and self._tokens >= needed:
+                    break
+                # The head sleeps until refilled; everyone else until woken
+                # as the new head. An interactive caller queueing in front
+                # simply takes over the head position.
+                timeout = (needed - self._tokens) / self.rate if at_head else None
+                await asyncio.wait([entry[2]], timeout=timeout)
+                if entry[2].done():
+                    entry[2] = loop.create_future()
+        finally:
+            was_head = self._waiters and self._waiters[0] is entry
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            if was_head and self._waiters and not self._waiters[0][2].done():
+                self._waiters[0][2].set_result(None)
+
+        self._tokens -= tokens
+        self._acquired += tokens
+        if background:
+            self._background += tokens
+        self._waited_seconds += time.monotonic() - start
+
+    def get_stats(self) -> Dict:
+        """Get limiter statistics"""
+        return {
+            "name": self.name,
+            "rate_per_sec": self.rate,
+            "capacity": self.capacity,
+            "available": round(self.available(), 2),
+            "acquired": self._acquired,
+            "acquired_background": self._background,
+            "reserve": self.reserve,
+            "queued": len(self._waiters),
+            "waited_seconds": round(self._waited_seconds, 1),
+        }
+
+
+# Shared exchange buckets (all endpoints of a venue count against one IP limit).
+# Public market-data limits: Bybit 600 req / 5s, OKX candles 40 req / 2s.
+# Both are kept well under the documented ceiling.
+BYBIT_LIMITER = TokenBucket("bybit", rate=10, capacity=20)
+OKX_LIMITER = TokenBucket("okx", rate=8, capacity=16)
+
+# Per-minute API plans (override with env vars when on a paid tier).
+# Twelve Data free tier: 8 credits/min. CoinGecko demo: 30 calls/min.
+# /regime and /levels share Twelve Data with the boards: 3 credits are
+# always left for them.
+TWELVE_LIMITER = TokenBucket(
+    "twelve_data",
+    rate=float(os.getenv("TWELVE_DATA_RATE_PER_MIN", "8")) / 60,
+    capacity=int(os.getenv("TWELVE_DATA_BURST", "8")),
+    reserve=int(os.getenv("TWELVE_DATA_INTERACTIVE_RESERVE", "3")),
+)
+COINGECKO_LIMITER = TokenBucket(
+    "coingecko",
+    rate=float(os.getenv("COINGECKO_RATE_PER_MIN", "30")) / 60,
+    capacity=int(os.getenv("COINGECKO_BURST", "5")),
+)
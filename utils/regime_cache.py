@@ -1,37 +1,34 @@
 
 import time
 import threading
+from collections import Counter
 from typing import Optional, Dict, List
 
+from utils.cache import Cache
+
 
 class RegimeCache:
     """
-    In-memory cache for regime analysis results
-    
-    Structure:
-        {
-            "BTC": {
-                "result": {...},
-                "expires_at": 1234567890,
-                "cached_at": 1234567890
-            },
-            "ETH": {...}
-        }
+    In-memory cache for regime analysis results, keyed by symbol
+    ("BTC", "BTC_DAY", ...) and stored in a utils.cache.Cache
+    (namespace "regime", LRU-bounded to `max_entries`).
+
+    Every get() also counts demand per key (hit or miss); the regime board
+    uses get_hot_keys() to decide which results to precompute.
     """
     
-    def __init__(self, ttl_minutes: int = 5):
+    def __init__(self, ttl_minutes: int = 5, max_entries: int = 1000):
         """
         Initialize cache
         
         Args:
             ttl_minutes: Time-to-live in minutes (default 5)
+            max_entries: Maximum number of cached results
         """
         self.ttl_minutes = ttl_minutes
-        self.cache: Dict[str, Dict] = {}
+        self.cache = Cache("regime", ttl=ttl_minutes * 60, max_entries=max_entries)
         self.lock = threading.Lock()
-        self._hits = 0
-        self._misses = 0
-        self._last_cleanup = time.time()
+        self._demand: Counter = Counter()
     
     def get(self, symbol: str, plan: str) -> Optional[Dict]:
         """
@@ -45,24 +42,20 @@ class RegimeCache:
             Cached result dict or None if not found/expired
         """
         
+        symbol = symbol.upper().strip()
         with self.lock:
-            symbol = symbol.upper().strip()
-            
-            if symbol not in self.cache:
-                self._misses += 1
-                return None
-            
-            cached_item = self.cache[symbol]
-            
-            if time.time() > cached_item["expires_at"]:
-                del self.cache[symbol]
-                self._misses += 1
-                return None
-            
-            self._hits += 1
-            return cached_item["result"].copy()
+            self._demand[symbol] += 1
+        
+        result = self.cache.get(symbol)
+        return result.copy() if result is not None else None
     
-    def set(self, symbol: str, plan: str, result: Dict) -> None:
+    def set(
+        self,
+        symbol: str,
+        plan: str,
+        result: Dict,
+        expires_at: Optional[float] = None
+    ) -> None:
         """
         Cache a result
         
@@ -70,21 +63,10 @@ class RegimeCache:
             symbol: Trading symbol
             plan: User plan tier (not used, kept for compatibility)
             result: Regime analysis result to cache
+            expires_at: Absolute expiry (epoch seconds); default now + TTL
         """
         
-        with self.lock:
-            symbol = symbol.upper().strip()
-            
-            expires_at = time.time() + (self.ttl_minutes * 60)
-            
-            self.cache[symbol] = {
-                "result": result.copy(),
-                "expires_at": expires_at,
-                "cached_at": time.time()
-            }
-            
-            if time.time() - self._last_cleanup > 300:
-                self._cleanup_expired()
+        self.cache.set(symbol.upper().strip(), result.copy(), expires_at=expires_at)
     
     def delete(self, symbol: str, plan: Optional[str] = None) -> bool:
         """
@@ -98,54 +80,49 @@ class RegimeCache:
             True if something was deleted, False otherwise
         """
         
-        with self.lock:
-            symbol = symbol.upper().strip()
-            
-            if symbol not in self.cache:
-                return False
-            
-            del self.cache[symbol]
-            return True
+        return self.cache.delete(symbol.upper().strip())
     
     def clear(self) -> None:
         """Clear entire cache"""
+        self.cache.clear()
         with self.lock:
-            self.cache.clear()
-            self._hits = 0
-            self._misses = 0
+            self._demand.clear()
     
-    def _cleanup_expired(self) -> int:
+    def get_hot_keys(self, limit: int) -> List[str]:
         """
-        Remove all expired entries from cache
+        Most requested keys, busiest first
+        
+        Args:
+            limit: Maximum number of keys to return
         
         Returns:
-            Number of entries removed
+            List of cache keys
         """
-        current_time = time.time()
-        removed_count = 0
-        
-        symbols_to_remove = []
-        
-        for symbol in list(self.cache.keys()):
-            if current_time > self.cache[symbol]["expires_at"]:
-                symbols_to_remove.append(symbol)
-                removed_count += 1
-        
-        for symbol in symbols_to_remove:
-            del self.cache[symbol]
+        with self.lock:
+            return [key for key, _ in self._demand.most_common(limit)]
+    
+    def decay_demand(self, factor: float = 0.5) -> None:
+        """
+        Scale down demand counts so hot keys reflect recent requests
         
-        self._last_cleanup = current_time
-        return removed_count
+        Args:
+            factor: Multiplier applied to every count (keys reaching 0 are dropped)
+        """
+        with self.lock:
+            self._demand = Counter({
+                key: int(count * factor)
+                for key, count in self._demand.items()
+                if int(count * factor) > 0
+            })
     
     def cleanup_expired(self) -> int:
         """
-        Public method to manually trigger cleanup
+        Remove all expired entries from cache
         
         Returns:
             Number of entries removed
         """
-        with self.lock:
-            return self._cleanup_expired()
+        return self.cache.purge_expired()
     
     def get_cache_age_minutes(self, symbol: str, plan: str) -> Optional[float]:
         """
@@ -158,19 +135,13 @@ class RegimeCache:
         Returns:
             Age in minutes or None if not cached
         """
-        with self.lock:
-            symbol = symbol.upper().strip()
-            
-            if symbol not in self.cache:
-                return None
-            
-            cached_item = self.cache[symbol]
-            
-            if time.time() > cached_item["expires_at"]:
-                return None
-            
-            age_seconds = time.time() - cached_item["cached_at"]
-            return age_seconds / 60
+        cached_item = self.cache.get_entry(symbol.upper().strip())
+        
+        if cached_item is None or time.time() > cached_item["expires_at"]:
+            return None
+        
+        age_seconds = time.time() - cached_item["cached_at"]
+        return age_seconds / 60
     
     def get_stats(self) -> Dict:
         """
@@ -179,20 +150,21 @@ class RegimeCache:
         Returns:
             Dictionary with cache stats
         """
+        stats = self.cache.get_stats()
         with self.lock:
-            total_entries = len(self.cache)
-            total_requests = self._hits + self._misses
-            hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
-            
-            return {
-                "symbols_cached": total_entries,
-                "total_entries": total_entries,
-                "ttl_minutes": self.ttl_minutes,
-                "hits": self._hits,
-                "misses": self._misses,
-                "total_requests": total_requests,
-                "hit_rate_pct": round(hit_rate, 1)
-            }
+            tracked_keys = len(self._demand)
+        
+        return {
+            "symbols_cached": stats["entries"],
+            "total_entries": stats["entries"],
+            "ttl_minutes": self.ttl_minutes,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "evictions": stats["evictions"],
+            "total_requests": stats["total_requests"],
+            "hit_rate_pct": stats["hit_rate_pct"],
+            "tracked_keys": tracked_keys
+        }
     
     def get_cached_symbols(self) -> List[str]:
         """
@@ -201,8 +173,7 @@ class RegimeCache:
         Returns:
             List of symbol strings
         """
-        with self.lock:
-            return list(self.cache.keys())
+        return self.cache.keys()
     
     def get_symbol_info(self, symbol: str) -> Optional[Dict]:
         """
@@ -214,29 +185,26 @@ class RegimeCache:
         Returns:
             Dictionary with cache info or None if not cached
         """
-        with self.lock:
-            symbol = symbol.upper().strip()
-            
-            if symbol not in self.cache:
-                return None
-            
-            data = self.cache[symbol]
-            expires_in = data["expires_at"] - time.time()
-            cached_ago = time.time() - data["cached_at"]
-            
-            return {
-                "symbol": symbol,
-                "expires_in_seconds": int(expires_in),
-                "cached_ago_seconds": int(cached_ago),
-                "cached_ago_minutes": round(cached_ago / 60, 1),
-                "is_expired": expires_in <= 0
-            }
+        symbol = symbol.upper().strip()
+        data = self.cache.get_entry(symbol)
+        
+        if data is None:
+            return None
+        
+        expires_in = data["expires_at"] - time.time()
+        cached_ago = time.time() - data["cached_at"]
+        
+        return {
+            "symbol": symbol,
+            "expires_in_seconds": int(expires_in),
+            "cached_ago_seconds": int(cached_ago),
+            "cached_ago_minutes": round(cached_ago / 60, 1),
+            "is_expired": expires_in <= 0
+        }
     
     def reset_stats(self) -> None:
         """Reset hit/miss statistics"""
-        with self.lock:
-            self._hits = 0
-            self._misses = 0
+        self.cache.reset_stats()
 
 
 def test_cache():
@@ -7,6 +7,7 @@ Supports TOP 10 most used timeframes for comprehensive analysis
 Handles errors, validates data, and normalizes output
 """
 import aiohttp
+import asyncio
 import os
 import math
 import json
@@ -14,6 +15,8 @@ from typing import Optional, List, Dict
 from datetime import datetime
 import logging
 
+from utils.rate_limiter import TWELVE_LIMITER
+
 logger = logging.getLogger(__name__)
 
 # API Configuration
@@ -209,7 +212,8 @@ def validate_symbol(symbol: str) -> str:
 async def fetch_market_data(
     symbol: str, 
     interval: str, 
-    limit: int = None
+    limit: int = None,
+    background: bool = False
 ) -> List[Dict]:
     """
     Fetch OHLCV data from Twelve Data API with validation
@@ -218,6 +222,8 @@ async def fetch_market_data(
         symbol: Trading pair (e.g., "BTC", "ETH")
         interval: Timeframe (e.g., "1m", "5m", "15m", "1h", "4h", "1d", "1w")
         limit: Number of candles (auto-determined if None)
+        background: Board refresh — queues behind user commands for the
+            Twelve Data budget (see utils/rate_limiter.py)
     
     Returns:
         List of normalized candles with OHLCV data (oldest first)
@@ -245,6 +251,10 @@ async def fetch_market_data(
     if not TWELVE_DATA_API_KEY:
         raise MarketDataError("TWELVE_DATA_API_KEY environment variable not set")
     
+    # Every Twelve Data caller (/regime, /levels, both boards) shares one
+    # budget; board refreshes yield to user commands
+    await TWELVE_LIMITER.acquire(background=background)
+    
     url = f"{BASE_URL}/time_series"
     params = {
         "symbol": api_symbol,
@@ -463,9 +473,11 @@ async def fetch_regime_data(
     )
     
     try:
-        # Fetch both timeframes
-        data_lower = await fetch_market_data(symbol, lower_validated)
-        data_upper = await fetch_market_data(symbol, upper_validated)
+        # Fetch both timeframes concurrently
+        data_lower, data_upper = await asyncio.gather(
+            fetch_market_data(symbol, lower_validated),
+            fetch_market_data(symbol, upper_validated),
+        )
         
         return {
             "symbol": symbol,
@@ -483,8 +495,10 @@ async def fetch_regime_data(
         if symbol.upper() != "BTC":
             try:
                 logger.info("Falling back to BTC")
-                data_lower = await fetch_market_data("BTC", lower_validated)
-                data_upper = await fetch_market_data("BTC", upper_validated)
+                data_lower, data_upper = await asyncio.gather(
+                    fetch_market_data("BTC", lower_validated),
+                    fetch_market_data("BTC", upper_validated),
+                )
                 
                 return {
                     "symbol": "BTC",
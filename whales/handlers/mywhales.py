@@ -1,40 +1,16 @@
-import os
-import json
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CommandHandler, CallbackQueryHandler, ContextTypes
 from models.user_activity import update_last_active
+from whales import whale_store
 
-# === File paths ===
-USER_TRACK_FILE = "whales/user_tracking.json"
-WHALE_DATA_DIR = "whales/data"
-
-
-# === Helper: Load tracking data ===
-def load_user_tracking():
-    if not os.path.exists(USER_TRACK_FILE):
-        return {}
-    with open(USER_TRACK_FILE, "r") as f:
-        return json.load(f)
-
-
-def load_whale_data(symbol: str):
-    """Load whale data for a token (from whales/data)"""
-    file_path = os.path.join(WHALE_DATA_DIR, f"{symbol}.json")
-    if not os.path.exists(file_path):
-        return None
-    try:
-        with open(file_path, "r") as f:
-            return json.load(f)
-    except Exception:
-        return None
+PREVIEW_COUNT = 10  # Whales shown by the "View Whales" button
 
 
 # === /mywhales Command ===
 async def mywhales_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
     await update_last_active(user_id, command_name="/mywhales")
-    tracking_data = load_user_tracking()
-    user_data = tracking_data.get(user_id, {}).get("tracked", [])
+    user_data = whale_store.get_user_tracking(user_id)
 
     if not user_data:
         await update.message.reply_text(
@@ -69,14 +45,14 @@ async def view_whales_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     await query.answer()
 
     _, token = query.data.split(":")
-    whale_data = load_whale_data(token)
+    whale_data = whale_store.get_token_whales(token, limit=PREVIEW_COUNT)
 
-    if not whale_data or "whales" not in whale_data:
+    if not whale_data or not whale_data["whales"]:
         await query.edit_message_text(f"⚠️ Whale data for *{token}* not available.", parse_mode="Markdown")
         return
 
     whales = whale_data["whales"]
-    preview_count = min(10, len(whales))  # Show only top 10 for preview
+    preview_count = len(whales)  # Show only the top PREVIEW_COUNT for preview
     lines = [f"🐋 *Top {preview_count} {token} Whales:*"]
 
     for w in whales[:preview_count]:
@@ -1,24 +1,7 @@
-import os
-import json
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CommandHandler, CallbackQueryHandler, ContextTypes
 from models.user_activity import update_last_active
-
-# === File path ===
-USER_TRACK_FILE = "whales/user_tracking.json"
-
-
-# === Helpers ===
-def load_user_tracking():
-    if not os.path.exists(USER_TRACK_FILE):
-        return {}
-    with open(USER_TRACK_FILE, "r") as f:
-        return json.load(f)
-
-
-def save_user_tracking(data):
-    with open(USER_TRACK_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+from whales import whale_store
 
 
 # === /untrack Command ===
@@ -28,8 +11,7 @@ async def untrack_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     user_id = str(update.effective_user.id)
     await update_last_active(user_id, command_name="/untrack")
-    tracking_data = load_user_tracking()
-    user_data = tracking_data.get(user_id, {}).get("tracked", [])
+    user_data = whale_store.get_user_tracking(user_id)
 
     if len(context.args) == 1 and context.args[0].lower() == "all":
         # Clear all tracked tokens
@@ -37,8 +19,7 @@ async def untrack_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("⚠️ You’re not tracking any whales.")
             return
 
-        tracking_data[user_id] = {"tracked": []}
-        save_user_tracking(tracking_data)
+        whale_store.remove_tracking(user_id)
 
         await update.message.reply_text("🗑️ All whale tracking cleared.")
         return
@@ -68,18 +49,10 @@ async def untrack_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     _, token = query.data.split(":")
     user_id = str(query.from_user.id)
 
-    tracking_data = load_user_tracking()
-    user_data = tracking_data.get(user_id, {}).get("tracked", [])
-
-    new_list = [t for t in user_data if t["token"] != token]
-
-    if len(new_list) == len(user_data):
+    if not whale_store.remove_tracking(user_id, token):
         await query.edit_message_text(f"⚠️ You weren’t tracking *{token}*.", parse_mode="Markdown")
         return
 
-    tracking_data[user_id] = {"tracked": new_list}
-    save_user_tracking(tracking_data)
-
     await query.edit_message_text(f"❌ You’ve stopped tracking *{token}* whales.", parse_mode="Markdown")
 
 
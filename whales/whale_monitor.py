@@ -1,11 +1,11 @@
 import asyncio
 import httpx
-import json
 import os
 import time
 from datetime import datetime
 from typing import List, Dict, Optional, Set
-from pathlib import Path
+
+from whales import whale_store
 
 # ============================================================================
 # CONFIGURATION
@@ -18,13 +18,12 @@ REQUEST_TIMEOUT = 30.0
 RETRY_DELAY = 2
 STATE_CLEANUP_DAYS = 7
 
-# File paths
-STATE_FILE = "whales/last_seen.json"
-USER_TRACK_FILE = "whales/user_tracking.json"
-WHALE_DATA_DIR = "whales/data"
-
 # Monitoring settings
-WHALE_CHECK_INTERVAL = 300  # 5 minutes
+WHALE_CHECK_INTERVAL = 120  # Monitor cycle; also the poll interval of whales within HOT_WINDOW
+DEFAULT_POLL_INTERVAL = 300  # New whales, and whales that moved within ACTIVE_WINDOW
+MAX_POLL_INTERVAL = 3600  # Dormant whales back off up to this
+HOT_WINDOW = 3600  # Seconds after a transfer during which a whale is polled every cycle
+ACTIVE_WINDOW = 86400  # Seconds after a transfer during which a whale counts as active
 MAX_CONCURRENT_REQUESTS = 10  # Limit concurrent API calls
 ALERT_DELAY = 0.3  # Delay between sending alerts
 
@@ -50,63 +49,59 @@ class RateLimiter:
 rate_limiter = RateLimiter()
 
 # ============================================================================
-# FILE I/O HELPERS
+# BLOCK CURSORS
 # ============================================================================
 
-async def load_json_async(filepath: str, default=None):
-    """Load JSON file asynchronously"""
-    try:
-        path = Path(filepath)
-        if not path.exists():
-            return default if default is not None else {}
-        
-        # Use asyncio to avoid blocking
-        loop = asyncio.get_event_loop()
-        content = await loop.run_in_executor(None, path.read_text)
-        return json.loads(content)
-    except Exception as e:
-        print(f"⚠️ Error loading {filepath}: {e}")
-        return default if default is not None else {}
+def get_cursor_key(contract: str, address: str) -> str:
+    """Block cursor key for a (contract, address) pair"""
+    return f"{contract.lower()}:{address.lower()}"
 
-async def save_json_async(filepath: str, data):
-    """Save JSON file asynchronously"""
-    try:
-        path = Path(filepath)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Use asyncio to avoid blocking
-        loop = asyncio.get_event_loop()
-        content = json.dumps(data, indent=2)
-        await loop.run_in_executor(None, path.write_text, content)
+def is_poll_due(cursor: Optional[Dict], now: float) -> bool:
+    """True if the whale behind `cursor` should be polled this cycle"""
+    if not isinstance(cursor, dict):
         return True
-    except Exception as e:
-        print(f"⚠️ Error saving {filepath}: {e}")
-        return False
+    # Half a cycle of slack so a whale due just after this cycle isn't pushed a whole cycle back
+    return now + WHALE_CHECK_INTERVAL / 2 >= cursor.get("next_check", 0)
 
-def cleanup_old_state(state: Dict, max_age_days: int = STATE_CLEANUP_DAYS) -> Dict:
-    """Remove state entries older than max_age_days"""
-    if not isinstance(state, dict):
-        return {}
-    
-    cutoff_time = time.time() - (max_age_days * 86400)
-    cleaned = {}
-    removed_count = 0
+def next_poll_interval(cursor: Optional[Dict], now: float) -> int:
+    """
+    Adaptive poll interval from the age of the whale's latest transfer:
+    every cycle within HOT_WINDOW, DEFAULT_POLL_INTERVAL within
+    ACTIVE_WINDOW, then doubling up to MAX_POLL_INTERVAL while dormant.
+    """
+    if not cursor:
+        return DEFAULT_POLL_INTERVAL
     
-    for key, value in state.items():
-        if isinstance(value, dict):
-            timestamp = value.get("timestamp", 0)
-            if timestamp > cutoff_time:
-                cleaned[key] = value
-            else:
-                removed_count += 1
-        else:
-            # Keep old format entries for now (migration)
-            cleaned[key] = value
+    # No transfer seen yet counts as dormant
+    idle = now - cursor.get("last_activity", 0)
+    if idle < HOT_WINDOW:
+        return WHALE_CHECK_INTERVAL
+    if idle < ACTIVE_WINDOW:
+        return DEFAULT_POLL_INTERVAL
+    return min(max(cursor.get("interval", DEFAULT_POLL_INTERVAL) * 2, DEFAULT_POLL_INTERVAL), MAX_POLL_INTERVAL)
+
+def update_cursor(
+    cursors: Dict,
+    key: str,
+    tx: Optional[Dict] = None,
+    now: Optional[float] = None
+) -> None:
+    """Record a poll: advance the block cursor to `tx` and schedule the next poll"""
+    now = now or time.time()
+    cursor = cursors.get(key)
+    updated = dict(cursor) if isinstance(cursor, dict) else {}
     
-    if removed_count > 0:
-        print(f"🧹 Cleaned up {removed_count} old state entries")
+    if tx:
+        try:
+            updated["block"] = max(int(tx.get("blockNumber", 0)), updated.get("block", 0))
+            updated["last_activity"] = max(int(tx.get("timeStamp", 0)), updated.get("last_activity", 0))
+        except (ValueError, TypeError):
+            pass
     
-    return cleaned
+    updated["interval"] = next_poll_interval(updated, now)
+    updated["next_check"] = now + updated["interval"]
+    updated["timestamp"] = now
+    cursors[key] = updated
 
 # ============================================================================
 # ETHERSCAN API
@@ -116,20 +111,25 @@ async def fetch_whale_transactions(
     address: str,
     contract: str,
     symbol: str,
-    limit: int = 5
+    limit: int = 5,
+    start_block: Optional[int] = None
 ) -> List[Dict]:
     """
-    Get recent ERC20 token transfers for an address with retry logic.
+    Get the newest ERC20 token transfers (at most `limit`, from `start_block`
+    onward if given) for an address with retry logic.
     Docs: https://docs.etherscan.io/api-endpoints/accounts#get-a-list-of-erc20-token-transfer-events-by-address
     """
     if not address or not contract:
         return []
     
+    # page/offset keep Etherscan from returning the whole transfer history
     url = (
         f"{ETHERSCAN_BASE}?module=account&action=tokentx"
         f"&address={address}&contractaddress={contract}"
-        f"&sort=desc&apikey={ETHERSCAN_API_KEY}"
+        f"&page=1&offset={limit}&sort=desc&apikey={ETHERSCAN_API_KEY}"
     )
+    if start_block is not None:
+        url += f"&startblock={start_block}"
     
     for attempt in range(MAX_RETRIES):
         try:
@@ -224,12 +224,17 @@ async def process_whale(
     whale: Dict,
     symbol: str,
     contract: str,
-    user_id: str,
     last_seen: Dict,
-    rank: int
+    cursors: Dict,
+    rank: int,
+    position: int
 ) -> Optional[Dict]:
     """
     Process a single whale and return alert data if there's new activity.
+    `position` is the whale's index in the token's list; subscribers whose
+    limit is above it receive the alert.
+    Whales that are not due (see is_poll_due) are skipped without a request;
+    otherwise only transfers after the whale's block cursor are fetched.
     Returns: Dict with alert info or None if no alert needed
     """
     if not isinstance(whale, dict):
@@ -239,29 +244,39 @@ async def process_whale(
     if not address:
         return None
     
+    cursor_key = get_cursor_key(contract, address)
+    cursor = cursors.get(cursor_key)
+    now = time.time()
+    if not is_poll_due(cursor, now):
+        return None
+    
+    start_block = None
+    if isinstance(cursor, dict) and cursor.get("block"):
+        start_block = cursor["block"] + 1
+    
     try:
         # Fetch transactions
-        txs = await fetch_whale_transactions(address, contract, symbol)
+        txs = await fetch_whale_transactions(address, contract, symbol, start_block=start_block)
         
         if not txs:
+            update_cursor(cursors, cursor_key, now=now)
             return None
         
         latest_tx = txs[0]
         tx_hash = latest_tx.get("hash")
         
         if not tx_hash:
+            update_cursor(cursors, cursor_key, latest_tx, now)
             return None
         
         # Check if already seen
         last_key = f"{symbol}:{address}"
         
         # Get last known hash
-        if isinstance(last_seen.get(last_key), dict):
-            last_hash = last_seen[last_key].get("hash")
-        else:
-            last_hash = last_seen.get(last_key)
+        last_hash = last_seen.get(last_key)
         
         if last_hash == tx_hash:
+            update_cursor(cursors, cursor_key, latest_tx, now)
             return None  # No new movement
         
         # Format transaction details
@@ -283,12 +298,15 @@ async def process_whale(
         )
         
         return {
-            "user_id": user_id,
+            "position": position,
             "message": alert_msg,
             "state_key": last_key,
             "tx_hash": tx_hash,
             "symbol": symbol,
-            "address": address
+            "address": address,
+            # Advanced by the caller once the alert is delivered
+            "cursor_key": cursor_key,
+            "tx": latest_tx
         }
     
     except (ValueError, TypeError, KeyError) as e:
@@ -299,25 +317,27 @@ async def process_token_whales(
     symbol: str,
     contract: str,
     whales: List[Dict],
-    user_id: str,
     last_seen: Dict,
-    limit: int
+    cursors: Dict,
+    limit: int,
+    semaphore: asyncio.Semaphore
 ) -> List[Dict]:
     """
-    Process all whales for a token concurrently with controlled concurrency.
+    Process the top `limit` whales of a token concurrently. `semaphore` is
+    shared by every token of the cycle and caps in-flight requests.
     Returns: List of alert data for new whale movements
     """
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-    
-    async def process_with_semaphore(whale, rank):
+    async def process_with_semaphore(whale, rank, position):
         async with semaphore:
-            return await process_whale(whale, symbol, contract, user_id, last_seen, rank)
+            return await process_whale(
+                whale, symbol, contract, last_seen, cursors, rank, position
+            )
     
     # Create tasks for all whales
     tasks = []
     for idx, whale in enumerate(whales[:limit]):
         rank = whale.get("rank", idx + 1)
-        task = process_with_semaphore(whale, rank)
+        task = process_with_semaphore(whale, rank, idx)
         tasks.append(task)
     
     # Process concurrently
@@ -345,93 +365,80 @@ async def monitor_whales():
     print(f"   Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
     print(f"{'='*60}\n")
     
-    # Load state
-    last_seen = await load_json_async(STATE_FILE, {})
-    user_tracking = await load_json_async(USER_TRACK_FILE, {})
+    # Subscriptions come back grouped by token: {symbol: {user_id: limit}}
+    subscriptions = await asyncio.to_thread(whale_store.get_subscriptions)
     
-    # Validate user tracking data
-    if not user_tracking or not isinstance(user_tracking, dict):
+    if not subscriptions:
         print("⚠️ No users are tracking whales yet.")
         print("   Waiting for next cycle...\n")
         return
     
+    # Load state for the tracked tokens only
+    last_seen = await asyncio.to_thread(whale_store.get_seen, list(subscriptions))
+    cursors = await asyncio.to_thread(whale_store.get_cursors)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
     # Metrics
     stats = {
-        "users_checked": 0,
+        "users_checked": len({user_id for users in subscriptions.values() for user_id in users}),
         "tokens_checked": 0,
         "whales_monitored": 0,
         "alerts_sent": 0,
         "errors": 0
     }
     
-    # Process each user's tracked tokens
-    for user_id, data in user_tracking.items():
-        if not isinstance(data, dict):
-            continue
+    async def check_token(symbol: str, subscribers: Dict[str, int]):
+        # Poll once, deep enough for the subscriber with the highest limit
+        limit = max(subscribers.values())
         
-        stats["users_checked"] += 1
-        tracked = data.get("tracked", [])
+        # Load whale data (only the top `limit` holders)
+        whale_data = await asyncio.to_thread(whale_store.get_token_whales, symbol, limit)
         
-        if not isinstance(tracked, list):
+        if not whale_data or whale_data.get("unsupported"):
+            return None
+        
+        contract = whale_data.get("contract")
+        whales = whale_data.get("whales", [])
+        
+        if not contract or not whales:
+            return None
+        
+        stats["tokens_checked"] += 1
+        stats["whales_monitored"] += min(len(whales), limit)
+        
+        print(f"📊 Checking {symbol} ({len(whales[:limit])} whales) for {len(subscribers)} user(s)")
+        
+        return await process_token_whales(
+            symbol, contract, whales, last_seen, cursors, limit, semaphore
+        )
+    
+    # Every token is polled once per cycle, all through the shared semaphore
+    symbols = list(subscriptions)
+    results = await asyncio.gather(
+        *(check_token(symbol, subscriptions[symbol]) for symbol in symbols),
+        return_exceptions=True
+    )
+    
+    # Fan each alert out to the subscribers whose limit covers that whale
+    for symbol, alerts in zip(symbols, results):
+        if isinstance(alerts, Exception):
+            print(f"⚠️ Failed to check {symbol}: {alerts}")
+            stats["errors"] += 1
             continue
         
-        for item in tracked:
-            if not isinstance(item, dict):
-                continue
-            
-            symbol = item.get("token")
-            limit = item.get("limit", 5)
-            
-            if not symbol or not isinstance(limit, int):
-                continue
-            
-            # Validate and clamp limit
-            limit = max(1, min(limit, 100))
-            
-            # Load whale data
-            whale_file = Path(WHALE_DATA_DIR) / f"{symbol}.json"
-            if not whale_file.exists():
-                continue
-            
-            whale_data = await load_json_async(str(whale_file))
-            
-            if not isinstance(whale_data, dict):
-                continue
-            
-            if whale_data.get("unsupported"):
-                continue
+        for alert in alerts or []:
+            delivered = False
             
-            contract = whale_data.get("contract")
-            whales = whale_data.get("whales", [])
-            
-            if not contract or not isinstance(whales, list):
-                continue
-            
-            stats["tokens_checked"] += 1
-            stats["whales_monitored"] += min(len(whales), limit)
-            
-            print(f"📊 Checking {symbol} ({len(whales[:limit])} whales) for user {user_id}")
-            
-            # Process whales concurrently
-            alerts = await process_token_whales(
-                symbol, contract, whales, user_id, last_seen, limit
-            )
-            
-            # Send alerts and update state
-            for alert in alerts:
+            for user_id, limit in subscriptions[symbol].items():
+                if alert["position"] >= limit:
+                    continue
+                
                 try:
-                    success = await send_whale_alert(alert["user_id"], alert["message"])
+                    success = await send_whale_alert(user_id, alert["message"])
                     
                     if success:
                         stats["alerts_sent"] += 1
-                        
-                        # Update state
-                        last_seen[alert["state_key"]] = {
-                            "hash": alert["tx_hash"],
-                            "timestamp": time.time()
-                        }
-                        
-                        print(f"   ✅ Sent alert for {alert['symbol']} whale {alert['address'][:8]}...")
+                        delivered = True
                     else:
                         stats["errors"] += 1
                     
@@ -441,12 +448,27 @@ async def monitor_whales():
                 except Exception as e:
                     print(f"   ⚠️ Error sending alert: {e}")
                     stats["errors"] += 1
+            
+            if delivered:
+                # Update state
+                last_seen[alert["state_key"]] = alert["tx_hash"]
+                await asyncio.to_thread(whale_store.mark_seen, alert["state_key"], alert["tx_hash"])
+                update_cursor(cursors, alert["cursor_key"], alert["tx"])
+                
+                print(f"   ✅ Sent alert for {alert['symbol']} whale {alert['address'][:8]}...")
     
-    # Cleanup old state entries
-    last_seen = cleanup_old_state(last_seen)
+    # Save the cursors polled this cycle
+    polled = {
+        key: cursor for key, cursor in cursors.items()
+        if isinstance(cursor, dict) and cursor.get("timestamp", 0) >= start_time
+    }
+    stats["whales_polled"] = len(polled)
+    await asyncio.to_thread(whale_store.save_cursors, polled)
     
-    # Save state
-    await save_json_async(STATE_FILE, last_seen)
+    # Cleanup old state entries
+    removed = await asyncio.to_thread(whale_store.prune_state, STATE_CLEANUP_DAYS)
+    if removed:
+        print(f"🧹 Cleaned up {removed} old state entries")
     
     # Calculate duration
     duration = time.time() - start_time
@@ -458,6 +480,7 @@ async def monitor_whales():
     print(f"   Users checked: {stats['users_checked']}")
     print(f"   Tokens checked: {stats['tokens_checked']}")
     print(f"   Whales monitored: {stats['whales_monitored']}")
+    print(f"   Whales polled: {stats['whales_polled']}")
     print(f"   Alerts sent: {stats['alerts_sent']}")
     print(f"   Errors: {stats['errors']}")
     print(f"{'='*60}\n")
@@ -469,7 +492,7 @@ async def monitor_whales():
 async def start_monitor(context):
     """Run the monitor continuously with error recovery"""
     print("🚀 Starting continuous whale monitoring...")
-    print(f"   Check interval: {WHALE_CHECK_INTERVAL}s")
+    print(f"   Check interval: {WHALE_CHECK_INTERVAL}s (whales: {WHALE_CHECK_INTERVAL}-{MAX_POLL_INTERVAL}s)")
     print(f"   Max concurrent requests: {MAX_CONCURRENT_REQUESTS}")
     print(f"   State cleanup: {STATE_CLEANUP_DAYS} days\n")
     
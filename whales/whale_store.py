@@ -0,0 +1,436 @@
+# whales/whale_store.py
+"""
+SQLite store for whale tracking (shared app DB, see models/db.py).
+
+    whale_tokens    one row per token: contract, or why it is unsupported
+    whale_holders   top holders per token, indexed by (symbol, rank)
+    whale_tracking  /track subscriptions, indexed by user and by symbol
+    whale_seen      last alerted tx per symbol:address, indexed by age
+    whale_cursors   Etherscan block cursor + poll schedule per contract:address
+
+Everything is a point upsert or an indexed range query, so a monitor cycle
+reads only the rows it needs and writes only the rows that changed; old
+state is pruned with an indexed DELETE instead of rewriting a file.
+
+migrate() creates the tables and, the first time, imports the legacy
+whales/data/*.json, whales/user_tracking.json and whales/last_seen.json.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+from models.db import get_connection as _base_get_connection
+
+LEGACY_WHALE_DATA_DIR = "whales/data"
+LEGACY_USER_TRACK_FILE = "whales/user_tracking.json"
+LEGACY_STATE_FILE = "whales/last_seen.json"
+
+
+def _get_db() -> sqlite3.Connection:
+    conn = _base_get_connection()
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# ============================================================================
+# SCHEMA MIGRATION
+# ============================================================================
+
+def migrate():
+    """
+    Create the whale tables if they don't exist and import legacy JSON
+    state into empty tables. Safe to call on every bot startup.
+    """
+    db = _get_db()
+    try:
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS whale_tokens (
+                symbol      TEXT PRIMARY KEY,
+                contract    TEXT,
+                unsupported INTEGER NOT NULL DEFAULT 0,
+                reason      TEXT,
+                updated_at  REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS whale_holders (
+                symbol  TEXT    NOT NULL,
+                rank    INTEGER NOT NULL,
+                address TEXT    NOT NULL,
+                balance REAL,
+                share   REAL,
+                PRIMARY KEY (symbol, rank)
+            );
+
+            CREATE TABLE IF NOT EXISTS whale_tracking (
+                user_id     TEXT    NOT NULL,
+                symbol      TEXT    NOT NULL,
+                whale_limit INTEGER NOT NULL,
+                added_at    TEXT,
+                PRIMARY KEY (user_id, symbol)
+            );
+            CREATE INDEX IF NOT EXISTS idx_whale_tracking_symbol
+                ON whale_tracking (symbol);
+
+            CREATE TABLE IF NOT EXISTS whale_seen (
+                state_key TEXT PRIMARY KEY,
+                tx_hash   TEXT NOT NULL,
+                seen_at   REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_whale_seen_seen_at
+                ON whale_seen (seen_at);
+
+            CREATE TABLE IF NOT EXISTS whale_cursors (
+                cursor_key    TEXT PRIMARY KEY,
+                block         INTEGER,
+                last_activity REAL,
+                poll_interval INTEGER,
+                next_check    REAL,
+                checked_at    REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_whale_cursors_checked_at
+                ON whale_cursors (checked_at);
+        """)
+        db.commit()
+        _import_legacy_json(db)
+    finally:
+        db.close()
+    print("[whale_store] ✅ DB migration complete")
+
+
+def _load_legacy(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[whale_store] ⚠️ Skipping legacy file {path}: {e}")
+        return None
+
+
+def _is_empty(db: sqlite3.Connection, table: str) -> bool:
+    return db.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None
+
+
+def _import_legacy_json(db: sqlite3.Connection) -> None:
+    """One-off import of the JSON files this store replaces"""
+    if _is_empty(db, "whale_tokens") and os.path.isdir(LEGACY_WHALE_DATA_DIR):
+        count = 0
+        for name in sorted(os.listdir(LEGACY_WHALE_DATA_DIR)):
+            if not name.endswith(".json"):
+                continue
+            data = _load_legacy(os.path.join(LEGACY_WHALE_DATA_DIR, name))
+            if not isinstance(data, dict):
+                continue
+            symbol = (data.get("token") or data.get("symbol") or name[:-5]).upper()
+            if data.get("unsupported"):
+                _write_token(db, symbol, None, [], reason=data.get("reason"))
+            elif data.get("contract") and isinstance(data.get("whales"), list):
+                _write_token(db, symbol, data["contract"], data["whales"])
+            else:
+                continue
+            count += 1
+        db.commit()
+        if count:
+            print(f"[whale_store] Imported whale data for {count} tokens")
+
+    if _is_empty(db, "whale_tracking") and os.path.exists(LEGACY_USER_TRACK_FILE):
+        tracking = _load_legacy(LEGACY_USER_TRACK_FILE)
+        rows = []
+        for user_id, data in (tracking or {}).items():
+            tracked = data.get("tracked", []) if isinstance(data, dict) else []
+            for item in tracked if isinstance(tracked, list) else []:
+                if isinstance(item, dict) and item.get("token") and isinstance(item.get("limit"), int):
+                    rows.append((str(user_id), item["token"].upper(), item["limit"], item.get("added_at")))
+        db.executemany(
+            "INSERT OR IGNORE INTO whale_tracking (user_id, symbol, whale_limit, added_at) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        db.commit()
+        if rows:
+            print(f"[whale_store] Imported {len(rows)} tracking subscriptions")
+
+    if _is_empty(db, "whale_seen") and os.path.exists(LEGACY_STATE_FILE):
+        state = _load_legacy(LEGACY_STATE_FILE)
+        rows = []
+        for key, value in (state or {}).items():
+            if isinstance(value, dict) and value.get("hash"):
+                rows.append((key, value["hash"], value.get("timestamp", time.time())))
+            elif isinstance(value, str):
+                rows.append((key, value, time.time()))
+        db.executemany(
+            "INSERT OR IGNORE INTO whale_seen (state_key, tx_hash, seen_at) VALUES (?, ?, ?)",
+            rows,
+        )
+        db.commit()
+
+
+# ============================================================================
+# whale_tokens / whale_holders
+# ============================================================================
+
+def _write_token(
+    db: sqlite3.Connection,
+    symbol: str,
+    contract: Optional[str],
+    whales: List[Dict],
+    reason: Optional[str] = None,
+) -> None:
+    db.execute(
+        "INSERT OR REPLACE INTO whale_tokens (symbol, contract, unsupported, reason, updated_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (symbol, contract, 0 if contract else 1, reason, time.time()),
+    )
+    db.execute("DELETE FROM whale_holders WHERE symbol = ?", (symbol,))
+    db.executemany(
+        "INSERT OR REPLACE INTO whale_holders (symbol, rank, address, balance, share) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [
+            (symbol, w.get("rank", idx), w["address"], w.get("balance"), w.get("share"))
+            for idx, w in enumerate(whales, start=1)
+            if isinstance(w, dict) and w.get("address")
+        ],
+    )
+
+
+def save_token_whales(symbol: str, contract: str, whales: List[Dict]) -> None:
+    """Replace the holder list of `symbol` in one transaction"""
+    db = _get_db()
+    try:
+        _write_token(db, symbol.upper(), contract, whales)
+        db.commit()
+    finally:
+        db.close()
+
+
+def save_unsupported_token(symbol: str, reason: str) -> None:
+    """Mark `symbol` as untrackable (no ERC20 contract / no holder data)"""
+    db = _get_db()
+    try:
+        _write_token(db, symbol.upper(), None, [], reason=reason)
+        db.commit()
+    finally:
+        db.close()
+
+
+def get_token_info(symbol: str) -> Optional[Dict]:
+    """{"token", "contract", "unsupported", "reason", "updated_at"} or None"""
+    db = _get_db()
+    try:
+        row = db.execute(
+            "SELECT * FROM whale_tokens WHERE symbol = ?", (symbol.upper(),)
+        ).fetchone()
+    finally:
+        db.close()
+    if row is None:
+        return None
+    return {
+        "token": row["symbol"],
+        "contract": row["contract"],
+        "unsupported": bool(row["unsupported"]),
+        "reason": row["reason"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def get_token_whales(symbol: str, limit: Optional[int] = None) -> Optional[Dict]:
+    """
+    Token info plus its top `limit` holders (all if None) under "whales",
+    in the shape of the former whales/data/<SYMBOL>.json. None if unknown.
+    """
+    info = get_token_info(symbol)
+    if info is None:
+        return None
+
+    db = _get_db()
+    try:
+        rows = db.execute(
+            "SELECT rank, address, balance, share FROM whale_holders "
+            "WHERE symbol = ? ORDER BY rank LIMIT ?",
+            (info["token"], -1 if limit is None else limit),
+        ).fetchall()
+    finally:
+        db.close()
+    info["whales"] = [dict(row) for row in rows]
+    return info
+
+
+def get_supported_tokens() -> List[str]:
+    """Symbols that can be tracked, sorted"""
+    db = _get_db()
+    try:
+        rows = db.execute(
+            "SELECT symbol FROM whale_tokens WHERE unsupported = 0 ORDER BY symbol"
+        ).fetchall()
+    finally:
+        db.close()
+    return [row["symbol"] for row in rows]
+
+
+# ============================================================================
+# whale_tracking
+# ============================================================================
+
+def get_user_tracking(user_id: str) -> List[Dict]:
+    """[{"token", "limit", "added_at"}] in the order they were added"""
+    db = _get_db()
+    try:
+        rows = db.execute(
+            "SELECT symbol, whale_limit, added_at FROM whale_tracking "
+            "WHERE user_id = ? ORDER BY rowid",
+            (str(user_id),),
+        ).fetchall()
+    finally:
+        db.close()
+    return [
+        {"token": row["symbol"], "limit": row["whale_limit"], "added_at": row["added_at"]}
+        for row in rows
+    ]
+
+
+def add_tracking(user_id: str, symbol: str, limit: int, added_at: str) -> bool:
+    """Subscribe `user_id` to `symbol`. Returns False if already tracked."""
+    db = _get_db()
+    try:
+        cursor = db.execute(
+            "INSERT OR IGNORE INTO whale_tracking (user_id, symbol, whale_limit, added_at) "
+            "VALUES (?, ?, ?, ?)",
+            (str(user_id), symbol.upper(), limit, added_at),
+        )
+        db.commit()
+        return cursor.rowcount > 0
+    finally:
+        db.close()
+
+
+def remove_tracking(user_id: str, symbol: Optional[str] = None) -> int:
+    """Unsubscribe `user_id` from `symbol` (or everything). Returns #rows removed."""
+    db = _get_db()
+    try:
+        if symbol is None:
+            cursor = db.execute("DELETE FROM whale_tracking WHERE user_id = ?", (str(user_id),))
+        else:
+            cursor = db.execute(
+                "DELETE FROM whale_tracking WHERE user_id = ? AND symbol = ?",
+                (str(user_id), symbol.upper()),
+            )
+        db.commit()
+        return cursor.rowcount
+    finally:
+        db.close()
+
+
+def get_subscriptions() -> Dict[str, Dict[str, int]]:
+    """{symbol: {user_id: limit}} for every tracked token"""
+    db = _get_db()
+    try:
+        rows = db.execute(
+            "SELECT symbol, user_id, whale_limit FROM whale_tracking ORDER BY symbol"
+        ).fetchall()
+    finally:
+        db.close()
+    subscriptions: Dict[str, Dict[str, int]] = {}
+    for row in rows:
+        limit = max(1, min(row["whale_limit"], 100))
+        subscriptions.setdefault(row["symbol"], {})[row["user_id"]] = limit
+    return subscriptions
+
+
+# ============================================================================
+# whale_seen
+# ============================================================================
+
+def get_seen(symbols: Iterable[str]) -> Dict[str, str]:
+    """{"SYMBOL:address": tx_hash} of the last alerted tx for `symbols`"""
+    db = _get_db()
+    seen = {}
+    try:
+        for symbol in symbols:
+            # Range scan on the primary key: "SYM:" <= key < "SYM;"
+            rows = db.execute(
+                "SELECT state_key, tx_hash FROM whale_seen WHERE state_key >= ? AND state_key < ?",
+                (f"{symbol}:", f"{symbol};"),
+            ).fetchall()
+            seen.update((row["state_key"], row["tx_hash"]) for row in rows)
+    finally:
+        db.close()
+    return seen
+
+
+def mark_seen(state_key: str, tx_hash: str) -> None:
+    """Record `tx_hash` as the last alerted tx of `state_key`"""
+    db = _get_db()
+    try:
+        db.execute(
+            "INSERT OR REPLACE INTO whale_seen (state_key, tx_hash, seen_at) VALUES (?, ?, ?)",
+            (state_key, tx_hash, time.time()),
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+# ============================================================================
+# whale_cursors
+# ============================================================================
+
+def get_cursors() -> Dict[str, Dict]:
+    """{contract:address: cursor} in the dict shape used by whale_monitor"""
+    db = _get_db()
+    try:
+        rows = db.execute("SELECT * FROM whale_cursors").fetchall()
+    finally:
+        db.close()
+    cursors = {}
+    for row in rows:
+        cursor = {
+            "block": row["block"],
+            "last_activity": row["last_activity"],
+            "interval": row["poll_interval"],
+            "next_check": row["next_check"],
+            "timestamp": row["checked_at"],
+        }
+        cursors[row["cursor_key"]] = {k: v for k, v in cursor.items() if v is not None}
+    return cursors
+
+
+def save_cursors(cursors: Dict[str, Dict]) -> None:
+    """Upsert the given cursors in one transaction"""
+    if not cursors:
+        return
+    db = _get_db()
+    try:
+        db.executemany(
+            "INSERT OR REPLACE INTO whale_cursors "
+            "(cursor_key, block, last_activity, poll_interval, next_check, checked_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    key, c.get("block"), c.get("last_activity"), c.get("interval"),
+                    c.get("next_check"), c.get("timestamp", time.time()),
+                )
+                for key, c in cursors.items()
+            ],
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+# ============================================================================
+# PRUNING
+# ============================================================================
+
+def prune_state(max_age_days: int) -> int:
+    """Delete seen txs and cursors not touched for `max_age_days`. Returns #rows."""
+    cutoff = time.time() - max_age_days * 86400
+    db = _get_db()
+    try:
+        removed = db.execute("DELETE FROM whale_seen WHERE seen_at < ?", (cutoff,)).rowcount
+        removed += db.execute("DELETE FROM whale_cursors WHERE checked_at < ?", (cutoff,)).rowcount
+        db.commit()
+    finally:
+        db.close()
+    return removed